@@ -1,15 +1,53 @@
-import requests
 import logging
+import time
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
 
 from django.conf import settings
 
+from marketplace.clients.circuit_breaker import CircuitOpenError, circuit_breakers
 from marketplace.clients.exceptions import CustomAPIException
+from marketplace.clients.metrics import (
+    IN_FLIGHT,
+    REQUEST_BYTES,
+    REQUEST_DURATION,
+    RESPONSE_BYTES,
+    RESPONSES,
+    url_template,
+)
+from marketplace.clients.sessions import http_session_pool
+from marketplace.clients.token_cache import module_token_cache
 
 
 logger = logging.getLogger(__name__)
 
 
 class RequestClient:
+    # Keep-alive sessions shared by every client of the process, one per host
+    session_pool = http_session_pool
+    # Fail fast towards targets that keep failing, shared by every process
+    circuit_breakers = circuit_breakers
+
+    def get_circuit_name(self, url: str) -> str:
+        """
+        Return the circuit a request to `url` belongs to: its host by default,
+        which for VTEX APIs is the store domain.
+        """
+        return urlsplit(url).netloc.lower()
+
+    def get_metric_labels(self, url: str, method: str) -> dict:
+        """
+        Return the labels identifying the endpoint of a request in the metrics.
+        """
+        return {
+            "client": type(self).__name__,
+            "method": method.upper(),
+            "endpoint": url_template(url),
+        }
+
     def make_request(
         self,
         url: str,
@@ -21,13 +59,65 @@ class RequestClient:
         json=None,
         timeout=60,
         ignore_error_logs=False,
+    ):
+        options = dict(
+            data=data,
+            params=params,
+            files=files,
+            json=json,
+            timeout=timeout,
+            ignore_error_logs=ignore_error_logs,
+        )
+        try:
+            return self._send_request(url, method, headers, **options)
+        except CustomAPIException as e:
+            renewed = (
+                self._renew_authorization(headers) if e.status_code == 401 else None
+            )
+            if renewed is None:
+                raise
+            # The module token was revoked before it expired, retry once
+            return self._send_request(url, method, renewed, **options)
+
+    def _renew_authorization(self, headers) -> Optional[dict]:
+        """
+        Return `headers` with a new module token after a 401, or None when the
+        request was not sent with the module token of the client.
+        """
+        authentication = getattr(self, "authentication_instance", None)
+        if not isinstance(authentication, InternalAuthentication):
+            return None
+        return authentication.renew_headers(headers)
+
+    def _send_request(
+        self,
+        url: str,
+        method: str,
+        headers=None,
+        data=None,
+        params=None,
+        files=None,
+        json=None,
+        timeout=60,
+        ignore_error_logs=False,
     ):
         if data and json:
             raise ValueError(
                 "Cannot use both 'data' and 'json' arguments simultaneously."
             )
+        circuit_name = self.get_circuit_name(url)
+        labels = self.get_metric_labels(url, method)
+        try:
+            is_trial = self.circuit_breakers.before_call(circuit_name)
+        except CircuitOpenError:
+            RESPONSES.inc(status="circuit_open", **labels)
+            raise
+
+        IN_FLIGHT.inc(**labels)
+        started_at = time.perf_counter()
         try:
-            response = requests.request(
+            session = self.session_pool.get_session(url)
+            response = session.request(
                 method=method,
                 url=url,
                 headers=headers,
@@ -38,6 +128,8 @@ class RequestClient:
                 files=files,
             )
         except Exception as e:
+            RESPONSES.inc(status="error", **labels)
+            self.circuit_breakers.record_failure(circuit_name, is_trial)
             if not ignore_error_logs:
                 self._log_request_exception(
                     exception=e,
@@ -53,6 +145,17 @@ class RequestClient:
                 detail=f"Base request error: {str(e)}",
                 status_code=getattr(e.response, "status_code", None),
             ) from e
+        finally:
+            IN_FLIGHT.dec(**labels)
+            REQUEST_DURATION.observe(time.perf_counter() - started_at, **labels)
+
+        RESPONSES.inc(status=str(response.status_code), **labels)
+        self._record_body_sizes(response, labels)
+
+        if self.circuit_breakers.is_failure_status(response.status_code):
+            self.circuit_breakers.record_failure(circuit_name, is_trial)
+        else:
+            self.circuit_breakers.record_success(circuit_name, is_trial)
 
         if response.status_code >= 400:
             detail = ""
@@ -64,10 +167,47 @@ class RequestClient:
                 detail = response.json()
             except ValueError:
                 detail = response.text
-            raise CustomAPIException(detail=detail, status_code=response.status_code)
+            raise CustomAPIException(
+                detail=detail,
+                status_code=response.status_code,
+                retry_after=self._parse_retry_after(
+                    response.headers.get("Retry-After")
+                ),
+            )
 
         return response
 
+    @staticmethod
+    def _record_body_sizes(response, labels: dict) -> None:
+        request_body = getattr(response.request, "body", None)
+        if isinstance(request_body, str):
+            request_body = request_body.encode()
+        if isinstance(request_body, bytes):
+            REQUEST_BYTES.inc(len(request_body), **labels)
+
+        content = response.content
+        if isinstance(content, bytes):
+            RESPONSE_BYTES.inc(len(content), **labels)
+
+    @staticmethod
+    def _parse_retry_after(value) -> Optional[float]:
+        """
+        Convert a Retry-After header, in seconds or as an HTTP date, to seconds.
+        """
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except (TypeError, ValueError):
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
     def _generate_log(self, response, url, method, headers, json, data, params, files):
         if response is None:
             logger.error("Response object is None, request failed.")
@@ -137,7 +277,10 @@ class RequestClient:
 
 
 class InternalAuthentication(RequestClient):
-    def __get_module_token(self):
+    # Module tokens are cached until shortly before they expire
+    token_cache = module_token_cache
+
+    def _request_module_token(self):
         data = {
             "client_id": settings.OIDC_RP_CLIENT_ID,
             "client_secret": settings.OIDC_RP_CLIENT_SECRET,
@@ -147,10 +290,25 @@ class InternalAuthentication(RequestClient):
             url=settings.OIDC_OP_TOKEN_ENDPOINT, method="POST", data=data
         )
 
-        token = request.json().get("access_token")
+        return request.json()
+
+    def __get_module_token(self):
+        token = self.token_cache.get_token(self._request_module_token)
 
         return f"Bearer {token}"
 
+    def renew_headers(self, sent_headers) -> Optional[dict]:
+        """
+        Drop the cached module token rejected with a 401 and return
+        `sent_headers` with a new one, or None when they carry another token.
+        """
+        if not sent_headers:
+            return None
+        if sent_headers.get("Authorization") != self.__get_module_token():
+            return None
+        self.token_cache.invalidate()
+        return {**sent_headers, "Authorization": self.__get_module_token()}
+
     @property
     def headers(self):
         return {
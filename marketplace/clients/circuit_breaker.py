@@ -0,0 +1,271 @@
+import logging
+import threading
+import time
+
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from marketplace.clients.exceptions import CustomAPIException
+
+
+logger = logging.getLogger(__name__)
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(CustomAPIException):
+    """
+    Raised instead of sending a request while the circuit of its target is open.
+    """
+
+    status_code = 503
+    default_code = "circuit_open"
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            detail=f"Circuit breaker for {name} is open, retry in {retry_after:.0f}s",
+            status_code=self.status_code,
+        )
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreakerRegistry:
+    """
+    Circuit breakers shared by every process through Redis, one per target
+    (an API host or a VTEX account).
+
+    - closed: requests flow; failures are counted over `failure_window` seconds
+      and the circuit opens once they reach `failure_threshold`.
+    - open: requests fail fast with CircuitOpenError for `recovery_timeout`
+      seconds.
+    - half_open: up to `half_open_max_calls` trial requests are let through;
+      a success closes the circuit and a failure opens it again.
+
+    Only transport errors and gateway statuses count as failures: 4xx answers
+    and plain 500s (which VTEX returns for some missing SKUs) say nothing about
+    the health of the target. Closed circuits are cached in memory for
+    `local_ttl` seconds, so healthy targets cost no Redis round trip per
+    request. When Redis is unavailable, requests are let through.
+    """
+
+    KEY_PREFIX = "circuit-breaker"
+    FAILURE_STATUS_CODES = {502, 503, 504}
+
+    def __init__(
+        self,
+        failure_threshold: int = 20,
+        failure_window: int = 60,
+        recovery_timeout: int = 30,
+        half_open_max_calls: int = 1,
+        local_ttl: float = 1.0,
+        enabled: bool = True,
+        redis_client=None,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.local_ttl = local_ttl
+        self.enabled = enabled
+        self._redis = redis_client
+        self._redis_retry_at = 0.0
+        self._closed_until: Dict[str, float] = {}
+        self._metrics: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_connection()
+        return self._redis
+
+    def _state_key(self, name: str) -> str:
+        return f"{self.KEY_PREFIX}:{name}"
+
+    def _failures_key(self, name: str) -> str:
+        return f"{self.KEY_PREFIX}:{name}:failures"
+
+    def _count(self, name: str, metric: str) -> None:
+        with self._lock:
+            metrics = self._metrics.setdefault(
+                name,
+                {
+                    "allowed": 0,
+                    "rejected": 0,
+                    "successes": 0,
+                    "failures": 0,
+                    "opened": 0,
+                    "closed": 0,
+                },
+            )
+            metrics[metric] += 1
+
+    def _redis_call(self, operation, *args, **kwargs) -> Any:
+        """
+        Run a Redis command, backing off from Redis for a few seconds if it
+        is unavailable so that requests are not slowed down by the breaker.
+        """
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            return getattr(self.redis, operation)(*args, **kwargs)
+        except Exception as e:
+            self._redis_retry_at = time.monotonic() + 5
+            logger.warning(f"Circuit breaker could not reach Redis: {e}")
+            return None
+
+    def before_call(self, name: str) -> bool:
+        """
+        Check whether a request to `name` may be sent.
+
+        Args:
+            name: Circuit identifier.
+
+        Returns:
+            True when the request is a half-open trial, False otherwise.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        if not self.enabled:
+            return False
+
+        if time.monotonic() < self._closed_until.get(name, 0):
+            self._count(name, "allowed")
+            return False
+
+        state = self._decode(self._redis_call("hgetall", self._state_key(name)))
+        if state.get("state", CLOSED) == CLOSED:
+            self._closed_until[name] = time.monotonic() + self.local_ttl
+            self._count(name, "allowed")
+            return False
+
+        retry_after = float(state.get("opened_at", 0)) + self.recovery_timeout
+        retry_after -= time.time()
+        if retry_after > 0:
+            self._count(name, "rejected")
+            raise CircuitOpenError(name, retry_after)
+
+        trials = self._redis_call("hincrby", self._state_key(name), "trials", 1)
+        if trials is not None and trials > self.half_open_max_calls:
+            self._count(name, "rejected")
+            raise CircuitOpenError(name, self.recovery_timeout)
+
+        self._redis_call("hset", self._state_key(name), "state", HALF_OPEN)
+        self._count(name, "allowed")
+        return True
+
+    def record_success(self, name: str, is_trial: bool = False) -> None:
+        """
+        Record a request that reached a healthy target.
+        """
+        if not self.enabled:
+            return
+        self._count(name, "successes")
+        if is_trial:
+            self._redis_call("delete", self._state_key(name), self._failures_key(name))
+            self._count(name, "closed")
+            logger.info(f"Circuit breaker for {name} closed")
+
+    def record_failure(self, name: str, is_trial: bool = False) -> None:
+        """
+        Record a request that failed because of its target, opening the
+        circuit when the failure threshold is reached.
+        """
+        if not self.enabled:
+            return
+        self._count(name, "failures")
+        if not is_trial:
+            failures = self._redis_call("incr", self._failures_key(name))
+            if failures == 1:
+                self._redis_call(
+                    "expire", self._failures_key(name), self.failure_window
+                )
+            if failures is None or failures < self.failure_threshold:
+                return
+
+        self._open(name)
+
+    def is_failure_status(self, status_code: Optional[int]) -> bool:
+        return status_code in self.FAILURE_STATUS_CODES
+
+    def _open(self, name: str) -> None:
+        self._closed_until.pop(name, None)
+        self._redis_call(
+            "hset",
+            self._state_key(name),
+            mapping={"state": OPEN, "opened_at": time.time(), "trials": 0},
+        )
+        # Stale circuits expire on their own if nobody calls the target again
+        self._redis_call(
+            "expire", self._state_key(name), self.recovery_timeout + self.failure_window
+        )
+        self._redis_call("delete", self._failures_key(name))
+        self._count(name, "opened")
+        logger.warning(
+            f"Circuit breaker for {name} opened for {self.recovery_timeout}s"
+        )
+
+    @staticmethod
+    def _decode(values: Optional[dict]) -> Dict[str, str]:
+        if not values:
+            return {}
+        return {
+            (k.decode() if isinstance(k, bytes) else k): (
+                v.decode() if isinstance(v, bytes) else v
+            )
+            for k, v in values.items()
+        }
+
+    def states(self) -> List[Dict[str, Any]]:
+        """
+        Return the circuits that are currently open or half-open.
+        """
+        states = []
+        try:
+            keys = list(self.redis.scan_iter(match=f"{self.KEY_PREFIX}:*"))
+        except Exception as e:
+            logger.warning(f"Circuit breaker could not reach Redis: {e}")
+            keys = []
+
+        for key in keys:
+            key = key.decode() if isinstance(key, bytes) else key
+            if key.endswith(":failures"):
+                continue
+            state = self._decode(self._redis_call("hgetall", key))
+            if not state:
+                continue
+            opened_at = float(state.get("opened_at", 0))
+            states.append(
+                {
+                    "name": key.split(":", 1)[1],
+                    "state": state.get("state", CLOSED),
+                    "opened_at": opened_at,
+                    "retry_after": max(
+                        opened_at + self.recovery_timeout - time.time(), 0
+                    ),
+                }
+            )
+        return states
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return the per-circuit counters of this process.
+        """
+        with self._lock:
+            return {name: dict(metrics) for name, metrics in self._metrics.items()}
+
+
+circuit_breakers = CircuitBreakerRegistry(
+    failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    failure_window=settings.CIRCUIT_BREAKER_FAILURE_WINDOW,
+    recovery_timeout=settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+    half_open_max_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS,
+    enabled=settings.CIRCUIT_BREAKER_ENABLED,
+)
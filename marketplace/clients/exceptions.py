@@ -2,6 +2,8 @@ from rest_framework.exceptions import APIException
 
 
 class CustomAPIException(APIException):
-    def __init__(self, detail=None, code=None, status_code=None):
+    def __init__(self, detail=None, code=None, status_code=None, retry_after=None):
         super().__init__(detail, code)
         self.status_code = status_code or self.status_code
+        # Seconds the server asked to wait before retrying (Retry-After header)
+        self.retry_after = retry_after
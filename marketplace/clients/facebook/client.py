@@ -173,6 +173,48 @@ class CatalogsRequests(FacebookAuthorization, RequestClient, CatalogsRequestsInt
 
         return all_products
 
+    def iter_catalog_products(self, catalog_id, fields, page_size=2000):
+        """
+        Pages through all the products of a catalog, yielding one page at a
+        time so the catalog is never held in memory.
+
+        :param catalog_id: The ID of the Facebook catalog.
+        :param fields: Comma separated fields of the products.
+        :param page_size: Number of products per page.
+        """
+        params = dict(limit=page_size, fields=fields, bulk_pagination=True)
+        return self._iter_product_pages(catalog_id, params)
+
+    def iter_unapproved_products(self, catalog_id, page_size=2000):
+        """
+        Pages through the products of a catalog rejected by the Meta policies,
+        yielding one page at a time.
+
+        :param catalog_id: The ID of the Facebook catalog.
+        :param page_size: Number of products per page.
+        """
+        params = dict(
+            limit=page_size,
+            error_type="PRODUCT_NOT_APPROVED",
+            summary=True,
+            fields="id,name,availability,review_status,review_rejection_reasons,retailer_id",
+            bulk_pagination=True,
+        )
+        return self._iter_product_pages(catalog_id, params)
+
+    def _iter_product_pages(self, catalog_id, params):
+        url = f"{self.get_url}/{catalog_id}/products"
+        headers = self._get_headers()
+
+        while url:
+            response = self.make_request(
+                url, method="GET", headers=headers, params=params
+            ).json()
+            yield response.get("data", [])
+
+            url = response.get("paging", {}).get("next")
+            params = None
+
     def delete_products_in_batch(self, catalog_id, products_to_delete):
         url = f"{self.get_url}/{catalog_id}/batch"
         headers = self._get_headers()
@@ -200,6 +242,82 @@ class CatalogsRequests(FacebookAuthorization, RequestClient, CatalogsRequestsInt
 
         return response.json()
 
+    def create_product_feed(self, catalog_id: str, name: str):
+        """
+        Creates a product feed in the catalog, for products sent as a file.
+
+        :param catalog_id: The ID of the Facebook catalog.
+        :param name: The name of the feed.
+        :return: The API response, with the ID of the feed.
+        """
+        url = f"{self.get_url}/{catalog_id}/product_feeds"
+        headers = self._get_headers()
+        data = {"name": name}
+        response = self.make_request(url, method="POST", headers=headers, data=data)
+        return response.json()
+
+    def upload_product_feed(
+        self, feed_id: str, file, file_name: str, update_only: bool = True
+    ):
+        """
+        Uploads a feed file to a product feed.
+
+        :param feed_id: The ID of the product feed.
+        :param file: The file object of the feed, gzip compressed.
+        :param file_name: The name of the file sent to Meta.
+        :param update_only: Whether products missing from the file are kept.
+        :return: The API response, with the ID of the upload session.
+        """
+        url = f"{self.get_url}/{feed_id}/uploads"
+        headers = self._get_headers()
+        data = {"update_only": "true" if update_only else "false"}
+        files = {"file": (file_name, file, "application/gzip")}
+        response = self.make_request(
+            url,
+            method="POST",
+            headers=headers,
+            data=data,
+            files=files,
+            timeout=600,
+        )
+        return response.json()
+
+    def get_product_feed_upload(self, upload_id: str):
+        """
+        Reads the status of a feed upload session.
+
+        :param upload_id: The ID of the upload session.
+        :return: The upload session, with `end_time` once Meta processed the file.
+        """
+        url = f"{self.get_url}/{upload_id}"
+        headers = self._get_headers()
+        params = {
+            "fields": "id,end_time,error_count,num_detected_items,"
+            "num_invalid_items,num_persisted_items"
+        }
+        response = self.make_request(url, method="GET", headers=headers, params=params)
+        return response.json()
+
+    def list_product_feed_upload_errors(self, upload_id: str):
+        """
+        Pages through the errors of a feed upload session.
+
+        :param upload_id: The ID of the upload session.
+        :return: An iterator over the errors, with the products they sample.
+        """
+        url = f"{self.get_url}/{upload_id}/errors"
+        headers = self._get_headers()
+        params = {"fields": "id,summary,severity,samples{retailer_id}", "limit": 100}
+
+        while url:
+            response = self.make_request(
+                url, method="GET", headers=headers, params=params
+            ).json()
+            yield from response.get("data", [])
+
+            url = response.get("paging", {}).get("next")
+            params = None
+
     def get_products_by_catalog_id(
         self,
         catalog_id: str,
@@ -0,0 +1,103 @@
+import re
+
+from urllib.parse import urlsplit
+
+from marketplace.clients.circuit_breaker import circuit_breakers
+from marketplace.clients.sessions import http_session_pool
+from marketplace.core.metrics import metrics
+
+
+HTTP_CLIENT_LABELS = ("client", "method", "endpoint")
+
+REQUEST_DURATION = metrics.histogram(
+    "http_client_request_duration_seconds",
+    "Latency of outgoing HTTP requests.",
+    HTTP_CLIENT_LABELS,
+)
+RESPONSES = metrics.counter(
+    "http_client_responses",
+    "Outgoing HTTP requests by response status (error for transport errors).",
+    HTTP_CLIENT_LABELS + ("status",),
+)
+IN_FLIGHT = metrics.gauge(
+    "http_client_requests_in_flight",
+    "Outgoing HTTP requests waiting for a response.",
+    HTTP_CLIENT_LABELS,
+)
+REQUEST_BYTES = metrics.counter(
+    "http_client_request_bytes",
+    "Bytes sent in outgoing HTTP request bodies.",
+    HTTP_CLIENT_LABELS,
+)
+RESPONSE_BYTES = metrics.counter(
+    "http_client_response_bytes",
+    "Bytes received in HTTP response bodies.",
+    HTTP_CLIENT_LABELS,
+)
+RETRIES = metrics.counter(
+    "http_client_retries",
+    "Retries of client calls, by outcome (retry or give_up) and status.",
+    ("operation", "outcome", "status"),
+)
+
+
+_ID_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|[0-9a-fA-F]{24,})$"
+)
+
+
+def url_template(url: str) -> str:
+    """
+    Return the path of `url` with identifiers replaced by `{id}`, so that
+    requests to the same endpoint share their metrics. The host and the query
+    string are left out to keep the number of series bounded.
+    """
+    segments = urlsplit(url).path.split("/")
+    return "/".join(
+        "{id}" if _ID_SEGMENT.match(segment) else segment for segment in segments
+    )
+
+
+def _collect_connection_pools():
+    stats = http_session_pool.stats()
+    samples = {"requests": [], "connections": [], "reused": []}
+    for host, host_stats in stats.items():
+        for field in samples:
+            samples[field].append(({"host": host}, host_stats[field]))
+    yield (
+        "http_client_pool_requests",
+        "gauge",
+        "Requests sent through the pooled connections of each host.",
+        samples["requests"],
+    )
+    yield (
+        "http_client_pool_connections",
+        "gauge",
+        "Connections opened by the pool of each host.",
+        samples["connections"],
+    )
+    yield (
+        "http_client_pool_reused_requests",
+        "gauge",
+        "Requests served by an already open connection.",
+        samples["reused"],
+    )
+
+
+def _collect_circuit_breakers():
+    samples = [
+        ({"circuit": name, "event": event}, value)
+        for name, counters in circuit_breakers.stats().items()
+        for event, value in counters.items()
+    ]
+    yield (
+        "http_client_circuit_breaker_events",
+        "counter",
+        "Circuit breaker decisions and transitions seen by this process.",
+        samples,
+    )
+
+
+metrics.register_collector(_collect_connection_pools)
+metrics.register_collector(_collect_circuit_breakers)
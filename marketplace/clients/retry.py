@@ -0,0 +1,247 @@
+import dataclasses
+import functools
+import inspect
+import logging
+import random
+import threading
+import time
+
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Optional
+
+from marketplace.clients.circuit_breaker import CircuitOpenError
+from marketplace.clients.metrics import RETRIES
+
+
+logger = logging.getLogger(__name__)
+
+
+class RetryBudget:
+    """
+    Token bucket bounding how many retries a client may issue.
+
+    Every retry withdraws one token and every successful call deposits
+    `deposit_ratio` tokens, up to `max_tokens`. While a target is healthy the
+    bucket stays full; during an outage the retries stop once the bucket is
+    empty instead of multiplying the load on the failing target.
+    """
+
+    def __init__(self, max_tokens: float = 100, deposit_ratio: float = 0.1) -> None:
+        self.max_tokens = max_tokens
+        self.deposit_ratio = deposit_ratio
+        self._tokens = float(max_tokens)
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.deposit_ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+_budgets: Dict[str, RetryBudget] = {}
+_budgets_lock = threading.Lock()
+
+
+def get_retry_budget(name: str) -> RetryBudget:
+    """
+    Return the process-wide retry budget registered under `name`.
+    """
+    with _budgets_lock:
+        budget = _budgets.get(name)
+        if budget is None:
+            budget = _budgets[name] = RetryBudget()
+        return budget
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Describes when and how a failed call is retried.
+
+    Attributes:
+        max_attempts: Maximum number of calls, the first one included.
+        base_delay: Backoff ceiling of the first retry, in seconds.
+        factor: Growth factor of the backoff ceiling between retries.
+        max_delay: Upper bound of a single wait, in seconds.
+        max_elapsed: Give up once this many seconds were spent, if set.
+        retry_statuses: Status codes worth a retry; None retries any status
+            that is not in `give_up_statuses`.
+        give_up_statuses: Status codes that are raised right away.
+        respect_retry_after: Wait for the Retry-After sent by the server.
+        raise_on_exhaustion: Raise the last error when giving up instead of
+            logging it and returning None. Running out of retry budget always
+            raises the last error.
+        budget: Name of the retry budget shared by the calls using this policy,
+            kept per circuit when the client tells the circuit of the call.
+    """
+
+    max_attempts: int = 8
+    base_delay: float = 2
+    factor: float = 2
+    max_delay: float = 300
+    max_elapsed: Optional[float] = None
+    retry_statuses: Optional[FrozenSet[int]] = None
+    give_up_statuses: FrozenSet[int] = frozenset({404, 500})
+    respect_retry_after: bool = True
+    raise_on_exhaustion: bool = False
+    budget: Optional[str] = None
+
+    def is_retryable(self, exception: Exception) -> bool:
+        if isinstance(exception, CircuitOpenError):
+            # The target is known to be down, waiting here would only hold the worker
+            return False
+        status_code = getattr(exception, "status_code", None)
+        if status_code in self.give_up_statuses:
+            return False
+        if self.retry_statuses is None or status_code is None:
+            return True
+        return status_code in self.retry_statuses
+
+    def spends_budget(self, exception: Exception) -> bool:
+        """
+        A throttled call that tells when to come back waits as asked instead
+        of adding load to a failing target, so it does not spend the budget.
+        """
+        return not (
+            self.respect_retry_after
+            and getattr(exception, "status_code", None) == 429
+            and getattr(exception, "retry_after", None)
+        )
+
+    def backoff(self, attempt: int, exception: Exception) -> float:
+        """
+        Return how long to wait before the retry following `attempt`, using
+        full jitter unless the server told how long to wait.
+        """
+        retry_after = getattr(exception, "retry_after", None)
+        if self.respect_retry_after and retry_after:
+            return min(float(retry_after), self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * self.factor**attempt)
+        return random.uniform(0, ceiling)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def call_with_retry(policy: RetryPolicy, func: Callable, *args, **kwargs):
+    """
+    Call `func` and retry it according to `policy`.
+
+    Returns:
+        The result of `func`, or None when the retries are exhausted and the
+        policy does not raise on exhaustion.
+
+    Raises:
+        The last error when the retry budget of the policy is exhausted.
+    """
+    budget = get_retry_budget(policy.budget) if policy.budget else None
+    started_at = time.monotonic()
+    attempts = 0
+    last_exception = None
+    reason = "max retry attempts reached"
+    budget_exhausted = False
+
+    operation = getattr(func, "__qualname__", func.__name__)
+    while attempts < policy.max_attempts:
+        try:
+            result = func(*args, **kwargs)
+            if budget is not None:
+                budget.deposit()
+            return result
+        except Exception as e:
+            last_exception = e
+            attempts += 1
+            status_code = getattr(e, "status_code", None)
+
+            if not policy.is_retryable(e):
+                print(f"Response:[{status_code}] {str(e)}. Not retrying this.")
+                raise
+
+            if attempts >= policy.max_attempts:
+                break
+
+            sleep_time = policy.backoff(attempts - 1, e)
+            elapsed = time.monotonic() - started_at
+            if policy.max_elapsed is not None and (
+                elapsed + sleep_time > policy.max_elapsed
+            ):
+                reason = f"max elapsed time of {policy.max_elapsed}s reached"
+                break
+            if budget is not None and policy.spends_budget(e) and not budget.withdraw():
+                reason = f"retry budget '{policy.budget}' exhausted"
+                budget_exhausted = True
+                break
+
+            RETRIES.inc(operation=operation, outcome="retry", status=str(status_code))
+            if not status_code or attempts > 2:
+                logger.error(e)
+            print(
+                f"Response:[{str(status_code)}] Retrying... "
+                f"Attempt {attempts} after {sleep_time:.2f} seconds, in {func.__name__}:"
+            )
+            time.sleep(sleep_time)
+
+    RETRIES.inc(
+        operation=operation,
+        outcome="budget_exhausted" if budget_exhausted else "give_up",
+        status=str(getattr(last_exception, "status_code", None)),
+    )
+    message = (
+        f"Giving up on function ({func.__name__}), {reason}. "
+        f"Last error:{last_exception}, after {attempts} attempts."
+    )
+    print(message)
+    logger.error(message)
+
+    if last_exception is not None and (budget_exhausted or policy.raise_on_exhaustion):
+        # Returning None here would read as an empty answer from the target
+        raise last_exception
+    return None
+
+
+def retry(policy: Optional[RetryPolicy] = None):
+    """
+    Decorator retrying the wrapped method according to a RetryPolicy.
+
+    Without an explicit policy, the `retry_policy` attribute of the client
+    instance the method is bound to is used, falling back to
+    DEFAULT_RETRY_POLICY. When the client tells the circuit of the call
+    (`get_retry_budget_key`), the retry budget is kept per circuit, so a
+    failing store does not spend the retries of the others.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active_policy = policy
+            if active_policy is None and args:
+                active_policy = getattr(args[0], "retry_policy", None)
+            active_policy = active_policy or DEFAULT_RETRY_POLICY
+
+            get_budget_key = (
+                getattr(args[0], "get_retry_budget_key", None) if args else None
+            )
+            if active_policy.budget and get_budget_key is not None:
+                arguments = signature.bind_partial(*args, **kwargs).arguments
+                budget_key = get_budget_key(arguments)
+                if budget_key:
+                    active_policy = dataclasses.replace(
+                        active_policy, budget=f"{active_policy.budget}:{budget_key}"
+                    )
+            return call_with_retry(active_policy, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
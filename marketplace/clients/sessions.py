@@ -0,0 +1,154 @@
+import os
+import threading
+
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+import requests
+
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class HTTPSessionPool:
+    """
+    Thread-safe registry of keep-alive `requests.Session` objects, one per host.
+
+    `requests.request` builds (and tears down) a new session for every call, so
+    each request pays for a fresh TCP and TLS handshake. Sharing one session per
+    scheme and host keeps those connections alive between calls and lets the
+    worker threads of a process reuse them.
+
+    Sessions never store cookies, so requests stay as stateless as they were
+    with `requests.request`. Connection errors (raised before anything is sent)
+    are retried by the transport adapter; read errors and error statuses are
+    left to the callers, which already decide how to retry them.
+
+    Attributes:
+        pool_connections (int): Number of host pools cached by each adapter.
+        pool_maxsize (int): Maximum number of idle connections kept per host.
+        max_retries (int): Retries for failed connection attempts.
+        backoff_factor (float): Backoff factor between connection retries.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 100,
+        max_retries: int = 3,
+        backoff_factor: float = 0.2,
+    ) -> None:
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def get_session(self, url: str) -> requests.Session:
+        """
+        Return the shared session for the host of `url`, creating it if needed.
+
+        Args:
+            url: Full URL of the request about to be sent.
+
+        Returns:
+            The keep-alive session bound to the URL's scheme and host.
+        """
+        key = self._host_key(url)
+        with self._lock:
+            if self._pid != os.getpid():
+                # Sockets must not be shared with the parent of a forked worker
+                self._sessions = {}
+                self._pid = os.getpid()
+
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._build_session()
+                self._sessions[key] = session
+            return session
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        retries = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=0,
+            other=0,
+            redirect=None,
+            backoff_factor=self.backoff_factor,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retries,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self) -> None:
+        """
+        Close every pooled session and release its connections.
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions = {}
+
+        for session in sessions:
+            session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return connection reuse counters for each pooled host.
+
+        `connections` is the number of connections opened towards the host and
+        `requests` the number of requests sent through them, so every request
+        above the number of connections was served by a reused connection.
+
+        Returns:
+            Dict keyed by host with requests, connections, reused and reuse_rate.
+        """
+        with self._lock:
+            sessions = dict(self._sessions)
+
+        stats = {}
+        for key, session in sessions.items():
+            connections = requests_count = 0
+            adapter = session.get_adapter(key)
+            pools = adapter.poolmanager.pools
+            for pool_key in pools.keys():
+                pool = pools.get(pool_key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    requests_count += pool.num_requests
+
+            reused = max(requests_count - connections, 0)
+            stats[key] = {
+                "requests": requests_count,
+                "connections": connections,
+                "reused": reused,
+                "reuse_rate": (
+                    round(reused / requests_count, 4) if requests_count else 0.0
+                ),
+            }
+        return stats
+
+
+http_session_pool = HTTPSessionPool(
+    pool_connections=settings.HTTP_CLIENT_POOL_CONNECTIONS,
+    pool_maxsize=settings.HTTP_CLIENT_POOL_MAXSIZE,
+    max_retries=settings.HTTP_CLIENT_MAX_RETRIES,
+)
@@ -0,0 +1,189 @@
+import time
+
+import requests
+
+from unittest.mock import MagicMock, Mock, patch
+
+from django.test import TestCase
+
+from marketplace.clients.base import RequestClient
+from marketplace.clients.circuit_breaker import (
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+)
+from marketplace.clients.decorators import retry_on_exception
+from marketplace.clients.exceptions import CustomAPIException
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def hgetall(self, key):
+        return dict(self.store.get(key, {}))
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        values = self.store.setdefault(key, {})
+        if mapping:
+            values.update({k: str(v) for k, v in mapping.items()})
+        else:
+            values[field] = str(value)
+
+    def hincrby(self, key, field, amount):
+        values = self.store.setdefault(key, {})
+        values[field] = str(int(values.get(field, 0)) + amount)
+        return int(values[field])
+
+    def incr(self, key):
+        self.store[key] = self.store.get(key, 0) + 1
+        return self.store[key]
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        return iter([key for key in list(self.store) if key.startswith(prefix)])
+
+
+class TestCircuitBreakerRegistry(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.breakers = CircuitBreakerRegistry(
+            failure_threshold=3,
+            recovery_timeout=30,
+            local_ttl=0,
+            redis_client=self.redis,
+        )
+
+    def _open_circuit(self, name="vtex.example.com"):
+        for _ in range(3):
+            self.breakers.before_call(name)
+            self.breakers.record_failure(name)
+
+    def test_circuit_opens_after_failure_threshold(self):
+        self._open_circuit()
+
+        with self.assertRaises(CircuitOpenError) as context:
+            self.breakers.before_call("vtex.example.com")
+
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(self.breakers.stats()["vtex.example.com"]["rejected"], 1)
+        self.assertEqual(self.breakers.states()[0]["state"], "open")
+
+    def test_circuits_are_independent(self):
+        self._open_circuit("a.example.com")
+
+        self.assertFalse(self.breakers.before_call("b.example.com"))
+
+    def test_successful_trial_closes_the_circuit(self):
+        self._open_circuit()
+        later = time.time() + 31
+
+        with patch("marketplace.clients.circuit_breaker.time.time", return_value=later):
+            is_trial = self.breakers.before_call("vtex.example.com")
+            # Only one trial request goes through while half-open
+            with self.assertRaises(CircuitOpenError):
+                self.breakers.before_call("vtex.example.com")
+            self.breakers.record_success("vtex.example.com", is_trial)
+
+        self.assertTrue(is_trial)
+        self.assertFalse(self.breakers.before_call("vtex.example.com"))
+        self.assertEqual(self.breakers.states(), [])
+
+    def test_failed_trial_opens_the_circuit_again(self):
+        self._open_circuit()
+        later = time.time() + 31
+
+        with patch("marketplace.clients.circuit_breaker.time.time", return_value=later):
+            is_trial = self.breakers.before_call("vtex.example.com")
+            self.breakers.record_failure("vtex.example.com", is_trial)
+
+            with self.assertRaises(CircuitOpenError):
+                self.breakers.before_call("vtex.example.com")
+
+    def test_requests_are_allowed_when_redis_is_down(self):
+        redis = MagicMock()
+        redis.hgetall.side_effect = ConnectionError("redis down")
+        breakers = CircuitBreakerRegistry(redis_client=redis)
+
+        self.assertFalse(breakers.before_call("vtex.example.com"))
+        self.assertFalse(breakers.before_call("vtex.example.com"))
+        # Redis is not hit again while backing off
+        redis.hgetall.assert_called_once()
+
+    def test_disabled_registry_never_rejects(self):
+        breakers = CircuitBreakerRegistry(enabled=False, redis_client=self.redis)
+        for _ in range(5):
+            breakers.record_failure("vtex.example.com")
+
+        self.assertFalse(breakers.before_call("vtex.example.com"))
+        self.assertEqual(self.redis.store, {})
+
+
+class TestRequestClientCircuitBreaker(TestCase):
+    def setUp(self):
+        self.breakers = CircuitBreakerRegistry(
+            failure_threshold=2, local_ttl=0, redis_client=FakeRedis()
+        )
+        self.session = MagicMock()
+        self.client = RequestClient()
+        self.client.circuit_breakers = self.breakers
+        self.client.session_pool = MagicMock()
+        self.client.session_pool.get_session.return_value = self.session
+
+    def _request(self):
+        return self.client.make_request(
+            "https://store.vtexcommercestable.com.br/api/sku",
+            method="GET",
+            ignore_error_logs=True,
+        )
+
+    def test_gateway_errors_open_the_circuit(self):
+        self.session.request.return_value = MagicMock(status_code=503)
+
+        for _ in range(2):
+            with self.assertRaises(CustomAPIException):
+                self._request()
+
+        self.session.request.reset_mock()
+        with self.assertRaises(CircuitOpenError):
+            self._request()
+        self.session.request.assert_not_called()
+
+    def test_client_errors_do_not_open_the_circuit(self):
+        self.session.request.return_value = MagicMock(status_code=404)
+
+        for _ in range(3):
+            with self.assertRaises(CustomAPIException) as context:
+                self._request()
+            self.assertEqual(context.exception.status_code, 404)
+
+        self.assertEqual(
+            self.breakers.stats()["store.vtexcommercestable.com.br"]["failures"], 0
+        )
+
+    def test_transport_errors_count_as_failures(self):
+        self.session.request.side_effect = requests.exceptions.ConnectionError("reset")
+
+        for _ in range(2):
+            with self.assertRaises(CustomAPIException):
+                self._request()
+
+        with self.assertRaises(CircuitOpenError):
+            self._request()
+
+    def test_retry_decorator_does_not_wait_on_open_circuit(self):
+        func = Mock(side_effect=CircuitOpenError("vtex.example.com", 30))
+        func.__name__ = "func"
+
+        with patch("marketplace.clients.retry.time.sleep") as mock_sleep:
+            with self.assertRaises(CircuitOpenError):
+                retry_on_exception()(func)()
+
+        func.assert_called_once()
+        mock_sleep.assert_not_called()
@@ -0,0 +1,127 @@
+from unittest.mock import MagicMock, Mock, patch
+
+import requests
+
+from django.test import TestCase
+
+from marketplace.clients.base import RequestClient
+from marketplace.clients.circuit_breaker import CircuitBreakerRegistry
+from marketplace.clients.exceptions import CustomAPIException
+from marketplace.clients.metrics import (
+    IN_FLIGHT,
+    REQUEST_BYTES,
+    REQUEST_DURATION,
+    RESPONSE_BYTES,
+    RESPONSES,
+    RETRIES,
+    url_template,
+)
+from marketplace.clients.retry import RetryPolicy, call_with_retry
+from marketplace.core.metrics import metrics
+
+
+class InstrumentedClient(RequestClient):
+    pass
+
+
+class TestUrlTemplate(TestCase):
+    def test_identifiers_are_replaced(self):
+        self.assertEqual(
+            url_template(
+                "https://store.vtex.com/api/catalog_system/pvt/sku/stockkeepingunitbyid/123"
+            ),
+            "/api/catalog_system/pvt/sku/stockkeepingunitbyid/{id}",
+        )
+        self.assertEqual(
+            url_template(
+                "https://api.example.com/v1/apps/5f1c8a52-9d8e-4c4a-a5a5-0a1b2c3d4e5f/"
+                "?page=2"
+            ),
+            "/v1/apps/{id}/",
+        )
+
+    def test_words_are_kept(self):
+        self.assertEqual(
+            url_template("https://graph.facebook.com/v18.0/items_batch"),
+            "/v18.0/items_batch",
+        )
+
+
+class TestRequestClientMetrics(TestCase):
+    def setUp(self):
+        self.client = InstrumentedClient()
+        self.client.circuit_breakers = CircuitBreakerRegistry(enabled=False)
+        self.session = MagicMock()
+        self.client.session_pool = MagicMock()
+        self.client.session_pool.get_session.return_value = self.session
+        self.labels = {
+            "client": "InstrumentedClient",
+            "method": "POST",
+            "endpoint": "/items/{id}",
+        }
+
+    def test_successful_request_is_recorded(self):
+        response = MagicMock(status_code=201, content=b'{"id": 1}')
+        response.request.body = b'{"name": "x"}'
+        self.session.request.return_value = response
+        count_before = REQUEST_DURATION.get_count(**self.labels)
+        responses_before = RESPONSES.get(status="201", **self.labels)
+        sent_before = REQUEST_BYTES.get(**self.labels)
+        received_before = RESPONSE_BYTES.get(**self.labels)
+
+        self.client.make_request("https://api.example.com/items/42", method="post")
+
+        self.assertEqual(REQUEST_DURATION.get_count(**self.labels), count_before + 1)
+        self.assertEqual(
+            RESPONSES.get(status="201", **self.labels), responses_before + 1
+        )
+        self.assertEqual(REQUEST_BYTES.get(**self.labels), sent_before + 13)
+        self.assertEqual(RESPONSE_BYTES.get(**self.labels), received_before + 9)
+        self.assertEqual(IN_FLIGHT.get(**self.labels), 0)
+
+    def test_transport_error_is_recorded(self):
+        self.session.request.side_effect = requests.exceptions.Timeout("timed out")
+        errors_before = RESPONSES.get(status="error", **self.labels)
+
+        with self.assertRaises(CustomAPIException):
+            self.client.make_request(
+                "https://api.example.com/items/42",
+                method="POST",
+                ignore_error_logs=True,
+            )
+
+        self.assertEqual(
+            RESPONSES.get(status="error", **self.labels), errors_before + 1
+        )
+        self.assertEqual(IN_FLIGHT.get(**self.labels), 0)
+
+
+@patch("marketplace.clients.retry.time.sleep")
+class TestRetryMetrics(TestCase):
+    def test_retries_and_give_ups_are_counted(self, mock_sleep):
+        func = Mock(side_effect=CustomAPIException(status_code=429))
+        func.__name__ = func.__qualname__ = "instrumented_operation"
+        labels = {"operation": "instrumented_operation", "status": "429"}
+        retries_before = RETRIES.get(outcome="retry", **labels)
+        give_ups_before = RETRIES.get(outcome="give_up", **labels)
+
+        call_with_retry(RetryPolicy(max_attempts=3), func)
+
+        self.assertEqual(RETRIES.get(outcome="retry", **labels), retries_before + 2)
+        self.assertEqual(RETRIES.get(outcome="give_up", **labels), give_ups_before + 1)
+
+
+class TestCircuitBreakerMetrics(TestCase):
+    def test_events_are_exported_as_counters(self):
+        with patch(
+            "marketplace.clients.metrics.circuit_breakers.stats",
+            return_value={"store.com": {"failures": 2}},
+        ):
+            output = metrics.render_prometheus()
+
+        self.assertIn("# TYPE http_client_circuit_breaker_events counter", output)
+        self.assertIn(
+            'http_client_circuit_breaker_events_total{circuit="store.com",'
+            'event="failures"} 2',
+            output,
+        )
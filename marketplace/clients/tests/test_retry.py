@@ -0,0 +1,214 @@
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from marketplace.clients.base import RequestClient
+from marketplace.clients.decorators import retry_on_exception
+from marketplace.clients.exceptions import CustomAPIException
+from marketplace.clients.retry import (
+    RetryBudget,
+    RetryPolicy,
+    call_with_retry,
+    get_retry_budget,
+    retry,
+)
+from marketplace.clients.vtex.client import VtexPrivateClient
+
+
+def failing(*errors, result="ok"):
+    func = Mock(side_effect=[*errors, result])
+    func.__name__ = "func"
+    return func
+
+
+@patch("marketplace.clients.retry.time.sleep")
+class TestCallWithRetry(TestCase):
+    def test_retries_until_success(self, mock_sleep):
+        func = failing(
+            CustomAPIException(status_code=429), CustomAPIException(status_code=503)
+        )
+
+        result = call_with_retry(RetryPolicy(), func)
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_give_up_statuses_are_raised_right_away(self, mock_sleep):
+        func = failing(CustomAPIException(status_code=404))
+
+        with self.assertRaises(CustomAPIException):
+            call_with_retry(RetryPolicy(), func)
+
+        func.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    def test_only_listed_statuses_are_retried(self, mock_sleep):
+        policy = RetryPolicy(retry_statuses=frozenset({429}))
+        func = failing(CustomAPIException(status_code=400))
+
+        with self.assertRaises(CustomAPIException):
+            call_with_retry(policy, func)
+
+        func.assert_called_once()
+
+    def test_returns_none_when_attempts_are_exhausted(self, mock_sleep):
+        func = Mock(side_effect=CustomAPIException(status_code=429))
+        func.__name__ = "func"
+
+        self.assertIsNone(call_with_retry(RetryPolicy(max_attempts=3), func))
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_raises_on_exhaustion_when_configured(self, mock_sleep):
+        func = Mock(side_effect=CustomAPIException(status_code=429))
+        func.__name__ = "func"
+        policy = RetryPolicy(max_attempts=2, raise_on_exhaustion=True)
+
+        with self.assertRaises(CustomAPIException):
+            call_with_retry(policy, func)
+
+    def test_backoff_uses_full_jitter(self, mock_sleep):
+        policy = RetryPolicy(base_delay=2, factor=2, max_delay=5)
+        error = CustomAPIException(status_code=429)
+
+        with patch("marketplace.clients.retry.random.uniform") as mock_uniform:
+            policy.backoff(0, error)
+            policy.backoff(1, error)
+            policy.backoff(4, error)
+
+        self.assertEqual(
+            [call.args for call in mock_uniform.call_args_list],
+            [(0, 2), (0, 4), (0, 5)],
+        )
+
+    def test_retry_after_is_honored(self, mock_sleep):
+        func = failing(CustomAPIException(status_code=429, retry_after=7))
+
+        call_with_retry(RetryPolicy(), func)
+
+        mock_sleep.assert_called_once_with(7.0)
+
+    def test_stops_when_max_elapsed_time_would_be_exceeded(self, mock_sleep):
+        func = Mock(side_effect=CustomAPIException(status_code=503, retry_after=30))
+        func.__name__ = "func"
+
+        result = call_with_retry(RetryPolicy(max_elapsed=10), func)
+
+        self.assertIsNone(result)
+        func.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    def test_stops_when_retry_budget_is_empty(self, mock_sleep):
+        budget = RetryBudget(max_tokens=1, deposit_ratio=0.5)
+        func = Mock(side_effect=CustomAPIException(status_code=503))
+        func.__name__ = "func"
+
+        with patch("marketplace.clients.retry.get_retry_budget", return_value=budget):
+            with self.assertRaises(CustomAPIException):
+                call_with_retry(RetryPolicy(budget="test"), func)
+
+        # One retry paid by the single token, then the budget is empty
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(budget.tokens, 0)
+
+    def test_throttled_calls_with_retry_after_do_not_spend_the_budget(self, mock_sleep):
+        budget = RetryBudget(max_tokens=1)
+        func = failing(
+            CustomAPIException(status_code=429, retry_after=1),
+            CustomAPIException(status_code=429, retry_after=1),
+            CustomAPIException(status_code=429),
+        )
+
+        with patch("marketplace.clients.retry.get_retry_budget", return_value=budget):
+            result = call_with_retry(RetryPolicy(budget="test"), func)
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(func.call_count, 4)
+        # Only the 429 without Retry-After paid for its retry
+        self.assertAlmostEqual(budget.tokens, 0.1)
+
+    def test_successes_refill_the_retry_budget(self, mock_sleep):
+        budget = RetryBudget(max_tokens=1, deposit_ratio=0.5)
+        budget.withdraw()
+        func = Mock(return_value="ok")
+        func.__name__ = "func"
+
+        with patch("marketplace.clients.retry.get_retry_budget", return_value=budget):
+            call_with_retry(RetryPolicy(budget="test"), func)
+            call_with_retry(RetryPolicy(budget="test"), func)
+            call_with_retry(RetryPolicy(budget="test"), func)
+
+        self.assertEqual(budget.tokens, 1)
+
+
+@patch("marketplace.clients.retry.time.sleep")
+class TestRetryDecorators(TestCase):
+    def test_client_retry_policy_is_used(self, mock_sleep):
+        class Client:
+            retry_policy = RetryPolicy(max_attempts=2)
+            calls = 0
+
+            @retry()
+            def fetch(self):
+                self.calls += 1
+                raise CustomAPIException(status_code=429)
+
+        client = Client()
+        client.fetch()
+
+        self.assertEqual(client.calls, 2)
+
+    def test_retry_on_exception_arguments_override_the_policy(self, mock_sleep):
+        class Client:
+            retry_policy = RetryPolicy(max_attempts=5)
+            calls = 0
+
+            @retry_on_exception(max_attempts=3)
+            def fetch(self):
+                self.calls += 1
+                raise CustomAPIException(status_code=429)
+
+        client = Client()
+        client.fetch()
+
+        self.assertEqual(client.calls, 3)
+
+    def test_vtex_retry_budget_is_kept_per_store(self, mock_sleep):
+        client = VtexPrivateClient("key", "token")
+        failing_store = get_retry_budget("vtex:failing.vtexcommercestable.com.br")
+        while failing_store.withdraw():
+            pass
+        error = CustomAPIException(status_code=503)
+
+        with patch.object(client, "make_request", side_effect=error) as request:
+            with self.assertRaises(CustomAPIException):
+                client.get_product_details("1", "Failing.vtexcommercestable.com.br")
+            self.assertEqual(request.call_count, 1)
+
+            request.reset_mock(side_effect=True)
+            request.side_effect = [error, Mock(json=Mock(return_value={"Id": 1}))]
+            details = client.get_product_details(
+                "1", domain="healthy.vtexcommercestable.com.br"
+            )
+
+        self.assertEqual(details, {"Id": 1})
+        self.assertEqual(request.call_count, 2)
+
+
+class TestParseRetryAfter(TestCase):
+    def test_seconds(self):
+        self.assertEqual(RequestClient._parse_retry_after("12"), 12.0)
+
+    def test_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+
+        seconds = RequestClient._parse_retry_after(format_datetime(retry_at))
+
+        self.assertTrue(55 <= seconds <= 60)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(RequestClient._parse_retry_after(None))
+        self.assertIsNone(RequestClient._parse_retry_after("soon"))
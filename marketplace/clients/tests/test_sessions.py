@@ -0,0 +1,135 @@
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from marketplace.clients.base import RequestClient
+from marketplace.clients.exceptions import CustomAPIException
+from marketplace.clients.sessions import HTTPSessionPool
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status = 404 if self.path == "/missing" else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "session=abc; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHTTPSessionPool(TestCase):
+    def setUp(self):
+        self.pool = HTTPSessionPool(pool_maxsize=4, max_retries=0)
+        self.addCleanup(self.pool.close)
+
+    def _start_server(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    def test_same_host_shares_session(self):
+        first = self.pool.get_session("https://api.example.com/a?x=1")
+        second = self.pool.get_session("https://API.example.com/b")
+
+        self.assertIs(first, second)
+
+    def test_different_hosts_get_different_sessions(self):
+        first = self.pool.get_session("https://a.example.com/")
+        second = self.pool.get_session("https://b.example.com/")
+        third = self.pool.get_session("http://a.example.com/")
+
+        self.assertIsNot(first, second)
+        self.assertIsNot(first, third)
+
+    def test_adapter_uses_configured_pool_and_retries(self):
+        session = self.pool.get_session("https://api.example.com/")
+        adapter = session.get_adapter("https://api.example.com/")
+
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.connect, 0)
+        self.assertEqual(adapter.max_retries.read, 0)
+
+    def test_sessions_are_reset_after_fork(self):
+        session = self.pool.get_session("https://api.example.com/")
+
+        with patch("marketplace.clients.sessions.os.getpid", return_value=-1):
+            child_session = self.pool.get_session("https://api.example.com/")
+
+        self.assertIsNot(session, child_session)
+
+    def test_connections_are_reused_and_cookies_ignored(self):
+        base_url = self._start_server()
+        session = self.pool.get_session(base_url)
+
+        for _ in range(3):
+            self.pool.get_session(base_url).get(f"{base_url}/ok", timeout=5)
+
+        stats = self.pool.stats()[base_url]
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["connections"], 1)
+        self.assertEqual(stats["reused"], 2)
+        self.assertEqual(len(session.cookies), 0)
+
+    def test_close_drops_sessions(self):
+        session = self.pool.get_session("https://api.example.com/")
+
+        self.pool.close()
+
+        self.assertEqual(self.pool.stats(), {})
+        self.assertIsNot(session, self.pool.get_session("https://api.example.com/"))
+
+
+class TestRequestClientSessions(TestCase):
+    def setUp(self):
+        self.session = MagicMock()
+        self.pool = MagicMock()
+        self.pool.get_session.return_value = self.session
+        self.client = RequestClient()
+        self.client.session_pool = self.pool
+
+    def test_make_request_uses_pooled_session(self):
+        self.session.request.return_value = MagicMock(status_code=200)
+
+        response = self.client.make_request(
+            "https://api.example.com/items", method="GET", params={"a": 1}
+        )
+
+        self.assertIs(response, self.session.request.return_value)
+        self.pool.get_session.assert_called_once_with("https://api.example.com/items")
+        self.session.request.assert_called_once_with(
+            method="GET",
+            url="https://api.example.com/items",
+            headers=None,
+            json=None,
+            data=None,
+            timeout=60,
+            params={"a": 1},
+            files=None,
+        )
+
+    def test_make_request_raises_on_error_status(self):
+        response = MagicMock(status_code=404)
+        response.json.return_value = {"error": "not found"}
+        self.session.request.return_value = response
+
+        with self.assertRaises(CustomAPIException) as context:
+            self.client.make_request(
+                "https://api.example.com/items",
+                method="GET",
+                ignore_error_logs=True,
+            )
+
+        self.assertEqual(context.exception.status_code, 404)
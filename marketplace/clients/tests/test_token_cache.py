@@ -0,0 +1,246 @@
+import json
+import time
+
+from unittest.mock import MagicMock, Mock, patch
+
+from django.test import TestCase, override_settings
+
+from marketplace.clients.base import InternalAuthentication
+from marketplace.clients.exceptions import CustomAPIException
+from marketplace.clients.flows.client import FlowsClient
+from marketplace.clients.token_cache import OIDCTokenCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+class TestOIDCTokenCache(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.cache = OIDCTokenCache(
+            key="oidc-module-token:test",
+            expiry_margin=30,
+            refresh_ahead=120,
+            wait_timeout=1,
+            redis_client=self.redis,
+        )
+
+    def _shared_record(self, token, usable_for, refresh_in):
+        now = time.time()
+        return json.dumps(
+            {
+                "access_token": token,
+                "usable_until": now + usable_for,
+                "refresh_at": now + refresh_in,
+            }
+        )
+
+    def test_token_is_requested_once_per_lifetime(self):
+        fetcher = Mock(return_value={"access_token": "abc", "expires_in": 3600})
+
+        self.assertEqual(self.cache.get_token(fetcher), "abc")
+        self.assertEqual(self.cache.get_token(fetcher), "abc")
+
+        fetcher.assert_called_once()
+        shared = json.loads(self.redis.get("oidc-module-token:test"))
+        self.assertEqual(shared["access_token"], "abc")
+        self.assertNotIn("oidc-module-token:test:refresh-lock", self.redis.store)
+
+    def test_token_shared_by_another_process_is_reused(self):
+        self.redis.set(
+            "oidc-module-token:test", self._shared_record("shared", 600, 500)
+        )
+        fetcher = Mock()
+
+        self.assertEqual(self.cache.get_token(fetcher), "shared")
+        fetcher.assert_not_called()
+
+    def test_expired_token_is_requested_again(self):
+        fetcher = Mock(
+            side_effect=[
+                {"access_token": "old", "expires_in": 300},
+                {"access_token": "new", "expires_in": 300},
+            ]
+        )
+        self.cache.get_token(fetcher)
+
+        later = time.time() + 280
+        with patch("marketplace.clients.token_cache.time.time", return_value=later):
+            self.assertEqual(self.cache.get_token(fetcher), "new")
+
+        self.assertEqual(fetcher.call_count, 2)
+
+    def test_token_is_refreshed_in_background_before_expiry(self):
+        fetcher = Mock(
+            side_effect=[
+                {"access_token": "old", "expires_in": 300},
+                {"access_token": "new", "expires_in": 300},
+            ]
+        )
+        self.cache.get_token(fetcher)
+
+        later = time.time() + 200
+        with patch("marketplace.clients.token_cache.time.time", return_value=later):
+            # The current token is still served while the refresh runs
+            self.assertEqual(self.cache.get_token(fetcher), "old")
+
+            deadline = time.monotonic() + 5
+            while fetcher.call_count < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            while self.cache._refreshing and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            self.assertEqual(self.cache.get_token(fetcher), "new")
+
+    def test_waits_for_the_process_holding_the_refresh_lock(self):
+        self.redis.set("oidc-module-token:test:refresh-lock", "other-process")
+        fetcher = Mock()
+
+        def other_process_refreshes(seconds):
+            self.redis.set(
+                "oidc-module-token:test", self._shared_record("fresh", 600, 500)
+            )
+
+        with patch(
+            "marketplace.clients.token_cache.time.sleep",
+            side_effect=other_process_refreshes,
+        ):
+            self.assertEqual(self.cache.get_token(fetcher), "fresh")
+
+        fetcher.assert_not_called()
+
+    def test_works_in_memory_when_redis_is_unavailable(self):
+        redis = MagicMock()
+        redis.get.side_effect = ConnectionError("redis down")
+        redis.set.side_effect = ConnectionError("redis down")
+        cache = OIDCTokenCache(key="oidc-module-token:test", redis_client=redis)
+        fetcher = Mock(return_value={"access_token": "abc", "expires_in": 3600})
+
+        self.assertEqual(cache.get_token(fetcher), "abc")
+        self.assertEqual(cache.get_token(fetcher), "abc")
+        fetcher.assert_called_once()
+
+    def test_response_without_token_is_not_cached(self):
+        fetcher = Mock(return_value={"error": "invalid_client"})
+
+        self.assertIsNone(self.cache.get_token(fetcher))
+        self.assertIsNone(self.cache.get_token(fetcher))
+
+        self.assertEqual(fetcher.call_count, 2)
+        self.assertNotIn("oidc-module-token:test", self.redis.store)
+
+    def test_invalidate_drops_local_and_shared_token(self):
+        fetcher = Mock(return_value={"access_token": "abc", "expires_in": 3600})
+        self.cache.get_token(fetcher)
+
+        self.cache.invalidate()
+        self.cache.get_token(fetcher)
+
+        self.assertEqual(fetcher.call_count, 2)
+
+
+@override_settings(
+    OIDC_RP_CLIENT_ID="client-id",
+    OIDC_RP_CLIENT_SECRET="client-secret",
+    OIDC_OP_TOKEN_ENDPOINT="https://oidc.example.com/token",
+)
+class TestInternalAuthenticationTokenCache(TestCase):
+    def test_headers_reuse_the_cached_token(self):
+        auth = InternalAuthentication()
+        auth.token_cache = OIDCTokenCache(key="test", redis_client=FakeRedis())
+        response = MagicMock()
+        response.json.return_value = {"access_token": "abc", "expires_in": 3600}
+
+        with patch.object(
+            InternalAuthentication, "make_request", return_value=response
+        ) as mock_make_request:
+            first = auth.headers
+            second = auth.headers
+
+        self.assertEqual(first["Authorization"], "Bearer abc")
+        self.assertEqual(second, first)
+        mock_make_request.assert_called_once_with(
+            url="https://oidc.example.com/token",
+            method="POST",
+            data={
+                "client_id": "client-id",
+                "client_secret": "client-secret",
+                "grant_type": "client_credentials",
+            },
+        )
+
+    def _client(self, *tokens):
+        client = FlowsClient()
+        client.authentication_instance.token_cache = OIDCTokenCache(
+            key="test", redis_client=FakeRedis()
+        )
+        client.authentication_instance._request_module_token = Mock(
+            side_effect=[{"access_token": token} for token in tokens]
+        )
+        return client
+
+    def test_renews_the_module_token_after_a_401(self):
+        client = self._client("old", "new")
+        ok = Mock(status_code=200)
+        with patch.object(
+            FlowsClient,
+            "_send_request",
+            side_effect=[CustomAPIException(status_code=401), ok],
+        ) as mock_send:
+            response = client.make_request(
+                "https://flows/x", "GET", headers=client.authentication_instance.headers
+            )
+
+        self.assertIs(response, ok)
+        self.assertEqual(
+            [c.args[2]["Authorization"] for c in mock_send.call_args_list],
+            ["Bearer old", "Bearer new"],
+        )
+        self.assertEqual(
+            client.authentication_instance.headers["Authorization"], "Bearer new"
+        )
+
+    def test_retries_a_401_once(self):
+        client = self._client("old", "new")
+        with patch.object(
+            FlowsClient,
+            "_send_request",
+            side_effect=CustomAPIException(status_code=401),
+        ) as mock_send:
+            with self.assertRaises(CustomAPIException):
+                client.make_request(
+                    "https://flows/x",
+                    "GET",
+                    headers=client.authentication_instance.headers,
+                )
+
+        self.assertEqual(mock_send.call_count, 2)
+
+    def test_does_not_retry_a_401_sent_with_another_token(self):
+        client = self._client("module")
+        with patch.object(
+            FlowsClient,
+            "_send_request",
+            side_effect=CustomAPIException(status_code=401),
+        ) as mock_send:
+            with self.assertRaises(CustomAPIException):
+                client.make_request(
+                    "https://flows/x", "GET", headers={"Authorization": "Bearer user"}
+                )
+
+        mock_send.assert_called_once()
+        client.authentication_instance._request_module_token.assert_called_once()
@@ -0,0 +1,246 @@
+import json
+import logging
+import threading
+import time
+import uuid
+
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+
+logger = logging.getLogger(__name__)
+
+
+TokenFetcher = Callable[[], Dict[str, Any]]
+
+
+class OIDCTokenCache:
+    """
+    Expiry-aware cache for OIDC client-credentials access tokens.
+
+    Tokens are kept in process memory and shared with the other processes
+    through Redis, so that a module token is requested once per lifetime
+    instead of once per outgoing request:
+
+    - A token is served until `expiry_margin` seconds before its `expires_in`.
+    - Once it gets within `refresh_ahead` seconds of that point, a background
+      thread renews it while callers keep using the current one.
+    - Renewals are serialized across processes by a Redis lock; processes that
+      lose the race wait briefly for the token stored by the winner.
+
+    Redis is an optimization only: when it is unavailable the cache keeps
+    working in process memory.
+
+    Attributes:
+        key (str): Redis key holding the shared token.
+        expiry_margin (int): Seconds before expiry after which a token is no longer served.
+        refresh_ahead (int): Seconds before `expiry_margin` at which a background refresh starts.
+        default_ttl (int): Lifetime assumed for token responses without `expires_in`.
+        lock_timeout (int): Expiration of the Redis refresh lock, in seconds.
+        wait_timeout (float): Maximum time to wait for another process' refresh.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        expiry_margin: int = 30,
+        refresh_ahead: int = 120,
+        default_ttl: int = 300,
+        lock_timeout: int = 10,
+        wait_timeout: float = 5.0,
+        redis_client=None,
+    ) -> None:
+        self.key = key
+        self.lock_key = f"{key}:refresh-lock"
+        self.expiry_margin = expiry_margin
+        self.refresh_ahead = refresh_ahead
+        self.default_ttl = default_ttl
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self._redis = redis_client
+        self._record: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._refresh_state_lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_connection()
+        return self._redis
+
+    def get_token(self, fetcher: TokenFetcher) -> str:
+        """
+        Return a valid access token, requesting a new one only when needed.
+
+        Args:
+            fetcher: Callable that requests a new token and returns the token
+                endpoint response (`access_token` and, optionally, `expires_in`).
+
+        Returns:
+            The access token.
+        """
+        now = time.time()
+        record = self._record
+        if self._is_usable(record, now):
+            if now >= record["refresh_at"]:
+                self._schedule_refresh(fetcher, record)
+            return record["access_token"]
+
+        with self._lock:
+            record = self._record
+            if not self._is_usable(record, time.time()):
+                record = self._refresh(fetcher, record)
+            return record["access_token"]
+
+    def invalidate(self) -> None:
+        """
+        Drop the cached token locally and in Redis, e.g. after a 401 response.
+        """
+        self._record = None
+        try:
+            self.redis.delete(self.key)
+        except Exception as e:
+            logger.warning(f"Could not drop shared OIDC token: {e}")
+
+    @staticmethod
+    def _is_usable(record: Optional[Dict[str, Any]], now: float) -> bool:
+        return record is not None and now < record["usable_until"]
+
+    def _schedule_refresh(self, fetcher: TokenFetcher, current: Dict[str, Any]):
+        # Callers holding a usable token must never wait for the refresh itself
+        with self._refresh_state_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                with self._lock:
+                    if self._record is current:
+                        self._refresh(fetcher, current)
+            except Exception as e:
+                logger.warning(f"Background OIDC token refresh failed: {e}")
+            finally:
+                with self._refresh_state_lock:
+                    self._refreshing = False
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _refresh(
+        self, fetcher: TokenFetcher, current: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Replace `current` by a newer token, taken from Redis when another
+        process already renewed it, or requested through `fetcher` otherwise.
+        Must be called while holding `self._lock`.
+        """
+        shared = self._read_shared()
+        if self._is_newer(shared, current):
+            self._record = shared
+            return shared
+
+        lock_value = str(uuid.uuid4())
+        if not self._acquire_lock(lock_value):
+            shared = self._wait_for_shared(current)
+            if shared is not None:
+                self._record = shared
+                return shared
+
+        try:
+            record = self._build_record(fetcher())
+            if self._is_usable(record, time.time()):
+                self._write_shared(record)
+        finally:
+            self._release_lock(lock_value)
+
+        self._record = record
+        return record
+
+    def _is_newer(
+        self, shared: Optional[Dict[str, Any]], current: Optional[Dict[str, Any]]
+    ) -> bool:
+        if not self._is_usable(shared, time.time()):
+            return False
+        if current is None:
+            return True
+        return shared["usable_until"] > current["usable_until"] and (
+            shared["refresh_at"] > time.time()
+        )
+
+    def _wait_for_shared(
+        self, current: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.1)
+            shared = self._read_shared()
+            if self._is_newer(shared, current):
+                return shared
+        return None
+
+    def _build_record(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        access_token = response.get("access_token")
+        issued_at = time.time()
+        lifetime = float(response.get("expires_in") or self.default_ttl)
+        # Never spend more than half of a short-lived token on the safety margins
+        usable_until = issued_at + max(lifetime - self.expiry_margin, lifetime / 2)
+        refresh_at = max(
+            usable_until - self.refresh_ahead,
+            issued_at + (usable_until - issued_at) / 2,
+        )
+        if not access_token:
+            # Hand the response back as before, but never keep it
+            logger.warning("OIDC token response has no access_token")
+            usable_until = refresh_at = 0
+
+        return {
+            "access_token": access_token,
+            "usable_until": usable_until,
+            "refresh_at": refresh_at,
+        }
+
+    def _read_shared(self) -> Optional[Dict[str, Any]]:
+        try:
+            value = self.redis.get(self.key)
+            return json.loads(value) if value else None
+        except Exception as e:
+            logger.warning(f"Could not read shared OIDC token: {e}")
+            return None
+
+    def _write_shared(self, record: Dict[str, Any]) -> None:
+        ttl = int(record["usable_until"] - time.time())
+        if ttl <= 0:
+            return
+        try:
+            self.redis.set(self.key, json.dumps(record), ex=ttl)
+        except Exception as e:
+            logger.warning(f"Could not share OIDC token: {e}")
+
+    def _acquire_lock(self, lock_value: str) -> bool:
+        try:
+            return bool(
+                self.redis.set(self.lock_key, lock_value, nx=True, ex=self.lock_timeout)
+            )
+        except Exception as e:
+            logger.warning(f"Could not acquire OIDC token refresh lock: {e}")
+            return True
+
+    def _release_lock(self, lock_value: str) -> None:
+        try:
+            value = self.redis.get(self.lock_key)
+            if isinstance(value, bytes):
+                value = value.decode()
+            if value == lock_value:
+                self.redis.delete(self.lock_key)
+        except Exception as e:
+            logger.warning(f"Could not release OIDC token refresh lock: {e}")
+
+
+module_token_cache = OIDCTokenCache(
+    key=f"oidc-module-token:{getattr(settings, 'OIDC_RP_CLIENT_ID', '')}",
+    expiry_margin=settings.OIDC_TOKEN_EXPIRY_MARGIN,
+    refresh_ahead=settings.OIDC_TOKEN_REFRESH_AHEAD,
+)
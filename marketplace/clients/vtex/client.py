@@ -5,11 +5,18 @@ from django.conf import settings
 
 from marketplace.clients.base import RequestClient
 from marketplace.clients.decorators import retry_on_exception
+from marketplace.clients.retry import RetryPolicy
 
 
 logger = logging.getLogger(__name__)
 
 
+# Retries towards VTEX stop after a bounded time and share a retry budget per store
+VTEX_RETRY_POLICY = RetryPolicy(
+    max_elapsed=settings.VTEX_RETRY_MAX_ELAPSED_TIME, budget="vtex"
+)
+
+
 class VtexAuthorization(RequestClient):
     def __init__(self, app_key, app_token):
         self.app_key = app_key
@@ -26,6 +33,18 @@ class VtexAuthorization(RequestClient):
 
 
 class VtexCommonClient(RequestClient):
+    retry_policy = VTEX_RETRY_POLICY
+
+    def get_retry_budget_key(self, arguments: dict):
+        """
+        Keep the retry budget per circuit, the store domain of the call.
+        """
+        domain = arguments.get("domain")
+        if domain:
+            return str(domain).lower()
+        url = arguments.get("url")
+        return self.get_circuit_name(url) if url else None
+
     @retry_on_exception()
     def check_domain(self, domain):
         try:
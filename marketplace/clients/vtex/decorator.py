@@ -1,9 +1,6 @@
-import functools
 import time
 import logging
 
-from django_redis import get_redis_connection
-
 
 logger = logging.getLogger(__name__)
 
@@ -56,84 +53,3 @@ class RateLimiter:
             time.sleep(20)
             # force reset the counter key after sleeping
             self.redis.delete(key)
-
-
-# TODO: Probably remove this method
-def rate_limit_and_retry_on_exception(domain_key_func, calls_per_period, period):
-    """
-    Decorator to enforce rate limiting and retries.
-
-    Applies rate limits and handles retries with exponential backoff
-    for network or HTTP errors.
-
-    Args:
-        domain_key_func (callable): Function to extract domain identifier.
-        calls_per_period (int): Max allowed function calls per period.
-        period (int): Time period (in seconds) for rate limiting.
-
-    Returns:
-        callable: Decorated function with rate limiting and retries.
-    """
-
-    def decorator(func):
-        redis_connection = get_redis_connection()
-        rate_limiter = RateLimiter(
-            "rate_limit", calls_per_period, period, redis_connection
-        )
-
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            domain = domain_key_func(*args, **kwargs)
-            max_attempts = 8
-            sleep_time = 1
-            attempts = 0
-            last_exception = ""
-
-            while attempts < max_attempts:
-                try:
-                    rate_limiter.check(domain)
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    last_exception = e
-                    status_code = e.status_code if hasattr(e, "status_code") else None
-                    if not status_code:
-                        print(f"Unexpected error: [{str(e)}]")
-                        logger.error(e)
-
-                    if status_code == 404:
-                        print(f"Not Found: [{str(e)}]. Not retrying this.")
-                        raise
-                    elif status_code == 500:
-                        print(f"A 500 error occurred: [{str(e)}]. Retrying...")
-                        raise
-
-                    if attempts >= 2:
-                        if status_code == 429:
-                            print(f"Too many requests: [{str(e)}]. Retrying...")
-                        elif status_code == 408:
-                            print(f"Timeout error: [{str(e)}]. Retrying...")
-                        else:
-                            print(
-                                f"Unexpected error: [{str(e)}]. status: {status_code}. Retrying..."
-                            )
-                            logger.error(e)
-
-                print(
-                    f"Response:[{str(status_code)}] Retrying... "
-                    f"Attempt {attempts + 1} after {sleep_time} seconds, in {func.__name__}:"
-                )
-                time.sleep(sleep_time)
-                attempts += 1
-                sleep_time *= 2
-
-            message = (
-                f"Rate limit exceeded, max retry attempts reached. Last error in {func.__name__}:"
-                f"Last error:{last_exception}, after {attempts} attempts."
-            )
-
-            print(message)
-            logger.error(message)
-
-        return wrapper
-
-    return decorator
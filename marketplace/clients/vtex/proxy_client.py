@@ -1,18 +1,82 @@
 import time
 import logging
+import threading
 import jwt
 
-from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Tuple, Union
 
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
 from django.conf import settings
 
 from marketplace.clients.base import RequestClient
 from marketplace.clients.decorators import retry_on_exception
+from marketplace.clients.vtex.client import VTEX_RETRY_POLICY
 
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4)
+def _load_signing_key(private_key: Union[str, bytes]):
+    """
+    Parse the PEM private key once instead of on every signature.
+    """
+    if isinstance(private_key, str):
+        private_key = private_key.encode()
+    return load_pem_private_key(private_key, password=None)
+
+
+class ProxyTokenCache:
+    """
+    Per-project cache of the JWTs sent to the retail-setup proxy.
+
+    A token is valid for `lifetime` seconds and is reused until `renew_before`
+    seconds before it expires, so that requests never carry a token about to
+    expire in flight. Entries are keyed by project and signing key, so a key
+    rotation issues new tokens right away.
+    """
+
+    def __init__(self, lifetime: int = 300, renew_before: int = 60, max_size=1024):
+        self.lifetime = lifetime
+        self.renew_before = renew_before
+        self.max_size = max_size
+        self._tokens: "OrderedDict[Tuple, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_token(self, project_uuid: str, private_key: Union[str, bytes]) -> str:
+        key = (project_uuid, private_key)
+        now = time.time()
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is not None and now < entry[1]:
+                self._tokens.move_to_end(key)
+                return entry[0]
+
+        issued_at = int(now)
+        payload = {
+            "project_uuid": project_uuid,
+            "exp": issued_at + self.lifetime,
+            "iat": issued_at,
+        }
+        token = jwt.encode(payload, _load_signing_key(private_key), algorithm="RS256")
+
+        with self._lock:
+            self._tokens[key] = (token, issued_at + self.lifetime - self.renew_before)
+            self._tokens.move_to_end(key)
+            while len(self._tokens) > self.max_size:
+                self._tokens.popitem(last=False)
+        return token
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+
+proxy_token_cache = ProxyTokenCache()
+
+
 class VtexProxyClient(RequestClient):
     """
     VTEX client that routes API calls through the retail-setup proxy.
@@ -22,21 +86,28 @@ class VtexProxyClient(RequestClient):
     which handles VTEX IO authentication transparently.
     """
 
+    # Signed tokens are reused across clients of the same project
+    token_cache = proxy_token_cache
+    retry_policy = VTEX_RETRY_POLICY
+
     def __init__(self, project_uuid: str):
         self.project_uuid = project_uuid
         self.proxy_url = settings.RETAIL_PROXY_URL.rstrip("/")
 
+    def get_circuit_name(self, url: str) -> str:
+        # Every store shares the proxy host, so circuits are kept per VTEX account
+        return f"vtex-proxy:{self.project_uuid}"
+
+    def get_retry_budget_key(self, arguments: dict) -> str:
+        # The retry budget is kept per circuit as well
+        return self.get_circuit_name(self.proxy_url)
+
     def _generate_jwt_token(self) -> str:
         private_key = settings.JWT_PRIVATE_KEY
         if not private_key:
             raise ValueError("JWT_PRIVATE_KEY not configured in Django settings.")
 
-        payload = {
-            "project_uuid": self.project_uuid,
-            "exp": datetime.now(timezone.utc) + timedelta(minutes=5),
-            "iat": datetime.now(timezone.utc),
-        }
-        return jwt.encode(payload, private_key, algorithm="RS256")
+        return self.token_cache.get_token(self.project_uuid, private_key)
 
     def _proxy_request(self, method: str, path: str, params=None, data=None):
         url = f"{self.proxy_url}/vtex/proxy/"
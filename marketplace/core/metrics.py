@@ -0,0 +1,304 @@
+"""
+Lightweight in-process metrics.
+
+Counters, gauges and histograms are kept in memory and rendered in the
+Prometheus text exposition format by the metrics view. When STATSD_HOST is
+configured, every observation is also sent to StatsD (DogStatsD tag format),
+which is how Celery workers, that serve no HTTP, get their metrics out.
+"""
+import bisect
+import logging
+import socket
+import threading
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[Dict[str, str], float]
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+
+
+class StatsdClient:
+    """
+    Fire-and-forget UDP StatsD client.
+    """
+
+    def __init__(self, host: str, port: int = 8125, prefix: str = "") -> None:
+        self.address = (host, port)
+        self.prefix = f"{prefix}." if prefix else ""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, name: str, value: float, kind: str, labels: Dict[str, str]) -> None:
+        tags = ",".join(f"{key}:{val}" for key, val in labels.items())
+        packet = f"{self.prefix}{name}:{value}|{kind}"
+        if tags:
+            packet = f"{packet}|#{tags}"
+        try:
+            self._socket.sendto(packet.encode(), self.address)
+        except OSError as e:
+            logger.debug(f"Could not send metric {name} to StatsD: {e}")
+
+
+class _Metric:
+    kind = ""
+    statsd_kind = ""
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+    ) -> None:
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def _emit(self, value: float, key: LabelValues) -> None:
+        if self.registry.statsd is not None:
+            self.registry.statsd.send(
+                self.name, value, self.statsd_kind, self._labels(key)
+            )
+
+
+class Counter(_Metric):
+    kind = "counter"
+    statsd_kind = "c"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self._emit(amount, key)
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            (f"{self.name}_total", self._labels(key), value)
+            for key, value in values.items()
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+    statsd_kind = "g"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            value = self._values[key] = self._values.get(key, 0) + amount
+        self._emit(value, key)
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+        self._emit(value, key)
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = dict(self._values)
+        return [(self.name, self._labels(key), value) for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+    statsd_kind = "ms"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: bucket counts (last one is +Inf), sum and count
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, totals = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0, 0])
+            )
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+        # StatsD timings are expressed in milliseconds
+        self._emit(round(value * 1000, 3), key)
+
+    def get_count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return int(entry[1][1]) if entry else 0
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = {
+                key: (list(counts), list(totals))
+                for key, (counts, totals) in self._values.items()
+            }
+
+        samples = []
+        for key, (counts, totals) in values.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                samples.append(
+                    (f"{self.name}_bucket", {**labels, "le": le}, cumulative)
+                )
+            samples.append((f"{self.name}_sum", labels, totals[0]))
+            samples.append((f"{self.name}_count", labels, totals[1]))
+        return samples
+
+
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+class MetricsRegistry:
+    """
+    Process-wide registry of metrics.
+
+    Besides the metrics updated as events happen, collectors can be
+    registered to report values read at scrape time, such as the counters
+    kept by caches, connection pools or circuit breakers.
+    """
+
+    def __init__(self, statsd: Optional[StatsdClient] = None) -> None:
+        self.statsd = statsd
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(self, name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(
+                    f"Metric {name} is already registered as {metric.kind}"
+                )
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def register_collector(self, collector: Collector) -> None:
+        """
+        Register a callable yielding (name, type, help, samples) tuples. The
+        samples of a "counter" are rendered with the `_total` suffix.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(_format_sample(name, labels, value))
+
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {collector} failed: {e}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                # Counter samples are suffixed like the ones of Counter
+                sample_name = f"{name}_total" if kind == "counter" else name
+                for labels, value in samples:
+                    lines.append(_format_sample(sample_name, labels, value))
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        return f"{name}{{{rendered}}} {value}"
+    return f"{name} {value}"
+
+
+metrics = MetricsRegistry(
+    statsd=(
+        StatsdClient(settings.STATSD_HOST, settings.STATSD_PORT, settings.STATSD_PREFIX)
+        if settings.STATSD_HOST
+        else None
+    )
+)
@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock
+
+from django.test import TestCase
+
+from marketplace.core.metrics import MetricsRegistry, StatsdClient
+
+
+class MetricsRegistryTestCase(TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_is_rendered_with_labels(self):
+        counter = self.registry.counter("jobs", "Jobs done.", ("queue",))
+        counter.inc(queue="sync")
+        counter.inc(2, queue="sync")
+
+        output = self.registry.render_prometheus()
+
+        self.assertIn("# TYPE jobs counter", output)
+        self.assertIn('jobs_total{queue="sync"} 3', output)
+
+    def test_gauge_goes_up_and_down(self):
+        gauge = self.registry.gauge("in_flight", "In flight.", ("client",))
+        gauge.inc(client="vtex")
+        gauge.inc(client="vtex")
+        gauge.dec(client="vtex")
+
+        self.assertEqual(gauge.get(client="vtex"), 1)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram("latency", "Latency.", buckets=(0.1, 1))
+        histogram.observe(0.05)
+        histogram.observe(0.1)
+        histogram.observe(0.5)
+        histogram.observe(3)
+
+        output = self.registry.render_prometheus()
+
+        self.assertIn('latency_bucket{le="0.1"} 2', output)
+        self.assertIn('latency_bucket{le="1.0"} 3', output)
+        self.assertIn('latency_bucket{le="+Inf"} 4', output)
+        self.assertIn("latency_count 4", output)
+        self.assertIn("latency_sum 3.65", output)
+
+    def test_label_values_are_escaped(self):
+        counter = self.registry.counter("errors", "Errors.", ("detail",))
+        counter.inc(detail='bad "quote"')
+
+        self.assertIn(
+            'errors_total{detail="bad \\"quote\\""} 1',
+            self.registry.render_prometheus(),
+        )
+
+    def test_same_name_returns_the_same_metric(self):
+        first = self.registry.counter("jobs", "Jobs done.")
+
+        self.assertIs(first, self.registry.counter("jobs", "Jobs done."))
+        with self.assertRaises(ValueError):
+            self.registry.gauge("jobs", "Jobs done.")
+
+    def test_collectors_are_rendered_and_failures_skipped(self):
+        def broken():
+            raise RuntimeError("boom")
+
+        self.registry.register_collector(broken)
+        self.registry.register_collector(
+            lambda: [
+                ("cache_size", "gauge", "Entries.", [({"cache": "a"}, 5)]),
+                ("cache_hits", "counter", "Hits.", [({"cache": "a"}, 3)]),
+            ]
+        )
+
+        output = self.registry.render_prometheus()
+
+        self.assertIn('cache_size{cache="a"} 5', output)
+        self.assertIn("# TYPE cache_hits counter", output)
+        self.assertIn('cache_hits_total{cache="a"} 3', output)
+
+    def test_observations_are_sent_to_statsd(self):
+        statsd = StatsdClient("localhost", 8125, prefix="marketplace")
+        statsd._socket = MagicMock()
+        registry = MetricsRegistry(statsd=statsd)
+
+        registry.histogram("latency", "Latency.", ("client",)).observe(
+            0.25, client="vtex"
+        )
+
+        statsd._socket.sendto.assert_called_once_with(
+            b"marketplace.latency:250.0|ms|#client:vtex", ("localhost", 8125)
+        )
@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+User = get_user_model()
+
+
+class CircuitBreakersViewTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("circuit-breakers")
+
+    def test_anonymous_user_is_redirected_to_login(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 302)
+
+    @patch("marketplace.core.views.circuit_breakers")
+    def test_staff_user_gets_breaker_states(self, mock_breakers):
+        mock_breakers.states.return_value = [
+            {
+                "name": "store.vtex.com",
+                "state": "open",
+                "opened_at": 1,
+                "retry_after": 10,
+            }
+        ]
+        mock_breakers.stats.return_value = {"store.vtex.com": {"rejected": 3}}
+        user = User.objects.create_superuser(email="admin@marketplace.ai")
+        self.client.force_login(user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["circuits"][0]["state"], "open")
+        self.assertEqual(
+            response.json()["process_stats"], {"store.vtex.com": {"rejected": 3}}
+        )
+
+
+class MetricsViewTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("metrics")
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_are_rendered_in_prometheus_format(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer secret")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(
+            "# TYPE http_client_request_duration_seconds histogram",
+            response.content.decode(),
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer wrong")
+
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_metrics_are_not_served_without_a_token(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer ")
+
+        self.assertEqual(response.status_code, 404)
@@ -118,6 +118,11 @@ class SyncOnDemandSerializer(serializers.Serializer):
     )
 
 
+class SyncOnDemandInlineSerializer(SyncOnDemandSerializer):
+    # Seconds the inline sync may take, VTEX_INLINE_SYNC_BUDGET by default
+    budget = serializers.FloatField(required=False, min_value=0.5, max_value=100)
+
+
 class FacebookProductDTOSerializer(serializers.Serializer):
     id = serializers.CharField()
     title = serializers.CharField()
@@ -1,6 +1,6 @@
 import uuid
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 
 from unittest.mock import Mock, patch
@@ -8,10 +8,14 @@ from unittest.mock import Mock, patch
 from rest_framework.exceptions import NotFound
 
 from marketplace.applications.models import App
+from marketplace.services.vtex.utils.on_demand_coalescer import OnDemandCoalescer
 from marketplace.wpp_products.models import Catalog
 from marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand import (
     SyncOnDemandUseCase,
 )
+from marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand_in_line import (
+    SyncOnDemandInlineUseCase,
+)
 from marketplace.core.types.ecommerce.vtex.usecases.vtex_integration import (
     VtexIntegration,
 )
@@ -95,6 +99,7 @@ class VtexIntegrationTest(TestCase):
         )
 
 
+@override_settings(VTEX_ON_DEMAND_COALESCE_WINDOW=0)
 class SyncOnDemandUseCaseTest(TestCase):
     def setUp(self):
         self.mock_celery_app = Mock()
@@ -106,78 +111,6 @@ class SyncOnDemandUseCaseTest(TestCase):
         self.mock_app.config = {"celery_queue_name": "test_queue"}
         self.mock_app.uuid = "fake-uuid"
 
-    # TODO: Fix this test
-    # @patch(
-    #     "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand.SyncOnDemandUseCase._get_vtex_app"
-    # )
-    # @patch(
-    #     "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand.SyncOnDemandUseCase._is_product_valid"
-    # )
-    # @patch(
-    #     "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand.SyncOnDemandUseCase._product_exists"
-    # )
-    # def test_execute_triggers_tasks_for_valid_products(
-    #     self, mock_product_exists, mock_is_valid, mock_get_app
-    # ):
-    #     mock_get_app.return_value = self.mock_app
-    #     mock_is_valid.return_value = True
-    #     mock_product_exists.return_value = True
-
-    #     data = {"seller": "seller1", "sku_ids": ["sku1", "sku2"]}
-    #     project_uuid = "project-uuid"
-
-    #     self.use_case.execute(data, project_uuid)
-
-    #     self.assertEqual(self.mock_celery_app.send_task.call_count, 4)
-    #     self.mock_celery_app.send_task.assert_any_call(
-    #         "task_enqueue_webhook",
-    #         kwargs={"app_uuid": "fake-uuid", "seller": "seller1", "sku_id": "sku1"},
-    #         queue="test_queue",
-    #         ignore_result=True,
-    #     )
-    #     self.mock_celery_app.send_task.assert_any_call(
-    #         "task_dequeue_webhooks",
-    #         kwargs={"app_uuid": "fake-uuid", "celery_queue": "test_queue"},
-    #         queue="test_queue",
-    #         ignore_result=True,
-    #     )
-
-    # TODO: Fix this test
-    # @patch(
-    #     "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand.SyncOnDemandUseCase._get_vtex_app"
-    # )
-    # @patch(
-    #     "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand.SyncOnDemandUseCase._is_product_valid"
-    # )
-    # @patch(
-    #     "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand.SyncOnDemandUseCase._product_exists"
-    # )
-    # def test_execute_does_not_trigger_tasks_for_invalid_products(
-    #     self, mock_product_exists, mock_is_valid, mock_get_app
-    # ):
-    #     mock_get_app.return_value = self.mock_app
-    #     mock_product_exists.side_effect = lambda sku_id, catalog: True
-    #     mock_is_valid.side_effect = lambda sku_id, catalog: sku_id != "sku2"
-
-    #     data = {"seller": "seller1", "sku_ids": ["sku1", "sku2"]}
-    #     project_uuid = "project-uuid"
-
-    #     self.use_case.execute(data, project_uuid)
-
-    #     self.assertEqual(self.mock_celery_app.send_task.call_count, 2)
-    #     self.mock_celery_app.send_task.assert_any_call(
-    #         "task_enqueue_webhook",
-    #         kwargs={"app_uuid": "fake-uuid", "seller": "seller1", "sku_id": "sku1"},
-    #         queue="test_queue",
-    #         ignore_result=True,
-    #     )
-    #     self.mock_celery_app.send_task.assert_any_call(
-    #         "task_dequeue_webhooks",
-    #         kwargs={"app_uuid": "fake-uuid", "celery_queue": "test_queue"},
-    #         queue="test_queue",
-    #         ignore_result=True,
-    #     )
-
     @patch("marketplace.applications.models.App.objects.get")
     def test_get_vtex_app_returns_app(self, mock_get):
         mock_app = Mock()
@@ -189,41 +122,251 @@ class SyncOnDemandUseCaseTest(TestCase):
         self.assertEqual(result, mock_app)
 
     @patch("marketplace.wpp_products.models.ProductValidation.objects.filter")
-    def test_is_product_valid_returns_true(self, mock_filter):
-        mock_filter.return_value.exists.return_value = True
+    def test_get_invalid_skus_runs_one_query(self, mock_filter):
+        mock_filter.return_value.values_list.return_value = [2]
 
-        result = self.use_case._is_product_valid("sku1", "mock_catalog")
+        result = self.use_case._get_invalid_skus({"1", "2", "abc"}, "mock_catalog")
 
-        mock_filter.assert_called_once_with(
-            sku_id="sku1", is_valid=True, catalog="mock_catalog"
-        )
-        self.assertTrue(result)
+        mock_filter.assert_called_once()
+        kwargs = mock_filter.call_args.kwargs
+        self.assertEqual(sorted(kwargs["sku_id__in"]), ["1", "2"])
+        self.assertEqual(kwargs["catalog"], "mock_catalog")
+        self.assertFalse(kwargs["is_valid"])
+        self.assertEqual(result, {"2"})
 
     @patch("marketplace.wpp_products.models.ProductValidation.objects.filter")
-    def test_is_product_valid_returns_false(self, mock_filter):
-        mock_filter.return_value.exists.return_value = False
+    def test_get_invalid_skus_without_numeric_ids(self, mock_filter):
+        self.assertEqual(self.use_case._get_invalid_skus({"abc"}, "catalog"), set())
+        mock_filter.assert_not_called()
+
+    @patch(
+        "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand.SyncOnDemandUseCase._get_invalid_skus"
+    )
+    @patch(
+        "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand.SyncOnDemandUseCase._get_vtex_app"
+    )
+    def test_execute_skips_invalid_skus(self, mock_get_app, mock_get_invalid_skus):
+        mock_get_app.return_value = self.mock_app
+        mock_get_invalid_skus.return_value = {"2"}
+        dto = Mock(seller="1", sku_ids=["1", "2"], sales_channel=None)
+
+        self.use_case.execute(dto, "project-uuid")
+
+        mock_get_invalid_skus.assert_called_once_with({"1", "2"}, self.mock_catalog)
+        kwargs = self.mock_celery_app.send_task.call_args.kwargs["kwargs"]
+        self.assertEqual(kwargs["batch"], ["1#1"])
+
+
+@override_settings(VTEX_ON_DEMAND_COALESCE_WINDOW=0)
+class SyncOnDemandInlineUseCaseTest(TestCase):
+    def setUp(self):
+        self.async_use_case = Mock()
+        self.use_case = SyncOnDemandInlineUseCase(
+            budget=5, async_use_case=self.async_use_case
+        )
+
+    @patch(
+        "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand_in_line.task_update_webhook_batch_products"
+    )
+    def test_dispatch_sends_pending_skus_to_the_queue(self, mock_task):
+        products = [Mock()]
 
-        result = self.use_case._is_product_valid("sku2", "mock_catalog")
+        def process(deadline, **kwargs):
+            deadline.add_pending(["1#2"])
+            return products
 
-        mock_filter.assert_called_once_with(
-            sku_id="sku2", is_valid=True, catalog="mock_catalog"
+        mock_task.side_effect = process
+
+        result = self.use_case._dispatch_skus(
+            app_uuid="app-uuid",
+            celery_queue="vtex-sync-on-demand",
+            skus_batch=["1#1", "1#2"],
+            sales_channel=None,
+            invalid_skus={"3"},
         )
-        self.assertFalse(result)
 
-    @patch("marketplace.wpp_products.models.ProductValidation.objects.filter")
-    def test_product_exists_returns_true(self, mock_filter):
-        mock_filter.return_value.exists.return_value = True
+        self.assertEqual(
+            result,
+            {"products": products, "invalid_skus": ["3"], "pending_skus": ["2"]},
+        )
+        self.assertEqual(mock_task.call_args.kwargs["deadline"].budget, 5)
+        self.async_use_case._dispatch_skus.assert_called_once_with(
+            app_uuid="app-uuid",
+            celery_queue="vtex-sync-on-demand",
+            skus_batch=["1#2"],
+            sales_channel=None,
+            invalid_skus=set(),
+        )
 
-        result = self.use_case._product_exists("sku1", "mock_catalog")
+    @patch(
+        "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand_in_line.task_update_webhook_batch_products"
+    )
+    def test_dispatch_within_budget(self, mock_task):
+        mock_task.return_value = []
+
+        result = self.use_case._dispatch_skus(
+            app_uuid="app-uuid",
+            celery_queue="vtex-sync-on-demand",
+            skus_batch=["1#1"],
+            sales_channel=None,
+            invalid_skus=set(),
+        )
 
-        mock_filter.assert_called_once_with(sku_id="sku1", catalog="mock_catalog")
-        self.assertTrue(result)
+        self.assertEqual(result["pending_skus"], [])
+        self.async_use_case._dispatch_skus.assert_not_called()
+
+    @patch(
+        "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand_in_line.OnDemandCoalescer"
+    )
+    @patch(
+        "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand_in_line.task_update_webhook_batch_products"
+    )
+    def test_dispatch_waits_for_skus_synced_by_another_request(
+        self, mock_task, mock_coalescer_class
+    ):
+        own_product, shared_product = Mock(), Mock()
+        coalescer = mock_coalescer_class.return_value
+        coalescer.window = 10
+        coalescer.claim.return_value = (["1#1"], ["1#2", "1#3"])
+        coalescer.wait.return_value = ([shared_product], ["1#3"])
+        mock_task.return_value = [own_product]
+
+        result = self.use_case._dispatch_skus(
+            app_uuid="app-uuid",
+            celery_queue="vtex-sync-on-demand",
+            skus_batch=["1#1", "1#2", "1#3"],
+            sales_channel=None,
+            invalid_skus=set(),
+        )
 
-    @patch("marketplace.wpp_products.models.ProductValidation.objects.filter")
-    def test_product_exists_returns_false(self, mock_filter):
-        mock_filter.return_value.exists.return_value = False
+        coalescer.claim.assert_called_once_with("inline", ["1#1", "1#2", "1#3"], ttl=15)
+        self.assertEqual(mock_task.call_args.kwargs["batch"], ["1#1"])
+        coalescer.publish.assert_called_once_with(["1#1"], [own_product])
+        self.assertEqual(coalescer.wait.call_args.args[:2], ("inline", ["1#2", "1#3"]))
+        self.assertEqual(result["products"], [own_product, shared_product])
+        self.assertEqual(result["pending_skus"], ["3"])
+        self.assertEqual(
+            self.async_use_case._dispatch_skus.call_args.kwargs["skus_batch"], ["1#3"]
+        )
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value).encode()
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def expire_results(self):
+        for key in [key for key in self.values if ":result:" in key]:
+            del self.values[key]
 
-        result = self.use_case._product_exists("sku2", "mock_catalog")
 
-        mock_filter.assert_called_once_with(sku_id="sku2", catalog="mock_catalog")
-        self.assertFalse(result)
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, *args, **kwargs):
+        self.commands.append((args, kwargs))
+
+    def execute(self):
+        return [self.redis.set(*args, **kwargs) for args, kwargs in self.commands]
+
+
+@patch(
+    "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand_in_line.task_update_webhook_batch_products"
+)
+class SyncOnDemandInlineClaimsTest(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = patch(
+            "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand_in_line.OnDemandCoalescer",
+            side_effect=lambda app_uuid, sales_channel: OnDemandCoalescer(
+                app_uuid, sales_channel, redis_client=self.redis, window=10
+            ),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.async_use_case = Mock()
+        self.use_case = SyncOnDemandInlineUseCase(
+            budget=0.2, async_use_case=self.async_use_case
+        )
+
+    def dispatch(self):
+        return self.use_case._dispatch_skus(
+            app_uuid="app-uuid",
+            celery_queue="vtex-sync-on-demand",
+            skus_batch=["1#1"],
+            sales_channel=None,
+            invalid_skus=set(),
+        )
+
+    def test_request_after_the_result_expired_syncs_again(self, mock_task):
+        mock_task.return_value = []
+        self.dispatch()
+        self.redis.expire_results()
+
+        result = self.dispatch()
+
+        self.assertEqual(mock_task.call_count, 2)
+        self.assertEqual(result["pending_skus"], [])
+        self.async_use_case._dispatch_skus.assert_not_called()
+
+    def test_claims_are_released_when_the_sync_fails(self, mock_task):
+        mock_task.side_effect = Exception("boom")
+
+        with self.assertRaises(Exception):
+            self.dispatch()
+
+        self.assertEqual(self.redis.values, {})
+
+
+class SyncOnDemandCoalescingTest(TestCase):
+    @patch(
+        "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand.OnDemandCoalescer"
+    )
+    def test_dispatch_skips_skus_already_queued(self, mock_coalescer_class):
+        celery_app = Mock()
+        mock_coalescer_class.return_value.claim.return_value = (["1#1"], ["1#2"])
+
+        SyncOnDemandUseCase(celery_app=celery_app)._dispatch_skus(
+            app_uuid="app-uuid",
+            celery_queue="vtex-sync-on-demand",
+            skus_batch=["1#1", "1#2"],
+            sales_channel=None,
+            invalid_skus=set(),
+        )
+
+        kwargs = celery_app.send_task.call_args.kwargs["kwargs"]
+        self.assertEqual(kwargs["batch"], ["1#1"])
+
+    @patch(
+        "marketplace.core.types.ecommerce.vtex.usecases.sync_on_demand.OnDemandCoalescer"
+    )
+    def test_dispatch_nothing_when_all_queued(self, mock_coalescer_class):
+        celery_app = Mock()
+        mock_coalescer_class.return_value.claim.return_value = ([], ["1#1"])
+
+        SyncOnDemandUseCase(celery_app=celery_app)._dispatch_skus(
+            app_uuid="app-uuid",
+            celery_queue="vtex-sync-on-demand",
+            skus_batch=["1#1"],
+            sales_channel=None,
+            invalid_skus=set(),
+        )
+
+        celery_app.send_task.assert_not_called()
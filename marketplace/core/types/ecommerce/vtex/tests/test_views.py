@@ -19,6 +19,8 @@ from marketplace.core.types.ecommerce.vtex.views import (
 from marketplace.core.types.ecommerce.vtex.type import VtexType
 from marketplace.clients.flows.client import FlowsClient
 from marketplace.services.vtex.app_manager import AppVtexManager
+from marketplace.services.vtex.utils.sync_progress import SyncProgress
+from marketplace.wpp_products.models import Catalog
 from marketplace.wpp_products.utils import SellerSyncUtils
 
 
@@ -406,6 +408,42 @@ class VtexViewSetTestCase(APIBaseTestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["message"], "No synchronization in progress")
+        self.assertEqual(response.data["progress"], [])
+
+    @patch.object(SyncProgress, "get")
+    def test_sync_progress(self, mock_get):
+        wpp_app = App.objects.create(
+            code="wpp-cloud",
+            created_by=self.user,
+            project_uuid=self.project_uuid,
+            platform=App.PLATFORM_WENI_FLOWS,
+        )
+        catalog = Catalog.objects.create(
+            app=wpp_app,
+            vtex_app=self.app,
+            facebook_catalog_id="123",
+            name="Catalog",
+            created_by=self.user,
+        )
+        mock_get.return_value = {"status": "running", "processed": 5, "total": 10}
+        url = reverse("vtex-app-sync-progress", kwargs={"uuid": self.app.uuid})
+        self.request.set_view(self.view_class.as_view({"get": "sync_progress"}))
+
+        response = self.request.get(url, uuid=self.app.uuid)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_get.assert_called_once_with(str(catalog.uuid))
+        self.assertEqual(
+            response.data["progress"],
+            [
+                {
+                    "catalog_uuid": str(catalog.uuid),
+                    "facebook_catalog_id": "123",
+                    "name": "Catalog",
+                    "sync": mock_get.return_value,
+                }
+            ],
+        )
 
 
 class UpdateVtexAdsTestCase(SetUpService):
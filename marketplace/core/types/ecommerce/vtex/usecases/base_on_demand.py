@@ -44,24 +44,21 @@ class BaseSyncUseCase(ABC):
             logger.info(f"No VTEX App configured with project: {project_uuid}")
             return None
 
-    def _is_product_valid(self, sku_id: str, catalog: Catalog) -> bool:
+    def _get_invalid_skus(self, sku_ids: Set[str], catalog: Catalog) -> Set[str]:
         """
-        Verify if a specific SKU is marked as valid.
+        Return the SKUs of `sku_ids` marked as invalid in the catalog, in a
+        single query. SKUs without a validation are not invalid.
         """
-        return ProductValidation.objects.filter(
-            sku_id=sku_id,
-            catalog=catalog,
-            is_valid=True,
-        ).exists()
+        numeric_ids = [sku_id for sku_id in sku_ids if str(sku_id).isdigit()]
+        if not numeric_ids:
+            return set()
 
-    def _product_exists(self, sku_id: str, catalog: Catalog) -> bool:
-        """
-        Check if the product is present in the catalog (regardless of validity).
-        """
-        return ProductValidation.objects.filter(
-            sku_id=sku_id,
+        invalid_ids = ProductValidation.objects.filter(
             catalog=catalog,
-        ).exists()
+            sku_id__in=numeric_ids,
+            is_valid=False,
+        ).values_list("sku_id", flat=True)
+        return {str(sku_id) for sku_id in invalid_ids}
 
     @staticmethod
     def _build_batch(seller: str, sku_ids: List[str]) -> List[str]:
@@ -91,12 +88,7 @@ class BaseSyncUseCase(ABC):
         app_uuid = str(vtex_app.uuid)
         celery_queue = "vtex-sync-on-demand"
 
-        invalid_skus = {
-            sku_id
-            for sku_id in sku_ids
-            if self._product_exists(sku_id, catalog)
-            and not self._is_product_valid(sku_id, catalog)
-        }
+        invalid_skus = self._get_invalid_skus(sku_ids, catalog)
 
         valid_skus = sku_ids - invalid_skus
         skus_batch = self._build_batch(seller, list(valid_skus))
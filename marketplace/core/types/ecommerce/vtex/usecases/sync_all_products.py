@@ -219,4 +219,9 @@ class SyncAllProductsUseCase:
         Returns:
             An instance of DataProcessor.
         """
-        return DataProcessor(queue=main_queue, temp_queue=temp_queue, use_threads=True)
+        return DataProcessor(
+            queue=main_queue,
+            temp_queue=temp_queue,
+            use_threads=True,
+            track_progress=True,
+        )
@@ -4,6 +4,7 @@ from typing import Optional, List, Set
 from celery import Celery
 
 from marketplace.celery import app as _celery_app
+from marketplace.services.vtex.utils.on_demand_coalescer import OnDemandCoalescer
 
 from .base_on_demand import BaseSyncUseCase
 
@@ -13,6 +14,9 @@ logger = logging.getLogger(__name__)
 class SyncOnDemandUseCase(BaseSyncUseCase):
     """
     High-priority (1) sync – uses Celery queue.
+
+    SKUs already queued by another request within the coalescing window are
+    not queued again.
     """
 
     def __init__(self, celery_app: Optional[Celery] = None) -> None:
@@ -31,6 +35,14 @@ class SyncOnDemandUseCase(BaseSyncUseCase):
         """
         Send the task to Celery; does not return a result.
         """
+        coalescer = OnDemandCoalescer(app_uuid, sales_channel)
+        skus_batch, already_queued = coalescer.claim("queued", skus_batch)
+        if already_queued:
+            logger.info(
+                f"Skipping {len(already_queued)} SKUs already queued for App: {app_uuid}"
+            )
+        if not skus_batch:
+            return
 
         kwargs = {
             "app_uuid": app_uuid,
@@ -1,11 +1,17 @@
 import logging
+import math
 
 from typing import List, Optional, Set
 
+from django.conf import settings
+
+from marketplace.services.vtex.utils.on_demand_coalescer import OnDemandCoalescer
+from marketplace.services.vtex.utils.sync_deadline import SyncDeadline
 from marketplace.wpp_products.tasks import task_update_webhook_batch_products
 
 
 from .base_on_demand import BaseSyncUseCase
+from .sync_on_demand import SyncOnDemandUseCase
 
 
 logger = logging.getLogger(__name__)
@@ -14,16 +20,34 @@ logger = logging.getLogger(__name__)
 class SyncOnDemandInlineUseCase(BaseSyncUseCase):
     """
     Inline-priority (2) sync – runs synchronously and returns the outcome.
+
+    The sync runs within a latency budget: the products finished in time are
+    returned and the remaining SKUs are handed to the on-demand (priority 1)
+    queue and reported as pending.
+
+    Concurrent inline syncs of the same SKUs are coalesced: the first request
+    processes them and publishes the products, the others wait for them.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        budget: Optional[float] = None,
+        async_use_case: Optional[SyncOnDemandUseCase] = None,
+    ) -> None:
+        """
+        Args:
+            budget: Seconds the inline sync may take, VTEX_INLINE_SYNC_BUDGET by default.
+            async_use_case: Use case receiving the SKUs not processed in time.
+        """
         super().__init__(priority=2)
+        self.budget = budget or settings.VTEX_INLINE_SYNC_BUDGET
+        self.async_use_case = async_use_case or SyncOnDemandUseCase()
 
     def _dispatch_skus(
         self,
         *,
         app_uuid: str,
-        celery_queue: str,  # Not used, but kept for compatibility
+        celery_queue: str,
         skus_batch: List[str],
         sales_channel: Optional[list[str]],
         invalid_skus: Set[str],
@@ -43,8 +67,48 @@ class SyncOnDemandInlineUseCase(BaseSyncUseCase):
             f"Processing inline sync for {skus_batch} (priority {self.priority}) – no Celery queue involved"
         )
 
-        result = task_update_webhook_batch_products(**kwargs)
+        deadline = SyncDeadline(self.budget)
+        coalescer = OnDemandCoalescer(app_uuid, sales_channel)
+        owned, shared = coalescer.claim(
+            "inline", skus_batch, ttl=math.ceil(self.budget) + coalescer.window
+        )
+
+        products, shared_products, not_ready = [], [], []
+        if owned:
+            kwargs["batch"] = owned
+            try:
+                result = task_update_webhook_batch_products(**kwargs, deadline=deadline)
+                products = list(result or [])
+                pending = set(deadline.pending)
+                coalescer.publish(
+                    [item for item in owned if item not in pending], products
+                )
+            finally:
+                # Requests already waiting read the published results, or stop
+                # waiting for the items released without them. The next ones
+                # sync the items again once the results expire
+                coalescer.release("inline", owned)
+
+        if shared:
+            logger.info(f"Waiting for {len(shared)} SKUs synced by another request")
+            shared_products, not_ready = coalescer.wait("inline", shared, deadline)
+
+        pending_batch = sorted(set(deadline.pending) | set(not_ready))
+        if pending_batch:
+            logger.info(
+                f"Inline sync budget of {self.budget}s spent, sending "
+                f"{len(pending_batch)} SKUs to the on-demand queue"
+            )
+            self.async_use_case._dispatch_skus(
+                app_uuid=app_uuid,
+                celery_queue=celery_queue,
+                skus_batch=pending_batch,
+                sales_channel=sales_channel,
+                invalid_skus=set(),
+            )
+
         return {
-            "products": result,
+            "products": products + shared_products,
             "invalid_skus": list(invalid_skus),
+            "pending_skus": [item.split("#", 1)[-1] for item in pending_batch],
         }
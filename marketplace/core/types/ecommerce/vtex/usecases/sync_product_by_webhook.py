@@ -5,6 +5,7 @@ from django.conf import settings
 from marketplace.services.vtex.private.products.service import PrivateProductsService
 from marketplace.services.vtex.utils.data_processor import DataProcessor
 from marketplace.services.vtex.utils.facebook_product_dto import FacebookProductDTO
+from marketplace.services.vtex.utils.sync_deadline import SyncDeadline
 from marketplace.wpp_products.models import Catalog
 
 logger = logging.getLogger(__name__)
@@ -50,6 +51,7 @@ class SyncProductByWebhookUseCase:
         catalog: Catalog,
         priority: int = 0,
         sales_channel: Optional[list[str]] = None,
+        deadline: Optional[SyncDeadline] = None,
     ) -> List[FacebookProductDTO]:
         """
         Executes the synchronization process for products received via webhook.
@@ -60,6 +62,8 @@ class SyncProductByWebhookUseCase:
             catalog (Catalog): The catalog associated with the products to be processed.
             priority (int, optional): The priority level for processing. Defaults to 0.
             sales_channel (list[str], optional): The sales channel identifier.
+            deadline (SyncDeadline, optional): Latency budget of an inline sync; the
+                items not processed in time are recorded in it.
 
         Returns:
             List[FacebookProductDTO]: List of processed products.
@@ -86,6 +90,7 @@ class SyncProductByWebhookUseCase:
             sellers=None,  # Not needed in this mode, as each item already includes the seller
             priority=priority,
             sales_channel=sales_channel,
+            deadline=deadline,
         )
 
         return result
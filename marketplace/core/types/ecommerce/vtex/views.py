@@ -1,3 +1,4 @@
+import logging
 import uuid as uuid_lib
 
 from rest_framework.response import Response
@@ -15,6 +16,7 @@ from marketplace.core.types.ecommerce.vtex.serializers import (
     VtexAppSerializer,
     VtexSyncSellerSerializer,
     SyncOnDemandSerializer,
+    SyncOnDemandInlineSerializer,
 )
 from marketplace.core.types import views
 from marketplace.core.types.ecommerce.vtex.tasks import task_sync_on_demand
@@ -33,11 +35,15 @@ from marketplace.services.flows.service import FlowsService
 from marketplace.clients.flows.client import FlowsClient
 from marketplace.services.vtex.app_manager import AppVtexManager
 from marketplace.services.vtex.dtos import APICredentials
+from marketplace.services.vtex.utils.sync_progress import SyncProgress
 
 from marketplace.wpp_products.utils import SellerSyncUtils
 from marketplace.accounts.permissions import ProjectManagePermission
 
 
+logger = logging.getLogger(__name__)
+
+
 class VtexViewSet(views.BaseAppTypeViewSet):
     serializer_class = VtexAppSerializer
     flows_service_class = FlowsService
@@ -196,15 +202,52 @@ class VtexViewSet(views.BaseAppTypeViewSet):
                 data={
                     "message": "A synchronization is already in progress",
                     "data": lock_data,
+                    "progress": self._catalogs_sync_progress(app),
                 },
                 status=status.HTTP_409_CONFLICT,
             )
 
         return Response(
-            data={"message": "No synchronization in progress"},
+            data={
+                "message": "No synchronization in progress",
+                "progress": self._catalogs_sync_progress(app),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["GET"], url_path="sync-progress")
+    def sync_progress(self, request, uuid=None, *args, **kwargs):
+        """
+        Return the live progress of the last sync of each catalog of the app:
+        total, processed, valid, invalid, saved and uploaded products, the
+        rate in SKUs per second and the ETA in seconds.
+        """
+        app = self.get_object()
+        return Response(
+            data={"progress": self._catalogs_sync_progress(app)},
             status=status.HTTP_200_OK,
         )
 
+    def _catalogs_sync_progress(self, app) -> list:
+        progress = []
+        for catalog in app.vtex_catalogs.all():
+            try:
+                catalog_progress = SyncProgress.get(str(catalog.uuid))
+            except Exception as e:
+                logger.warning(
+                    f"Could not read the sync progress of {catalog.uuid}: {e}"
+                )
+                catalog_progress = None
+            progress.append(
+                {
+                    "catalog_uuid": str(catalog.uuid),
+                    "facebook_catalog_id": catalog.facebook_catalog_id,
+                    "name": catalog.name,
+                    "sync": catalog_progress,
+                }
+            )
+        return progress
+
     @action(detail=True, methods=["POST"], url_path="update-vtex-ads")
     def update_vtex_ads(self, request, app_uuid=None, *args, **kwargs):
         app = self.get_object()
@@ -284,12 +327,15 @@ class VtexSyncOnDemandInlineView(JWTModuleAuthMixin, APIView):  # pragma: no cov
     Handles on-demand (priority 2) product sync for VTEX.
 
     Receives a list of SKU IDs and seller info, processes the sync inline, and returns the list of processed products.
+    The sync runs within a latency budget (`budget`, in seconds): the SKUs not processed in time are sent
+    to the on-demand queue and returned in `pending_skus`.
 
     Example request:
         {
             "sku_ids": ["123", "456"],
             "seller": "1",
-            "sales_channel": "1"
+            "sales_channel": "1",
+            "budget": 5
         }
 
     Example response:
@@ -302,7 +348,8 @@ class VtexSyncOnDemandInlineView(JWTModuleAuthMixin, APIView):  # pragma: no cov
                 }
             ],
             "total_products": 1,
-            "invalid_skus": []
+            "invalid_skus": [],
+            "pending_skus": ["456"]
         }
     """
 
@@ -317,14 +364,16 @@ class VtexSyncOnDemandInlineView(JWTModuleAuthMixin, APIView):  # pragma: no cov
         Returns:
             Response: A JSON object containing the serialized products and the total found.
         """
-        serializer = SyncOnDemandSerializer(data=request.data)
+        serializer = SyncOnDemandInlineSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         sku_ids = serializer.validated_data.get("sku_ids")
         seller = serializer.validated_data.get("seller")
         sales_channel = serializer.validated_data.get("sales_channel")
 
-        use_case = SyncOnDemandInlineUseCase()
+        use_case = SyncOnDemandInlineUseCase(
+            budget=serializer.validated_data.get("budget")
+        )
         dto = SyncOnDemandDTO(
             sku_ids=sku_ids,
             seller=seller,
@@ -334,6 +383,7 @@ class VtexSyncOnDemandInlineView(JWTModuleAuthMixin, APIView):  # pragma: no cov
 
         products = result.get("products") if result else []
         invalid_skus = result.get("invalid_skus") if result else []
+        pending_skus = result.get("pending_skus") if result else []
 
         if not products:
             return Response(
@@ -341,6 +391,7 @@ class VtexSyncOnDemandInlineView(JWTModuleAuthMixin, APIView):  # pragma: no cov
                     "products": [],
                     "total_products": 0,
                     "invalid_skus": invalid_skus,
+                    "pending_skus": pending_skus,
                 },
                 status=status.HTTP_200_OK,
             )
@@ -352,6 +403,7 @@ class VtexSyncOnDemandInlineView(JWTModuleAuthMixin, APIView):  # pragma: no cov
                 "products": facebook_products_serializer.data,
                 "total_products": len(products),
                 "invalid_skus": invalid_skus,
+                "pending_skus": pending_skus,
             },
             status=status.HTTP_200_OK,
         )
@@ -0,0 +1,42 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+
+from marketplace.clients.circuit_breaker import circuit_breakers
+from marketplace.core.metrics import metrics
+
+# Registers the HTTP client metrics and collectors
+import marketplace.clients.metrics  # noqa: F401
+
+
+def circuit_breakers_view(request):
+    """
+    Admin view listing the circuits currently open or half-open across all
+    processes, along with the breaker counters of the serving process.
+    """
+    return JsonResponse(
+        {
+            "circuits": circuit_breakers.states(),
+            "process_stats": circuit_breakers.stats(),
+        }
+    )
+
+
+def metrics_view(request):
+    """
+    Expose the metrics of the serving process in the Prometheus text format.
+    Requires `Authorization: Bearer <METRICS_TOKEN>`, and is not served at all
+    while no token is configured.
+    """
+    if not settings.METRICS_TOKEN:
+        raise Http404()
+
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    provided = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(provided, expected):
+        return HttpResponse(status=401)
+
+    return HttpResponse(
+        metrics.render_prometheus(), content_type="text/plain; version=0.0.4"
+    )
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Tuple
 
 
 class ProfileHandlerInterface(ABC):
@@ -214,6 +214,81 @@ class CatalogsRequestsInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def iter_catalog_products(
+        self, catalog_id: str, fields: str, page_size: int = 2000
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Pages through all the products of a catalog.
+
+        :param catalog_id: The ID of the catalog.
+        :param fields: Comma separated fields of the products.
+        :param page_size: Number of products per page.
+        :return: An iterator over the pages of products.
+        """
+        pass
+
+    @abstractmethod
+    def iter_unapproved_products(
+        self, catalog_id: str, page_size: int = 2000
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Pages through the products of a catalog rejected by the Meta policies.
+
+        :param catalog_id: The ID of the catalog.
+        :param page_size: Number of products per page.
+        :return: An iterator over the pages of products.
+        """
+        pass
+
+    @abstractmethod
+    def create_product_feed(self, catalog_id: str, name: str) -> Dict[str, Any]:
+        """
+        Creates a product feed in a catalog.
+
+        :param catalog_id: The ID of the catalog.
+        :param name: The name of the feed.
+        :return: A dictionary with the ID of the feed.
+        """
+        pass
+
+    @abstractmethod
+    def upload_product_feed(
+        self, feed_id: str, file: Any, file_name: str, update_only: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Uploads a gzip compressed feed file to a product feed.
+
+        :param feed_id: The ID of the product feed.
+        :param file: The file object of the feed.
+        :param file_name: The name of the file.
+        :param update_only: Whether products missing from the file are kept.
+        :return: A dictionary with the ID of the upload session.
+        """
+        pass
+
+    @abstractmethod
+    def get_product_feed_upload(self, upload_id: str) -> Dict[str, Any]:
+        """
+        Reads the status of a feed upload session.
+
+        :param upload_id: The ID of the upload session.
+        :return: A dictionary with the upload session, `end_time` set once processed.
+        """
+        pass
+
+    @abstractmethod
+    def list_product_feed_upload_errors(
+        self, upload_id: str
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Pages through the errors of a feed upload session.
+
+        :param upload_id: The ID of the upload session.
+        :return: An iterator over the errors, with the products they sample.
+        """
+        pass
+
     @abstractmethod
     def get_products_by_catalog_id(
         self,
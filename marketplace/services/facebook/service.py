@@ -2,7 +2,7 @@ import logging
 import requests
 
 from sentry_sdk import capture_exception
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
 
 from marketplace.wpp_products.models import Catalog
 from marketplace.interfaces.facebook.interfaces import (
@@ -153,6 +153,28 @@ class FacebookService:  # TODO: Change the name to CatalogService
         )
         return self.client.upload_items_batch(catalog_id, payload)
 
+    def create_product_feed(self, catalog_id: str, name: str) -> Dict[str, Any]:
+        return self.client.create_product_feed(catalog_id, name)
+
+    def upload_product_feed(
+        self, feed_id: str, file: Any, file_name: str
+    ) -> Dict[str, Any]:
+        """
+        Uploads a feed file as an update-only upload, so products missing from
+        the file are kept in the catalog.
+        """
+        return self.client.upload_product_feed(
+            feed_id, file, file_name, update_only=True
+        )
+
+    def get_product_feed_upload(self, upload_id: str) -> Dict[str, Any]:
+        return self.client.get_product_feed_upload(upload_id)
+
+    def list_product_feed_upload_errors(
+        self, upload_id: str
+    ) -> Iterator[Dict[str, Any]]:
+        return self.client.list_product_feed_upload_errors(upload_id)
+
 
 class TemplateService:
     def __init__(self, client: TemplatesRequestsInterface):
@@ -1,8 +1,10 @@
 from typing import List
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
 
+from marketplace.services.product.upload_product_loader import UploadProductLoader
 from marketplace.services.vtex.utils.facebook_product_dto import FacebookProductDTO
 from marketplace.wpp_products.models import (
     UploadProduct,
@@ -42,8 +44,9 @@ class ProductFacebookManager:
         Save products in bulk for the initial insertion process.
 
         This method uses Django's bulk_create for efficient database operations
-        during the initial product load. All operations are wrapped in a transaction
-        to ensure atomicity - either all products are saved or none.
+        during the initial product load, or COPY for batches of at least
+        UPLOAD_PRODUCT_COPY_MIN_ROWS products. All operations are wrapped in a
+        transaction to ensure atomicity - either all products are saved or none.
 
         Args:
             products_dto: List of FacebookProductDTO objects containing product data
@@ -57,11 +60,17 @@ class ProductFacebookManager:
             f"Starting bulk insertion process for {len(products_dto)} products. Catalog: {catalog.name}"
         )
 
+        pending_data = self._pending_full_data(
+            [product.id for product in products_dto if product.partial], catalog
+        )
         new_products = [
             UploadProduct(
                 facebook_product_id=product.id,
                 catalog=catalog,
-                data=product.to_meta_payload(),
+                data={
+                    **pending_data.get(product.id, {}),
+                    **product.to_meta_payload(),
+                },
                 status="pending",
                 priority=self.priority,
             )
@@ -70,9 +79,12 @@ class ProductFacebookManager:
 
         try:
             with transaction.atomic():
-                UploadProduct.objects.bulk_create(
-                    new_products, batch_size=self.batch_size
-                )
+                if self._use_copy(new_products):
+                    UploadProductLoader().load(new_products)
+                else:
+                    UploadProduct.objects.bulk_create(
+                        new_products, batch_size=self.batch_size
+                    )
             print(
                 f"All {len(products_dto)} products were saved successfully in the database."
             )
@@ -82,3 +94,33 @@ class ProductFacebookManager:
 
         UploadProduct.remove_duplicates(catalog)
         return all_success
+
+    @staticmethod
+    def _pending_full_data(facebook_product_ids: List[str], catalog: Catalog) -> dict:
+        """
+        The data of the full updates still pending for the products of
+        partial updates. The newer row replaces the pending one, so the
+        partial data is saved on top of it, not to lose the full update.
+        """
+        if not facebook_product_ids:
+            return {}
+        pending = (
+            UploadProduct.objects.filter(
+                catalog=catalog,
+                status="pending",
+                facebook_product_id__in=facebook_product_ids,
+                data__has_key="title",
+            )
+            .order_by("modified_on")
+            .values_list("facebook_product_id", "data")
+        )
+        return {facebook_product_id: data for facebook_product_id, data in pending}
+
+    @staticmethod
+    def _use_copy(products: List[UploadProduct]) -> bool:
+        min_rows = settings.UPLOAD_PRODUCT_COPY_MIN_ROWS
+        return (
+            bool(min_rows)
+            and len(products) >= min_rows
+            and UploadProductLoader.supported()
+        )
@@ -1,5 +1,5 @@
 from unittest.mock import MagicMock, patch
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, override_settings
 
 from marketplace.services.product.product_facebook_manage import (
     ProductFacebookManager,
@@ -92,3 +92,53 @@ class TestProductFacebookManager(SimpleTestCase):
 
         self.assertFalse(ok)
         mock_upload_product.remove_duplicates.assert_called_once_with(catalog)
+
+    @override_settings(UPLOAD_PRODUCT_COPY_MIN_ROWS=2)
+    @patch("marketplace.services.product.product_facebook_manage.UploadProductLoader")
+    @patch("marketplace.services.product.product_facebook_manage.transaction")
+    @patch("marketplace.services.product.product_facebook_manage.UploadProduct")
+    def test_bulk_save_large_batches_with_copy(
+        self, mock_upload_product, mock_tx, mock_loader
+    ):
+        mock_loader.supported.return_value = True
+        dtos = [MagicMock(id=f"p{i}") for i in range(2)]
+
+        ok = ProductFacebookManager().bulk_save_initial_product_data(dtos, MagicMock())
+
+        self.assertTrue(ok)
+        loaded = mock_loader.return_value.load.call_args.args[0]
+        self.assertEqual(len(loaded), 2)
+        mock_upload_product.objects.bulk_create.assert_not_called()
+
+    @patch("marketplace.services.product.product_facebook_manage.transaction")
+    @patch("marketplace.services.product.product_facebook_manage.UploadProduct")
+    def test_bulk_save_partial_products_on_top_of_pending_full_data(
+        self, mock_upload_product, mock_tx
+    ):
+        pending = mock_upload_product.objects.filter.return_value.order_by.return_value
+        pending.values_list.return_value = [
+            ("p1", {"id": "p1", "title": "Product", "price": "10.00 BRL"})
+        ]
+        partial = MagicMock(id="p1", partial=True)
+        partial.to_meta_payload.return_value = {"id": "p1", "price": "8.00 BRL"}
+        full = MagicMock(id="p2", partial=False)
+        full.to_meta_payload.return_value = {"id": "p2", "title": "Other"}
+        catalog = MagicMock()
+
+        ProductFacebookManager().bulk_save_initial_product_data(
+            [partial, full], catalog
+        )
+
+        mock_upload_product.objects.filter.assert_called_once_with(
+            catalog=catalog,
+            status="pending",
+            facebook_product_id__in=["p1"],
+            data__has_key="title",
+        )
+        self.assertEqual(
+            [call.kwargs["data"] for call in mock_upload_product.call_args_list],
+            [
+                {"id": "p1", "title": "Product", "price": "8.00 BRL"},
+                {"id": "p2", "title": "Other"},
+            ],
+        )
@@ -0,0 +1,85 @@
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+
+from marketplace.applications.models import App
+from marketplace.services.product.upload_product_loader import (
+    CsvStream,
+    UploadProductLoader,
+)
+from marketplace.wpp_products.models import Catalog, UploadProduct
+
+
+User = get_user_model()
+
+
+class TestCsvStream(TestCase):
+    def test_reads_the_rows_in_chunks(self):
+        rows = [(1, 'say "hi"'), (2, "line\nbreak")]
+        stream = CsvStream(rows)
+
+        chunks = []
+        while True:
+            chunk = stream.read(5)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        self.assertTrue(all(len(chunk) <= 5 for chunk in chunks))
+        self.assertEqual("".join(chunks), '1,"say ""hi"""\n2,"line\nbreak"\n')
+
+
+class TestUploadProductLoader(TestCase):
+    def setUp(self):
+        user = User.objects.create_superuser(email="user@marketplace.ai")
+        app = App.objects.create(
+            code="wpp-cloud",
+            created_by=user,
+            project_uuid=str(uuid.uuid4()),
+            platform=App.PLATFORM_WENI_FLOWS,
+        )
+        self.catalog = Catalog.objects.create(
+            name="Catalog", facebook_catalog_id="123", app=app
+        )
+
+    def product(self, facebook_product_id, data, priority=0):
+        return UploadProduct(
+            facebook_product_id=facebook_product_id,
+            catalog=self.catalog,
+            data=data,
+            status="pending",
+            priority=priority,
+        )
+
+    def test_loads_the_products(self):
+        data = {"id": "1#1", "title": 'Camisa "Polo", ação', "description": "a\nb"}
+
+        with transaction.atomic():
+            inserted = UploadProductLoader().load(
+                [self.product("1#1", data, priority=1), self.product("2#1", {})]
+            )
+
+        self.assertEqual(inserted, 2)
+        product = UploadProduct.objects.get(facebook_product_id="1#1")
+        self.assertEqual(product.data, data)
+        self.assertEqual((product.status, product.priority), ("pending", 1))
+        self.assertEqual(product.catalog, self.catalog)
+        self.assertIsNotNone(product.modified_on)
+
+    def test_keeps_the_last_row_of_each_product(self):
+        with transaction.atomic():
+            loader = UploadProductLoader()
+            loader.load([self.product("1#1", {"v": 1}), self.product("1#1", {"v": 2})])
+            # The staging table can be reused within the transaction
+            loader.load([self.product("2#1", {"v": 3})])
+
+        self.assertEqual(
+            list(
+                UploadProduct.objects.order_by("facebook_product_id").values_list(
+                    "facebook_product_id", "data"
+                )
+            ),
+            [("1#1", {"v": 2}), ("2#1", {"v": 3})],
+        )
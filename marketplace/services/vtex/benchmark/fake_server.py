@@ -0,0 +1,462 @@
+"""
+Local stand-ins for the VTEX and Meta APIs used by the product sync.
+
+FakeVtexServer answers the catalog, seller and cart simulation endpoints with
+generated data and FakeMetaServer accepts catalog batch uploads, both after a
+latency drawn from a configurable distribution and failing a configurable
+share of the requests. Clients reach them through StubSessionPool, which sends
+every request to a local server whatever the host in the URL, so the real
+clients and services can be benchmarked as is.
+"""
+import hashlib
+import json
+import math
+import multiprocessing
+import random
+import threading
+import time
+
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """
+    Distribution of the response latency, in seconds.
+
+    Kinds:
+        fixed: always `a`.
+        uniform: between `a` and `b`.
+        lognormal: median `a` with shape `b`, which gives the long tail seen
+            on real APIs.
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    KINDS = ("fixed", "uniform", "lognormal")
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "LatencyDistribution":
+        """
+        Build a distribution from a `kind:a[:b]` string, e.g. `lognormal:0.08:0.6`.
+        """
+        kind, *params = spec.split(":")
+        if kind not in cls.KINDS or not 1 <= len(params) <= 2:
+            raise ValueError(
+                f"Invalid latency '{spec}', expected one of {cls.KINDS} as kind:a[:b]"
+            )
+        values = [float(param) for param in params]
+        return cls(kind, values[0], values[1] if len(values) > 1 else 0.0)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return self.a * math.exp(rng.gauss(0, self.b))
+        return self.a
+
+
+@dataclass
+class FakeVtexConfig:
+    """
+    Shape of the store served by FakeVtexServer.
+
+    Attributes:
+        skus: Number of SKUs in the catalog.
+        sellers: Number of active sellers.
+        latency: Latency of every endpoint without a specific one.
+        endpoint_latency: Latency per endpoint name (details, simulation,
+            sellers, skus).
+        error_rate: Share of requests answered with an error status.
+        error_statuses: Statuses the failed requests are answered with.
+        unavailable_ratio: Share of SKU and seller pairs out of stock.
+        seed: Seed of the latency and error draws.
+    """
+
+    skus: int = 1000
+    sellers: int = 1
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    endpoint_latency: Dict[str, LatencyDistribution] = field(default_factory=dict)
+    error_rate: float = 0.0
+    error_statuses: Tuple[int, ...] = (503,)
+    unavailable_ratio: float = 0.1
+    seed: int = 42
+
+    @property
+    def seller_ids(self) -> List[str]:
+        return ["1"] + [f"seller{index}" for index in range(2, self.sellers + 1)]
+
+
+@dataclass
+class FakeMetaConfig:
+    """
+    Behaviour of FakeMetaServer.
+
+    Attributes:
+        latency: Latency of the batch uploads.
+        endpoint_latency: Latency per endpoint name (items_batch).
+        error_rate: Share of requests answered with an error status.
+        error_statuses: Statuses the failed requests are answered with.
+        seed: Seed of the latency and error draws.
+    """
+
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    endpoint_latency: Dict[str, LatencyDistribution] = field(default_factory=dict)
+    error_rate: float = 0.0
+    error_statuses: Tuple[int, ...] = (500,)
+    seed: int = 42
+
+
+class FakeApiServer:
+    """
+    Threaded HTTP server answering the routes of a subclass.
+
+    By default the server runs in a child process, so that serving requests
+    does not compete for the GIL with the pipeline being measured. With
+    `isolated=False` it runs in a thread of the current process instead.
+    Request counters are read through the `/__stats__` endpoint.
+    """
+
+    STATS_PATH = "/__stats__"
+    NAME = "fake-api"
+
+    def __init__(self, config, host: str = "127.0.0.1", isolated: bool = True) -> None:
+        self.config = config
+        self.isolated = isolated
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+        self._counts_lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._server = ThreadingHTTPServer((host, 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._runner = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeApiServer":
+        if self.isolated:
+            # The listening socket is inherited, so the server is reachable
+            # as soon as start returns
+            self._runner = multiprocessing.get_context("fork").Process(
+                target=self._server.serve_forever, name=self.NAME, daemon=True
+            )
+        else:
+            self._runner = threading.Thread(
+                target=self._server.serve_forever, name=self.NAME, daemon=True
+            )
+        self._runner.start()
+        return self
+
+    def stop(self) -> None:
+        if self.isolated:
+            self._runner.terminate()
+        else:
+            self._server.shutdown()
+        self._runner.join()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeApiServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def stats(self) -> dict:
+        """
+        Return the requests and injected errors per endpoint.
+        """
+        return requests.get(f"{self.url}{self.STATS_PATH}", timeout=5).json()
+
+    def _local_stats(self) -> dict:
+        with self._counts_lock:
+            return {"requests": dict(self.requests), "errors": dict(self.errors)}
+
+    # ================================
+    # Request handling
+    # ================================
+    def _draw(self, endpoint: str) -> Tuple[float, Optional[int]]:
+        latency = self.config.endpoint_latency.get(endpoint, self.config.latency)
+        with self._rng_lock:
+            delay = latency.sample(self._rng)
+            fails = self._rng.random() < self.config.error_rate
+            status = self._rng.choice(self.config.error_statuses) if fails else None
+        return max(delay, 0.0), status
+
+    def _count(self, endpoint: str, failed: bool) -> None:
+        with self._counts_lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            if failed:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def _route(self, method: str, path: str, query: dict, body: Optional[dict]):
+        """
+        Return (endpoint name, payload) for a request, or (None, None) if the
+        path is not emulated.
+        """
+        return None, None
+
+    def _accepted(self, endpoint: str, body: Optional[dict]) -> None:
+        """
+        Called for every request answered successfully, before the response
+        is sent.
+        """
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, which Nagle's algorithm
+            # would delay by tens of milliseconds on keep-alive connections
+            disable_nagle_algorithm = True
+
+            def _handle(self, method: str) -> None:
+                parts = urlsplit(self.path)
+                if parts.path == server.STATS_PATH:
+                    self._send(200, server._local_stats())
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                body = json.loads(raw_body) if raw_body else None
+
+                endpoint, payload = server._route(
+                    method, parts.path, parse_qs(parts.query), body
+                )
+                if endpoint is None:
+                    self._send(404, {"error": "not emulated"})
+                    return
+
+                delay, error_status = server._draw(endpoint)
+                time.sleep(delay)
+                server._count(endpoint, error_status is not None)
+                if error_status is not None:
+                    self._send(error_status, {"error": "injected failure"})
+                else:
+                    server._accepted(endpoint, body)
+                    self._send(200, payload)
+
+            def _send(self, status: int, payload) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class FakeVtexServer(FakeApiServer):
+    """
+    Fake VTEX store serving the catalog, seller and simulation endpoints.
+    """
+
+    NAME = "fake-vtex"
+
+    def __init__(
+        self, config: FakeVtexConfig, host: str = "127.0.0.1", isolated: bool = True
+    ) -> None:
+        super().__init__(config, host, isolated)
+
+    def _route(self, method: str, path: str, query: dict, body: Optional[dict]):
+        if path.startswith("/api/catalog_system/pvt/sku/stockkeepingunitbyid/"):
+            return "details", self._product_details(path.rsplit("/", 1)[-1])
+        if path == "/api/checkout/pub/orderForms/simulation" and method == "POST":
+            sales_channel = query.get("sc", [None])[0]
+            return "simulation", self._simulation(body or {}, sales_channel)
+        if path.startswith("/api/catalog_system/pvt/sku/stockkeepingunitids"):
+            page = int(query.get("page", ["1"])[0])
+            page_size = int(query.get("pagesize", ["1000"])[0])
+            start = (page - 1) * page_size + 1
+            end = min(start + page_size, self.config.skus + 1)
+            return "skus", list(range(start, end))
+        if path == "/api/seller-register/pvt/sellers":
+            return "sellers", {
+                "paging": {"total": self.config.sellers},
+                "items": [
+                    {"id": seller, "isActive": True}
+                    for seller in self.config.seller_ids
+                ],
+            }
+        if path == "/api/catalog_system/pvt/seller/list":
+            return "sellers", [
+                {"SellerId": seller, "IsActive": True}
+                for seller in self.config.seller_ids
+            ]
+        if path.startswith("/api/catalog_system/"):
+            return "catalog", []
+        return None, None
+
+    def _product_details(self, sku_id: str) -> dict:
+        sku = int(sku_id)
+        product_id = (sku + 1) // 2
+        return {
+            "Id": sku,
+            "ProductId": product_id,
+            "IsActive": True,
+            "SkuName": f"Benchmark product {sku}",
+            "ProductName": f"Benchmark product {product_id}",
+            "ProductDescription": f"Description of the benchmark product {product_id}",
+            "BrandName": "Benchmark",
+            "DetailUrl": f"/benchmark-product-{product_id}/p",
+            "ImageUrl": f"https://images.example.com/{sku}.jpg",
+            "Images": [{"ImageUrl": f"https://images.example.com/{sku}.jpg"}],
+            "ProductCategories": {"1": "Benchmark"},
+            "ProductSpecifications": [],
+            "Dimension": {"weight": 1000, "height": 10, "width": 10, "length": 10},
+            "MeasurementUnit": "un",
+            "UnitMultiplier": 1.0,
+            "SkuSellers": [
+                {"SellerId": seller, "IsActive": True}
+                for seller in self.config.seller_ids
+            ],
+        }
+
+    def _is_available(self, sku_id: str, seller: str) -> bool:
+        digest = hashlib.md5(f"{sku_id}:{seller}".encode()).digest()
+        return digest[0] / 256 >= self.config.unavailable_ratio
+
+    def _simulation(self, body: dict, sales_channel: Optional[str]) -> dict:
+        items = []
+        for item in body.get("items", []):
+            sku_id, seller = str(item.get("id")), str(item.get("seller"))
+            price = 1000 + int(sku_id) % 100 * 10 + int(sales_channel or 1)
+            items.append(
+                {
+                    "id": sku_id,
+                    "seller": seller,
+                    "availability": (
+                        "available"
+                        if self._is_available(sku_id, seller)
+                        else "withoutStock"
+                    ),
+                    "price": price,
+                    "listPrice": price + 100,
+                    "sellingPrice": price,
+                }
+            )
+        return {"items": items}
+
+
+class FakeMetaServer(FakeApiServer):
+    """
+    Fake Meta Graph API accepting catalog batch uploads.
+
+    The time each retailer id was first accepted is recorded, as a Unix
+    timestamp, and returned by `stats` under `first_accepted`.
+    """
+
+    NAME = "fake-meta"
+
+    def __init__(
+        self,
+        config: Optional[FakeMetaConfig] = None,
+        host: str = "127.0.0.1",
+        isolated: bool = True,
+    ) -> None:
+        super().__init__(config or FakeMetaConfig(), host, isolated)
+        self.first_accepted: Dict[str, float] = {}
+        self.items = 0
+
+    def _local_stats(self) -> dict:
+        stats = super()._local_stats()
+        with self._counts_lock:
+            stats["items"] = self.items
+            stats["first_accepted"] = dict(self.first_accepted)
+        return stats
+
+    def _route(self, method: str, path: str, query: dict, body: Optional[dict]):
+        if path.endswith("/items_batch") and method == "POST":
+            with self._counts_lock:
+                handle = f"handle-{sum(self.requests.values()) + 1}"
+            return "items_batch", {"handles": [handle]}
+        return None, None
+
+    def _accepted(self, endpoint: str, body: Optional[dict]) -> None:
+        accepted_at = time.time()
+        with self._counts_lock:
+            for request in (body or {}).get("requests", []):
+                retailer_id = str(request.get("data", {}).get("id"))
+                self.items += 1
+                self.first_accepted.setdefault(retailer_id, accepted_at)
+
+
+class StubRoutingAdapter(HTTPAdapter):
+    """
+    Transport adapter sending every request to `target_url`, keeping the path
+    and query string of the original URL. Hosts listed in `routes` are sent
+    to their own target instead.
+    """
+
+    def __init__(
+        self, target_url: str, routes: Optional[Dict[str, str]] = None, **kwargs
+    ) -> None:
+        self.target = urlsplit(target_url)
+        self.routes = {host: urlsplit(url) for host, url in (routes or {}).items()}
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        target = self.routes.get(parts.hostname, self.target)
+        request.url = urlunsplit(
+            (target.scheme, target.netloc, parts.path, parts.query, "")
+        )
+        return super().send(request, **kwargs)
+
+
+class StubSessionPool:
+    """
+    Drop-in replacement of HTTPSessionPool routing all traffic to stub servers.
+
+    Args:
+        target_url: Server receiving the requests of hosts not in `routes`.
+        pool_maxsize: Connections kept per server.
+        routes: Target URL per host name, e.g. the Graph API host.
+    """
+
+    def __init__(
+        self,
+        target_url: str,
+        pool_maxsize: int = 100,
+        routes: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.session = requests.Session()
+        adapter = StubRoutingAdapter(
+            target_url,
+            routes=routes,
+            pool_connections=1 + len(routes or {}),
+            pool_maxsize=pool_maxsize,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_session(self, url: str) -> requests.Session:
+        return self.session
+
+    def stats(self) -> dict:
+        return {}
+
+    def close(self) -> None:
+        self.session.close()
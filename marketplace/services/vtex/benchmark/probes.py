@@ -0,0 +1,129 @@
+"""
+Counters of the resources used by a benchmark run: database queries, Redis
+commands and memory.
+"""
+import contextlib
+import re
+import resource
+import sys
+import threading
+
+from typing import Dict, Iterator
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from redis.client import Pipeline, Redis
+
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "COPY")
+WRITTEN_TABLE = re.compile(
+    r'^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|COPY)\s+"?([\w.]+)"?', re.IGNORECASE
+)
+
+
+class QueryCounter:
+    """
+    Counts the SQL statements run by every thread while installed.
+
+    Worker threads open their own connections, so the counter is attached to
+    the connections that already exist and to every connection created while
+    it is installed. Writes are also counted per table.
+    """
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.writes = 0
+        self.rows_written = 0
+        self.writes_by_table: Dict[str, int] = {}
+        self.rows_by_table: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        statement = sql.lstrip()[:6].upper()
+        is_write = statement.startswith(WRITE_STATEMENTS)
+        table = None
+        if is_write:
+            match = WRITTEN_TABLE.match(sql)
+            table = match.group(1) if match else "unknown"
+        with self._lock:
+            self.queries += 1
+            if is_write:
+                self.writes += 1
+                self.writes_by_table[table] = self.writes_by_table.get(table, 0) + 1
+        result = execute(sql, params, many, context)
+        if is_write:
+            rowcount = max(getattr(context["cursor"], "rowcount", 0) or 0, 0)
+            with self._lock:
+                self.rows_written += rowcount
+                self.rows_by_table[table] = self.rows_by_table.get(table, 0) + rowcount
+        return result
+
+    def _attach(self, connection, **kwargs) -> None:
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    @contextlib.contextmanager
+    def install(self) -> Iterator["QueryCounter"]:
+        connection_created.connect(self._attach, weak=False)
+        for connection in connections.all():
+            self._attach(connection)
+        try:
+            yield self
+        finally:
+            connection_created.disconnect(self._attach)
+            for connection in connections.all():
+                if self in connection.execute_wrappers:
+                    connection.execute_wrappers.remove(self)
+
+
+class RedisCommandCounter:
+    """
+    Counts the Redis commands sent by every client of the process while installed.
+
+    Commands sent in a pipeline are counted one by one, and the pipeline
+    round trips separately.
+    """
+
+    def __init__(self) -> None:
+        self.commands = 0
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def _add(self, commands: int) -> None:
+        with self._lock:
+            self.commands += commands
+            self.round_trips += 1
+
+    @contextlib.contextmanager
+    def install(self) -> Iterator["RedisCommandCounter"]:
+        counter = self
+        execute_command = Redis.execute_command
+        pipeline_execute = Pipeline.execute
+
+        def counted_execute_command(self, *args, **options):
+            if not isinstance(self, Pipeline):
+                counter._add(1)
+            return execute_command(self, *args, **options)
+
+        def counted_pipeline_execute(self, *args, **kwargs):
+            counter._add(len(self.command_stack))
+            return pipeline_execute(self, *args, **kwargs)
+
+        Redis.execute_command = counted_execute_command
+        Pipeline.execute = counted_pipeline_execute
+        try:
+            yield self
+        finally:
+            Redis.execute_command = execute_command
+            Pipeline.execute = pipeline_execute
+
+
+def peak_rss_mb() -> float:
+    """
+    Return the peak resident set size of the process, in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
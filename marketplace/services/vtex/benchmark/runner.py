@@ -0,0 +1,335 @@
+"""
+Benchmark of the VTEX product sync.
+
+Runs SyncAllProductsUseCase, with the real DataProcessor, services and
+clients, against FakeVtexServer and the Redis and Postgres configured for the
+project. Products are saved as in production, but the upload to Meta is not
+started. The result can be saved as a JSON baseline and compared with later
+runs.
+"""
+import contextlib
+import json
+import logging
+import os
+import subprocess
+import time
+import uuid
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple
+
+from django.core.cache import cache
+
+from marketplace.accounts.models import User
+from marketplace.applications.models import App
+from marketplace.clients.base import RequestClient
+from marketplace.clients.vtex.client import VtexPrivateClient
+from marketplace.core.types.ecommerce.vtex.usecases.sync_all_products import (
+    SyncAllProductsUseCase,
+)
+from marketplace.services.vtex.benchmark.fake_server import (
+    FakeVtexConfig,
+    FakeVtexServer,
+    LatencyDistribution,
+    StubSessionPool,
+)
+from marketplace.services.vtex.benchmark.probes import (
+    QueryCounter,
+    RedisCommandCounter,
+    peak_rss_mb,
+)
+from marketplace.services.vtex.private.products.service import PrivateProductsService
+from marketplace.services.vtex.utils.data_processor import DataProcessor
+from marketplace.services.vtex.utils.pipeline_stats import PipelineStats
+from marketplace.wpp_products.models import Catalog, UploadProduct
+from marketplace.wpp_products.utils import UploadManager
+
+
+logger = logging.getLogger(__name__)
+
+
+# Metrics compared with the baseline and whether a higher value is better
+COMPARED_METRICS = {
+    "skus_per_sec": True,
+    "peak_rss_mb": False,
+    "redis_commands_per_sku": False,
+    "db_queries_per_sku": False,
+    "db_writes_per_sku": False,
+}
+
+
+@dataclass
+class BenchmarkScenario:
+    """
+    Store shape, VTEX behaviour and pipeline settings of a benchmark run.
+
+    Latencies use the `kind:a[:b]` format of LatencyDistribution.from_spec.
+    """
+
+    name: str = "default"
+    skus: int = 1000
+    sellers: int = 1
+    sales_channels: List[str] = field(default_factory=list)
+    rules: List[str] = field(default_factory=list)
+    workers: int = 20
+    batch_size: int = 1000
+    latency: str = "lognormal:0.05:0.5"
+    details_latency: Optional[str] = None
+    simulation_latency: Optional[str] = None
+    error_rate: float = 0.0
+    error_statuses: Tuple[int, ...] = (503,)
+    unavailable_ratio: float = 0.1
+    seed: int = 42
+
+    def server_config(self) -> FakeVtexConfig:
+        endpoint_latency = {}
+        if self.details_latency:
+            endpoint_latency["details"] = LatencyDistribution.from_spec(
+                self.details_latency
+            )
+        if self.simulation_latency:
+            endpoint_latency["simulation"] = LatencyDistribution.from_spec(
+                self.simulation_latency
+            )
+        return FakeVtexConfig(
+            skus=self.skus,
+            sellers=self.sellers,
+            latency=LatencyDistribution.from_spec(self.latency),
+            endpoint_latency=endpoint_latency,
+            error_rate=self.error_rate,
+            error_statuses=tuple(self.error_statuses),
+            unavailable_ratio=self.unavailable_ratio,
+            seed=self.seed,
+        )
+
+
+class BenchmarkSyncUseCase(SyncAllProductsUseCase):
+    """
+    SyncAllProductsUseCase running with the worker count and batch size of
+    the scenario and reporting its stage timings to `stats`.
+    """
+
+    def __init__(
+        self,
+        products_service: PrivateProductsService,
+        scenario: BenchmarkScenario,
+        stats: PipelineStats,
+    ):
+        super().__init__(products_service)
+        self.scenario = scenario
+        self.stats = stats
+
+    def _build_data_processor(self, main_queue, temp_queue) -> DataProcessor:
+        return DataProcessor(
+            queue=main_queue,
+            temp_queue=temp_queue,
+            use_threads=True,
+            batch_size=self.scenario.batch_size,
+            max_workers=self.scenario.workers,
+            stats=self.stats,
+            track_progress=True,
+        )
+
+
+@dataclass
+class BenchmarkFixtures:
+    """
+    Apps and catalog a benchmark run writes to, removed after the run.
+    """
+
+    user: User
+    vtex_app: App
+    wpp_app: App
+    catalog: Catalog
+
+    @classmethod
+    def create(cls, run_id: str, scenario: BenchmarkScenario, domain: str):
+        user = User.objects.create_user(email=f"benchmark-{run_id}@weni.ai")
+        project_uuid = str(uuid.uuid4())
+        vtex_app = App.objects.create(
+            code="vtex",
+            project_uuid=project_uuid,
+            platform=App.PLATFORM_VTEX,
+            configured=True,
+            created_by=user,
+            config={
+                "rules": scenario.rules,
+                "store_domain": domain,
+                "use_sku_sellers": False,
+            },
+        )
+        wpp_app = App.objects.create(
+            code="wpp-cloud",
+            project_uuid=project_uuid,
+            platform=App.PLATFORM_WENI_FLOWS,
+            created_by=user,
+        )
+        catalog = Catalog.objects.create(
+            app=wpp_app,
+            vtex_app=vtex_app,
+            facebook_catalog_id=f"benchmark-{run_id}",
+            name=f"Benchmark {scenario.name}",
+        )
+        return cls(user=user, vtex_app=vtex_app, wpp_app=wpp_app, catalog=catalog)
+
+    def delete(self) -> None:
+        UploadProduct.objects.filter(catalog=self.catalog).delete()
+        self.catalog.delete()
+        self.wpp_app.delete()
+        self.vtex_app.delete()
+        self.user.delete()
+
+
+class SyncBenchmark:
+    def __init__(self, scenario: BenchmarkScenario) -> None:
+        self.scenario = scenario
+
+    @contextlib.contextmanager
+    def _route_clients(self, session_pool: StubSessionPool) -> Iterator[None]:
+        """
+        Send the requests of every client to the fake server.
+        """
+        original_pool = RequestClient.session_pool
+        RequestClient.session_pool = session_pool
+        try:
+            yield
+        finally:
+            RequestClient.session_pool = original_pool
+
+    @contextlib.contextmanager
+    def _hold_uploads(self) -> Iterator[List[str]]:
+        """
+        Record the uploads the sync asks for instead of starting them.
+        """
+        requested: List[str] = []
+        original = UploadManager.__dict__["check_and_start_upload"]
+
+        def check_and_start_upload(app_uuid, priority=0):
+            requested.append(str(app_uuid))
+
+        UploadManager.check_and_start_upload = staticmethod(check_and_start_upload)
+        try:
+            yield requested
+        finally:
+            UploadManager.check_and_start_upload = original
+
+    def run(self) -> dict:
+        scenario = self.scenario
+        run_id = uuid.uuid4().hex[:8]
+        domain = f"benchmark-{run_id}.vtexcommercestable.com.br"
+        stats = PipelineStats()
+        queries = QueryCounter()
+        redis_commands = RedisCommandCounter()
+
+        with FakeVtexServer(scenario.server_config()) as server:
+            session_pool = StubSessionPool(
+                server.url, pool_maxsize=max(scenario.workers * 2, 10)
+            )
+            fixtures = BenchmarkFixtures.create(run_id, scenario, domain)
+            service = PrivateProductsService(
+                VtexPrivateClient(app_key="benchmark", app_token="benchmark")
+            )
+            use_case = BenchmarkSyncUseCase(service, scenario, stats)
+            rss_before = peak_rss_mb()
+            try:
+                with self._route_clients(session_pool), self._hold_uploads() as uploads:
+                    with queries.install(), redis_commands.install():
+                        started_at = time.perf_counter()
+                        use_case.execute(
+                            domain=domain,
+                            catalog=fixtures.catalog,
+                            sync_all_sellers=True,
+                            sales_channel=scenario.sales_channels or None,
+                        )
+                        elapsed = time.perf_counter() - started_at
+                saved = UploadProduct.objects.filter(catalog=fixtures.catalog).count()
+            finally:
+                sales_channel = (
+                    scenario.sales_channels[0] if scenario.sales_channels else "all"
+                )
+                cache.delete(f"active_products_{domain}_{sales_channel}")
+                fixtures.delete()
+                session_pool.close()
+            server_stats = server.stats()
+
+        skus = max(scenario.skus, 1)
+        rss_peak = peak_rss_mb()
+        return {
+            "scenario": asdict(scenario),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "elapsed": round(elapsed, 3),
+            "skus_per_sec": round(scenario.skus / elapsed, 2) if elapsed else 0.0,
+            "peak_rss_mb": round(rss_peak, 1),
+            "rss_growth_mb": round(rss_peak - rss_before, 1),
+            "redis_commands": redis_commands.commands,
+            "redis_round_trips": redis_commands.round_trips,
+            "redis_commands_per_sku": round(redis_commands.commands / skus, 3),
+            "db_queries": queries.queries,
+            "db_queries_per_sku": round(queries.queries / skus, 3),
+            "db_writes_per_sku": round(queries.writes / skus, 3),
+            "db_rows_written": queries.rows_written,
+            "products_saved": saved,
+            "uploads_requested": len(uploads),
+            "vtex": server_stats,
+            "pipeline": stats.summary(),
+        }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def save_result(result: dict, path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(result, file, indent=2, sort_keys=True)
+
+
+def load_result(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare_with_baseline(result: dict, baseline: dict, tolerance: float = 0.1):
+    """
+    Compare a run with a baseline.
+
+    Args:
+        result: The current run.
+        baseline: A run saved earlier.
+        tolerance: Relative change accepted before a metric counts as a regression.
+
+    Returns:
+        A list of dicts with the metric, both values, the relative change and
+        whether it is a regression.
+    """
+    comparison = []
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        current, previous = result.get(metric), baseline.get(metric)
+        if current is None or previous is None:
+            continue
+        change = (current - previous) / previous if previous else 0.0
+        worse = -change if higher_is_better else change
+        comparison.append(
+            {
+                "metric": metric,
+                "baseline": previous,
+                "current": current,
+                "change": round(change, 4),
+                "regression": worse > tolerance,
+            }
+        )
+    return comparison
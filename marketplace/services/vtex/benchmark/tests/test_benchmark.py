@@ -0,0 +1,153 @@
+import random
+
+import redis
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from marketplace.clients.vtex.client import VtexPrivateClient
+from marketplace.services.vtex.benchmark.fake_server import (
+    FakeVtexConfig,
+    FakeVtexServer,
+    LatencyDistribution,
+    StubSessionPool,
+)
+from marketplace.services.vtex.benchmark.probes import (
+    QueryCounter,
+    RedisCommandCounter,
+)
+from marketplace.services.vtex.benchmark.runner import (
+    BenchmarkScenario,
+    compare_with_baseline,
+)
+from marketplace.clients.exceptions import CustomAPIException
+from marketplace.clients.retry import RetryPolicy
+
+
+DOMAIN = "store.vtexcommercestable.com.br"
+
+
+class TestLatencyDistribution(TestCase):
+    def test_from_spec(self):
+        latency = LatencyDistribution.from_spec("uniform:0.01:0.05")
+
+        self.assertEqual(latency, LatencyDistribution("uniform", 0.01, 0.05))
+        value = latency.sample(random.Random(1))
+        self.assertTrue(0.01 <= value <= 0.05)
+
+    def test_lognormal_median(self):
+        latency = LatencyDistribution.from_spec("lognormal:0.1:0.5")
+        rng = random.Random(1)
+        samples = sorted(latency.sample(rng) for _ in range(2001))
+
+        self.assertAlmostEqual(samples[1000], 0.1, delta=0.01)
+
+    def test_invalid_spec(self):
+        with self.assertRaises(ValueError):
+            LatencyDistribution.from_spec("gaussian:1")
+
+    def test_scenario_builds_server_config(self):
+        scenario = BenchmarkScenario(
+            skus=10, sellers=3, latency="fixed:0", details_latency="fixed:0.2"
+        )
+
+        config = scenario.server_config()
+
+        self.assertEqual(config.seller_ids, ["1", "seller2", "seller3"])
+        self.assertEqual(config.endpoint_latency["details"].a, 0.2)
+
+
+class TestFakeVtexServer(TestCase):
+    def setUp(self):
+        self.server = FakeVtexServer(
+            FakeVtexConfig(skus=5, sellers=2), isolated=False
+        ).start()
+        self.addCleanup(self.server.stop)
+        self.pool = StubSessionPool(self.server.url)
+        self.addCleanup(self.pool.close)
+        self.client = VtexPrivateClient(app_key="key", app_token="token")
+        self.client.session_pool = self.pool
+
+    def test_serves_the_sync_endpoints(self):
+        self.assertEqual(
+            self.client.list_all_products_sku_ids(DOMAIN, page_size=2), [1, 2, 3, 4, 5]
+        )
+        self.assertEqual(self.client.list_active_sellers(DOMAIN), ["1", "seller2"])
+        self.assertEqual(self.client.get_product_details("3", DOMAIN)["Id"], 3)
+
+        simulation = self.client.simulate_cart_for_multiple_sellers(
+            "3", ["1", "seller2"], DOMAIN, "2"
+        )
+
+        self.assertEqual(set(simulation), {"1", "seller2"})
+        self.assertEqual(self.server.stats()["requests"]["details"], 1)
+
+    def test_isolated_server(self):
+        server = FakeVtexServer(FakeVtexConfig(skus=5)).start()
+        self.addCleanup(server.stop)
+        self.client.session_pool = StubSessionPool(server.url)
+        self.addCleanup(self.client.session_pool.close)
+
+        self.assertEqual(self.client.get_product_details("2", DOMAIN)["Id"], 2)
+        self.assertEqual(server.stats()["requests"], {"details": 1})
+
+    def test_injects_errors(self):
+        self.server.config.error_rate = 1.0
+        self.client.retry_policy = RetryPolicy(max_attempts=1)
+
+        with self.assertRaises(CustomAPIException) as context:
+            self.client.make_request(
+                f"https://{DOMAIN}/api/catalog_system/pvt/sku/stockkeepingunitbyid/1",
+                method="GET",
+                ignore_error_logs=True,
+            )
+
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(self.server.stats()["errors"]["details"], 1)
+
+
+class TestProbes(TransactionTestCase):
+    def test_query_counter_counts_reads_and_writes(self):
+        counter = QueryCounter()
+
+        with counter.install():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.execute("CREATE TEMPORARY TABLE bench_probe (id int)")
+                cursor.execute("INSERT INTO bench_probe VALUES (1), (2)")
+
+        self.assertEqual(counter.queries, 3)
+        self.assertEqual(counter.writes, 1)
+        self.assertEqual(counter.rows_written, 2)
+        self.assertEqual(counter.rows_by_table, {"bench_probe": 2})
+        self.assertNotIn(counter, connection.execute_wrappers)
+
+    def test_redis_command_counter(self):
+        client = redis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.1)
+        counter = RedisCommandCounter()
+
+        with counter.install():
+            with self.assertRaises(redis.exceptions.ConnectionError):
+                client.get("key")
+            pipeline = client.pipeline(transaction=False)
+            pipeline.get("a")
+            pipeline.get("b")
+            with self.assertRaises(redis.exceptions.ConnectionError):
+                pipeline.execute()
+
+        self.assertEqual(counter.commands, 3)
+        self.assertEqual(counter.round_trips, 2)
+
+
+class TestCompareWithBaseline(TestCase):
+    def test_flags_regressions_beyond_tolerance(self):
+        baseline = {"skus_per_sec": 100.0, "db_queries_per_sku": 2.0}
+        result = {"skus_per_sec": 85.0, "db_queries_per_sku": 2.1}
+
+        comparison = {
+            row["metric"]: row for row in compare_with_baseline(result, baseline, 0.1)
+        }
+
+        self.assertTrue(comparison["skus_per_sec"]["regression"])
+        self.assertFalse(comparison["db_queries_per_sku"]["regression"])
+        self.assertEqual(comparison["skus_per_sec"]["change"], -0.15)
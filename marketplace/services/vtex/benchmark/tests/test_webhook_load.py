@@ -0,0 +1,148 @@
+import threading
+import time
+
+from unittest.mock import MagicMock
+
+from django.test import TestCase
+
+from marketplace.clients.facebook.client import FacebookClient
+from marketplace.clients.vtex.client import VtexPrivateClient
+from marketplace.services.vtex.benchmark.fake_server import (
+    FakeMetaServer,
+    FakeVtexConfig,
+    FakeVtexServer,
+    StubSessionPool,
+)
+from marketplace.services.vtex.benchmark.webhook_load import (
+    NotificationTimeline,
+    WebhookLoadScenario,
+    distribution,
+)
+from marketplace.services.vtex.benchmark.workers import InProcessWorkers
+
+
+class TestFakeMetaServer(TestCase):
+    def setUp(self):
+        self.vtex = FakeVtexServer(FakeVtexConfig(skus=5), isolated=False).start()
+        self.addCleanup(self.vtex.stop)
+        self.meta = FakeMetaServer(isolated=False).start()
+        self.addCleanup(self.meta.stop)
+        self.pool = StubSessionPool(
+            self.vtex.url, routes={"graph.facebook.com": self.meta.url}
+        )
+        self.addCleanup(self.pool.close)
+
+    def test_routes_hosts_to_their_server(self):
+        facebook = FacebookClient("token")
+        facebook.session_pool = self.pool
+        vtex = VtexPrivateClient(app_key="key", app_token="token")
+        vtex.session_pool = self.pool
+
+        response = facebook.upload_items_batch(
+            "catalog-id",
+            {
+                "item_type": "PRODUCT_ITEM",
+                "requests": [
+                    {"method": "UPDATE", "data": {"id": "1#1"}},
+                    {"method": "UPDATE", "data": {"id": "2#1"}},
+                ],
+            },
+        )
+        vtex.get_product_details("3", "store.vtexcommercestable.com.br")
+
+        self.assertTrue(response["handles"])
+        stats = self.meta.stats()
+        self.assertEqual(stats["items"], 2)
+        self.assertEqual(set(stats["first_accepted"]), {"1#1", "2#1"})
+        self.assertEqual(self.vtex.stats()["requests"], {"details": 1})
+
+
+class FakeCeleryApp:
+    def __init__(self):
+        self.tasks = {}
+
+    def send_task(self, name, **options):
+        raise AssertionError(f"{name} was sent to the broker")
+
+
+class TestInProcessWorkers(TestCase):
+    def setUp(self):
+        self.celery_app = FakeCeleryApp()
+        self.calls = []
+        self.celery_app.tasks = {
+            "first": lambda **kwargs: self.calls.append(("first", kwargs))
+            or self.celery_app.send_task("second", kwargs={"n": 2}, countdown=0.05),
+            "second": lambda **kwargs: self.calls.append(("second", kwargs)),
+            "broken": MagicMock(side_effect=ValueError("boom")),
+        }
+        self.workers = InProcessWorkers(self.celery_app, concurrency=2)
+
+    def test_runs_tasks_sent_by_other_tasks(self):
+        with self.workers.install():
+            self.celery_app.send_task("first", kwargs={"n": 1}, queue="sync")
+
+            self.assertTrue(self.workers.wait_idle(timeout=5))
+
+        self.assertEqual(self.calls, [("first", {"n": 1}), ("second", {"n": 2})])
+        self.assertEqual(self.workers.sent, {"first": 1, "second": 1})
+        with self.assertRaises(AssertionError):
+            self.celery_app.send_task("first")
+
+    def test_honours_the_countdown(self):
+        started_at = time.perf_counter()
+        with self.workers.install():
+            self.celery_app.send_task("second", kwargs={}, countdown=0.1)
+            self.workers.wait_idle(timeout=5)
+
+        self.assertGreaterEqual(time.perf_counter() - started_at, 0.1)
+
+    def test_counts_failures(self):
+        with self.assertLogs("marketplace.services.vtex.benchmark.workers", "ERROR"):
+            with self.workers.install():
+                self.celery_app.send_task("broken")
+                self.workers.wait_idle(timeout=5)
+
+        self.assertEqual(self.workers.failed, {"broken": 1})
+
+    def test_wait_idle_times_out(self):
+        release = threading.Event()
+        self.celery_app.tasks["slow"] = lambda: release.wait(5)
+
+        with self.workers.install():
+            self.celery_app.send_task("slow")
+
+            self.assertFalse(self.workers.wait_idle(timeout=0.05))
+            release.set()
+
+
+class TestWebhookLoadReport(TestCase):
+    def test_notifications_are_reproducible(self):
+        scenario = WebhookLoadScenario(skus=50, sellers=2, bursts=2, burst_size=10)
+
+        bursts = scenario.notifications()
+
+        self.assertEqual(bursts, scenario.notifications())
+        self.assertEqual([len(burst) for burst in bursts], [10, 10])
+        self.assertTrue(
+            all(body["An"] in ("1", "seller2") for burst in bursts for body in burst)
+        )
+
+    def test_distribution(self):
+        result = distribution([float(value) for value in range(1, 101)], scale=1000)
+
+        self.assertEqual(result["count"], 100)
+        self.assertEqual(result["p50"], 50000.0)
+        self.assertEqual(result["p99"], 99000.0)
+        self.assertEqual(distribution([])["p99"], 0.0)
+
+    def test_timeline(self):
+        timeline = NotificationTimeline()
+        timeline.notified("1#10", at=100.0)
+        timeline.notified("1#10", at=101.0)
+        timeline.notified("1#11", at=102.0)
+
+        timeline.dequeued(["1#10", "1#11"], at=105.0)
+        times = timeline.times_to_meta({"10#1": 110.0, "12#1": 111.0, "x": 1.0})
+
+        self.assertEqual(sorted(timeline.queue_lags), [3.0, 5.0])
+        self.assertEqual(times, {"10": 10.0})
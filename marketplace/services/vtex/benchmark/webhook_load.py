@@ -0,0 +1,358 @@
+"""
+End to end load test of the VTEX webhook path.
+
+Bursts of product update notifications are posted to VtexProductUpdateWebhook
+and drained through task_dequeue_webhooks, task_update_webhook_batch_products
+and task_upload_vtex_products, run by in-process workers, up to a fake Meta
+`items_batch` endpoint. VTEX is served by FakeVtexServer and the configured
+Redis and Postgres are used as in production.
+
+The report gives the webhook response latency, the time items waited in the
+webhook queue, the time from the first notification of a SKU until Meta
+accepted it and the database writes per product delivered.
+"""
+import contextlib
+import logging
+import random
+import threading
+import time
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from marketplace.celery import app as celery_app
+from marketplace.clients.base import RequestClient
+from marketplace.services.vtex.benchmark.fake_server import (
+    FakeMetaConfig,
+    FakeMetaServer,
+    FakeVtexConfig,
+    FakeVtexServer,
+    LatencyDistribution,
+    StubSessionPool,
+)
+from marketplace.services.vtex.benchmark.probes import (
+    QueryCounter,
+    RedisCommandCounter,
+)
+from marketplace.services.vtex.benchmark.runner import BenchmarkFixtures, _git_commit
+from marketplace.services.vtex.benchmark.workers import InProcessWorkers
+from marketplace.webhooks.vtex.product_updates import VtexProductUpdateWebhook
+from marketplace.wpp_products.models import UploadProduct
+from marketplace.wpp_products.utils import RedisQueue, extract_sku_id
+
+
+logger = logging.getLogger(__name__)
+
+
+WEBHOOK_PATH = "/api/v1/webhook/vtex/{app_uuid}/products-update/api/notification/"
+
+
+@dataclass
+class WebhookLoadScenario:
+    """
+    Notification bursts, store shape and worker settings of a load test.
+
+    Latencies use the `kind:a[:b]` format of LatencyDistribution.from_spec.
+    """
+
+    name: str = "webhooks"
+    skus: int = 1000
+    sellers: int = 1
+    rules: List[str] = field(default_factory=list)
+    bursts: int = 5
+    burst_size: int = 200
+    burst_interval: float = 2.0
+    posters: int = 8
+    concurrency: int = 4
+    upload_delay: Optional[int] = None
+    vtex_latency: str = "lognormal:0.05:0.5"
+    meta_latency: str = "lognormal:0.3:0.4"
+    meta_error_rate: float = 0.0
+    drain_timeout: float = 600.0
+    seed: int = 42
+
+    def vtex_config(self) -> FakeVtexConfig:
+        return FakeVtexConfig(
+            skus=self.skus,
+            sellers=self.sellers,
+            latency=LatencyDistribution.from_spec(self.vtex_latency),
+            seed=self.seed,
+        )
+
+    def meta_config(self) -> FakeMetaConfig:
+        return FakeMetaConfig(
+            latency=LatencyDistribution.from_spec(self.meta_latency),
+            error_rate=self.meta_error_rate,
+            seed=self.seed,
+        )
+
+    def notifications(self) -> List[List[dict]]:
+        """
+        Return the bursts of notifications, as VTEX sends them.
+        """
+        rng = random.Random(self.seed)
+        seller_ids = self.vtex_config().seller_ids
+        return [
+            [
+                {
+                    "IdSku": str(rng.randint(1, self.skus)),
+                    "An": rng.choice(seller_ids),
+                    "IsActive": True,
+                    "StockModified": True,
+                    "PriceModified": rng.random() < 0.5,
+                }
+                for _ in range(self.burst_size)
+            ]
+            for _ in range(self.bursts)
+        ]
+
+
+def distribution(values: Iterable[float], scale: float = 1.0) -> dict:
+    """
+    Return the count, p50, p95, p99 and max of `values`, multiplied by `scale`.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    def percentile(percent: float) -> float:
+        index = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+        return round(ordered[min(index, len(ordered) - 1)] * scale, 3)
+
+    return {
+        "count": len(ordered),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": round(ordered[-1] * scale, 3),
+    }
+
+
+class NotificationTimeline:
+    """
+    Times at which the items of the webhook queue were notified and dequeued.
+
+    An item ("seller#sku") keeps the time of its earliest notification not
+    yet dequeued, matching the queue, which ignores items already in it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waiting: Dict[str, float] = {}
+        self.first_notified: Dict[str, float] = {}
+        self.queue_lags: List[float] = []
+
+    def notified(self, item: str, at: float) -> None:
+        sku_id = item.split("#", 1)[1]
+        with self._lock:
+            self._waiting.setdefault(item, at)
+            self.first_notified.setdefault(sku_id, at)
+
+    def dequeued(self, items: List[str], at: float) -> None:
+        with self._lock:
+            for item in items:
+                notified_at = self._waiting.pop(item, None)
+                if notified_at is not None:
+                    self.queue_lags.append(at - notified_at)
+
+    def times_to_meta(self, first_accepted: Dict[str, float]) -> Dict[str, float]:
+        """
+        Return, per SKU, the time from its first notification until Meta
+        first accepted one of its products.
+        """
+        accepted_by_sku: Dict[str, float] = {}
+        for retailer_id, accepted_at in first_accepted.items():
+            try:
+                sku_id = str(extract_sku_id(retailer_id))
+            except ValueError:
+                continue
+            current = accepted_by_sku.get(sku_id)
+            accepted_by_sku[sku_id] = min(current or accepted_at, accepted_at)
+        return {
+            sku_id: accepted_by_sku[sku_id] - notified_at
+            for sku_id, notified_at in self.first_notified.items()
+            if sku_id in accepted_by_sku
+        }
+
+
+class WebhookLoadTest:
+    def __init__(self, scenario: WebhookLoadScenario) -> None:
+        self.scenario = scenario
+        self.timeline = NotificationTimeline()
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _route_clients(self, session_pool: StubSessionPool) -> Iterator[None]:
+        original_pool = RequestClient.session_pool
+        RequestClient.session_pool = session_pool
+        try:
+            yield
+        finally:
+            RequestClient.session_pool = original_pool
+
+    @contextlib.contextmanager
+    def _watch_queue(self) -> Iterator[None]:
+        """
+        Record when items leave the webhook queue.
+        """
+        timeline = self.timeline
+        get_batch = RedisQueue.get_batch
+
+        def timed_get_batch(queue, batch_size):
+            batch = get_batch(queue, batch_size)
+            timeline.dequeued(batch, time.time())
+            return batch
+
+        RedisQueue.get_batch = timed_get_batch
+        try:
+            yield
+        finally:
+            RedisQueue.get_batch = get_batch
+
+    def _post(self, view, factory: APIRequestFactory, app_uuid: str, body: dict):
+        request = factory.post(
+            WEBHOOK_PATH.format(app_uuid=app_uuid), body, format="json"
+        )
+        notified_at = time.time()
+        started_at = time.perf_counter()
+        try:
+            response = view(request, app_uuid=app_uuid)
+        finally:
+            # As Django does when a request finishes
+            close_old_connections()
+        latency = time.perf_counter() - started_at
+        if response.status_code == 200:
+            self.timeline.notified(f"{body['An']}#{body['IdSku']}", notified_at)
+        with self._lock:
+            self.latencies.append(latency)
+            self.statuses[response.status_code] = (
+                self.statuses.get(response.status_code, 0) + 1
+            )
+
+    def _send_bursts(self, app_uuid: str) -> None:
+        view = VtexProductUpdateWebhook.as_view()
+        factory = APIRequestFactory()
+        bursts = self.scenario.notifications()
+        with ThreadPoolExecutor(max_workers=self.scenario.posters) as posters:
+            for index, burst in enumerate(bursts):
+                burst_started_at = time.perf_counter()
+                list(
+                    posters.map(
+                        lambda body: self._post(view, factory, app_uuid, body), burst
+                    )
+                )
+                if index < len(bursts) - 1:
+                    elapsed = time.perf_counter() - burst_started_at
+                    time.sleep(max(self.scenario.burst_interval - elapsed, 0.0))
+
+    def _configure(self, fixtures: BenchmarkFixtures, domain: str) -> None:
+        fixtures.vtex_app.config.update(
+            {
+                "initial_sync_completed": True,
+                "api_credentials": {
+                    "domain": domain,
+                    "app_key": "load-test",
+                    "app_token": "load-test",
+                },
+            }
+        )
+        fixtures.vtex_app.save()
+
+    def run(self) -> dict:
+        scenario = self.scenario
+        run_id = uuid.uuid4().hex[:8]
+        domain = f"load-test-{run_id}.vtexcommercestable.com.br"
+        queries = QueryCounter()
+        redis_commands = RedisCommandCounter()
+        workers = InProcessWorkers(celery_app, concurrency=scenario.concurrency)
+        upload_delay = (
+            settings.META_UPLOAD_PRODUCT_DELAY_DEFAULT
+            if scenario.upload_delay is None
+            else scenario.upload_delay
+        )
+
+        with FakeVtexServer(scenario.vtex_config()) as vtex, FakeMetaServer(
+            scenario.meta_config()
+        ) as meta:
+            session_pool = StubSessionPool(
+                vtex.url,
+                pool_maxsize=max(scenario.concurrency * 4, 10),
+                routes={urlsplit(settings.WHATSAPP_API_URL).hostname: meta.url},
+            )
+            fixtures = BenchmarkFixtures.create(run_id, scenario, domain)
+            self._configure(fixtures, domain)
+            app_uuid = str(fixtures.vtex_app.uuid)
+            try:
+                with override_settings(
+                    META_UPLOAD_PRODUCT_DELAY_DEFAULT=upload_delay
+                ), self._route_clients(session_pool), self._watch_queue():
+                    with workers.install(), queries.install(), redis_commands.install():
+                        started_at = time.perf_counter()
+                        self._send_bursts(app_uuid)
+                        sent_in = time.perf_counter() - started_at
+                        drained = workers.wait_idle(scenario.drain_timeout)
+                        elapsed = time.perf_counter() - started_at
+                pending = (
+                    UploadProduct.objects.filter(catalog=fixtures.catalog)
+                    .exclude(status="success")
+                    .count()
+                )
+            finally:
+                cache.delete(f"app_cache_{app_uuid}")
+                fixtures.delete()
+                session_pool.close()
+            meta_stats = meta.stats()
+            vtex_stats = vtex.stats()
+
+        first_accepted = meta_stats.pop("first_accepted")
+        times_to_meta = self.timeline.times_to_meta(first_accepted)
+        delivered = max(len(first_accepted), 1)
+        webhooks = max(len(self.latencies), 1)
+        return {
+            "scenario": asdict(scenario),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "drained": drained,
+            "elapsed": round(elapsed, 3),
+            "send_duration": round(sent_in, 3),
+            "webhooks_sent": len(self.latencies),
+            "webhook_statuses": self.statuses,
+            "webhook_latency_ms": distribution(self.latencies, scale=1000),
+            "queue_lag_s": distribution(self.timeline.queue_lags),
+            "time_to_meta_s": distribution(times_to_meta.values()),
+            "skus_notified": len(self.timeline.first_notified),
+            "skus_delivered": len(times_to_meta),
+            "products_delivered": len(first_accepted),
+            "products_not_delivered": pending,
+            "tasks": {
+                name: {
+                    "sent": workers.sent.get(name, 0),
+                    "failed": workers.failed.get(name, 0),
+                    "lag_s": distribution(workers.lags.get(name, [])),
+                    "duration_s": distribution(workers.durations.get(name, [])),
+                }
+                for name in workers.sent
+            },
+            "db_queries": queries.queries,
+            "db_writes": queries.writes,
+            "db_rows_written": queries.rows_written,
+            "db_writes_per_product": round(queries.writes / delivered, 3),
+            "db_rows_written_per_product": round(queries.rows_written / delivered, 3),
+            "db_rows_written_by_table": queries.rows_by_table,
+            "redis_commands": redis_commands.commands,
+            "redis_commands_per_webhook": round(redis_commands.commands / webhooks, 3),
+            "meta": meta_stats,
+            "vtex": vtex_stats,
+        }
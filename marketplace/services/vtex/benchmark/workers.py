@@ -0,0 +1,141 @@
+"""
+In-process stand-in for the Celery workers.
+
+Tasks sent with `send_task` while InProcessWorkers is installed run on thread
+pools of the current process, one per queue, instead of going through the
+broker. Countdowns are honoured, so debounces and delays behave as in
+production, and the time each task waited before a worker picked it up is
+recorded.
+"""
+import contextlib
+import logging
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessWorkers:
+    """
+    Runs the tasks of a Celery app on local thread pools.
+
+    Args:
+        app: The Celery app whose `send_task` is replaced.
+        concurrency: Worker threads per queue.
+        queue_concurrency: Worker threads of specific queues.
+        countdown_scale: Factor applied to the countdown of the tasks, 0 to
+            run them as soon as they are sent.
+    """
+
+    DEFAULT_QUEUE = "celery"
+
+    def __init__(
+        self,
+        app,
+        concurrency: int = 4,
+        queue_concurrency: Optional[Dict[str, int]] = None,
+        countdown_scale: float = 1.0,
+    ) -> None:
+        self.app = app
+        self.concurrency = concurrency
+        self.queue_concurrency = queue_concurrency or {}
+        self.countdown_scale = countdown_scale
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._timers: List[threading.Timer] = []
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self.sent: Dict[str, int] = {}
+        self.failed: Dict[str, int] = {}
+        self.lags: Dict[str, List[float]] = {}
+        self.durations: Dict[str, List[float]] = {}
+
+    def _executor(self, queue: str) -> ThreadPoolExecutor:
+        with self._lock:
+            if queue not in self._executors:
+                self._executors[queue] = ThreadPoolExecutor(
+                    max_workers=self.queue_concurrency.get(queue, self.concurrency),
+                    thread_name_prefix=f"worker-{queue}",
+                )
+            return self._executors[queue]
+
+    def send_task(
+        self, name, args=None, kwargs=None, countdown=None, queue=None, **options
+    ) -> None:
+        if name not in self.app.tasks:
+            raise KeyError(f"Task {name} is not registered")
+        delay = (countdown or 0) * self.countdown_scale
+        queue = queue or self.DEFAULT_QUEUE
+        due_at = time.perf_counter() + delay
+        with self._lock:
+            self._in_flight += 1
+            self.sent[name] = self.sent.get(name, 0) + 1
+
+        def submit() -> None:
+            self._executor(queue).submit(
+                self._run, name, tuple(args or ()), dict(kwargs or {}), due_at
+            )
+
+        if delay > 0:
+            timer = threading.Timer(delay, submit)
+            timer.daemon = True
+            with self._lock:
+                self._timers.append(timer)
+            timer.start()
+        else:
+            submit()
+
+    def _run(self, name: str, args: tuple, kwargs: dict, due_at: float) -> None:
+        started_at = time.perf_counter()
+        try:
+            self.app.tasks[name](*args, **kwargs)
+        except Exception as e:
+            logger.error(f"In-process task {name} failed: {e}", exc_info=True)
+            with self._lock:
+                self.failed[name] = self.failed.get(name, 0) + 1
+        finally:
+            # Worker threads open their own connections, which a real worker
+            # would close at the end of the task
+            connections.close_all()
+            finished_at = time.perf_counter()
+            with self._idle:
+                self.lags.setdefault(name, []).append(max(started_at - due_at, 0.0))
+                self.durations.setdefault(name, []).append(finished_at - started_at)
+                self._in_flight -= 1
+                self._idle.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every task sent, including the ones sent by other tasks,
+        has finished. Returns False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    @contextlib.contextmanager
+    def install(self) -> Iterator["InProcessWorkers"]:
+        original = self.app.__dict__.get("send_task")
+        self.app.send_task = self.send_task
+        try:
+            yield self
+        finally:
+            if original is None:
+                del self.app.send_task
+            else:
+                self.app.send_task = original
+            for timer in self._timers:
+                timer.cancel()
+            for executor in self._executors.values():
+                executor.shutdown(wait=True)
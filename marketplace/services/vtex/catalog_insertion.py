@@ -2,6 +2,8 @@ import logging
 
 from typing import Optional, List
 
+from django.conf import settings
+
 from marketplace.applications.models import App
 from marketplace.wpp_products.models import Catalog
 
@@ -109,10 +111,10 @@ class CatalogProductInsertion:
         sellers: Optional[List[str]] = None,
         sales_channel: Optional[list[str]] = None,
     ) -> None:
-        from marketplace.celery import app as celery_app
+        from marketplace.services.vtex.utils.fair_share import send_sync_task
 
-        celery_app.send_task(
-            name="task_insert_vtex_products",
+        send_sync_task(
+            "task_insert_vtex_products",
             kwargs={
                 "credentials": credentials,
                 "catalog_uuid": str(catalog.uuid),
@@ -120,6 +122,8 @@ class CatalogProductInsertion:
                 "sales_channel": sales_channel,
             },
             queue="product_first_synchronization",
+            app_uuid=(catalog.vtex_app or catalog.app).uuid,
+            cost=settings.VTEX_FAIR_SHARE_FULL_SYNC_COST,
         )
         logger.info(f"Catalog: {catalog.name} sent to task_insert_vtex_products")
 
@@ -227,10 +231,10 @@ class CatalogInsertionBySeller:  # pragma: no cover
         sellers: Optional[List[str]] = None,
         sync_all_sellers: bool = False,
     ) -> None:
-        from marketplace.celery import app as celery_app
+        from marketplace.services.vtex.utils.fair_share import send_sync_task
 
-        celery_app.send_task(
-            name="task_insert_vtex_products_by_sellers",
+        send_sync_task(
+            "task_insert_vtex_products_by_sellers",
             kwargs={
                 "credentials": credentials,
                 "catalog_uuid": str(catalog.uuid),
@@ -238,6 +242,8 @@ class CatalogInsertionBySeller:  # pragma: no cover
                 "sync_all_sellers": sync_all_sellers,
             },
             queue="product_first_synchronization",
+            app_uuid=(catalog.vtex_app or catalog.app).uuid,
+            cost=settings.VTEX_FAIR_SHARE_FULL_SYNC_COST,
         )
         logger.info(
             f"Catalog: {catalog.name} sent to task_insert_vtex_products_by_sellers"
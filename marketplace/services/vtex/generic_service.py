@@ -35,6 +35,7 @@ from marketplace.services.vtex.catalog_insertion import (  # noqa: F401
     CatalogInsertionBySeller,
 )
 from marketplace.services.vtex.utils.enums import ProductPriority
+from marketplace.services.vtex.utils.sync_deadline import SyncDeadline
 
 
 logger = logging.getLogger(__name__)
@@ -204,6 +205,7 @@ class ProductUpdateService(VtexServiceBase):
         sellers_skus: list[str] = None,
         priority: int = ProductPriority.DEFAULT,
         sales_channel: Optional[list[str]] = None,
+        deadline: Optional[SyncDeadline] = None,
     ):
         """
         Args:
@@ -215,6 +217,7 @@ class ProductUpdateService(VtexServiceBase):
             sellers_skus (list[str], optional): List of seller#sku identifiers.
             priority (int): Type of synchronization (0=legacy, 1=async, 2=inline).
             sales_channel (list[str], optional): Sales channel.
+            deadline (SyncDeadline, optional): Latency budget of an inline sync.
         """
         super().__init__()
         self.api_credentials = api_credentials
@@ -227,6 +230,7 @@ class ProductUpdateService(VtexServiceBase):
         self.product_manager = ProductFacebookManager()
         self.priority = priority
         self.sales_channel = sales_channel
+        self.deadline = deadline
 
     def process_batch_sync(self):
         """
@@ -256,6 +260,7 @@ class ProductUpdateService(VtexServiceBase):
                 catalog=self.catalog,
                 priority=self.priority,
                 sales_channel=self.sales_channel,
+                deadline=self.deadline,
             )
             if self.priority == ProductPriority.API_ONLY:
                 # For inline/API_ONLY, return the processed list (may be empty)
@@ -276,9 +281,7 @@ class ProductUpdateService(VtexServiceBase):
         if seller_id:
             return [seller_id]
 
-        all_active_sellers = service.list_all_actives_sellers(
-            self.api_credentials.domain
-        )
+        all_active_sellers = service.list_active_sellers(self.api_credentials.domain)
         print("Seller not found, return all actives sellers")
         return all_active_sellers
 
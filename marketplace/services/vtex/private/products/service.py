@@ -10,10 +10,12 @@ Attributes:
 Public Methods:
     check_is_valid_domain(domain): Validates if a domain is recognized by VTEX.
     validate_private_credentials(domain): Checks if stored credentials for a domain are valid.
-    list_active_sellers(domain): Lists all active sellers for a domain.
+    list_active_sellers(domain): Lists all active sellers for a domain, cached in the
+        active seller registry.
     list_all_skus_ids(domain): Lists all SKU IDs from a domain with caching.
     get_product_specification(product_id, domain): Retrieves specifications for a product.
-    get_product_details(sku_id, domain): Retrieves details for a specific SKU.
+    get_product_details(sku_id, domain): Retrieves details for a specific SKU, shared through
+        a short-lived in-process cache.
     simulate_cart_for_seller(sku_id, seller_id, domain): Simulates a cart for a seller and SKU.
     simulate_cart_for_multiple_sellers(sku_id, sellers, domain): Simulates cart for multiple sellers.
 
@@ -39,14 +41,22 @@ from django.core.cache import cache
 
 from marketplace.services.vtex.exceptions import CredentialsValidationError
 from marketplace.services.vtex.business.rules.rule_mappings import RULE_MAPPINGS
+from marketplace.services.vtex.utils.product_details_cache import (
+    ProductDetailsCache,
+    product_details_cache,
+)
+from marketplace.services.vtex.utils.seller_registry import ActiveSellerRegistry
 
 
 logger = logging.getLogger(__name__)
 
 
 class PrivateProductsService:
-    def __init__(self, client: Any) -> None:
+    def __init__(
+        self, client: Any, details_cache: Optional[ProductDetailsCache] = None
+    ) -> None:
         self.client = client
+        self.details_cache = details_cache or product_details_cache
 
     def check_is_valid_domain(self, domain: str) -> bool:
         if not self._is_domain_valid(domain):
@@ -60,7 +70,10 @@ class PrivateProductsService:
     def list_active_sellers(
         self, domain: str, sales_channel: Optional[str] = None
     ) -> List[str]:
-        return self.client.list_active_sellers(domain, sales_channel)
+        registry = ActiveSellerRegistry(domain, sales_channel)
+        return sorted(
+            registry.get(lambda: self.client.list_active_sellers(domain, sales_channel))
+        )
 
     def list_all_skus_ids(
         self, domain: str, sales_channel: Optional[str] = None
@@ -85,8 +98,22 @@ class PrivateProductsService:
     def get_product_specification(self, product_id: str, domain: str) -> Dict[str, Any]:
         return self.client.get_product_specification(product_id, domain)
 
-    def get_product_details(self, sku_id: str, domain: str) -> Dict[str, Any]:
-        return self.client.get_product_details(sku_id, domain)
+    def get_product_details(
+        self, sku_id: str, domain: str, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Retrieve SKU details through the process-wide details cache.
+
+        Concurrent requests for the same domain and SKU share a single VTEX call.
+        With `use_cache` off the details are always fetched from VTEX, for the
+        syncs reacting to a change of the SKU.
+        """
+        if not use_cache:
+            return self.client.get_product_details(sku_id, domain)
+        return self.details_cache.get_or_load(
+            (domain, str(sku_id)),
+            lambda: self.client.get_product_details(sku_id, domain),
+        )
 
     def simulate_cart_for_seller(
         self,
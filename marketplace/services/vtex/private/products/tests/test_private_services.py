@@ -6,6 +6,7 @@ from marketplace.services.vtex.business.rules.exclude_alcoholic_drinks import (
 )
 from marketplace.services.vtex.exceptions import CredentialsValidationError
 from marketplace.services.vtex.private.products.service import PrivateProductsService
+from marketplace.services.vtex.utils.product_details_cache import ProductDetailsCache
 
 
 class MockClient:
@@ -112,6 +113,34 @@ class PrivateProductsServiceTestCase(TestCase):
         details = self.service.get_product_details("sku1", "valid.domain.com")
         self.assertEqual(details, {"sku_id": "sku1", "domain": "valid.domain.com"})
 
+    def test_get_product_details_uses_details_cache(self):
+        client = Mock()
+        client.get_product_details.return_value = {"Id": "sku1"}
+        service = PrivateProductsService(
+            client, details_cache=ProductDetailsCache(max_size=10, ttl=30)
+        )
+
+        service.get_product_details("sku1", "valid.domain.com")
+        details = service.get_product_details("sku1", "valid.domain.com")
+
+        self.assertEqual(details, {"Id": "sku1"})
+        client.get_product_details.assert_called_once_with("sku1", "valid.domain.com")
+
+    def test_get_product_details_without_cache_always_calls_vtex(self):
+        client = Mock()
+        client.get_product_details.side_effect = [{"Id": "sku1"}, {"Id": "sku1 v2"}]
+        service = PrivateProductsService(
+            client, details_cache=ProductDetailsCache(max_size=10, ttl=30)
+        )
+
+        service.get_product_details("sku1", "valid.domain.com")
+        details = service.get_product_details(
+            "sku1", "valid.domain.com", use_cache=False
+        )
+
+        self.assertEqual(details, {"Id": "sku1 v2"})
+        self.assertEqual(client.get_product_details.call_count, 2)
+
     def test_simulate_cart_for_seller(self):
         cart = self.service.simulate_cart_for_seller(
             "sku1", "seller1", "valid.domain.com"
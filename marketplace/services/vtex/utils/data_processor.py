@@ -1,11 +1,15 @@
 import threading
 import re
 import concurrent.futures
+import json
+import time
 
 import logging
+from contextlib import nullcontext
+from django.conf import settings
 from django.db import close_old_connections
 from tqdm import tqdm
-from typing import List, Optional, Union
+from typing import Any, Callable, List, Optional, Tuple, Union
 
 from queue import Queue
 
@@ -13,8 +17,19 @@ from queue import Queue
 from marketplace.interfaces.redis.interfaces import AbstractQueue
 from marketplace.services.product.product_facebook_manage import ProductFacebookManager
 from marketplace.services.vtex.utils.facebook_product_dto import FacebookProductDTO
+from marketplace.services.vtex.utils.pipeline_stats import PipelineStats
+from marketplace.services.vtex.utils.priority_lane import PriorityLane
 from marketplace.services.vtex.utils.redis_queue_manager import TempRedisQueueManager
+from marketplace.services.vtex.utils.results_sink import ResultsSink
+from marketplace.services.vtex.utils.product_mirror import ProductMirror
 from marketplace.services.vtex.utils.sku_validator import SKUValidator
+from marketplace.services.vtex.utils.sync_deadline import SyncDeadline
+from marketplace.services.vtex.utils.sync_progress import SyncProgress
+from marketplace.services.vtex.utils.webhook_items import (
+    CHANGE_PRICE_STOCK,
+    drop_superseded_items,
+    parse_webhook_item,
+)
 from marketplace.clients.exceptions import CustomAPIException
 from marketplace.clients.zeroshot.client import MockZeroShotClient
 from marketplace.wpp_products.utils import UploadManager
@@ -313,6 +328,9 @@ class ProductProcessor:
         update_product: bool = False,
         sync_specific_sellers: bool = False,
         sales_channel: list[str] = None,
+        stats: Optional[PipelineStats] = None,
+        mirror: Optional[ProductMirror] = None,
+        cache_details: bool = True,
     ):
         """
         Initialize the product processor
@@ -326,6 +344,9 @@ class ProductProcessor:
             update_product: Whether to update existing products
             sync_specific_sellers: Whether this is a seller-specific sync
             sales_channel: VTEX sales channel identifier
+            stats: PipelineStats collecting the stage timings of the run
+            mirror: ProductMirror the product details are read from or written to
+            cache_details: Whether the product details may be served by the details cache
         """
         self.catalog = catalog
         self.domain = domain
@@ -334,15 +355,53 @@ class ProductProcessor:
         self.validator = validator
         self.update_product = update_product
         self.sync_specific_sellers = sync_specific_sellers
+        self.stats = stats or PipelineStats()
         # Injection of SKUValidator (can also be injected)
         self.validator_service = SKUValidator(service, domain, MockZeroShotClient())
+        # Lets the validator time the product details fetch on its own
+        self.validator_service.stats = self.stats
+        self.validator_service.mirror = mirror
+        self.validator_service.cache_details = cache_details
         self.use_sku_sellers = getattr(catalog.vtex_app, "config", {}).get(
             "use_sku_sellers", False
         )
         self.sales_channel = sales_channel
 
+    @staticmethod
+    def _simulate_channels(
+        simulate: Callable[[Optional[str]], Any], channels: List[Optional[str]]
+    ) -> List[Tuple[Optional[str], Any]]:
+        """
+        Run one cart simulation per sales channel and pair each result with its channel.
+
+        VTEX takes the sales channel as a query parameter of the simulation endpoint,
+        so channels cannot be folded into a single request. When more than one channel
+        is configured, the simulations for the SKU are issued concurrently so that the
+        SKU latency does not grow with the number of channels.
+
+        Args:
+            simulate: Callable receiving a channel and returning its simulation result.
+            channels: Sales channels to simulate, in the order results are expected.
+
+        Returns:
+            List of (channel, result) tuples in the same order as `channels`.
+
+        Raises:
+            Any exception raised by a simulation, in channel order.
+        """
+        if len(channels) <= 1:
+            return [(channel, simulate(channel)) for channel in channels]
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(channels)
+        ) as executor:
+            futures = [executor.submit(simulate, channel) for channel in channels]
+            return [
+                (channel, future.result()) for channel, future in zip(channels, futures)
+            ]
+
     def process_seller_sku(
-        self, seller_id: str, sku_id: str
+        self, seller_id: str, sku_id: str, price_stock_only: bool = False
     ) -> List[FacebookProductDTO]:
         """
         Process a single SKU for a specific seller.
@@ -351,12 +410,16 @@ class ProductProcessor:
         validate DTO structure, and apply business rules (including ID unification).
 
         Note:
-            Reads `self.sales_channel` (Optional[List[str]]). If set, iterates once per channel;
-            otherwise runs with channel=None.
+            Reads `self.sales_channel` (Optional[List[str]]). If set, simulates once per channel,
+            concurrently when there is more than one; otherwise runs with channel=None.
 
         Args:
             seller_id (str): VTEX seller identifier to process.
             sku_id (str): VTEX SKU identifier to process.
+            price_stock_only (bool): Only the price or the stock of the SKU changed. The
+                details already known are reused, without calling VTEX or the AI
+                validation, and the DTOs are partial, carrying price and availability.
+                SKUs without known details are processed in full.
 
         Returns:
             List[FacebookProductDTO]: A list of processed product DTOs for each sales channel
@@ -380,9 +443,17 @@ class ProductProcessor:
 
         try:
             # Fetch product details; skip if inactive and not updating
-            product_details = self.validator_service.validate_product_details(
-                sku_id, self.catalog
-            )
+            with self.stats.stage("validation"):
+                product_details = None
+                if price_stock_only:
+                    product_details = self.validator_service.get_known_product_details(
+                        sku_id, self.catalog
+                    )
+                partial = product_details is not None
+                if not partial:
+                    product_details = self.validator_service.validate_product_details(
+                        sku_id, self.catalog
+                    )
             if not product_details or (
                 not product_details.get("IsActive") and not self.update_product
             ):
@@ -392,27 +463,38 @@ class ProductProcessor:
             # Determine sales channels to process (or [None] if not provided)
             channels = self.sales_channel or [None]
 
-            for channel in channels:
-                # Simulate cart for given seller and channel
-                availability = self.service.simulate_cart_for_seller(
-                    sku_id, seller_id, self.domain, channel
+            # Simulate cart for given seller on every channel concurrently
+            with self.stats.stage("simulation"):
+                simulations = self._simulate_channels(
+                    lambda channel: self.service.simulate_cart_for_seller(
+                        sku_id, seller_id, self.domain, channel
+                    ),
+                    channels,
                 )
+
+            for channel, availability in simulations:
                 # Skip if unavailable and not in update mode
                 if not availability.get("is_available") and not self.update_product:
                     continue
 
                 # Build DTO from API response
-                dto = self.extractor.extract(product_details, availability)
+                with self.stats.stage("extraction"):
+                    dto = self.extractor.extract(product_details, availability)
                 # Validate DTO required fields
-                if not self.validator.is_valid(dto):
+                with self.stats.stage("validation"):
+                    is_valid = self.validator.is_valid(dto)
+                if not is_valid:
                     continue
                 # Apply business rules (merging IDs, filters, etc.)
-                if not self.validator.apply_rules(
-                    dto, seller_id, self.service, self.domain, channel
-                ):
+                with self.stats.stage("rules"):
+                    passed = self.validator.apply_rules(
+                        dto, seller_id, self.service, self.domain, channel
+                    )
+                if not passed:
                     continue
 
                 # Only append if all checks passed
+                dto.partial = partial
                 results.append(dto)
 
             return results
@@ -441,7 +523,8 @@ class ProductProcessor:
 
         Note:
             This method reads `self.sales_channel` (Optional[List[str]]). If it is set,
-            it will iterate once per channel; otherwise, it runs with channel=None.
+            it simulates once per channel, concurrently when there is more than one;
+            otherwise, it runs with channel=None.
 
         Args:
             sku_id (str): The VTEX SKU identifier to process.
@@ -477,9 +560,10 @@ class ProductProcessor:
 
         try:
             # Fetch product details; skip if inactive and not in update mode
-            product_details = self.validator_service.validate_product_details(
-                sku_id, self.catalog
-            )
+            with self.stats.stage("validation"):
+                product_details = self.validator_service.validate_product_details(
+                    sku_id, self.catalog
+                )
             if not product_details or (
                 not product_details.get("IsActive") and not self.update_product
             ):
@@ -500,11 +584,11 @@ class ProductProcessor:
             # Determine which channels to process: provided list or [None]
             channels = self.sales_channel or [None]
 
-            for channel in channels:
+            def simulate(channel: Optional[str]) -> dict:
                 # Build availability_results either by mocking or real simulation
                 if not product_details.get("IsActive") and self.update_product:
                     # In update mode for inactive product: mock all as unavailable
-                    availability_results = {
+                    return {
                         seller: {
                             "is_available": False,
                             "price": 0,
@@ -513,14 +597,15 @@ class ProductProcessor:
                         }
                         for seller in sellers
                     }
-                else:
-                    # Simulate cart in bulk for these sellers and this channel
-                    availability_results = (
-                        self.service.simulate_cart_for_multiple_sellers(
-                            sku_id, sellers, self.domain, channel
-                        )
-                    )
+                # Simulate cart in bulk for these sellers and this channel
+                return self.service.simulate_cart_for_multiple_sellers(
+                    sku_id, sellers, self.domain, channel
+                )
 
+            with self.stats.stage("simulation"):
+                simulations = self._simulate_channels(simulate, channels)
+
+            for channel, availability_results in simulations:
                 # Process each seller’s simulated result
                 for seller_id, availability in availability_results.items():
                     # Skip if unavailable and not updating existing product
@@ -528,16 +613,21 @@ class ProductProcessor:
                         continue
 
                     # Extract the DTO from API response
-                    dto = self.extractor.extract(product_details, availability)
+                    with self.stats.stage("extraction"):
+                        dto = self.extractor.extract(product_details, availability)
 
                     # Validate the DTO’s required fields
-                    if not self.validator.is_valid(dto):
+                    with self.stats.stage("validation"):
+                        is_valid = self.validator.is_valid(dto)
+                    if not is_valid:
                         continue
 
                     # Apply business rules (including ID unification with channel)
-                    if not self.validator.apply_rules(
-                        dto, seller_id, self.service, self.domain, channel
-                    ):
+                    with self.stats.stage("rules"):
+                        passed = self.validator.apply_rules(
+                            dto, seller_id, self.service, self.domain, channel
+                        )
+                    if not passed:
                         continue
 
                     # Only append if all checks passed
@@ -573,6 +663,11 @@ class BatchProcessor:
         temp_queue: Optional[TempRedisQueueManager] = None,
         use_threads: bool = True,
         max_workers: int = 100,
+        stats: Optional[PipelineStats] = None,
+        progress: Optional[SyncProgress] = None,
+        deadline: Optional[SyncDeadline] = None,
+        priority_lane: Optional[PriorityLane] = None,
+        max_result_bytes: Optional[int] = None,
     ) -> None:
         """
         Initialize the batch processor
@@ -581,6 +676,12 @@ class BatchProcessor:
             queue: Queue to use for processing
             use_threads: Whether to use multi-threading for processing
             max_workers: Maximum number of worker threads to use
+            stats: PipelineStats collecting the stage timings of the run
+            progress: SyncProgress publishing the live progress of the run
+            deadline: SyncDeadline after which the run returns what finished
+            priority_lane: PriorityLane the run yields to between items
+            max_result_bytes: If set, results are saved by a writer thread and kept
+                under this many bytes in memory, spilling to disk beyond it
         """
         self.queue = queue
         self.temp_queue = temp_queue
@@ -590,6 +691,89 @@ class BatchProcessor:
         self.valid = 0
         self.invalid = 0
         self.progress_lock = threading.Lock()
+        self.stats = stats or PipelineStats()
+        self.progress = progress
+        self.deadline = deadline
+        self.priority_lane = priority_lane
+        self.max_result_bytes = max_result_bytes
+        self.in_flight = set()
+        self.abandoned = False
+
+    def _collect_pending(self) -> List[str]:
+        """
+        Take the items left in the queue and the ones still being processed,
+        once the deadline expired. The items in flight are abandoned, their
+        results are dropped when they finish as the next run processes them.
+        """
+        with self.progress_lock:
+            self.abandoned = True
+            pending = list(self.in_flight)
+        while not self.queue.empty():
+            item = self.queue.get()
+            if item is not None:
+                pending.append(item)
+        return pending
+
+    def _save(self, saver: ProductSaver, catalog) -> None:
+        """
+        Save the pending results and add the saved products to the progress.
+        """
+        sent_before = saver.sent_to_db
+        with self.stats.stage("save"):
+            self.results = saver.save_batch(self.results, catalog)
+        if self.progress and saver.sent_to_db > sent_before:
+            self.progress.add(saved=saver.sent_to_db - sent_before)
+
+    def _save_sunk(
+        self, saver: ProductSaver, catalog, products: List[FacebookProductDTO]
+    ) -> None:
+        """
+        Save a batch of the results sink, on its writer thread. Raises when
+        part of the batch was not saved, for the sink to count it as failed.
+        """
+        total = len(products)
+        sent_before = saver.sent_to_db
+        try:
+            with self.stats.stage("save"):
+                while products:
+                    remaining = saver.save_batch(products, catalog)
+                    if len(remaining) >= len(products):
+                        break
+                    products = remaining
+        finally:
+            saved = saver.sent_to_db - sent_before
+            if self.progress and saved > 0:
+                self.progress.add(saved=saved)
+            close_old_connections()
+        if products or saved < total:
+            raise RuntimeError(f"Saved {saved} of {total} products")
+
+    def _build_sink(self, saver: ProductSaver, catalog) -> Optional[ResultsSink]:
+        if (
+            not self.max_result_bytes
+            or not saver
+            or saver.priority == ProductPriority.API_ONLY
+        ):
+            return None
+        return ResultsSink(
+            save=lambda products: self._save_sunk(saver, catalog, products),
+            batch_size=saver.batch_size,
+            max_bytes=self.max_result_bytes,
+        )
+
+    def _log_stats(self, processor: "ProductProcessor") -> None:
+        """
+        Log throughput, worker utilization and p50/p95 per stage of the run,
+        as a structured record, and publish them as metrics.
+        """
+        self.stats.finish()
+        summary = self.stats.summary()
+        self.stats.publish_summary(summary)
+        catalog_uuid = str(getattr(processor.catalog, "uuid", ""))
+        logger.info(
+            f"Sync pipeline stats for catalog {catalog_uuid}: {json.dumps(summary)}",
+            extra={"catalog_uuid": catalog_uuid, "pipeline_stats": summary},
+        )
 
     def run(
         self,
@@ -630,87 +814,164 @@ class BatchProcessor:
         total_items = len(items) if items else self.queue.qsize()
 
         progress_bar = tqdm(total=total_items, desc="[✓:0 | ✗:0]", ncols=0)
+        self.stats.start(self.max_workers if self.use_threads else 1)
+        if self.progress:
+            self.progress.start(total_items)
+
+        deadline = self.deadline
+        priority_lane = self.priority_lane
+        # Results saved by a writer thread, so workers never wait for the database
+        sink = self._build_sink(saver, processor.catalog)
 
         def worker_job() -> None:
             while not self.queue.empty():
-                item = self.queue.get()
+                if deadline and deadline.expired:
+                    return
+                if priority_lane:
+                    priority_lane.wait()
+                with self.stats.stage("queue_pop"):
+                    item = self.queue.get()
 
                 # In a multi-threaded context, Redis queue may return None
                 # when another thread has already consumed the last item.
                 # We skip None values to avoid unnecessary processing or crashes.
                 if item is None:
                     continue
+                with self.progress_lock:
+                    self.in_flight.add(item)
+                started_at = time.perf_counter()
+                is_valid = False
+                late = False
                 try:
                     if mode == "seller_sku":
-                        seller_id, sku_id = item.split("#")
-                        result = processor.process_seller_sku(seller_id, sku_id)
+                        seller_id, sku_id, change = parse_webhook_item(item)
+                        result = processor.process_seller_sku(
+                            seller_id,
+                            sku_id,
+                            price_stock_only=change == CHANGE_PRICE_STOCK,
+                        )
                     else:  # mode "single"
                         sku_id = str(item)
                         result = processor.process_single_sku(sku_id, sellers)
                         if self.temp_queue:
                             self.temp_queue.put(item)
                     with self.progress_lock:
+                        if self.abandoned:
+                            late = True
+                            return
+                        self.in_flight.discard(item)
                         if result:
+                            is_valid = True
                             self.valid += 1
-                            self.results.extend(result)
-                            if saver and len(self.results) >= saver.batch_size:
+                            if sink is None:
+                                self.results.extend(result)
+                            if sink is None and (
+                                saver and len(self.results) >= saver.batch_size
+                            ):
                                 # If batch reaches size, try to save
-                                self.results = saver.save_batch(
-                                    self.results, processor.catalog
-                                )
+                                self._save(saver, processor.catalog)
                                 if self.temp_queue:
                                     self.temp_queue.clear()
                         else:
                             self.invalid += 1
+                        buffered = sink.pending if sink else len(self.results)
                         progress_bar.set_description(
-                            f"[✓:{self.valid} | LC:{len(self.results)} | "
+                            f"[✓:{self.valid} | LC:{buffered} | "
                             f"DB:{saver.sent_to_db if saver else 0} | ✗:{self.invalid}]"
                         )
                         progress_bar.update(1)
+                    if is_valid and sink is not None:
+                        sink.add(result)
                 except Exception as e:
                     logger.error(f"Failed to process {item}: {str(e)}")
                     with self.progress_lock:
+                        if self.abandoned:
+                            late = True
+                            return
+                        self.in_flight.discard(item)
                         self.invalid += 1
                         progress_bar.update(1)
                 finally:
+                    if not late:
+                        self.stats.record_item(
+                            is_valid, time.perf_counter() - started_at
+                        )
+                        if self.progress:
+                            self.progress.add(
+                                processed=1,
+                                valid=int(is_valid),
+                                invalid=int(not is_valid),
+                            )
                     close_old_connections()
 
+        timed_out = False
         try:
-            # If threading is enabled, process items concurrently
-            if self.use_threads:
+            # If threading is enabled, process items concurrently. A deadline
+            # needs the threads, to return while items are still in flight.
+            if self.use_threads or deadline:
                 # Create a ThreadPoolExecutor with the specified maximum number of worker threads
-                with concurrent.futures.ThreadPoolExecutor(
+                executor = concurrent.futures.ThreadPoolExecutor(
                     max_workers=self.max_workers
-                ) as executor:
+                )
+                try:
                     # Submit the worker_job function for execution in each thread
                     futures = [
                         executor.submit(worker_job) for _ in range(self.max_workers)
                     ]
-                    # Wait for all threads to complete their work
-                    for future in futures:
+                    # Wait for all threads to complete their work, or the deadline
+                    done, not_done = concurrent.futures.wait(
+                        futures, timeout=deadline.remaining() if deadline else None
+                    )
+                    timed_out = bool(not_done)
+                    for future in done:
                         future.result()
+                finally:
+                    # Past the deadline the jobs not started are cancelled, the
+                    # items in flight finish in the background and are dropped
+                    executor.shutdown(wait=not timed_out, cancel_futures=timed_out)
             # Otherwise, process items sequentially using a single worker_job execution
             else:
                 worker_job()
-
+        except Exception:
+            if sink:
+                sink.close()
+            if self.progress:
+                self.progress.finish("failed")
+            raise
         finally:
             progress_bar.close()
+        if deadline and (timed_out or not self.queue.empty()):
+            pending = self._collect_pending()
+            deadline.add_pending(pending)
+            logger.info(
+                f"Deadline of {deadline.budget}s reached with {len(pending)} "
+                f"items pending"
+            )
         # If priority is API_ONLY, return the list of processed DTOs
         if saver and saver.priority == ProductPriority.API_ONLY:
-            return self.results
+            self._log_stats(processor)
+            with self.progress_lock:
+                return list(self.results)
         # Try to save remaining items
-        if saver and saver.priority != ProductPriority.API_ONLY and self.results:
-            self.results = saver.save_batch(self.results, processor.catalog)
-
-        if self.temp_queue:
+        all_saved = True
+        if sink:
+            all_saved = sink.close()
+        elif saver and saver.priority != ProductPriority.API_ONLY and self.results:
+            self._save(saver, processor.catalog)
+
+        # The SKUs of the run stay in the recovery queue unless all were saved
+        if self.temp_queue and all_saved:
             self.temp_queue.clear()
+        if self.progress:
+            self.progress.finish()
 
         logger.info(
             f"Processing completed. Valid: {self.valid}, Invalid: {self.invalid}"
         )
+        self._log_stats(processor)
         # Return True if all results were successfully processed
         # (empty list means there's nothing pending to upload)
-        return len(self.results) == 0
+        return all_saved and len(self.results) == 0
 
 
 # --------------------------------------------------
@@ -728,6 +989,8 @@ class DataProcessor:
         use_threads: bool = True,
         batch_size: int = 10_000,
         max_workers: int = 100,
+        stats: Optional[PipelineStats] = None,
+        track_progress: bool = False,
     ):
         """
         Initialize the data processor
@@ -737,12 +1000,16 @@ class DataProcessor:
             use_threads: Whether to use multi-threading for processing
             batch_size: Number of items to process in each batch before saving
             max_workers: Maximum number of worker threads to use
+            stats: PipelineStats to collect the stage timings into (a new one per run if None)
+            track_progress: Whether to publish the live progress of the run per catalog
         """
         self.queue = queue or Queue()
         self.temp_queue = temp_queue
         self.use_threads = use_threads
         self.batch_size = batch_size
         self.max_workers = max_workers
+        self.stats = stats
+        self.track_progress = track_progress
 
     def process(
         self,
@@ -758,6 +1025,7 @@ class DataProcessor:
         sellers: List[str] = None,
         priority: int = ProductPriority.DEFAULT,
         sales_channel: Optional[list[str]] = None,
+        deadline: Optional[SyncDeadline] = None,
     ) -> List[FacebookProductDTO]:
         """
         Process a list of items
@@ -775,13 +1043,20 @@ class DataProcessor:
             sellers: List of seller IDs to process (for "single" mode)
             priority: Priority level for processing
             sales_channel: VTEX sales channel identifier
+            deadline: Latency budget of the run, collecting the items not processed in time
         Returns:
             List of processed products
         """
+        if mode == "seller_sku":
+            items = drop_superseded_items(items)
+
         # Create components
         extractor = ProductExtractor(store_domain or domain)
         validator = ProductValidator(rules or [])
         saver = ProductSaver(batch_size=self.batch_size, priority=priority)
+        stats = self.stats or PipelineStats(app=self._metrics_app(catalog))
+        mirror = self._build_mirror(items, catalog, mode, priority)
+        priority_lane = self._build_priority_lane(catalog)
         processor = ProductProcessor(
             catalog=catalog,
             domain=domain,
@@ -791,13 +1066,76 @@ class DataProcessor:
             update_product=update_product,
             sync_specific_sellers=sync_specific_sellers,
             sales_channel=sales_channel,
+            stats=stats,
+            mirror=mirror,
+            # Only full syncs share the details cache, the webhook and on
+            # demand syncs fetch the SKU that just changed from VTEX
+            cache_details=mode == "single" and priority == ProductPriority.DEFAULT,
         )
         batch_processor = BatchProcessor(
             queue=self.queue,
             temp_queue=self.temp_queue,
             use_threads=self.use_threads,
             max_workers=self.max_workers,
+            stats=stats,
+            progress=SyncProgress(catalog.uuid) if self.track_progress else None,
+            deadline=deadline,
+            max_result_bytes=settings.VTEX_RESULTS_MAX_MEMORY or None,
+            priority_lane=(
+                priority_lane if priority == ProductPriority.DEFAULT else None
+            ),
+        )
+
+        # DEFAULT runs yield to the priority runs of the app holding its lane
+        holding = (
+            priority_lane.hold()
+            if priority_lane and priority != ProductPriority.DEFAULT
+            else nullcontext()
         )
 
         # Process items
-        return batch_processor.run(items, processor, mode, sellers, saver)
+        try:
+            with holding:
+                return batch_processor.run(items, processor, mode, sellers, saver)
+        finally:
+            if mirror is not None:
+                mirror.close()
+
+    @staticmethod
+    def _metrics_app(catalog) -> str:
+        vtex_app = getattr(catalog, "vtex_app", None)
+        return str(vtex_app.uuid) if vtex_app is not None else ""
+
+    @staticmethod
+    def _build_priority_lane(catalog) -> Optional[PriorityLane]:
+        vtex_app_id = getattr(catalog, "vtex_app_id", None)
+        if not settings.VTEX_PRIORITY_LANES_ENABLED or not vtex_app_id:
+            return None
+        return PriorityLane(vtex_app_id)
+
+    @staticmethod
+    def _build_mirror(
+        items: List[str], catalog, mode: str, priority: int
+    ) -> Optional[ProductMirror]:
+        """
+        Build the product mirror of the VTEX app of the catalog. Inline syncs
+        read the product details from it, loading the SKUs in one query, and
+        the other syncs keep it fresh with the details they fetch. The price
+        and stock only webhook items are always read from it.
+        """
+        vtex_app_id = getattr(catalog, "vtex_app_id", None)
+        if not settings.VTEX_PRODUCT_MIRROR_ENABLED or not vtex_app_id:
+            return None
+
+        mirror = ProductMirror(vtex_app_id, read=priority == ProductPriority.API_ONLY)
+        if mode == "seller_sku":
+            sku_ids = [
+                sku_id
+                for _, sku_id, change in map(parse_webhook_item, map(str, items))
+                if mirror.read or change == CHANGE_PRICE_STOCK
+            ]
+        else:
+            sku_ids = [str(item) for item in items] if mirror.read else []
+        if sku_ids:
+            mirror.preload(sku_ids)
+        return mirror
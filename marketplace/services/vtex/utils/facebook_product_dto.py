@@ -2,6 +2,11 @@ from dataclasses import asdict, dataclass
 from typing import Optional
 
 
+# Fields sent to Meta by a price and stock only update. The status follows the
+# stock, archived products are hidden on Meta even when back in stock.
+PARTIAL_META_FIELDS = ["id", "availability", "status", "price", "sale_price"]
+
+
 @dataclass
 class FacebookProductDTO:
     id: str
@@ -18,11 +23,14 @@ class FacebookProductDTO:
     product_details: dict  # TODO: Implement ProductDetailsDTO
     additional_image_link: Optional[str] = ""
     rich_text_description: Optional[str] = ""
+    # Price and stock only update, sending Meta just the fields they change
+    partial: bool = False
 
     def to_meta_payload(self):
         """
         Returns a dictionary containing only the fields relevant to Meta,
-        and excludes fields with empty or None values.
+        and excludes fields with empty or None values. Partial products
+        only carry their price, availability and status.
         """
         fields_for_meta = [
             "id",
@@ -39,6 +47,8 @@ class FacebookProductDTO:
             "additional_image_link",
             "rich_text_description",
         ]
+        if self.partial:
+            fields_for_meta = PARTIAL_META_FIELDS
         # Convert dataclass to dictionary and filter fields
         return {
             key: value
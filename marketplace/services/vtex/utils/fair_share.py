@@ -0,0 +1,233 @@
+import contextlib
+import json
+import logging
+import threading
+import time
+import uuid
+
+from typing import Dict, Iterator, Optional
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from marketplace.celery import app as celery_app
+
+
+logger = logging.getLogger(__name__)
+
+
+class FairShareDispatcher:
+    """
+    Tenant-aware dispatcher of the VTEX sync tasks of a Celery queue.
+
+    Tasks are kept in a Redis sub-queue per app and only sent to Celery while
+    fewer than `max_in_flight` of them run, so the Celery queue never builds
+    up a backlog in which one app's burst delays every other app. Free slots
+    go to the apps by deficit round robin: on its turn an app earns
+    `quantum * weight` credits and sends tasks while their cost (SKUs) fits
+    in its credits. A large full sync or webhook storm of one app therefore
+    only takes its share of the workers.
+
+    Tasks run wrapped by `task_fair_share_run`, which renews the lease of
+    the slot while they run, then frees it and starts the next round when
+    they finish. A slot whose task died is freed after `lease` seconds.
+    """
+
+    KEY_PREFIX = "fair_share"
+    QUEUES_KEY = f"{KEY_PREFIX}:queues"
+
+    def __init__(
+        self,
+        queue: str,
+        redis_client=None,
+        quantum: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        lease: Optional[int] = None,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.queue = queue
+        self._redis = redis_client
+        self.quantum = quantum or settings.VTEX_FAIR_SHARE_QUANTUM
+        self.max_in_flight = max_in_flight or settings.VTEX_FAIR_SHARE_MAX_IN_FLIGHT
+        self.lease = lease or settings.VTEX_FAIR_SHARE_LEASE
+        self.weights = settings.VTEX_FAIR_SHARE_WEIGHTS if weights is None else weights
+        prefix = f"{self.KEY_PREFIX}:{queue}"
+        self.ring_key = f"{prefix}:ring"
+        self.active_key = f"{prefix}:active"
+        self.deficits_key = f"{prefix}:deficits"
+        self.in_flight_key = f"{prefix}:in_flight"
+        self.lock_key = f"{prefix}:lock"
+        self._jobs_prefix = f"{prefix}:jobs"
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_connection()
+        return self._redis
+
+    def jobs_key(self, app_uuid: str) -> str:
+        return f"{self._jobs_prefix}:{app_uuid}"
+
+    def weight(self, app_uuid: str) -> float:
+        return float(self.weights.get(app_uuid, 1))
+
+    def _activate(self, app_uuid: str) -> None:
+        # The active set keeps each app at most once in the ring
+        if self.redis.sadd(self.active_key, app_uuid):
+            self.redis.rpush(self.ring_key, app_uuid)
+
+    def submit(self, app_uuid: str, task_name: str, kwargs: dict, cost: int = 1):
+        """
+        Add a task of an app to its sub-queue and dispatch what fits.
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "app_uuid": app_uuid,
+            "task": task_name,
+            "kwargs": kwargs,
+            "cost": max(int(cost), 1),
+        }
+        self.redis.rpush(self.jobs_key(app_uuid), json.dumps(job))
+        self._activate(app_uuid)
+        self.redis.sadd(self.QUEUES_KEY, self.queue)
+        try:
+            self.dispatch()
+        except Exception as e:
+            # The task is queued already, the periodic dispatch sends it
+            logger.warning(f"Could not dispatch the queue '{self.queue}': {e}")
+
+    def complete(self, job_id: str) -> None:
+        self.redis.zrem(self.in_flight_key, job_id)
+
+    def renew(self, job_id: str) -> bool:
+        """
+        Extend the lease of a running task, unless its slot was freed already.
+        """
+        return bool(
+            self.redis.zadd(
+                self.in_flight_key, {job_id: time.time() + self.lease}, xx=True, ch=True
+            )
+        )
+
+    @contextlib.contextmanager
+    def keep_lease(self, job_id: str) -> Iterator[None]:
+        """
+        Renew the lease of the task every third of the lease while the block
+        runs, so a sync longer than the lease keeps its slot.
+        """
+        stop = threading.Event()
+
+        def renew_until_stopped():
+            while not stop.wait(self.lease / 3):
+                try:
+                    self.renew(job_id)
+                except Exception as e:
+                    logger.warning(
+                        f"Could not renew the fair-share slot of {job_id}: {e}"
+                    )
+
+        threading.Thread(target=renew_until_stopped, daemon=True).start()
+        try:
+            yield
+        finally:
+            stop.set()
+
+    def dispatch(self) -> int:
+        """
+        Run a round of deficit round robin over the free slots, unless one is
+        already running. Returns the number of tasks sent.
+        """
+        if not self.redis.set(self.lock_key, 1, nx=True, ex=60):
+            return 0
+        try:
+            return self._round()
+        finally:
+            self.redis.delete(self.lock_key)
+
+    def _round(self) -> int:
+        redis = self.redis
+        redis.zremrangebyscore(self.in_flight_key, 0, time.time())
+        capacity = self.max_in_flight - redis.zcard(self.in_flight_key)
+        dispatched = 0
+        # Bounds the turns spent earning credits for tasks costlier than a quantum
+        turns_left = max(redis.llen(self.ring_key), 1) * 100
+
+        while capacity > 0 and turns_left > 0:
+            turns_left -= 1
+            app_uuid = redis.lpop(self.ring_key)
+            if app_uuid is None:
+                break
+            app_uuid = app_uuid.decode() if isinstance(app_uuid, bytes) else app_uuid
+            jobs_key = self.jobs_key(app_uuid)
+            deficit = float(redis.hget(self.deficits_key, app_uuid) or 0)
+            deficit += self.quantum * self.weight(app_uuid)
+
+            while capacity > 0:
+                raw_job = redis.lindex(jobs_key, 0)
+                if raw_job is None:
+                    break
+                job = json.loads(raw_job)
+                if job["cost"] > deficit:
+                    break
+                redis.lpop(jobs_key)
+                deficit -= job["cost"]
+                self._send(job)
+                capacity -= 1
+                dispatched += 1
+
+            if redis.llen(jobs_key):
+                redis.hset(self.deficits_key, app_uuid, deficit)
+                redis.rpush(self.ring_key, app_uuid)
+                continue
+
+            # An idle app loses its credits
+            redis.hdel(self.deficits_key, app_uuid)
+            redis.srem(self.active_key, app_uuid)
+            if redis.llen(jobs_key):
+                self._activate(app_uuid)
+
+        return dispatched
+
+    def _send(self, job: dict) -> None:
+        self.redis.zadd(self.in_flight_key, {job["id"]: time.time() + self.lease})
+        celery_app.send_task(
+            "task_fair_share_run",
+            kwargs={"queue": self.queue, "job": job},
+            queue=self.queue,
+            ignore_result=True,
+        )
+        logger.info(
+            f"Dispatched {job['task']} of App: {job['app_uuid']} "
+            f"(cost {job['cost']}) to queue '{self.queue}'"
+        )
+
+    @classmethod
+    def dispatch_all(cls, redis_client=None) -> int:
+        """
+        Run a round on every queue that received tasks, picking up slots whose
+        lease expired.
+        """
+        redis = redis_client or get_redis_connection()
+        dispatched = 0
+        for queue in redis.smembers(cls.QUEUES_KEY):
+            queue = queue.decode() if isinstance(queue, bytes) else queue
+            dispatched += cls(queue, redis_client=redis).dispatch()
+        return dispatched
+
+
+def send_sync_task(
+    task_name: str, kwargs: dict, queue: str, app_uuid: str, cost: int = 1
+) -> None:
+    """
+    Send a VTEX sync task of an app through the fair-share dispatcher, when
+    enabled, or straight to its Celery queue.
+    """
+    if settings.VTEX_FAIR_SHARE_ENABLED:
+        try:
+            FairShareDispatcher(queue).submit(str(app_uuid), task_name, kwargs, cost)
+            return
+        except Exception as e:
+            logger.warning(
+                f"Fair-share dispatch unavailable, sending {task_name} directly: {e}"
+            )
+    celery_app.send_task(task_name, kwargs=kwargs, queue=queue, ignore_result=True)
@@ -0,0 +1,159 @@
+import json
+import logging
+import time
+
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from marketplace.services.vtex.utils.facebook_product_dto import FacebookProductDTO
+from marketplace.services.vtex.utils.sync_deadline import SyncDeadline
+
+
+logger = logging.getLogger(__name__)
+
+
+class OnDemandCoalescer:
+    """
+    Coalesces concurrent on-demand syncs of the same SKUs, across processes.
+
+    An item ("seller#sku") of an app and sales channel is claimed in Redis
+    for a short window by the first request asking for it. Requests arriving
+    within the window skip the items already claimed: queued syncs drop them,
+    since they are already on their way, and inline syncs wait for the
+    products the first request publishes, until it releases its claim.
+
+    Coalescing is best effort: when Redis cannot be reached every item is
+    processed by its own request.
+    """
+
+    KEY_PREFIX = "on_demand"
+
+    def __init__(
+        self,
+        app_uuid: str,
+        sales_channel: Optional[List[str]] = None,
+        redis_client=None,
+        window: Optional[int] = None,
+    ) -> None:
+        self.app_uuid = str(app_uuid)
+        self.sales_channel = ",".join(sorted(sales_channel or [])) or "-"
+        self._redis = redis_client
+        self.window = (
+            settings.VTEX_ON_DEMAND_COALESCE_WINDOW if window is None else window
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_connection()
+        return self._redis
+
+    def _key(self, kind: str, item: str) -> str:
+        return f"{self.KEY_PREFIX}:{kind}:{self.app_uuid}:{self.sales_channel}:{item}"
+
+    def claim(
+        self, kind: str, items: List[str], ttl: Optional[int] = None
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Claim `items` for `ttl` seconds, the window by default.
+
+        Returns:
+            The items claimed by this request and the ones already claimed.
+        """
+        if not self.enabled or not items:
+            return list(items), []
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for item in items:
+                pipeline.set(self._key(kind, item), 1, nx=True, ex=ttl or self.window)
+            claimed = pipeline.execute()
+        except Exception as e:
+            logger.warning(f"On-demand coalescing unavailable, Redis error: {e}")
+            return list(items), []
+
+        owned = [item for item, was_set in zip(items, claimed) if was_set]
+        taken = [item for item, was_set in zip(items, claimed) if not was_set]
+        return owned, taken
+
+    def release(self, kind: str, items: List[str]) -> None:
+        if not self.enabled or not items:
+            return
+        try:
+            self.redis.delete(*[self._key(kind, item) for item in items])
+        except Exception as e:
+            logger.warning(f"Could not release on-demand claims: {e}")
+
+    def publish(self, items: List[str], products: List[FacebookProductDTO]) -> None:
+        """
+        Share the products of the processed `items` with the requests waiting
+        for them, for the window. Items without products are published empty.
+        """
+        if not self.enabled or not items:
+            return
+        by_sku: Dict[str, list] = {item.split("#", 1)[-1]: [] for item in items}
+        for product in products:
+            sku_id = product.id.split("#", 1)[0]
+            if sku_id in by_sku:
+                by_sku[sku_id].append(asdict(product))
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for item in items:
+                sku_id = item.split("#", 1)[-1]
+                pipeline.set(
+                    self._key("result", item),
+                    json.dumps(by_sku[sku_id]),
+                    ex=self.window,
+                )
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Could not publish on-demand results: {e}")
+
+    def wait(
+        self,
+        kind: str,
+        items: List[str],
+        deadline: SyncDeadline,
+        poll_interval: float = 0.05,
+    ) -> Tuple[List[FacebookProductDTO], List[str]]:
+        """
+        Wait, up to the deadline, for the products of items claimed by other
+        requests. An item whose claim is released without products, because
+        its request failed or ran out of time, is not waited for.
+
+        Returns:
+            The products published for `items` and the items still not ready.
+        """
+        products: List[FacebookProductDTO] = []
+        not_ready: List[str] = []
+        waiting = list(items)
+        while waiting:
+            keys = [self._key("result", i) for i in waiting]
+            keys += [self._key(kind, i) for i in waiting]
+            try:
+                values = self.redis.mget(keys)
+            except Exception as e:
+                logger.warning(f"Could not read on-demand results: {e}")
+                break
+            results = values[: len(waiting)]
+            claims = values[len(waiting) :]  # noqa: E203
+            still_waiting = []
+            for item, value, claim in zip(waiting, results, claims):
+                if value is None:
+                    # Released without products, the claim holder gave up on it
+                    (still_waiting if claim else not_ready).append(item)
+                    continue
+                products.extend(
+                    FacebookProductDTO(**product) for product in json.loads(value)
+                )
+            waiting = still_waiting
+            if not waiting or deadline.expired:
+                break
+            time.sleep(min(poll_interval, deadline.remaining()))
+        return products, not_ready + waiting
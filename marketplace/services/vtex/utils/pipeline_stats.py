@@ -0,0 +1,201 @@
+import contextlib
+import random
+import threading
+import time
+
+from typing import Dict, Iterator, List, Optional
+
+from marketplace.core.metrics import metrics
+
+
+STAGE_DURATION = metrics.histogram(
+    "vtex_sync_stage_duration_seconds",
+    "Time spent by the product sync pipeline in each stage, nested stages excluded.",
+    ("app", "stage"),
+)
+SKUS_PROCESSED = metrics.counter(
+    "vtex_sync_skus_processed",
+    "SKUs taken from the sync queue, by outcome (valid or invalid).",
+    ("app", "outcome"),
+)
+# Throughput is the rate of SKUS_PROCESSED and worker utilization the rate of
+# WORKER_BUSY_SECONDS over the rate of WORKER_CAPACITY_SECONDS, so concurrent
+# runs add up instead of overwriting each other.
+WORKER_BUSY_SECONDS = metrics.counter(
+    "vtex_sync_worker_busy_seconds",
+    "Time the sync workers spent processing SKUs.",
+    ("app",),
+)
+WORKER_CAPACITY_SECONDS = metrics.counter(
+    "vtex_sync_worker_capacity_seconds",
+    "Wall time of the finished sync runs multiplied by their number of workers.",
+    ("app",),
+)
+
+
+class _StageSamples:
+    """
+    Duration samples of a stage.
+
+    Count and total are exact; percentiles are computed over a reservoir of at
+    most `max_samples` durations so that memory stays bounded on large catalogs.
+    """
+
+    def __init__(self, max_samples: int) -> None:
+        self.max_samples = max_samples
+        self.count = 0
+        self.total = 0.0
+        self.samples: List[float] = []
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        if len(self.samples) < self.max_samples:
+            self.samples.append(duration)
+            return
+        index = random.randrange(self.count)
+        if index < self.max_samples:
+            self.samples[index] = duration
+
+    def percentile(self, percent: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+        return ordered[min(index, len(ordered) - 1)]
+
+
+class PipelineStats:
+    """
+    Collects stage timings of a product sync run.
+
+    Stages are timed with the `stage` context manager from any worker thread.
+    Stages may be nested (e.g. the details fetch happens inside the SKU
+    validation); the time of a nested stage is only accounted to it, so the
+    stage totals add up to the time actually spent in the pipeline.
+    """
+
+    STAGES = (
+        "queue_pop",
+        "validation",
+        "detail_fetch",
+        "simulation",
+        "extraction",
+        "rules",
+        "save",
+    )
+
+    def __init__(
+        self, max_samples: int = 10_000, publish: bool = True, app: str = ""
+    ) -> None:
+        """
+        Args:
+            max_samples: Maximum number of durations kept per stage for percentiles.
+            publish: Whether the timings are also sent to the metrics registry.
+            app: UUID of the VTEX app synced, labelling the published metrics.
+        """
+        self.max_samples = max_samples
+        self.publish = publish
+        self.app = app
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.workers = 0
+        self.valid = 0
+        self.invalid = 0
+        self.busy_time = 0.0
+        self._stages: Dict[str, _StageSamples] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self, workers: int) -> None:
+        self.workers = workers
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+
+    def finish(self) -> None:
+        self.finished_at = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time the enclosed block as stage `name`.
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        # Each frame accumulates the time of the stages nested in it
+        stack.append(0.0)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started_at
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.record(name, elapsed - nested)
+
+    def record(self, name: str, duration: float) -> None:
+        with self._lock:
+            samples = self._stages.get(name)
+            if samples is None:
+                samples = self._stages[name] = _StageSamples(self.max_samples)
+            samples.add(duration)
+        if self.publish:
+            STAGE_DURATION.observe(duration, app=self.app, stage=name)
+
+    def record_item(self, is_valid: bool, busy_time: float) -> None:
+        """
+        Record a SKU taken from the queue and the time a worker spent on it.
+        """
+        with self._lock:
+            if is_valid:
+                self.valid += 1
+            else:
+                self.invalid += 1
+            self.busy_time += busy_time
+        if self.publish:
+            SKUS_PROCESSED.inc(app=self.app, outcome="valid" if is_valid else "invalid")
+            WORKER_BUSY_SECONDS.inc(busy_time, app=self.app)
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def summary(self) -> dict:
+        """
+        Return throughput, worker utilization and per-stage timings, in seconds.
+        """
+        elapsed = self.elapsed
+        processed = self.valid + self.invalid
+        capacity = elapsed * self.workers
+        with self._lock:
+            stages = {
+                name: {
+                    "count": samples.count,
+                    "total": round(samples.total, 6),
+                    "p50": round(samples.percentile(50), 6),
+                    "p95": round(samples.percentile(95), 6),
+                }
+                for name, samples in self._stages.items()
+            }
+        return {
+            "processed": processed,
+            "valid": self.valid,
+            "invalid": self.invalid,
+            "elapsed": round(elapsed, 3),
+            "skus_per_sec": round(processed / elapsed, 2) if elapsed else 0.0,
+            "workers": self.workers,
+            "worker_utilization": (
+                round(min(self.busy_time / capacity, 1.0), 4) if capacity else 0.0
+            ),
+            "stages": stages,
+        }
+
+    def publish_summary(self, summary: dict) -> None:
+        if self.publish:
+            WORKER_CAPACITY_SECONDS.inc(
+                summary["elapsed"] * summary["workers"], app=self.app
+            )
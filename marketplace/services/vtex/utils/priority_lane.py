@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Optional
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+
+logger = logging.getLogger(__name__)
+
+
+class PriorityLane:
+    """
+    Lets the DEFAULT syncs of a VTEX app yield to its ON_DEMAND and API_ONLY
+    syncs, across processes.
+
+    Priority syncs hold the lane, a Redis counter per app, while they run.
+    DEFAULT syncs call `wait` between items and pause while the lane is held,
+    so the priority syncs get the VTEX rate limit and the workers. A pause
+    lasts at most `max_yield` seconds, after which the DEFAULT sync runs for
+    `min_run` seconds before yielding again, so it is never starved by a
+    steady flow of on-demand requests.
+
+    When Redis cannot be reached the lane is never held.
+    """
+
+    KEY_PREFIX = "priority_lane"
+    # Seconds a held lane is kept if its holder never releases it
+    HOLD_TTL = 300
+
+    def __init__(
+        self,
+        vtex_app_id,
+        redis_client=None,
+        max_yield: Optional[float] = None,
+        min_run: Optional[float] = None,
+        check_interval: float = 0.5,
+    ) -> None:
+        self.key = f"{self.KEY_PREFIX}:{vtex_app_id}"
+        self._redis = redis_client
+        self.max_yield = (
+            settings.VTEX_PRIORITY_MAX_YIELD if max_yield is None else max_yield
+        )
+        self.min_run = settings.VTEX_PRIORITY_MIN_RUN if min_run is None else min_run
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._held = False
+        self._run_until = 0.0
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_connection()
+        return self._redis
+
+    @contextmanager
+    def hold(self):
+        """
+        Hold the lane while a priority sync runs.
+        """
+        try:
+            pipeline = self.redis.pipeline(transaction=True)
+            pipeline.incr(self.key)
+            pipeline.expire(self.key, self.HOLD_TTL)
+            pipeline.execute()
+            entered = True
+        except Exception as e:
+            logger.warning(f"Priority lane unavailable, Redis error: {e}")
+            entered = False
+        try:
+            yield self
+        finally:
+            if entered:
+                self._release()
+
+    def _release(self) -> None:
+        try:
+            if self.redis.decr(self.key) <= 0:
+                self.redis.delete(self.key)
+        except Exception as e:
+            logger.warning(f"Could not release the priority lane {self.key}: {e}")
+
+    def is_held(self) -> bool:
+        """
+        Whether a priority sync holds the lane, read from Redis at most once
+        every `check_interval` seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at < self.check_interval:
+                return self._held
+            self._checked_at = now
+            try:
+                self._held = int(self.redis.get(self.key) or 0) > 0
+            except Exception as e:
+                logger.warning(f"Priority lane unavailable, Redis error: {e}")
+                self._held = False
+            return self._held
+
+    def wait(self) -> float:
+        """
+        Pause while the lane is held, up to `max_yield` seconds. Returns the
+        seconds paused.
+        """
+        if time.monotonic() < self._run_until or not self.is_held():
+            return 0.0
+
+        started_at = time.monotonic()
+        while self.is_held():
+            waited = time.monotonic() - started_at
+            if waited >= self.max_yield:
+                with self._lock:
+                    self._run_until = time.monotonic() + self.min_run
+                logger.info(
+                    f"DEFAULT sync resuming after yielding {waited:.1f}s to "
+                    f"{self.key}"
+                )
+                break
+            time.sleep(min(self.check_interval, self.max_yield - waited))
+        return time.monotonic() - started_at
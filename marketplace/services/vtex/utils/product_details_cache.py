@@ -0,0 +1,183 @@
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class _InFlightCall:
+    """
+    Holds the outcome of a loader call so that concurrent callers waiting on
+    the same key can share it instead of issuing their own request.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._value: Any = None
+        self._exception: Optional[BaseException] = None
+
+    def set_result(self, value: Any) -> None:
+        self._value = value
+        self._event.set()
+
+    def set_exception(self, exception: BaseException) -> None:
+        self._exception = exception
+        self._event.set()
+
+    def wait(self) -> Any:
+        self._event.wait()
+        if self._exception is not None:
+            raise self._exception
+        return self._value
+
+
+class ProductDetailsCache:
+    """
+    Process-wide bounded LRU cache with a short TTL and single-flight loading.
+
+    Concurrent lookups for a key that is not cached share a single loader call:
+    the first caller (the leader) runs the loader while the others wait for its
+    result. Errors raised by the loader are propagated to every waiter and are
+    never cached, and neither are empty results.
+
+    Cached values are shared between threads and must be treated as read-only.
+
+    Attributes:
+        max_size (int): Maximum number of cached entries before LRU eviction.
+        ttl (float): Time-to-live of each entry, in seconds.
+        report_interval (int): Number of lookups between two stats log lines.
+    """
+
+    def __init__(
+        self, max_size: int = 10_000, ttl: float = 30, report_interval: int = 10_000
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.report_interval = report_interval
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._in_flight: Dict[Hashable, _InFlightCall] = {}
+        self._lock = threading.Lock()
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, or load it through `loader`.
+
+        Args:
+            key: Cache key identifying the value.
+            loader: Callable without arguments that fetches the value.
+
+        Returns:
+            The cached or freshly loaded value.
+        """
+        if self.max_size <= 0 or self.ttl <= 0:
+            return loader()
+
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced + 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self._maybe_report(lookups)
+                    return value
+                del self._entries[key]
+
+            call = self._in_flight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _InFlightCall()
+                self._in_flight[key] = call
+                self.misses += 1
+            else:
+                self.coalesced += 1
+            self._maybe_report(lookups)
+
+        if not is_leader:
+            return call.wait()
+
+        try:
+            value = loader()
+        except BaseException as exc:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            call.set_exception(exc)
+            raise
+
+        with self._lock:
+            if value:
+                self._store(key, value)
+            self._in_flight.pop(key, None)
+        call.set_result(value)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _maybe_report(self, lookups: int) -> None:
+        if self.report_interval and lookups % self.report_interval == 0:
+            logger.info(f"[ProductDetailsCache] {self._build_stats()}")
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Drop a single entry from the cache, if present.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drop every cached entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._reset_counters()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache counters along with the hit and coalescing rates.
+
+        The hit rate is the share of lookups answered from the cache, and the
+        coalescing rate is the share of lookups that joined an in-flight call
+        instead of issuing their own request.
+        """
+        with self._lock:
+            return self._build_stats()
+
+    def _build_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "lookups": lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "coalescing_rate": round(self.coalesced / lookups, 4) if lookups else 0.0,
+        }
+
+
+product_details_cache = ProductDetailsCache(
+    max_size=settings.VTEX_PRODUCT_DETAILS_CACHE_SIZE,
+    ttl=settings.VTEX_PRODUCT_DETAILS_CACHE_TTL,
+)
@@ -0,0 +1,200 @@
+import json
+import logging
+import threading
+
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from marketplace.wpp_products.models import VtexProductMirror
+
+
+logger = logging.getLogger(__name__)
+
+
+# Fields of the VTEX SKU details read by the extractor and the business rules
+MIRRORED_FIELDS = (
+    "Id",
+    "ProductId",
+    "IsActive",
+    "SkuName",
+    "ProductName",
+    "ProductDescription",
+    "BrandName",
+    "DetailUrl",
+    "ImageUrl",
+    "Images",
+    "ProductCategories",
+    "ProductSpecifications",
+    "Dimension",
+    "MeasurementUnit",
+    "UnitMultiplier",
+    "SkuSellers",
+)
+
+MIRROR_TABLE = VtexProductMirror._meta.db_table
+
+UPSERT_SQL = (
+    f"INSERT INTO {MIRROR_TABLE} (vtex_app_id, sku_id, details, modified_on) "
+    "VALUES {values} "
+    "ON CONFLICT (vtex_app_id, sku_id) DO UPDATE "
+    "SET details = EXCLUDED.details, modified_on = EXCLUDED.modified_on "
+    f"WHERE {MIRROR_TABLE}.details IS DISTINCT FROM EXCLUDED.details"
+)
+
+
+def normalize_details(details: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Keep only the fields of the SKU details the pipeline reads, trimming the
+    images and sellers to the attributes in use.
+    """
+    normalized = {
+        field: details[field] for field in MIRRORED_FIELDS if field in details
+    }
+    if isinstance(normalized.get("Images"), list):
+        normalized["Images"] = [
+            {"ImageUrl": image.get("ImageUrl")}
+            for image in normalized["Images"]
+            if isinstance(image, dict)
+        ]
+    if isinstance(normalized.get("SkuSellers"), list):
+        normalized["SkuSellers"] = [
+            {"SellerId": seller.get("SellerId"), "IsActive": seller.get("IsActive")}
+            for seller in normalized["SkuSellers"]
+            if isinstance(seller, dict)
+        ]
+    return normalized
+
+
+class ProductMirror:
+    """
+    Local mirror of the VTEX SKU details of an app, stored in Postgres.
+
+    Details fetched from VTEX are buffered with `add` and written in batches,
+    one upsert statement per `batch_size` SKUs; rows whose details did not
+    change are left untouched. Reads go through `get`, which serves SKUs
+    loaded with `preload` from memory, and only returns details younger than
+    `max_age` seconds. `read` tells the validator whether to serve the details
+    from the mirror or only to keep it fresh.
+
+    Instances are shared by the pipeline workers and are thread safe. Once
+    `close`d, the details added by workers left behind by a deadline are
+    dropped.
+    """
+
+    def __init__(
+        self,
+        vtex_app_id: int,
+        read: bool = False,
+        batch_size: int = 500,
+        max_age: Optional[int] = None,
+    ) -> None:
+        self.vtex_app_id = vtex_app_id
+        self.read = read
+        self.batch_size = batch_size
+        self.max_age = (
+            settings.VTEX_PRODUCT_MIRROR_MAX_AGE if max_age is None else max_age
+        )
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._preloaded: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self):
+        return VtexProductMirror.objects.filter(
+            vtex_app_id=self.vtex_app_id,
+            modified_on__gte=timezone.now() - timedelta(seconds=self.max_age),
+        )
+
+    def preload(self, sku_ids: Iterable[str]) -> int:
+        """
+        Load the details of `sku_ids` in a single query. Returns how many
+        were found.
+        """
+        sku_ids = {str(sku_id) for sku_id in sku_ids}
+        if not sku_ids:
+            return 0
+        try:
+            rows = list(
+                self._fresh()
+                .filter(sku_id__in=sku_ids)
+                .values_list("sku_id", "details")
+            )
+        except Exception as e:
+            logger.warning(
+                f"Could not read the product mirror of {self.vtex_app_id}: {e}"
+            )
+            return 0
+        with self._lock:
+            self._preloaded.update(rows)
+        return len(rows)
+
+    def get(self, sku_id: str) -> Optional[Dict[str, Any]]:
+        sku_id = str(sku_id)
+        with self._lock:
+            details = self._preloaded.get(sku_id)
+        if details is None:
+            try:
+                details = (
+                    self._fresh()
+                    .filter(sku_id=sku_id)
+                    .values_list("details", flat=True)
+                    .first()
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Could not read SKU {sku_id} from the product mirror of "
+                    f"{self.vtex_app_id}: {e}"
+                )
+        with self._lock:
+            if details is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return details
+
+    def add(self, sku_id: str, details: Dict[str, Any]) -> None:
+        """
+        Buffer fresh details of a SKU, writing the buffer once it is full.
+        """
+        if not details:
+            return
+        normalized = normalize_details(details)
+        with self._lock:
+            if self._closed:
+                return
+            self._pending[str(sku_id)] = normalized
+            self._preloaded[str(sku_id)] = normalized
+            due = len(self._pending) >= self.batch_size
+        if due:
+            self.flush()
+
+    def close(self) -> None:
+        """Write the buffered details and ignore the ones added afterwards."""
+        with self._lock:
+            self._closed = True
+        self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        now = timezone.now()
+        params = []
+        for sku_id, details in pending.items():
+            params.extend((self.vtex_app_id, sku_id, json.dumps(details), now))
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(pending))
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(UPSERT_SQL.format(values=values), params)
+        except Exception as e:
+            logger.error(
+                f"Failed to write {len(pending)} SKUs to the product mirror of "
+                f"app {self.vtex_app_id}: {e}"
+            )
@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Callable, List, Optional
+
+from django.conf import settings
+from django.db import connections
+
+from marketplace.services.vtex.utils.facebook_product_dto import FacebookProductDTO
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Batch:
+    records: Optional[List[bytes]]
+    size: int
+    nbytes: int = 0
+    offset: int = 0
+    length: int = 0
+
+
+class ResultsSink:
+    """
+    Bounded-memory buffer of the products of a sync run, saved by a writer
+    thread.
+
+    Workers add their products without waiting for the database. Products
+    are kept serialized, without the VTEX product details the upload does not
+    use, and handed to the writer in batches of `batch_size`. While the
+    batches waiting for the writer take more than `max_bytes`, new batches
+    are spilled to a temporary file and read back, in order, when the writer
+    gets to them. A slow database therefore neither stalls the workers nor
+    grows the memory of the run.
+    """
+
+    def __init__(
+        self,
+        save: Callable[[List[FacebookProductDTO]], None],
+        batch_size: int,
+        max_bytes: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            save: Saves a batch of products, called on the writer thread
+            batch_size: Number of products handed to `save` at a time
+            max_bytes: Bytes of serialized products kept in memory before spilling
+            spill_dir: Directory of the spill file, the system default if None
+        """
+        self.save = save
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes or settings.VTEX_RESULTS_MAX_MEMORY
+        self.spill_dir = spill_dir or settings.VTEX_RESULTS_SPILL_DIR or None
+        self.memory_bytes = 0
+        self.pending = 0
+        self.spilled = 0
+        self.failed = 0
+        self._cond = threading.Condition()
+        self._buffer: List[bytes] = []
+        self._buffer_bytes = 0
+        self._batches = deque()
+        self._spill_file = None
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+
+    @staticmethod
+    def serialize(product: FacebookProductDTO) -> bytes:
+        data = {
+            field.name: getattr(product, field.name)
+            for field in fields(product)
+            if field.name != "product_details"
+        }
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+    @staticmethod
+    def deserialize(record: bytes) -> FacebookProductDTO:
+        return FacebookProductDTO(product_details={}, **json.loads(record))
+
+    def add(self, products: List[FacebookProductDTO]) -> None:
+        records = [self.serialize(product) for product in products]
+        with self._cond:
+            for record in records:
+                self._buffer.append(record)
+                self._buffer_bytes += len(record)
+                self.memory_bytes += len(record)
+            self.pending += len(records)
+            if (
+                len(self._buffer) >= self.batch_size
+                or self._buffer_bytes >= self.max_bytes
+            ):
+                self._seal()
+
+    def _seal(self) -> None:
+        """
+        Hand the buffered products to the writer, spilling them to disk if
+        the memory cap is exceeded. Called holding the condition.
+        """
+        records, nbytes = self._buffer, self._buffer_bytes
+        self._buffer, self._buffer_bytes = [], 0
+        if self.memory_bytes > self.max_bytes:
+            offset, length = self._spill(records)
+            self.memory_bytes -= nbytes
+            self.spilled += 1
+            batch = _Batch(None, len(records), offset=offset, length=length)
+        else:
+            batch = _Batch(records, len(records), nbytes=nbytes)
+        self._batches.append(batch)
+
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._write, name="results-sink-writer", daemon=True
+            )
+            self._writer.start()
+        self._cond.notify()
+
+    def _spill(self, records: List[bytes]):
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(
+                prefix="vtex-results-", dir=self.spill_dir
+            )
+            logger.info(
+                f"Results over {self.max_bytes} bytes in memory, spilling to disk"
+            )
+        data = b"\n".join(records)
+        offset = self._spill_file.seek(0, os.SEEK_END)
+        self._spill_file.write(data)
+        self._spill_file.flush()
+        return offset, len(data)
+
+    def _read_spilled(self, batch: _Batch) -> List[bytes]:
+        data = os.pread(self._spill_file.fileno(), batch.length, batch.offset)
+        return data.split(b"\n")
+
+    def _write(self) -> None:
+        try:
+            self._write_batches()
+        finally:
+            connections.close_all()
+
+    def _write_batches(self) -> None:
+        while True:
+            with self._cond:
+                while not self._batches and not self._closed:
+                    self._cond.wait()
+                if not self._batches:
+                    return
+                batch = self._batches.popleft()
+                records = batch.records
+                if records is None:
+                    records = self._read_spilled(batch)
+                    batch.nbytes = batch.length
+                    self.memory_bytes += batch.nbytes
+
+            try:
+                self.save([self.deserialize(record) for record in records])
+            except Exception as e:
+                logger.error(f"Failed to save {batch.size} products: {e}")
+                with self._cond:
+                    self.failed += 1
+            finally:
+                with self._cond:
+                    self.memory_bytes -= batch.nbytes
+                    self.pending -= batch.size
+
+    def close(self) -> bool:
+        """
+        Save the products left in the buffer and wait for the writer.
+        Returns whether every batch was saved.
+        """
+        with self._cond:
+            if self._buffer:
+                self._seal()
+            self._closed = True
+            self._cond.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+        if self._spill_file is not None:
+            self._spill_file.close()
+            logger.info(f"Spilled {self.spilled} batches of results to disk")
+        return self.failed == 0
@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+
+from typing import Callable, List, Optional, Set
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+
+logger = logging.getLogger(__name__)
+
+
+class ActiveSellerRegistry:
+    """
+    Active sellers of a VTEX domain and sales channel, cached in a Redis set.
+
+    Listing the sellers pages through the VTEX seller register, so the list
+    is kept in Redis as a set for `ttl` seconds. Once older than
+    `refresh_after` seconds the cached list is still served while one
+    background thread, across processes, reloads it.
+
+    A product notification from a seller missing in the registry means the
+    list is outdated, so `invalidate_unknown` drops it, at most once every
+    `INVALIDATE_MIN_AGE` seconds, and the next read reloads it. The sales
+    channels cached for a domain are indexed in a set, so that
+    `invalidate_unknown_in_domain` reaches the registry of each of them.
+
+    When Redis cannot be reached the sellers are listed from VTEX directly.
+    """
+
+    KEY_PREFIX = "active_sellers"
+    CHANNELS_KEY_PREFIX = "active_sellers_channels"
+    INVALIDATE_MIN_AGE = 300
+
+    def __init__(
+        self,
+        domain: str,
+        sales_channel: Optional[str] = None,
+        redis_client=None,
+        ttl: Optional[int] = None,
+        refresh_after: Optional[int] = None,
+    ) -> None:
+        self.domain = domain
+        self.sales_channel = sales_channel
+        self._redis = redis_client
+        self.ttl = ttl or settings.VTEX_ACTIVE_SELLERS_TTL
+        self.refresh_after = refresh_after or settings.VTEX_ACTIVE_SELLERS_REFRESH_AFTER
+        self.key = f"{self.KEY_PREFIX}:{domain}:{sales_channel or 'all'}"
+        self.refreshed_at_key = f"{self.key}:refreshed_at"
+        self.lock_key = f"{self.key}:refreshing"
+        self.channels_key = f"{self.CHANNELS_KEY_PREFIX}:{domain}"
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_connection()
+        return self._redis
+
+    def _store(self, sellers: List[str]) -> None:
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.delete(self.key)
+        if sellers:
+            pipeline.sadd(self.key, *sellers)
+            pipeline.expire(self.key, self.ttl)
+        pipeline.set(self.refreshed_at_key, time.time(), ex=self.ttl)
+        pipeline.sadd(self.channels_key, self.sales_channel or "all")
+        pipeline.expire(self.channels_key, self.ttl)
+        pipeline.execute()
+
+    def _refresh(self, loader: Callable[[], List[str]]) -> None:
+        try:
+            self._store(list(loader()))
+        except Exception as e:
+            logger.warning(f"Could not refresh the active sellers of {self.key}: {e}")
+        finally:
+            try:
+                self.redis.delete(self.lock_key)
+            except Exception:
+                pass
+
+    def _refresh_in_background(self, loader: Callable[[], List[str]]) -> None:
+        # A single refresh at a time across processes
+        if not self.redis.set(self.lock_key, 1, nx=True, ex=300):
+            return
+        threading.Thread(target=self._refresh, args=(loader,), daemon=True).start()
+
+    def get(self, loader: Callable[[], List[str]]) -> Set[str]:
+        """
+        Return the active sellers, calling `loader` to list them from VTEX
+        when they are not cached.
+        """
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.get(self.refreshed_at_key)
+            pipeline.smembers(self.key)
+            refreshed_at, members = pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Active sellers registry unavailable: {e}")
+            return set(loader())
+
+        if refreshed_at is None:
+            sellers = list(loader())
+            try:
+                self._store(sellers)
+            except Exception as e:
+                logger.warning(f"Could not cache the active sellers of {self.key}: {e}")
+            return set(sellers)
+
+        if time.time() - float(refreshed_at) >= self.refresh_after:
+            try:
+                self._refresh_in_background(loader)
+            except Exception as e:
+                logger.warning(
+                    f"Could not refresh the active sellers of {self.key}: {e}"
+                )
+        return {
+            member.decode() if isinstance(member, bytes) else member
+            for member in members
+        }
+
+    def invalidate(self) -> None:
+        try:
+            self.redis.delete(self.key, self.refreshed_at_key)
+        except Exception as e:
+            logger.warning(
+                f"Could not invalidate the active sellers of {self.key}: {e}"
+            )
+
+    def invalidate_unknown(self, seller_id: str) -> bool:
+        """
+        Drop the cached sellers if `seller_id` is not among them, unless they
+        were just listed. Returns whether the registry was invalidated.
+        Nothing is listed from VTEX.
+        """
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.get(self.refreshed_at_key)
+            pipeline.sismember(self.key, seller_id)
+            refreshed_at, is_member = pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Active sellers registry unavailable: {e}")
+            return False
+        if refreshed_at is None or is_member:
+            return False
+        if time.time() - float(refreshed_at) < self.INVALIDATE_MIN_AGE:
+            return False
+        logger.info(f"Seller {seller_id} not in {self.key}, invalidating the registry")
+        self.invalidate()
+        return True
+
+    @classmethod
+    def invalidate_unknown_in_domain(
+        cls, domain: str, seller_id: str, redis_client=None
+    ) -> int:
+        """
+        Run `invalidate_unknown` on the registry of every sales channel of
+        `domain` cached. Returns the number of registries invalidated.
+        """
+        registry = cls(domain, redis_client=redis_client)
+        try:
+            members = registry.redis.smembers(registry.channels_key)
+        except Exception as e:
+            logger.warning(f"Active sellers registry unavailable: {e}")
+            return 0
+
+        channels = {
+            member.decode() if isinstance(member, bytes) else member
+            for member in members
+        }
+        channels.discard("all")
+        invalidated = int(registry.invalidate_unknown(seller_id))
+        for channel in sorted(channels):
+            channel_registry = cls(domain, channel, redis_client=registry.redis)
+            invalidated += channel_registry.invalidate_unknown(seller_id)
+        return invalidated
@@ -10,7 +10,7 @@ logger = logging.getLogger(__name__)
 
 
 class SKUValidator:
-    def __init__(self, service, domain, zeroshot_client, redis_client=None):
+    def __init__(self, service, domain, zeroshot_client, redis_client=None, stats=None):
         """
         Initialize SKUValidator with dependency injection for better testability and scalability.
 
@@ -19,6 +19,7 @@ class SKUValidator:
             domain: Domain for VTEX operations
             zeroshot_client: AI client for product validation
             redis_client: Optional Redis client (defaults to get_redis_connection())
+            stats: Optional PipelineStats timing the product details fetch
         """
         self.service = service
         self.domain = domain
@@ -28,6 +29,38 @@ class SKUValidator:
             settings, "SKU_VALIDATOR_TIMEOUT", 3600
         )  # Default 1 hour
         self.cache_prefix = "sku_validator"
+        self.stats = stats
+        # Optional ProductMirror serving and storing the product details
+        self.mirror = None
+        # Whether the details may come from the short-lived details cache of
+        # the service, off for the syncs triggered by a change of the SKU
+        self.cache_details = True
+
+    def _load_product_details(self, sku_id: str):
+        if self.cache_details:
+            return self.service.get_product_details(sku_id, self.domain)
+        return self.service.get_product_details(sku_id, self.domain, use_cache=False)
+
+    def _fetch_product_details(self, sku_id: str):
+        if self.stats is None:
+            return self._load_product_details(sku_id)
+        with self.stats.stage("detail_fetch"):
+            return self._load_product_details(sku_id)
+
+    def _get_product_details(self, sku_id: str):
+        """
+        Get the product details from the mirror when it is read, otherwise
+        from VTEX, keeping the mirror fresh.
+        """
+        if self.mirror is not None and self.mirror.read:
+            product_details = self.mirror.get(sku_id)
+            if product_details is not None:
+                return product_details
+
+        product_details = self._fetch_product_details(sku_id)
+        if product_details and self.mirror is not None:
+            self.mirror.add(sku_id, product_details)
+        return product_details
 
     def _get_cache_key(self, catalog: Catalog, sku_id: str) -> str:
         """Generate a cache key with prefix for easier searching"""
@@ -59,7 +92,7 @@ class SKUValidator:
                     f"SKU:{sku_id} is invalid in cache for catalog: {catalog.name}"
                 )
                 return None
-            return self.service.get_product_details(sku_id, self.domain)
+            return self._get_product_details(sku_id)
 
         is_valid = (
             ProductValidation.objects.filter(sku_id=sku_id, catalog=catalog)
@@ -79,13 +112,13 @@ class SKUValidator:
                 )
                 return None
 
-            product_details = self.service.get_product_details(sku_id, self.domain)
+            product_details = self._get_product_details(sku_id)
             cache.set(
                 cache_key, (True, "Valid from database"), timeout=self.default_timeout
             )
             return product_details
 
-        product_details = self.service.get_product_details(sku_id, self.domain)
+        product_details = self._get_product_details(sku_id)
         if not product_details:
             return None
 
@@ -117,6 +150,28 @@ class SKUValidator:
         cache.set(cache_key, (is_valid, classification), timeout=self.default_timeout)
         return product_details
 
+    def get_known_product_details(self, sku_id: str, catalog: Catalog):
+        """
+        Get the details of a SKU the pipeline already processed, from the
+        product mirror, without calling VTEX or the AI validation. Returns
+        None when the SKU is invalid or its details are not mirrored.
+        """
+        if self.mirror is None:
+            return None
+
+        cached_validation = self._get_cached_validation(
+            self._get_cache_key(catalog, sku_id)
+        )
+        if cached_validation is not None:
+            if not cached_validation[0]:
+                return None
+        elif ProductValidation.objects.filter(
+            sku_id=sku_id, catalog=catalog, is_valid=False
+        ).exists():
+            return None
+
+        return self.mirror.get(sku_id)
+
     def validate_with_ai(self, product_description: str):
         try:
             response = self.zeroshot_client.validate_product_policy(product_description)
@@ -0,0 +1,32 @@
+import threading
+import time
+
+from typing import List
+
+
+class SyncDeadline:
+    """
+    Latency budget of an inline sync.
+
+    The batch processor stops taking new items once the budget is spent and
+    returns what finished in time, recording the items left unprocessed, or
+    still in flight, in `pending` so the caller can hand them to the
+    asynchronous sync.
+    """
+
+    def __init__(self, budget: float) -> None:
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self.pending: List[str] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def add_pending(self, items: List[str]) -> None:
+        with self._lock:
+            self.pending.extend(items)
@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+
+from typing import Dict, Optional
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+
+logger = logging.getLogger(__name__)
+
+
+class SyncProgress:
+    """
+    Live progress of a catalog sync, kept in a Redis hash per catalog.
+
+    Workers record every SKU they finish, but the counters are only sent to
+    Redis every `flush_every` SKUs or `flush_interval` seconds, in a single
+    pipelined round trip, so tracking does not slow the sync down. Progress
+    is best effort: when Redis cannot be reached the sync goes on untracked.
+
+    Fields of the hash: status (running, completed or failed), total,
+    processed, valid, invalid, saved, uploaded, started_at, updated_at and
+    finished_at (Unix timestamps).
+    """
+
+    KEY_PREFIX = "sync_progress"
+    COUNTERS = ("processed", "valid", "invalid", "saved", "uploaded")
+
+    def __init__(
+        self,
+        catalog_uuid: str,
+        redis_client=None,
+        flush_every: Optional[int] = None,
+        flush_interval: float = 2.0,
+        ttl: Optional[int] = None,
+    ) -> None:
+        self.catalog_uuid = str(catalog_uuid)
+        self._redis = redis_client
+        self.flush_every = flush_every or settings.VTEX_SYNC_PROGRESS_FLUSH_EVERY
+        self.flush_interval = flush_interval
+        self.ttl = ttl or settings.VTEX_SYNC_PROGRESS_TTL
+        self._pending: Dict[str, int] = {}
+        self._pending_items = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._disabled = False
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_connection()
+        return self._redis
+
+    @classmethod
+    def key(cls, catalog_uuid: str) -> str:
+        return f"{cls.KEY_PREFIX}:{catalog_uuid}"
+
+    def _execute(self, build) -> None:
+        """
+        Send the commands added by `build` to a pipeline in one round trip.
+        After a Redis failure the run stops tracking progress.
+        """
+        if self._disabled:
+            return
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            build(pipeline)
+            pipeline.expire(self.key(self.catalog_uuid), self.ttl)
+            pipeline.execute()
+        except Exception as e:
+            self._disabled = True
+            logger.warning(
+                f"Sync progress of catalog {self.catalog_uuid} disabled, "
+                f"Redis unavailable: {e}"
+            )
+
+    def start(self, total: int) -> None:
+        now = time.time()
+        key = self.key(self.catalog_uuid)
+
+        def build(pipeline):
+            pipeline.delete(key)
+            pipeline.hset(
+                key,
+                mapping={
+                    "status": "running",
+                    "total": total,
+                    "started_at": now,
+                    "updated_at": now,
+                    **{counter: 0 for counter in self.COUNTERS},
+                },
+            )
+
+        self._execute(build)
+
+    def add(self, **counters: int) -> None:
+        """
+        Add to the counters, e.g. `add(processed=1, valid=1)`. A SKU is
+        counted as one `processed`.
+        """
+        with self._lock:
+            for counter, value in counters.items():
+                self._pending[counter] = self._pending.get(counter, 0) + value
+            self._pending_items += counters.get("processed", 0)
+            due = (
+                self._pending_items >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self, **fields) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_items = 0
+            self._last_flush = time.monotonic()
+        key = self.key(self.catalog_uuid)
+
+        def build(pipeline):
+            for counter, value in pending.items():
+                if value:
+                    pipeline.hincrby(key, counter, value)
+            pipeline.hset(key, mapping={"updated_at": time.time(), **fields})
+
+        self._execute(build)
+
+    def finish(self, status: str = "completed") -> None:
+        self.flush(status=status, finished_at=time.time())
+
+    @classmethod
+    def increment(cls, catalog_uuid: str, counter: str, value: int) -> None:
+        """
+        Add to a counter of the progress of a catalog, if a sync was tracked.
+        Used by the tasks running after the sync, such as the upload.
+        """
+        key = cls.key(catalog_uuid)
+        try:
+            redis = get_redis_connection()
+            if redis.exists(key):
+                redis.hincrby(key, counter, value)
+        except Exception as e:
+            logger.warning(f"Could not update the sync progress of {catalog_uuid}: {e}")
+
+    @classmethod
+    def get(cls, catalog_uuid: str, redis_client=None) -> Optional[dict]:
+        """
+        Return the progress of the last tracked sync of a catalog, with its
+        rate in SKUs per second and ETA in seconds, or None if there is none.
+        """
+        redis = redis_client or get_redis_connection()
+        raw = redis.hgetall(cls.key(catalog_uuid))
+        if not raw:
+            return None
+        data = {
+            (key.decode() if isinstance(key, bytes) else key): (
+                value.decode() if isinstance(value, bytes) else value
+            )
+            for key, value in raw.items()
+        }
+        progress = {"status": data.get("status")}
+        for counter in ("total",) + cls.COUNTERS:
+            progress[counter] = int(data.get(counter) or 0)
+        for field in ("started_at", "updated_at", "finished_at"):
+            progress[field] = float(data[field]) if data.get(field) else None
+
+        until = progress["finished_at"] or time.time()
+        elapsed = max(until - (progress["started_at"] or until), 0.0)
+        rate = progress["processed"] / elapsed if elapsed else 0.0
+        remaining = max(progress["total"] - progress["processed"], 0)
+        progress["rate"] = round(rate, 2)
+        if progress["status"] != "running":
+            progress["eta"] = 0
+        else:
+            progress["eta"] = round(remaining / rate) if rate else None
+        return progress
@@ -1,4 +1,7 @@
-from unittest.mock import Mock, patch
+import threading
+import time
+
+from unittest.mock import Mock, call, patch
 from queue import Queue
 
 from django.test import TestCase
@@ -14,6 +17,7 @@ from marketplace.services.vtex.utils.data_processor import (
 )
 from marketplace.services.vtex.utils.facebook_product_dto import FacebookProductDTO
 from marketplace.services.vtex.utils.enums import ProductPriority
+from marketplace.services.vtex.utils.sync_deadline import SyncDeadline
 from marketplace.clients.exceptions import CustomAPIException
 
 
@@ -120,6 +124,35 @@ class TestProductExtractor(TestCase):
         self.assertEqual(result.brand, "Test Brand")
         self.assertEqual(result.link, "https://test-store.com/product/123?idsku=123")
 
+    def test_partial_payload_restores_the_status_back_in_stock(self):
+        """Test a price and stock only update of a SKU back in stock reactivates it."""
+        product_details = {
+            "Id": "123",
+            "DetailUrl": "/product/123",
+            "SkuName": "Test Product",
+        }
+        prices = {"list_price": 120.0, "selling_price": 100.0}
+
+        out_of_stock = self.extractor.extract(
+            product_details, {**prices, "is_available": False}
+        )
+        back_in_stock = self.extractor.extract(
+            product_details, {**prices, "is_available": True}
+        )
+        back_in_stock.partial = True
+
+        self.assertEqual(out_of_stock.to_meta_payload()["status"], "archived")
+        self.assertEqual(
+            back_in_stock.to_meta_payload(),
+            {
+                "id": "123",
+                "availability": "in stock",
+                "status": "Active",
+                "price": 120.0,
+                "sale_price": 100.0,
+            },
+        )
+
     def test_extract_with_image_url_fallback(self):
         """Test extraction when falling back to ImageUrl."""
         product_details = {
@@ -542,6 +575,52 @@ class TestProductProcessor(TestCase):
         self.mock_sku_validator.validate_product_details.assert_called_once()
         self.processor.service.simulate_cart_for_seller.assert_called_once()
 
+    def test_process_seller_sku_price_stock_only_reuses_known_details(self):
+        """Test price and stock only items skip the details fetch and are partial."""
+        self.mock_sku_validator.get_known_product_details.return_value = {
+            "IsActive": True,
+            "SkuName": "Test Product",
+        }
+        self.processor.service.simulate_cart_for_seller.return_value = {
+            "is_available": True,
+            "price": 100,
+            "list_price": 120,
+        }
+        dto = Mock(partial=False)
+        self.mock_extractor.extract.return_value = dto
+
+        result = self.processor.process_seller_sku(
+            "seller123", "sku123", price_stock_only=True
+        )
+
+        self.assertEqual(result, [dto])
+        self.assertTrue(dto.partial)
+        self.mock_sku_validator.validate_product_details.assert_not_called()
+        self.processor.service.simulate_cart_for_seller.assert_called_once()
+        self.mock_validator.apply_rules.assert_called_once()
+
+    def test_process_seller_sku_price_stock_only_without_known_details(self):
+        """Test price and stock only items run in full when details are unknown."""
+        self.mock_sku_validator.get_known_product_details.return_value = None
+        self.mock_sku_validator.validate_product_details.return_value = {
+            "IsActive": True,
+        }
+        self.processor.service.simulate_cart_for_seller.return_value = {
+            "is_available": True,
+        }
+        dto = Mock(partial=False)
+        self.mock_extractor.extract.return_value = dto
+
+        result = self.processor.process_seller_sku(
+            "seller123", "sku123", price_stock_only=True
+        )
+
+        self.assertEqual(result, [dto])
+        self.assertFalse(dto.partial)
+        self.mock_sku_validator.validate_product_details.assert_called_once_with(
+            "sku123", self.mock_catalog
+        )
+
     def test_process_seller_sku_invalid_seller_id(self):
         """Test processing with invalid seller ID."""
         result = self.processor.process_seller_sku("", "sku123")
@@ -606,6 +685,88 @@ class TestProductProcessor(TestCase):
 
         self.assertEqual(len(result), 2)  # One for each channel
 
+    def test_process_single_sku_simulates_channels_concurrently(self):
+        """Test that every sales channel is simulated at the same time."""
+        self.mock_sku_validator.validate_product_details.return_value = {
+            "IsActive": True,
+            "SkuName": "Test Product",
+        }
+        self.processor.sales_channel = ["1", "2", "3"]
+        # Each simulation only returns once all channels are in flight
+        barrier = threading.Barrier(3, timeout=5)
+
+        def simulate(sku_id, sellers, domain, channel):
+            barrier.wait()
+            return {"seller1": {"is_available": True, "price": int(channel)}}
+
+        self.processor.service.simulate_cart_for_multiple_sellers.side_effect = simulate
+
+        result = self.processor.process_single_sku("sku123", ["seller1"])
+
+        self.assertEqual(len(result), 3)
+        rules_channels = [
+            call.args[4] for call in self.mock_validator.apply_rules.call_args_list
+        ]
+        self.assertEqual(rules_channels, ["1", "2", "3"])
+
+    def test_process_seller_sku_with_sales_channels(self):
+        """Test that seller SKUs are processed once per sales channel, in order."""
+        self.mock_sku_validator.validate_product_details.return_value = {
+            "IsActive": True,
+            "SkuName": "Test Product",
+        }
+        self.processor.sales_channel = ["1", "2"]
+        self.processor.service.simulate_cart_for_seller.side_effect = (
+            lambda sku_id, seller_id, domain, channel: {
+                "is_available": channel == "2",
+                "price": 100,
+            }
+        )
+
+        result = self.processor.process_seller_sku("seller123", "sku123")
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(self.processor.service.simulate_cart_for_seller.call_count, 2)
+        self.mock_validator.apply_rules.assert_called_once_with(
+            self.mock_extractor.extract.return_value,
+            "seller123",
+            self.processor.service,
+            "test.com",
+            "2",
+        )
+
+    def test_process_seller_sku_records_stage_timings(self):
+        """Test every stage of a seller SKU is timed."""
+        self.mock_sku_validator.validate_product_details.return_value = {
+            "IsActive": True
+        }
+        self.processor.service.simulate_cart_for_seller.return_value = {
+            "is_available": True
+        }
+        self.mock_extractor.extract.return_value = Mock()
+
+        self.processor.process_seller_sku("seller1", "sku1")
+
+        stages = self.processor.stats.summary()["stages"]
+        for stage in ("validation", "simulation", "extraction", "rules"):
+            self.assertIn(stage, stages)
+        # Once for the SKU and once for the DTO
+        self.assertEqual(stages["validation"]["count"], 2)
+
+    def test_process_single_sku_channel_error_is_handled(self):
+        """Test that a failing channel simulation is handled like a sequential one."""
+        self.mock_sku_validator.validate_product_details.return_value = {
+            "IsActive": True,
+        }
+        self.processor.sales_channel = ["1", "2"]
+        self.processor.service.simulate_cart_for_multiple_sellers.side_effect = (
+            CustomAPIException(status_code=500)
+        )
+
+        result = self.processor.process_single_sku("sku123", ["seller1"])
+
+        self.assertEqual(result, [])
+
     @patch("marketplace.services.vtex.utils.data_processor.SKUValidator")
     def test_process_seller_sku_unavailable_product(self, mock_sku_validator_class):
         """Test processing with unavailable product (not in update mode)."""
@@ -1312,6 +1473,264 @@ class TestBatchProcessor(TestCase):
         self.assertTrue(result)  # Should return True when no results to process
         # The invalid counter should be incremented (line 662)
 
+    def test_run_records_stage_timings(self):
+        """Test run times queue pops and saves and logs the run summary."""
+        mock_processor = Mock()
+        mock_processor.process_single_sku.side_effect = [[Mock()], []]
+        mock_processor.catalog = Mock(uuid="catalog-uuid")
+
+        mock_saver = Mock()
+        mock_saver.batch_size = 1
+        mock_saver.priority = ProductPriority.DEFAULT
+        mock_saver.save_batch.return_value = []
+
+        items = ["sku1", "sku2"]
+        call_count = 0
+
+        def mock_get():
+            nonlocal call_count
+            call_count += 1
+            if call_count <= len(items):
+                return items[call_count - 1]
+            self.mock_queue.empty.return_value = True
+            return None
+
+        self.mock_queue.get.side_effect = mock_get
+
+        with self.assertLogs(
+            "marketplace.services.vtex.utils.data_processor", level="INFO"
+        ) as logs:
+            self.batch_processor.run(items, mock_processor, "single", [], mock_saver)
+
+        summary = self.batch_processor.stats.summary()
+        self.assertEqual(summary["processed"], 2)
+        self.assertEqual(summary["valid"], 1)
+        self.assertEqual(summary["workers"], 1)
+        self.assertEqual(summary["stages"]["queue_pop"]["count"], 3)
+        self.assertEqual(summary["stages"]["save"]["count"], 1)
+        stats_record = logs.records[-1]
+        self.assertEqual(stats_record.catalog_uuid, "catalog-uuid")
+        self.assertEqual(stats_record.pipeline_stats["valid"], 1)
+
+    def test_run_publishes_progress(self):
+        """Test run publishes the counters and saved products to the progress."""
+        progress = Mock()
+        self.batch_processor.progress = progress
+        mock_processor = Mock()
+        mock_processor.process_single_sku.side_effect = [[Mock()], []]
+
+        mock_saver = Mock()
+        mock_saver.batch_size = 1
+        mock_saver.priority = ProductPriority.DEFAULT
+        mock_saver.sent_to_db = 0
+
+        def save_batch(products, catalog):
+            mock_saver.sent_to_db += len(products)
+            return []
+
+        mock_saver.save_batch.side_effect = save_batch
+        items = ["sku1", "sku2"]
+        self.mock_queue.get.side_effect = items + [None]
+        self.mock_queue.empty.side_effect = [False, False, True]
+
+        self.batch_processor.run(items, mock_processor, "single", [], mock_saver)
+
+        progress.start.assert_called_once_with(2)
+        progress.add.assert_has_calls(
+            [
+                call(saved=1),
+                call(processed=1, valid=1, invalid=0),
+                call(processed=1, valid=0, invalid=1),
+            ]
+        )
+        progress.finish.assert_called_once_with()
+
+    def test_run_returns_partial_results_at_the_deadline(self):
+        """Test run returns what finished in time and records the rest as pending."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        fast_product = Mock()
+
+        def process_seller_sku(seller_id, sku_id, price_stock_only=False):
+            if sku_id == "slow":
+                release.wait(5)
+                return [Mock()]
+            return [fast_product]
+
+        mock_processor = Mock()
+        mock_processor.process_seller_sku.side_effect = process_seller_sku
+        mock_saver = Mock(priority=ProductPriority.API_ONLY, batch_size=100)
+        deadline = SyncDeadline(0.2)
+        batch_processor = BatchProcessor(
+            queue=Queue(), use_threads=False, max_workers=2, deadline=deadline
+        )
+
+        result = batch_processor.run(
+            ["1#slow", "1#fast"], mock_processor, "seller_sku", None, mock_saver
+        )
+
+        self.assertEqual(result, [fast_product])
+        self.assertEqual(deadline.pending, ["1#slow"])
+
+    def test_run_drops_the_items_finished_after_the_deadline(self):
+        """Test an item in flight at the deadline is only left pending."""
+        release = threading.Event()
+        finished = threading.Event()
+        self.addCleanup(release.set)
+        progress = Mock()
+
+        def process_seller_sku(seller_id, sku_id, price_stock_only=False):
+            if sku_id == "slow":
+                release.wait(5)
+                finished.set()
+                return [Mock()]
+            return [Mock()]
+
+        mock_processor = Mock()
+        mock_processor.process_seller_sku.side_effect = process_seller_sku
+        mock_saver = Mock(priority=ProductPriority.API_ONLY, batch_size=100)
+        deadline = SyncDeadline(0.2)
+        batch_processor = BatchProcessor(
+            queue=Queue(), max_workers=2, deadline=deadline, progress=progress
+        )
+
+        result = batch_processor.run(
+            ["1#slow", "1#fast"], mock_processor, "seller_sku", None, mock_saver
+        )
+        release.set()
+        self.assertTrue(finished.wait(5))
+        time.sleep(0.05)
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(deadline.pending, ["1#slow"])
+        self.assertEqual((batch_processor.valid, batch_processor.invalid), (1, 0))
+        self.assertEqual(len(batch_processor.results), 1)
+        progress.add.assert_called_once_with(processed=1, valid=1, invalid=0)
+
+    def test_run_leaves_queued_items_pending_once_expired(self):
+        """Test no item is taken from the queue after the deadline."""
+        mock_processor = Mock()
+        mock_saver = Mock(priority=ProductPriority.API_ONLY, batch_size=100)
+        deadline = SyncDeadline(0)
+        batch_processor = BatchProcessor(
+            queue=Queue(), max_workers=2, deadline=deadline
+        )
+
+        result = batch_processor.run(
+            ["1#1", "1#2"], mock_processor, "seller_sku", None, mock_saver
+        )
+
+        self.assertEqual(result, [])
+        self.assertEqual(sorted(deadline.pending), ["1#1", "1#2"])
+        mock_processor.process_seller_sku.assert_not_called()
+
+    def test_run_yields_to_the_priority_lane_between_items(self):
+        """Test a DEFAULT run checks the priority lane before each item."""
+        mock_processor = Mock()
+        mock_processor.process_seller_sku.return_value = []
+        lane = Mock()
+        lane.wait.return_value = 0.0
+        batch_processor = BatchProcessor(
+            queue=Queue(), use_threads=False, priority_lane=lane
+        )
+
+        batch_processor.run(["1#1", "1#2"], mock_processor, "seller_sku")
+
+        self.assertEqual(lane.wait.call_count, 2)
+
+    def test_run_parses_the_change_type_of_the_items(self):
+        """Test price and stock only items are processed on the fast path."""
+        mock_processor = Mock()
+        mock_processor.process_seller_sku.return_value = []
+        batch_processor = BatchProcessor(queue=Queue(), use_threads=False)
+
+        batch_processor.run(["1#1", "1#2#price_stock"], mock_processor, "seller_sku")
+
+        mock_processor.process_seller_sku.assert_has_calls(
+            [
+                call("1", "1", price_stock_only=False),
+                call("1", "2", price_stock_only=True),
+            ]
+        )
+
+    def test_run_saves_through_the_results_sink(self):
+        """Test a run with a memory cap saves on the writer thread."""
+        mock_processor = Mock()
+        mock_processor.process_seller_sku.side_effect = lambda seller, sku, **_: [
+            FacebookProductDTO(
+                id=f"{sku}#{seller}",
+                title="Product",
+                description="Description",
+                availability="in stock",
+                status="active",
+                condition="new",
+                price="10.00 BRL",
+                link="https://store/product",
+                image_link="https://store/product.jpg",
+                brand="Brand",
+                sale_price="10.00 BRL",
+                product_details={"IsActive": True},
+            )
+        ]
+        saved = []
+        mock_saver = Mock(priority=ProductPriority.DEFAULT, batch_size=2, sent_to_db=0)
+
+        def save_batch(products, catalog):
+            saved.append((threading.current_thread(), [p.id for p in products]))
+            mock_saver.sent_to_db += len(products)
+            return []
+
+        mock_saver.save_batch.side_effect = save_batch
+        temp_queue = Mock()
+        batch_processor = BatchProcessor(
+            queue=Queue(),
+            temp_queue=temp_queue,
+            use_threads=False,
+            max_result_bytes=1024 * 1024,
+        )
+
+        result = batch_processor.run(
+            ["1#1", "1#2", "1#3"], mock_processor, "seller_sku", None, mock_saver
+        )
+
+        self.assertTrue(result)
+        self.assertEqual([ids for _, ids in saved], [["1#1", "2#1"], ["3#1"]])
+        self.assertNotIn(threading.current_thread(), [thread for thread, _ in saved])
+        self.assertEqual(batch_processor.results, [])
+        # The recovery queue is cleared once, after every batch was saved
+        temp_queue.clear.assert_called_once_with()
+
+    def test_run_keeps_the_recovery_queue_when_a_sink_batch_fails(self):
+        """Test a batch not saved by the writer leaves the SKUs to recover."""
+        mock_processor = Mock()
+        mock_processor.process_single_sku.side_effect = lambda sku, sellers: [
+            Mock(id=sku)
+        ]
+        # The saver discards a batch it failed to save, without counting it
+        mock_saver = Mock(priority=ProductPriority.DEFAULT, batch_size=2, sent_to_db=0)
+        mock_saver.save_batch.side_effect = lambda products, catalog: products[2:]
+        temp_queue = Mock()
+        batch_processor = BatchProcessor(
+            queue=Queue(),
+            temp_queue=temp_queue,
+            use_threads=False,
+            max_result_bytes=1024 * 1024,
+        )
+
+        with patch(
+            "marketplace.services.vtex.utils.results_sink.ResultsSink.serialize",
+            side_effect=lambda product: product.id.encode(),
+        ), patch(
+            "marketplace.services.vtex.utils.results_sink.ResultsSink.deserialize",
+            side_effect=lambda record: Mock(id=record.decode()),
+        ):
+            result = batch_processor.run(
+                ["1", "2", "3"], mock_processor, "single", ["seller"], mock_saver
+            )
+
+        self.assertFalse(result)
+        temp_queue.clear.assert_not_called()
+
 
 class TestDataProcessor(TestCase):
     """Test cases for DataProcessor class."""
@@ -1412,3 +1831,123 @@ class TestDataProcessor(TestCase):
         custom_queue = Mock()
         processor = DataProcessor(queue=custom_queue)
         self.assertEqual(processor.queue, custom_queue)
+
+    @patch("marketplace.services.vtex.utils.data_processor.ProductMirror")
+    def test_inline_process_reads_the_product_mirror(self, mock_mirror_class):
+        """Inline syncs preload the mirror and close it once processed."""
+        mirror = mock_mirror_class.return_value
+        mirror.read = True
+        catalog = Mock(vtex_app_id=7)
+
+        self.data_processor.process(
+            items=["seller1#10", "seller2#11"],
+            catalog=catalog,
+            domain="test.com",
+            service=Mock(),
+            mode="seller_sku",
+            priority=ProductPriority.API_ONLY,
+        )
+
+        mock_mirror_class.assert_called_once_with(7, read=True)
+        mirror.preload.assert_called_once_with(["10", "11"])
+        product_processor_class = self.patcher_processor.target.ProductProcessor
+        self.assertEqual(product_processor_class.call_args.kwargs["mirror"], mirror)
+        mirror.close.assert_called_once()
+
+    @patch("marketplace.services.vtex.utils.data_processor.ProductMirror")
+    def test_process_writes_the_product_mirror(self, mock_mirror_class):
+        """Other syncs only keep the mirror fresh."""
+        mock_mirror_class.return_value.read = False
+
+        self.data_processor.process(
+            items=["10"],
+            catalog=Mock(vtex_app_id=7),
+            domain="test.com",
+            service=Mock(),
+            priority=ProductPriority.DEFAULT,
+        )
+
+        mock_mirror_class.assert_called_once_with(7, read=False)
+        mock_mirror_class.return_value.preload.assert_not_called()
+        mock_mirror_class.return_value.close.assert_called_once()
+
+    @patch("marketplace.services.vtex.utils.data_processor.ProductMirror")
+    def test_webhook_process_preloads_the_price_stock_items(self, mock_mirror_class):
+        """Price and stock only items are read from the mirror, full ones are dropped."""
+        mock_mirror_class.return_value.read = False
+
+        self.data_processor.process(
+            items=["1#10#price_stock", "1#11", "1#11#price_stock"],
+            catalog=Mock(vtex_app_id=7),
+            domain="test.com",
+            service=Mock(),
+            mode="seller_sku",
+            priority=ProductPriority.DEFAULT,
+        )
+
+        mock_mirror_class.return_value.preload.assert_called_once_with(["10"])
+        self.assertEqual(
+            self.mock_batch_processor.run.call_args.args[0],
+            ["1#10#price_stock", "1#11"],
+        )
+
+    def test_only_full_syncs_use_the_details_cache(self):
+        """Webhook and on demand syncs fetch the SKU that changed from VTEX."""
+        product_processor_class = self.patcher_processor.target.ProductProcessor
+        runs = [
+            ("single", ProductPriority.DEFAULT, True),
+            ("single", ProductPriority.ON_DEMAND, False),
+            ("seller_sku", ProductPriority.DEFAULT, False),
+            ("seller_sku", ProductPriority.API_ONLY, False),
+        ]
+
+        for mode, priority, cache_details in runs:
+            with self.subTest(mode=mode, priority=priority):
+                self.data_processor.process(
+                    items=["1#10"] if mode == "seller_sku" else ["10"],
+                    catalog=Mock(vtex_app_id=None),
+                    domain="test.com",
+                    service=Mock(),
+                    mode=mode,
+                    priority=priority,
+                )
+
+                self.assertEqual(
+                    product_processor_class.call_args.kwargs["cache_details"],
+                    cache_details,
+                )
+
+    @patch("marketplace.services.vtex.utils.data_processor.PriorityLane")
+    def test_on_demand_process_holds_the_priority_lane(self, mock_lane_class):
+        """ON_DEMAND syncs hold the lane of the app while they run."""
+        lane = mock_lane_class.return_value
+
+        self.data_processor.process(
+            items=["10"],
+            catalog=Mock(vtex_app_id=7),
+            domain="test.com",
+            service=Mock(),
+            priority=ProductPriority.ON_DEMAND,
+        )
+
+        mock_lane_class.assert_called_once_with(7)
+        lane.hold.return_value.__enter__.assert_called_once()
+        batch_processor_class = self.patcher_batch_processor.target.BatchProcessor
+        self.assertIsNone(batch_processor_class.call_args.kwargs["priority_lane"])
+
+    @patch("marketplace.services.vtex.utils.data_processor.PriorityLane")
+    def test_default_process_yields_to_the_priority_lane(self, mock_lane_class):
+        """DEFAULT syncs yield to the lane instead of holding it."""
+        lane = mock_lane_class.return_value
+
+        self.data_processor.process(
+            items=["10"],
+            catalog=Mock(vtex_app_id=7),
+            domain="test.com",
+            service=Mock(),
+            priority=ProductPriority.DEFAULT,
+        )
+
+        lane.hold.assert_not_called()
+        batch_processor_class = self.patcher_batch_processor.target.BatchProcessor
+        self.assertEqual(batch_processor_class.call_args.kwargs["priority_lane"], lane)
@@ -72,3 +72,32 @@ class TestFacebookProductDTO(TestCase):
             payload["additional_image_link"], "https://example.com/i/extra.jpg"
         )
         self.assertEqual(payload["rich_text_description"], "Rich text")
+
+    def test_to_meta_payload_of_partial_products_has_price_and_availability(self):
+        """Ensure partial products only send their price, availability and status."""
+        dto = FacebookProductDTO(
+            id="1",
+            title="T",
+            description="D",
+            availability="out of stock",
+            status="Active",
+            condition="new",
+            price="100.00",
+            link="L",
+            image_link="I",
+            brand="B",
+            sale_price="90.00",
+            product_details={},
+            partial=True,
+        )
+
+        self.assertEqual(
+            dto.to_meta_payload(),
+            {
+                "id": "1",
+                "availability": "out of stock",
+                "status": "Active",
+                "price": "100.00",
+                "sale_price": "90.00",
+            },
+        )
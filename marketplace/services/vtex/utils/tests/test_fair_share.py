@@ -0,0 +1,253 @@
+import time
+
+from collections import Counter
+from unittest.mock import Mock, patch
+
+from django.test import TestCase, override_settings
+
+from marketplace.services.vtex.utils.fair_share import (
+    FairShareDispatcher,
+    send_sync_task,
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.lists = {}
+        self.sets = {}
+        self.hashes = {}
+        self.zsets = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value).encode()
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(
+            v.encode() if isinstance(v, str) else v for v in values
+        )
+
+    def lpop(self, key):
+        items = self.lists.get(key)
+        return items.pop(0) if items else None
+
+    def lindex(self, key, index):
+        items = self.lists.get(key, [])
+        return items[index] if items else None
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def sadd(self, key, *members):
+        members = {m.encode() for m in members}
+        current = self.sets.setdefault(key, set())
+        added = len(members - current)
+        current.update(members)
+        return added
+
+    def srem(self, key, *members):
+        self.sets.get(key, set()).difference_update(m.encode() for m in members)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def hget(self, key, field):
+        value = self.hashes.get(key, {}).get(field)
+        return None if value is None else str(value).encode()
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def zadd(self, key, mapping, xx=False, ch=False):
+        zset = self.zsets.setdefault(key, {})
+        if xx:
+            mapping = {member: s for member, s in mapping.items() if member in zset}
+        zset.update(mapping)
+        return len(mapping)
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def zremrangebyscore(self, key, min_score, max_score):
+        zset = self.zsets.get(key, {})
+        for member, score in list(zset.items()):
+            if min_score <= score <= max_score:
+                del zset[member]
+
+
+@patch("marketplace.services.vtex.utils.fair_share.celery_app")
+class TestFairShareDispatcher(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+
+    def dispatcher(self, **kwargs):
+        options = {"quantum": 100, "max_in_flight": 4, "lease": 60, "weights": {}}
+        options.update(kwargs)
+        return FairShareDispatcher("queue", redis_client=self.redis, **options)
+
+    def sent_jobs(self, mock_celery):
+        return [
+            call.kwargs["kwargs"]["job"]
+            for call in mock_celery.send_task.call_args_list
+        ]
+
+    def fill(self, dispatcher, app_uuid, jobs, cost):
+        # Queue the jobs while no slot is free, to dispatch them all at once
+        max_in_flight = dispatcher.max_in_flight
+        dispatcher.max_in_flight = 0
+        for index in range(jobs):
+            dispatcher.submit(app_uuid, "task", {"index": index}, cost=cost)
+        dispatcher.max_in_flight = max_in_flight
+
+    def test_submit_sends_while_slots_are_free(self, mock_celery):
+        dispatcher = self.dispatcher(max_in_flight=2)
+
+        for index in range(3):
+            dispatcher.submit("app", "task", {"index": index}, cost=10)
+
+        jobs = self.sent_jobs(mock_celery)
+        self.assertEqual([job["kwargs"] for job in jobs], [{"index": 0}, {"index": 1}])
+        mock_celery.send_task.assert_called_with(
+            "task_fair_share_run",
+            kwargs={"queue": "queue", "job": jobs[-1]},
+            queue="queue",
+            ignore_result=True,
+        )
+
+        dispatcher.complete(jobs[0]["id"])
+        dispatcher.dispatch()
+
+        self.assertEqual(self.sent_jobs(mock_celery)[-1]["kwargs"], {"index": 2})
+
+    def test_slots_are_shared_by_weight(self, mock_celery):
+        dispatcher = self.dispatcher(max_in_flight=9, weights={"big": 2})
+        self.fill(dispatcher, "big", 20, cost=100)
+        self.fill(dispatcher, "small", 20, cost=100)
+
+        dispatcher.dispatch()
+
+        shares = Counter(job["app_uuid"] for job in self.sent_jobs(mock_celery))
+        self.assertEqual(shares, {"big": 6, "small": 3})
+
+    def test_costly_jobs_take_fewer_slots(self, mock_celery):
+        dispatcher = self.dispatcher(max_in_flight=6)
+        self.fill(dispatcher, "storm", 10, cost=500)
+        self.fill(dispatcher, "quiet", 10, cost=50)
+
+        dispatcher.dispatch()
+
+        shares = Counter(job["app_uuid"] for job in self.sent_jobs(mock_celery))
+        self.assertEqual(shares, {"quiet": 6})
+
+        # Credits are kept between rounds, so the storm is not starved
+        for job in self.sent_jobs(mock_celery):
+            dispatcher.complete(job["id"])
+        dispatcher.dispatch()
+
+        self.assertIn("storm", {job["app_uuid"] for job in self.sent_jobs(mock_celery)})
+
+    def test_expired_leases_free_their_slots(self, mock_celery):
+        dispatcher = self.dispatcher(max_in_flight=1)
+        dispatcher.submit("app", "task", {}, cost=1)
+        dispatcher.submit("app", "task", {}, cost=1)
+        self.assertEqual(mock_celery.send_task.call_count, 1)
+
+        job_id = self.sent_jobs(mock_celery)[0]["id"]
+        self.redis.zsets[dispatcher.in_flight_key][job_id] = time.time() - 1
+
+        self.assertEqual(FairShareDispatcher.dispatch_all(redis_client=self.redis), 1)
+
+    def test_running_tasks_renew_their_lease(self, mock_celery):
+        dispatcher = self.dispatcher(max_in_flight=1, lease=0.03)
+        dispatcher.submit("app", "task", {}, cost=1)
+        job_id = self.sent_jobs(mock_celery)[0]["id"]
+        leases = self.redis.zsets[dispatcher.in_flight_key]
+        leases[job_id] = 0
+
+        with dispatcher.keep_lease(job_id):
+            deadline = time.time() + 2
+            while leases[job_id] == 0 and time.time() < deadline:
+                time.sleep(0.01)
+
+        self.assertGreater(leases[job_id], time.time() - 1)
+
+    def test_freed_slots_are_not_renewed(self, mock_celery):
+        dispatcher = self.dispatcher()
+        dispatcher.submit("app", "task", {}, cost=1)
+        job_id = self.sent_jobs(mock_celery)[0]["id"]
+
+        self.assertTrue(dispatcher.renew(job_id))
+        dispatcher.complete(job_id)
+
+        self.assertFalse(dispatcher.renew(job_id))
+        self.assertEqual(self.redis.zcard(dispatcher.in_flight_key), 0)
+
+    def test_idle_app_loses_its_credits(self, mock_celery):
+        dispatcher = self.dispatcher()
+
+        dispatcher.submit("app", "task", {}, cost=10)
+
+        self.assertEqual(self.redis.hashes.get(dispatcher.deficits_key, {}), {})
+        self.assertEqual(self.redis.smembers(dispatcher.active_key), set())
+        self.assertEqual(self.redis.llen(dispatcher.ring_key), 0)
+
+    def test_a_running_round_is_not_repeated(self, mock_celery):
+        dispatcher = self.dispatcher()
+        self.redis.set(dispatcher.lock_key, 1)
+
+        dispatcher.submit("app", "task", {}, cost=1)
+
+        mock_celery.send_task.assert_not_called()
+        self.assertEqual(self.redis.llen(dispatcher.jobs_key("app")), 1)
+
+
+@patch("marketplace.services.vtex.utils.fair_share.celery_app")
+class TestSendSyncTask(TestCase):
+    @override_settings(VTEX_FAIR_SHARE_ENABLED=False)
+    def test_sends_directly_when_disabled(self, mock_celery):
+        send_sync_task("task", {"a": 1}, "queue", "app", cost=10)
+
+        mock_celery.send_task.assert_called_once_with(
+            "task", kwargs={"a": 1}, queue="queue", ignore_result=True
+        )
+
+    @override_settings(VTEX_FAIR_SHARE_ENABLED=True)
+    @patch("marketplace.services.vtex.utils.fair_share.FairShareDispatcher")
+    def test_submits_to_the_dispatcher_when_enabled(self, mock_dispatcher, mock_celery):
+        send_sync_task("task", {"a": 1}, "queue", "app", cost=10)
+
+        mock_dispatcher.assert_called_once_with("queue")
+        mock_dispatcher.return_value.submit.assert_called_once_with(
+            "app", "task", {"a": 1}, 10
+        )
+        mock_celery.send_task.assert_not_called()
+
+    @override_settings(VTEX_FAIR_SHARE_ENABLED=True)
+    def test_sends_directly_without_redis(self, mock_celery):
+        redis = Mock()
+        redis.rpush.side_effect = ConnectionError("down")
+
+        with patch(
+            "marketplace.services.vtex.utils.fair_share.get_redis_connection",
+            return_value=redis,
+        ), self.assertLogs("marketplace.services.vtex.utils.fair_share", "WARNING"):
+            send_sync_task("task", {"a": 1}, "queue", "app")
+
+        mock_celery.send_task.assert_called_once_with(
+            "task", kwargs={"a": 1}, queue="queue", ignore_result=True
+        )
@@ -0,0 +1,129 @@
+from unittest.mock import Mock
+
+from django.test import TestCase
+
+from marketplace.services.vtex.utils.facebook_product_dto import FacebookProductDTO
+from marketplace.services.vtex.utils.on_demand_coalescer import OnDemandCoalescer
+from marketplace.services.vtex.utils.sync_deadline import SyncDeadline
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value).encode()
+        self.ttls[key] = ex
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, *args, **kwargs):
+        self.commands.append((args, kwargs))
+
+    def execute(self):
+        return [self.redis.set(*args, **kwargs) for args, kwargs in self.commands]
+
+
+def product(retailer_id: str) -> FacebookProductDTO:
+    return FacebookProductDTO(
+        id=retailer_id,
+        title="Product",
+        description="Description",
+        availability="in stock",
+        status="active",
+        condition="new",
+        price="10.00 BRL",
+        link="https://store/product",
+        image_link="https://store/product.jpg",
+        brand="Brand",
+        sale_price="10.00 BRL",
+        product_details={"IsActive": True},
+    )
+
+
+class TestOnDemandCoalescer(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.coalescer = OnDemandCoalescer(
+            "app-uuid", ["2", "1"], redis_client=self.redis, window=10
+        )
+
+    def test_claim_once_per_window(self):
+        self.assertEqual(
+            self.coalescer.claim("queued", ["1#1", "1#2"]), (["1#1", "1#2"], [])
+        )
+        other = OnDemandCoalescer("app-uuid", ["1", "2"], redis_client=self.redis)
+
+        self.assertEqual(other.claim("queued", ["1#2", "1#3"]), (["1#3"], ["1#2"]))
+        self.assertEqual(self.redis.ttls["on_demand:queued:app-uuid:1,2:1#1"], 10)
+
+    def test_claims_are_per_sales_channel_and_release(self):
+        self.coalescer.claim("inline", ["1#1"], ttl=30)
+        other_channel = OnDemandCoalescer(
+            "app-uuid", ["3"], redis_client=self.redis, window=10
+        )
+
+        self.assertEqual(other_channel.claim("inline", ["1#1"]), (["1#1"], []))
+        self.coalescer.release("inline", ["1#1"])
+        self.assertEqual(self.coalescer.claim("inline", ["1#1"]), (["1#1"], []))
+
+    def test_waiters_get_the_published_products(self):
+        self.coalescer.claim("inline", ["1#10", "1#11", "1#12"])
+        self.coalescer.publish(["1#10", "1#11"], [product("10#1"), product("99#1")])
+
+        products, not_ready = self.coalescer.wait(
+            "inline", ["1#10", "1#11", "1#12"], SyncDeadline(0.1), poll_interval=0.01
+        )
+
+        self.assertEqual(products, [product("10#1")])
+        self.assertEqual(not_ready, ["1#12"])
+
+    def test_waiters_stop_once_the_claim_is_released(self):
+        self.coalescer.claim("inline", ["1#10", "1#11"])
+        self.coalescer.publish(["1#10"], [product("10#1")])
+        self.coalescer.release("inline", ["1#10", "1#11"])
+        deadline = SyncDeadline(5)
+
+        products, not_ready = self.coalescer.wait(
+            "inline", ["1#10", "1#11"], deadline, poll_interval=0.01
+        )
+
+        self.assertEqual(products, [product("10#1")])
+        self.assertEqual(not_ready, ["1#11"])
+        self.assertGreater(deadline.remaining(), 4)
+
+    def test_disabled_window_claims_everything(self):
+        coalescer = OnDemandCoalescer("app-uuid", redis_client=self.redis, window=0)
+
+        coalescer.claim("queued", ["1#1"])
+
+        self.assertEqual(coalescer.claim("queued", ["1#1"]), (["1#1"], []))
+        self.assertEqual(self.redis.values, {})
+
+    def test_claims_everything_without_redis(self):
+        redis = Mock()
+        redis.pipeline.return_value.execute.side_effect = ConnectionError("down")
+        coalescer = OnDemandCoalescer("app-uuid", redis_client=redis, window=10)
+
+        with self.assertLogs(
+            "marketplace.services.vtex.utils.on_demand_coalescer", "WARNING"
+        ):
+            self.assertEqual(coalescer.claim("queued", ["1#1"]), (["1#1"], []))
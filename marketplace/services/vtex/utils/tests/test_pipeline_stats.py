@@ -0,0 +1,101 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from marketplace.services.vtex.utils.pipeline_stats import (
+    SKUS_PROCESSED,
+    STAGE_DURATION,
+    WORKER_BUSY_SECONDS,
+    WORKER_CAPACITY_SECONDS,
+    PipelineStats,
+)
+
+
+class TestPipelineStats(TestCase):
+    def setUp(self):
+        self.stats = PipelineStats(publish=False)
+
+    def test_nested_stage_time_is_excluded_from_parent(self):
+        # validation: 0 -> 10, detail_fetch: 2 -> 8
+        clock = iter([0.0, 2.0, 8.0, 10.0])
+        with patch(
+            "marketplace.services.vtex.utils.pipeline_stats.time.perf_counter",
+            side_effect=lambda: next(clock),
+        ):
+            with self.stats.stage("validation"):
+                with self.stats.stage("detail_fetch"):
+                    pass
+
+        stages = self.stats.summary()["stages"]
+        self.assertEqual(stages["detail_fetch"]["total"], 6.0)
+        self.assertEqual(stages["validation"]["total"], 4.0)
+
+    def test_stage_is_recorded_when_block_raises(self):
+        with self.assertRaises(ValueError):
+            with self.stats.stage("simulation"):
+                raise ValueError("boom")
+
+        self.assertEqual(self.stats.summary()["stages"]["simulation"]["count"], 1)
+
+    def test_percentiles(self):
+        for value in range(1, 101):
+            self.stats.record("save", value / 100)
+
+        save = self.stats.summary()["stages"]["save"]
+        self.assertEqual(save["count"], 100)
+        self.assertEqual(save["p50"], 0.5)
+        self.assertEqual(save["p95"], 0.95)
+
+    def test_samples_are_bounded(self):
+        stats = PipelineStats(max_samples=10, publish=False)
+        for _ in range(1000):
+            stats.record("rules", 0.001)
+
+        self.assertEqual(len(stats._stages["rules"].samples), 10)
+        self.assertEqual(stats.summary()["stages"]["rules"]["count"], 1000)
+
+    def test_throughput_and_worker_utilization(self):
+        self.stats.start(workers=4)
+        self.stats.started_at = 0.0
+        self.stats.finished_at = 10.0
+        for index in range(20):
+            self.stats.record_item(is_valid=index % 2 == 0, busy_time=1.0)
+
+        summary = self.stats.summary()
+        self.assertEqual(summary["processed"], 20)
+        self.assertEqual(summary["valid"], 10)
+        self.assertEqual(summary["skus_per_sec"], 2.0)
+        # 20s of work over 4 workers during 10s
+        self.assertEqual(summary["worker_utilization"], 0.5)
+
+    def test_stage_durations_are_published_per_app(self):
+        stats = PipelineStats(app="app-1")
+        before = STAGE_DURATION.get_count(app="app-1", stage="extraction")
+        other_app = STAGE_DURATION.get_count(app="app-2", stage="extraction")
+
+        stats.record("extraction", 0.01)
+
+        self.assertEqual(
+            STAGE_DURATION.get_count(app="app-1", stage="extraction"), before + 1
+        )
+        self.assertEqual(
+            STAGE_DURATION.get_count(app="app-2", stage="extraction"), other_app
+        )
+
+    def test_runs_add_up_to_the_worker_counters(self):
+        labels = {"app": "app-3"}
+        processed = SKUS_PROCESSED.get(outcome="valid", **labels)
+        busy = WORKER_BUSY_SECONDS.get(**labels)
+        capacity = WORKER_CAPACITY_SECONDS.get(**labels)
+
+        for _ in range(2):
+            stats = PipelineStats(app="app-3")
+            stats.start(workers=4)
+            stats.started_at = 0.0
+            stats.finished_at = 10.0
+            stats.record_item(is_valid=True, busy_time=5.0)
+            stats.publish_summary(stats.summary())
+
+        self.assertEqual(SKUS_PROCESSED.get(outcome="valid", **labels), processed + 2)
+        self.assertEqual(WORKER_BUSY_SECONDS.get(**labels), busy + 10.0)
+        self.assertEqual(WORKER_CAPACITY_SECONDS.get(**labels), capacity + 80.0)
@@ -0,0 +1,115 @@
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from marketplace.services.vtex.utils.priority_lane import PriorityLane
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, key):
+        value = self.values.get(key)
+        return None if value is None else str(value).encode()
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    def decr(self, key):
+        self.values[key] = self.values.get(key, 0) - 1
+        return self.values[key]
+
+    def expire(self, key, ttl):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [
+            getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+
+
+class TestPriorityLane(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+
+    def lane(self, **kwargs):
+        options = {"max_yield": 0.2, "min_run": 10, "check_interval": 0}
+        options.update(kwargs)
+        return PriorityLane(7, redis_client=self.redis, **options)
+
+    def test_is_held_while_priority_syncs_run(self):
+        lane = self.lane()
+
+        with lane.hold():
+            with self.lane().hold():
+                self.assertTrue(lane.is_held())
+            self.assertTrue(lane.is_held())
+
+        self.assertFalse(lane.is_held())
+        self.assertEqual(self.redis.values, {})
+
+    def test_free_lane_does_not_wait(self):
+        self.assertEqual(self.lane().wait(), 0.0)
+
+    def test_default_sync_waits_for_the_release(self):
+        lane = self.lane(max_yield=5)
+        holder = self.lane()
+
+        with holder.hold():
+            with patch(
+                "marketplace.services.vtex.utils.priority_lane.time.sleep",
+                side_effect=lambda _: holder._release(),
+            ) as mock_sleep:
+                lane.wait()
+
+        mock_sleep.assert_called_once()
+        self.assertFalse(lane.is_held())
+
+    def test_default_sync_is_not_starved(self):
+        lane = self.lane()
+
+        with self.lane().hold():
+            self.assertGreaterEqual(lane.wait(), 0.2)
+            # Runs for min_run seconds before yielding again
+            self.assertEqual(lane.wait(), 0.0)
+
+    def test_checks_redis_once_per_interval(self):
+        redis = Mock()
+        redis.get.return_value = b"1"
+        lane = PriorityLane(7, redis_client=redis, check_interval=60)
+
+        self.assertTrue(lane.is_held())
+        self.assertTrue(lane.is_held())
+
+        redis.get.assert_called_once_with("priority_lane:7")
+
+    def test_is_never_held_without_redis(self):
+        redis = Mock()
+        redis.pipeline.return_value.execute.side_effect = ConnectionError("down")
+        redis.get.side_effect = ConnectionError("down")
+        lane = PriorityLane(7, redis_client=redis, check_interval=0)
+
+        with self.assertLogs(
+            "marketplace.services.vtex.utils.priority_lane", "WARNING"
+        ), lane.hold():
+            self.assertFalse(lane.is_held())
+        redis.decr.assert_not_called()
@@ -0,0 +1,147 @@
+import threading
+
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from marketplace.services.vtex.utils.product_details_cache import ProductDetailsCache
+
+
+class TestProductDetailsCache(TestCase):
+    """Test cases for ProductDetailsCache."""
+
+    def setUp(self):
+        self.cache = ProductDetailsCache(max_size=2, ttl=30, report_interval=0)
+
+    def test_second_lookup_is_served_from_cache(self):
+        """Test that a cached key does not call the loader again."""
+        loader = Mock(return_value={"Id": "1"})
+
+        first = self.cache.get_or_load(("domain", "1"), loader)
+        second = self.cache.get_or_load(("domain", "1"), loader)
+
+        self.assertEqual(first, {"Id": "1"})
+        self.assertIs(first, second)
+        loader.assert_called_once()
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    @patch("marketplace.services.vtex.utils.product_details_cache.time.monotonic")
+    def test_expired_entry_is_reloaded(self, mock_monotonic):
+        """Test that entries older than the TTL are loaded again."""
+        loader = Mock(return_value={"Id": "1"})
+        mock_monotonic.return_value = 100
+        self.cache.get_or_load("key", loader)
+
+        mock_monotonic.return_value = 131
+        self.cache.get_or_load("key", loader)
+
+        self.assertEqual(loader.call_count, 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache keeps at most max_size entries."""
+        self.cache.get_or_load("a", lambda: "A")
+        self.cache.get_or_load("b", lambda: "B")
+        self.cache.get_or_load("a", lambda: "A")  # "a" becomes most recent
+        self.cache.get_or_load("c", lambda: "C")
+
+        loader = Mock(return_value="B2")
+        self.assertEqual(self.cache.get_or_load("b", loader), "B2")
+        loader.assert_called_once()
+        self.assertEqual(self.cache.stats()["evictions"], 2)
+
+    def test_empty_results_are_not_cached(self):
+        """Test that empty loader results are always fetched again."""
+        loader = Mock(return_value={})
+
+        self.cache.get_or_load("key", loader)
+        self.cache.get_or_load("key", loader)
+
+        self.assertEqual(loader.call_count, 2)
+
+    def test_loader_errors_are_raised_and_not_cached(self):
+        """Test that loader exceptions propagate and the next lookup retries."""
+        loader = Mock(side_effect=[ValueError("boom"), {"Id": "1"}])
+
+        with self.assertRaises(ValueError):
+            self.cache.get_or_load("key", loader)
+
+        self.assertEqual(self.cache.get_or_load("key", loader), {"Id": "1"})
+
+    def test_concurrent_lookups_share_a_single_call(self):
+        """Test that concurrent lookups for the same key are coalesced."""
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            release.wait(timeout=5)
+            return {"Id": "1"}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(self.cache.get_or_load("key", loader))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        while self.cache.stats()["coalesced"] < 4:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"Id": "1"}] * 5)
+        stats = self.cache.stats()
+        self.assertEqual(stats["coalesced"], 4)
+        self.assertEqual(stats["coalescing_rate"], 0.8)
+
+    def test_waiters_receive_the_leader_exception(self):
+        """Test that an error in the shared call reaches every waiter."""
+        release = threading.Event()
+
+        def loader():
+            release.wait(timeout=5)
+            raise ValueError("boom")
+
+        errors = []
+
+        def lookup():
+            try:
+                self.cache.get_or_load("key", loader)
+            except ValueError as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=lookup) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while self.cache.stats()["coalesced"] < 2:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 3)
+
+    def test_disabled_cache_always_calls_loader(self):
+        """Test that a zero TTL bypasses the cache."""
+        cache = ProductDetailsCache(max_size=10, ttl=0)
+        loader = Mock(return_value={"Id": "1"})
+
+        cache.get_or_load("key", loader)
+        cache.get_or_load("key", loader)
+
+        self.assertEqual(loader.call_count, 2)
+
+    def test_clear_drops_entries_and_counters(self):
+        """Test that clear empties the cache and resets the stats."""
+        self.cache.get_or_load("key", lambda: "value")
+        self.cache.clear()
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["size"], 0)
+        self.assertEqual(stats["lookups"], 0)
+        self.assertEqual(stats["hit_rate"], 0.0)
@@ -0,0 +1,128 @@
+import uuid
+
+from datetime import timedelta
+from unittest.mock import Mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from marketplace.applications.models import App
+from marketplace.services.vtex.utils.product_mirror import (
+    ProductMirror,
+    normalize_details,
+)
+from marketplace.services.vtex.utils.sku_validator import SKUValidator
+from marketplace.wpp_products.models import VtexProductMirror
+
+
+User = get_user_model()
+
+
+def sku_details(sku_id: str, name: str = "Product") -> dict:
+    return {
+        "Id": int(sku_id),
+        "ProductId": 10,
+        "IsActive": True,
+        "ProductName": name,
+        "ProductDescription": "Description",
+        "Images": [{"ImageUrl": "https://img/1.jpg", "ImageName": "front"}],
+        "SkuSellers": [
+            {"SellerId": "1", "IsActive": True, "FreightCommissionPercentage": 0}
+        ],
+        "AlternateIds": {"Ean": "789"},
+        "KeyWords": "unused",
+    }
+
+
+class TestNormalizeDetails(TestCase):
+    def test_keeps_only_the_fields_in_use(self):
+        normalized = normalize_details(sku_details("1"))
+
+        self.assertNotIn("AlternateIds", normalized)
+        self.assertNotIn("KeyWords", normalized)
+        self.assertEqual(normalized["Images"], [{"ImageUrl": "https://img/1.jpg"}])
+        self.assertEqual(
+            normalized["SkuSellers"], [{"SellerId": "1", "IsActive": True}]
+        )
+        self.assertEqual(normalized["ProductName"], "Product")
+
+
+class TestProductMirror(TestCase):
+    def setUp(self):
+        user = User.objects.create_superuser(email="user@marketplace.ai")
+        self.app = App.objects.create(
+            code="vtex",
+            config={},
+            created_by=user,
+            project_uuid=str(uuid.uuid4()),
+            platform=App.PLATFORM_VTEX,
+        )
+        self.mirror = ProductMirror(self.app.id, batch_size=2)
+
+    def test_writes_in_batches(self):
+        self.mirror.add("1", sku_details("1"))
+        self.assertFalse(VtexProductMirror.objects.exists())
+
+        self.mirror.add("2", sku_details("2"))
+
+        self.assertEqual(
+            set(VtexProductMirror.objects.values_list("sku_id", flat=True)), {"1", "2"}
+        )
+
+    def test_close_writes_the_buffer_and_drops_later_details(self):
+        self.mirror.add("1", sku_details("1"))
+
+        self.mirror.close()
+        self.mirror.add("2", sku_details("2"))
+        self.mirror.add("3", sku_details("3"))
+
+        self.assertEqual(
+            list(VtexProductMirror.objects.values_list("sku_id", flat=True)), ["1"]
+        )
+
+    def test_updates_only_changed_details(self):
+        self.mirror.add("1", sku_details("1"))
+        self.mirror.add("2", sku_details("2"))
+        old = timezone.now() - timedelta(days=1)
+        VtexProductMirror.objects.update(modified_on=old)
+
+        self.mirror.add("1", sku_details("1", name="Renamed"))
+        self.mirror.add("2", sku_details("2"))
+
+        rows = {row.sku_id: row for row in VtexProductMirror.objects.all()}
+        self.assertEqual(rows["1"].details["ProductName"], "Renamed")
+        self.assertGreater(rows["1"].modified_on, old)
+        self.assertEqual(rows["2"].modified_on, old)
+
+    def test_preload_skips_stale_details(self):
+        self.mirror.add("1", sku_details("1"))
+        self.mirror.add("2", sku_details("2"))
+        VtexProductMirror.objects.filter(sku_id="2").update(
+            modified_on=timezone.now() - timedelta(days=30)
+        )
+        mirror = ProductMirror(self.app.id, read=True, max_age=24 * 3600)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(mirror.preload(["1", "2", "3"]), 1)
+            self.assertEqual(mirror.get("1")["ProductName"], "Product")
+        self.assertIsNone(mirror.get("2"))
+        self.assertEqual((mirror.hits, mirror.misses), (1, 1))
+
+    def test_validator_reads_the_mirror(self):
+        self.mirror.add("1", sku_details("1"))
+        self.mirror.flush()
+        service = Mock()
+        service.get_product_details.side_effect = lambda sku_id, domain: sku_details(
+            sku_id
+        )
+        validator = SKUValidator(service, "domain", Mock(), redis_client=Mock())
+        validator.mirror = ProductMirror(self.app.id, read=True)
+
+        self.assertEqual(validator._get_product_details("1")["Id"], 1)
+        service.get_product_details.assert_not_called()
+
+        self.assertEqual(validator._get_product_details("2")["Id"], 2)
+        service.get_product_details.assert_called_once_with("2", "domain")
+        validator.mirror.flush()
+        self.assertTrue(VtexProductMirror.objects.filter(sku_id="2").exists())
@@ -0,0 +1,87 @@
+import threading
+
+from unittest.mock import Mock
+
+from django.test import TestCase
+
+from marketplace.services.vtex.utils.facebook_product_dto import FacebookProductDTO
+from marketplace.services.vtex.utils.results_sink import ResultsSink
+
+
+def product(retailer_id: str) -> FacebookProductDTO:
+    return FacebookProductDTO(
+        id=retailer_id,
+        title="Product ação",
+        description="Description",
+        availability="in stock",
+        status="active",
+        condition="new",
+        price="10.00 BRL",
+        link="https://store/product",
+        image_link="https://store/product.jpg",
+        brand="Brand",
+        sale_price="10.00 BRL",
+        product_details={"IsActive": True, "Images": ["a"] * 100},
+    )
+
+
+class TestResultsSink(TestCase):
+    def setUp(self):
+        self.saved = []
+        self.save = Mock(side_effect=lambda products: self.saved.append(products))
+
+    def test_saves_in_batches_without_the_product_details(self):
+        sink = ResultsSink(self.save, batch_size=2, max_bytes=10_000_000)
+
+        sink.add([product("1#1"), product("2#1")])
+        sink.add([product("3#1")])
+
+        self.assertTrue(sink.close())
+        self.assertEqual(
+            [[p.id for p in batch] for batch in self.saved],
+            [
+                ["1#1", "2#1"],
+                ["3#1"],
+            ],
+        )
+        self.assertEqual(self.saved[0][0].title, "Product ação")
+        self.assertEqual(self.saved[0][0].product_details, {})
+        self.assertEqual(
+            self.saved[0][0].to_meta_payload(), product("1#1").to_meta_payload()
+        )
+        self.assertEqual((sink.pending, sink.memory_bytes), (0, 0))
+
+    def test_spills_to_disk_while_the_writer_lags(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def slow_save(products):
+            release.wait(5)
+            self.saved.append(products)
+
+        record_size = len(ResultsSink.serialize(product("1#1")))
+        sink = ResultsSink(slow_save, batch_size=1, max_bytes=record_size * 2)
+
+        for index in range(6):
+            sink.add([product(f"{index}#1")])
+            self.assertLessEqual(sink.memory_bytes, record_size * 3)
+
+        self.assertGreater(sink.spilled, 0)
+        release.set()
+        self.assertTrue(sink.close())
+        self.assertEqual(
+            [batch[0].id for batch in self.saved], [f"{i}#1" for i in range(6)]
+        )
+
+    def test_reports_failed_batches(self):
+        sink = ResultsSink(Mock(side_effect=Exception("db down")), batch_size=1)
+
+        with self.assertLogs("marketplace.services.vtex.utils.results_sink", "ERROR"):
+            sink.add([product("1#1")])
+            self.assertFalse(sink.close())
+
+    def test_close_without_products(self):
+        sink = ResultsSink(self.save, batch_size=2)
+
+        self.assertTrue(sink.close())
+        self.save.assert_not_called()
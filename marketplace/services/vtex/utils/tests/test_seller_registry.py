@@ -0,0 +1,156 @@
+import time
+
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from marketplace.services.vtex.utils.seller_registry import ActiveSellerRegistry
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value).encode()
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(m.encode() for m in members)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def sismember(self, key, member):
+        return member.encode() in self.sets.get(key, set())
+
+    def expire(self, key, ttl):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [
+            getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+
+
+class TestActiveSellerRegistry(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.loader = Mock(return_value=["1", "seller2"])
+        self.registry = ActiveSellerRegistry(
+            "store.vtexcommercestable.com.br",
+            redis_client=self.redis,
+            ttl=3600,
+            refresh_after=600,
+        )
+
+    def test_lists_the_sellers_once(self):
+        self.assertEqual(self.registry.get(self.loader), {"1", "seller2"})
+        self.assertEqual(self.registry.get(self.loader), {"1", "seller2"})
+
+        self.loader.assert_called_once_with()
+
+    def test_registries_are_per_sales_channel(self):
+        self.registry.get(self.loader)
+        channel = ActiveSellerRegistry(
+            "store.vtexcommercestable.com.br", "2", redis_client=self.redis
+        )
+
+        self.assertEqual(channel.get(Mock(return_value=["1"])), {"1"})
+        self.assertEqual(self.registry.get(self.loader), {"1", "seller2"})
+
+    def test_caches_an_empty_list(self):
+        loader = Mock(return_value=[])
+
+        self.registry.get(loader)
+
+        self.assertEqual(self.registry.get(loader), set())
+        loader.assert_called_once_with()
+
+    @patch("marketplace.services.vtex.utils.seller_registry.threading.Thread")
+    def test_serves_stale_sellers_while_refreshing(self, mock_thread):
+        self.registry.get(self.loader)
+        self.redis.values[self.registry.refreshed_at_key] = str(
+            time.time() - 601
+        ).encode()
+
+        self.assertEqual(self.registry.get(Mock()), {"1", "seller2"})
+        self.registry.get(Mock())
+
+        mock_thread.assert_called_once()
+        mock_thread.return_value.start.assert_called_once_with()
+
+    def test_refresh_replaces_the_sellers(self):
+        self.registry.get(self.loader)
+        self.redis.set(self.registry.lock_key, 1)
+
+        self.registry._refresh(Mock(return_value=["3"]))
+
+        self.assertEqual(self.registry.get(self.loader), {"3"})
+        self.assertNotIn(self.registry.lock_key, self.redis.values)
+
+    def test_unknown_seller_invalidates_the_registry(self):
+        self.registry.get(self.loader)
+        self.assertFalse(self.registry.invalidate_unknown("new-seller"))
+
+        self.redis.values[self.registry.refreshed_at_key] = str(
+            time.time() - ActiveSellerRegistry.INVALIDATE_MIN_AGE
+        ).encode()
+        self.assertFalse(self.registry.invalidate_unknown("1"))
+        self.assertTrue(self.registry.invalidate_unknown("new-seller"))
+
+        self.registry.get(self.loader)
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_unknown_seller_invalidates_every_sales_channel_of_the_domain(self):
+        domain = "store.vtexcommercestable.com.br"
+        channel = ActiveSellerRegistry(domain, "2", redis_client=self.redis)
+        other_domain = ActiveSellerRegistry("other", "2", redis_client=self.redis)
+        for registry in (self.registry, channel, other_domain):
+            registry.get(self.loader)
+            self.redis.values[registry.refreshed_at_key] = str(
+                time.time() - ActiveSellerRegistry.INVALIDATE_MIN_AGE
+            ).encode()
+
+        invalidated = ActiveSellerRegistry.invalidate_unknown_in_domain(
+            domain, "new-seller", redis_client=self.redis
+        )
+
+        self.assertEqual(invalidated, 2)
+        self.assertNotIn(self.registry.refreshed_at_key, self.redis.values)
+        self.assertNotIn(channel.refreshed_at_key, self.redis.values)
+        self.assertIn(other_domain.refreshed_at_key, self.redis.values)
+
+    def test_lists_from_vtex_without_redis(self):
+        redis = Mock()
+        redis.pipeline.return_value.execute.side_effect = ConnectionError("down")
+        registry = ActiveSellerRegistry("store", redis_client=redis)
+
+        with self.assertLogs(
+            "marketplace.services.vtex.utils.seller_registry", "WARNING"
+        ):
+            self.assertEqual(registry.get(self.loader), {"1", "seller2"})
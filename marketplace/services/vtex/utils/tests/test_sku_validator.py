@@ -107,6 +107,22 @@ class TestSKUValidator(TestCase):
         self.assertEqual(self.validator.zeroshot_client, self.mock_zeroshot_client)
         self.assertEqual(self.validator.cache_prefix, "sku_validator")
 
+    def test_fetch_bypasses_the_details_cache_when_disabled(self):
+        """Syncs triggered by a SKU change ask the service for fresh details"""
+        service = Mock()
+        validator = SKUValidator(
+            service, "test-domain.com", self.mock_zeroshot_client, redis_client=Mock()
+        )
+
+        validator._fetch_product_details("1")
+        service.get_product_details.assert_called_with("1", "test-domain.com")
+
+        validator.cache_details = False
+        validator._fetch_product_details("1")
+        service.get_product_details.assert_called_with(
+            "1", "test-domain.com", use_cache=False
+        )
+
     def test_get_cache_key(self):
         """Test cache key generation"""
         sku_id = "TEST-SKU-123"
@@ -471,3 +487,36 @@ class TestSKUValidator(TestCase):
         self.mock_product_validation.objects.create.assert_called_once()
         call_args = self.mock_product_validation.objects.create.call_args[1]
         self.assertEqual(call_args["description"], "Product with empty description")
+
+    def test_get_known_product_details_reads_the_mirror(self):
+        """Test known SKUs are served from the mirror, without VTEX nor AI"""
+        self.validator.mirror = Mock()
+        self.validator.mirror.get.return_value = {"ProductName": "Mirrored"}
+        self.mock_product_validation.objects.filter.return_value.exists.return_value = (
+            False
+        )
+
+        result = self.validator.get_known_product_details("SKU", self.catalog)
+
+        self.assertEqual(result, {"ProductName": "Mirrored"})
+        self.validator.mirror.get.assert_called_once_with("SKU")
+        self.assertEqual(self.mock_service.call_count, 0)
+        self.assertEqual(self.mock_zeroshot_client.call_count, 0)
+
+    def test_get_known_product_details_skips_invalid_skus(self):
+        """Test invalid SKUs, in cache or in the database, are not served"""
+        self.validator.mirror = Mock()
+
+        self.mock_cache.get.return_value = (False, "Invalid from cache")
+        self.assertIsNone(self.validator.get_known_product_details("SKU", self.catalog))
+
+        self.mock_cache.get.return_value = None
+        self.mock_product_validation.objects.filter.return_value.exists.return_value = (
+            True
+        )
+        self.assertIsNone(self.validator.get_known_product_details("SKU", self.catalog))
+        self.validator.mirror.get.assert_not_called()
+
+    def test_get_known_product_details_without_mirror(self):
+        """Test nothing is known without a product mirror"""
+        self.assertIsNone(self.validator.get_known_product_details("SKU", self.catalog))
@@ -0,0 +1,134 @@
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from marketplace.services.vtex.utils.sync_progress import SyncProgress
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(
+            {field: str(value).encode() for field, value in mapping.items()}
+        )
+
+    def hincrby(self, key, field, value):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, 0)) + value).encode()
+
+    def expire(self, key, ttl):
+        pass
+
+    def exists(self, key):
+        return int(key in self.hashes)
+
+    def hgetall(self, key):
+        return {
+            field.encode(): value for field, value in self.hashes.get(key, {}).items()
+        }
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        self.redis.round_trips += 1
+        for name, args, kwargs in self.commands:
+            getattr(self.redis, name)(*args, **kwargs)
+
+
+class TestSyncProgress(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.progress = SyncProgress(
+            "catalog-uuid", redis_client=self.redis, flush_every=3, flush_interval=60
+        )
+
+    def test_counters_are_flushed_in_batches(self):
+        self.progress.start(total=10)
+        self.progress.add(processed=1, valid=1)
+        self.progress.add(processed=1, invalid=1)
+
+        self.assertEqual(self.redis.round_trips, 1)
+        self.assertEqual(SyncProgress.get("catalog-uuid", self.redis)["processed"], 0)
+
+        self.progress.add(processed=1, valid=1)
+        self.progress.add(saved=2)
+
+        progress = SyncProgress.get("catalog-uuid", self.redis)
+        self.assertEqual(self.redis.round_trips, 2)
+        self.assertEqual(progress["status"], "running")
+        self.assertEqual(progress["total"], 10)
+        self.assertEqual(progress["processed"], 3)
+        self.assertEqual(progress["valid"], 2)
+        self.assertEqual(progress["invalid"], 1)
+        self.assertEqual(progress["saved"], 0)
+
+    def test_rate_and_eta(self):
+        with patch(
+            "marketplace.services.vtex.utils.sync_progress.time.time",
+            return_value=100.0,
+        ):
+            self.progress.start(total=10)
+            self.progress.add(processed=3)
+
+        with patch(
+            "marketplace.services.vtex.utils.sync_progress.time.time",
+            return_value=106.0,
+        ):
+            progress = SyncProgress.get("catalog-uuid", self.redis)
+
+        self.assertEqual(progress["rate"], 0.5)
+        self.assertEqual(progress["eta"], 14)
+
+    def test_finish_flushes_pending_counters(self):
+        self.progress.start(total=2)
+        self.progress.add(processed=1, valid=1)
+        self.progress.finish()
+
+        progress = SyncProgress.get("catalog-uuid", self.redis)
+        self.assertEqual(progress["status"], "completed")
+        self.assertEqual(progress["processed"], 1)
+        self.assertEqual(progress["eta"], 0)
+        self.assertIsNotNone(progress["finished_at"])
+
+    def test_increment_only_tracked_catalogs(self):
+        self.progress.start(total=2)
+
+        with patch(
+            "marketplace.services.vtex.utils.sync_progress.get_redis_connection",
+            return_value=self.redis,
+        ):
+            SyncProgress.increment("catalog-uuid", "uploaded", 5)
+            SyncProgress.increment("other-catalog", "uploaded", 5)
+
+        self.assertEqual(SyncProgress.get("catalog-uuid", self.redis)["uploaded"], 5)
+        self.assertIsNone(SyncProgress.get("other-catalog", self.redis))
+
+    def test_redis_failure_disables_tracking(self):
+        redis = Mock()
+        redis.pipeline.side_effect = ConnectionError("down")
+        progress = SyncProgress("catalog-uuid", redis_client=redis, flush_every=1)
+
+        with self.assertLogs(
+            "marketplace.services.vtex.utils.sync_progress", "WARNING"
+        ):
+            progress.start(total=2)
+        progress.add(processed=1)
+        progress.finish()
+
+        self.assertEqual(redis.pipeline.call_count, 1)
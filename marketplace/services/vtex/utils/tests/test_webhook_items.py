@@ -0,0 +1,78 @@
+from django.test import SimpleTestCase
+
+from marketplace.services.vtex.utils.webhook_items import (
+    CHANGE_FULL,
+    CHANGE_PRICE_STOCK,
+    drop_superseded_items,
+    parse_webhook_item,
+    webhook_change_type,
+    webhook_item,
+)
+
+
+def notification(**flags):
+    webhook = {
+        "IdSku": "1",
+        "An": "seller",
+        "IsActive": True,
+        "StockModified": False,
+        "PriceModified": False,
+        "HasStockKeepingUnitModified": False,
+        "HasStockKeepingUnitRemovedFromAffiliate": False,
+    }
+    webhook.update(flags)
+    return webhook
+
+
+class TestWebhookChangeType(SimpleTestCase):
+    def test_price_or_stock_changes_are_price_stock_only(self):
+        self.assertEqual(
+            webhook_change_type(notification(PriceModified=True)), CHANGE_PRICE_STOCK
+        )
+        self.assertEqual(
+            webhook_change_type(notification(StockModified=True)), CHANGE_PRICE_STOCK
+        )
+
+    def test_sku_changes_are_full(self):
+        self.assertEqual(
+            webhook_change_type(
+                notification(PriceModified=True, HasStockKeepingUnitModified=True)
+            ),
+            CHANGE_FULL,
+        )
+        self.assertEqual(
+            webhook_change_type(
+                notification(
+                    StockModified=True, HasStockKeepingUnitRemovedFromAffiliate=True
+                )
+            ),
+            CHANGE_FULL,
+        )
+        self.assertEqual(
+            webhook_change_type(notification(StockModified=True, IsActive=False)),
+            CHANGE_FULL,
+        )
+
+    def test_notifications_without_the_flags_are_full(self):
+        self.assertEqual(webhook_change_type({"IdSku": "1"}), CHANGE_FULL)
+        self.assertEqual(
+            webhook_change_type({"IdSku": "1", "PriceModified": True}), CHANGE_FULL
+        )
+        self.assertEqual(webhook_change_type(notification()), CHANGE_FULL)
+
+
+class TestWebhookItems(SimpleTestCase):
+    def test_items_round_trip(self):
+        self.assertEqual(webhook_item("seller", "1"), "seller#1")
+        self.assertEqual(parse_webhook_item("seller#1"), ("seller", "1", CHANGE_FULL))
+        item = webhook_item("seller", "1", CHANGE_PRICE_STOCK)
+        self.assertEqual(item, "seller#1#price_stock")
+        self.assertEqual(parse_webhook_item(item), ("seller", "1", CHANGE_PRICE_STOCK))
+
+    def test_drops_the_price_stock_items_of_full_items(self):
+        items = ["a#1#price_stock", "a#1", "a#2#price_stock", "b#1#price_stock"]
+
+        self.assertEqual(
+            drop_superseded_items(items),
+            ["a#1", "a#2#price_stock", "b#1#price_stock"],
+        )
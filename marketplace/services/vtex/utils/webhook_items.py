@@ -0,0 +1,56 @@
+from typing import Iterable, List, Tuple
+
+
+# Change types of the items of the webhook queue. Full items are queued as
+# "seller#sku", price and stock only items carry their type as a third part.
+CHANGE_FULL = "full"
+CHANGE_PRICE_STOCK = "price_stock"
+
+# Flags of a VTEX notification telling that the price or the stock changed
+PRICE_STOCK_FLAGS = ("PriceModified", "StockModified")
+# Flags of a VTEX notification telling that the SKU itself changed
+DETAIL_FLAGS = (
+    "HasStockKeepingUnitModified",
+    "HasStockKeepingUnitRemovedFromAffiliate",
+)
+
+
+def webhook_change_type(webhook: dict) -> str:
+    """
+    The change type of a VTEX notification. It is a price and stock only
+    change when the price or the stock changed and the notification says
+    explicitly that the SKU did not, anything else is a full change.
+    """
+    if webhook.get("IsActive") is False:
+        return CHANGE_FULL
+    if not any(webhook.get(flag) is True for flag in PRICE_STOCK_FLAGS):
+        return CHANGE_FULL
+    if all(webhook.get(flag) is False for flag in DETAIL_FLAGS):
+        return CHANGE_PRICE_STOCK
+    return CHANGE_FULL
+
+
+def webhook_item(seller_id: str, sku_id: str, change: str = CHANGE_FULL) -> str:
+    if change == CHANGE_FULL:
+        return f"{seller_id}#{sku_id}"
+    return f"{seller_id}#{sku_id}#{change}"
+
+
+def parse_webhook_item(item: str) -> Tuple[str, str, str]:
+    """Splits a webhook item into its seller, SKU and change type."""
+    seller_id, sku_id, *change = item.split("#", 2)
+    return seller_id, sku_id, change[0] if change else CHANGE_FULL
+
+
+def drop_superseded_items(items: Iterable[str]) -> List[str]:
+    """
+    Drops the price and stock only items whose full item is also in
+    `items`, the full update already sends their price and stock.
+    """
+    parsed = [(item, parse_webhook_item(item)) for item in items]
+    full = {item for item, (_, _, change) in parsed if change == CHANGE_FULL}
+    return [
+        item
+        for item, (seller_id, sku_id, change) in parsed
+        if change == CHANGE_FULL or webhook_item(seller_id, sku_id) not in full
+    ]
@@ -226,6 +226,12 @@ OIDC_CACHE_TOKEN = env.bool(
 OIDC_CACHE_TTL = env.int(
     "OIDC_CACHE_TTL", default=600
 )  # Time-to-live for cached user tokens (default: 600 seconds).
+OIDC_TOKEN_EXPIRY_MARGIN = env.int(
+    "OIDC_TOKEN_EXPIRY_MARGIN", default=30
+)  # Seconds before expiry after which a cached module token is no longer used.
+OIDC_TOKEN_REFRESH_AHEAD = env.int(
+    "OIDC_TOKEN_REFRESH_AHEAD", default=120
+)  # Seconds ahead of that point at which the module token is renewed in background.
 
 # django-cors-headers Configurations
 
@@ -418,6 +424,16 @@ CELERY_BEAT_SCHEDULE = {
         "task": "task_sync_product_policies",
         "schedule": crontab(minute=30),
     },
+    "task-fair-share-dispatch": {
+        "task": "task_fair_share_dispatch",
+        "schedule": timedelta(minutes=1),
+    },
+    "task-reconcile-vtex-catalogs": {
+        "task": "task_reconcile_vtex_catalogs",
+        "schedule": crontab(
+            minute=0, hour=env.int("RECONCILE_VTEX_CATALOGS_HOUR", default=2)
+        ),
+    },
 }
 
 
@@ -512,3 +528,113 @@ SKU_VALIDATOR_TIMEOUT = env.int("SKU_VALIDATOR_TIMEOUT", default=1200)
 META_UPLOAD_PRODUCT_DELAY_DEFAULT = env.int(
     "META_UPLOAD_PRODUCT_DELAY_DEFAULT", default=30
 )
+
+# In-process VTEX product details cache (shared by the sync worker threads)
+VTEX_PRODUCT_DETAILS_CACHE_SIZE = env.int(
+    "VTEX_PRODUCT_DETAILS_CACHE_SIZE", default=10_000
+)
+VTEX_PRODUCT_DETAILS_CACHE_TTL = env.int("VTEX_PRODUCT_DETAILS_CACHE_TTL", default=30)
+
+# Keep-alive HTTP sessions shared by the API clients (one connection pool per host)
+HTTP_CLIENT_POOL_CONNECTIONS = env.int("HTTP_CLIENT_POOL_CONNECTIONS", default=10)
+HTTP_CLIENT_POOL_MAXSIZE = env.int("HTTP_CLIENT_POOL_MAXSIZE", default=100)
+HTTP_CLIENT_MAX_RETRIES = env.int("HTTP_CLIENT_MAX_RETRIES", default=3)
+
+# Circuit breakers for outgoing API calls (per host, or per VTEX account through the proxy)
+CIRCUIT_BREAKER_ENABLED = env.bool("CIRCUIT_BREAKER_ENABLED", default=True)
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = env.int(
+    "CIRCUIT_BREAKER_FAILURE_THRESHOLD", default=20
+)
+CIRCUIT_BREAKER_FAILURE_WINDOW = env.int("CIRCUIT_BREAKER_FAILURE_WINDOW", default=60)
+CIRCUIT_BREAKER_RECOVERY_TIMEOUT = env.int(
+    "CIRCUIT_BREAKER_RECOVERY_TIMEOUT", default=30
+)
+CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS = env.int(
+    "CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS", default=1
+)
+
+# Maximum time spent retrying a single VTEX call, in seconds
+VTEX_RETRY_MAX_ELAPSED_TIME = env.int("VTEX_RETRY_MAX_ELAPSED_TIME", default=600)
+
+# Metrics: exposed in Prometheus format at /metrics and, if a host is set, sent to StatsD.
+# /metrics is only served with a token, sent as `Authorization: Bearer <token>`
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+STATSD_HOST = env.str("STATSD_HOST", default="")
+STATSD_PORT = env.int("STATSD_PORT", default=8125)
+STATSD_PREFIX = env.str("STATSD_PREFIX", default="marketplace")
+
+# Live progress of the catalog syncs, kept in Redis and sent every N SKUs
+VTEX_SYNC_PROGRESS_FLUSH_EVERY = env.int("VTEX_SYNC_PROGRESS_FLUSH_EVERY", default=100)
+VTEX_SYNC_PROGRESS_TTL = env.int("VTEX_SYNC_PROGRESS_TTL", default=7 * 24 * 3600)
+
+# Local mirror of the VTEX product details, read by the on-demand inline syncs
+VTEX_PRODUCT_MIRROR_ENABLED = env.bool("VTEX_PRODUCT_MIRROR_ENABLED", default=True)
+VTEX_PRODUCT_MIRROR_MAX_AGE = env.int(
+    "VTEX_PRODUCT_MIRROR_MAX_AGE", default=7 * 24 * 3600
+)
+
+# Seconds an on-demand inline sync may take before the remaining SKUs go to the queue
+VTEX_INLINE_SYNC_BUDGET = env.float("VTEX_INLINE_SYNC_BUDGET", default=20.0)
+
+# Seconds during which concurrent on-demand syncs of the same SKUs are coalesced (0 disables)
+VTEX_ON_DEMAND_COALESCE_WINDOW = env.int("VTEX_ON_DEMAND_COALESCE_WINDOW", default=10)
+
+# Active sellers of the VTEX domains, cached in Redis and refreshed in the background
+VTEX_ACTIVE_SELLERS_TTL = env.int("VTEX_ACTIVE_SELLERS_TTL", default=24 * 3600)
+VTEX_ACTIVE_SELLERS_REFRESH_AFTER = env.int(
+    "VTEX_ACTIVE_SELLERS_REFRESH_AFTER", default=3600
+)
+
+# Weighted fair share of the VTEX sync workers between apps: credits (SKUs) earned per
+# turn, tasks running per queue, seconds before a stuck slot is freed and app weights
+VTEX_FAIR_SHARE_ENABLED = env.bool("VTEX_FAIR_SHARE_ENABLED", default=False)
+VTEX_FAIR_SHARE_QUANTUM = env.int("VTEX_FAIR_SHARE_QUANTUM", default=1000)
+VTEX_FAIR_SHARE_MAX_IN_FLIGHT = env.int("VTEX_FAIR_SHARE_MAX_IN_FLIGHT", default=8)
+VTEX_FAIR_SHARE_LEASE = env.int("VTEX_FAIR_SHARE_LEASE", default=1800)
+VTEX_FAIR_SHARE_WEIGHTS = env.dict(
+    "VTEX_FAIR_SHARE_WEIGHTS", cast={"value": float}, default={}
+)
+# Cost charged for a full catalog sync, which has no SKU count up front
+VTEX_FAIR_SHARE_FULL_SYNC_COST = env.int("VTEX_FAIR_SHARE_FULL_SYNC_COST", default=5000)
+
+# Priority lanes: DEFAULT syncs of an app pause up to VTEX_PRIORITY_MAX_YIELD seconds while its
+# ON_DEMAND syncs run, then run at least VTEX_PRIORITY_MIN_RUN seconds before pausing again
+VTEX_PRIORITY_LANES_ENABLED = env.bool("VTEX_PRIORITY_LANES_ENABLED", default=True)
+VTEX_PRIORITY_MAX_YIELD = env.float("VTEX_PRIORITY_MAX_YIELD", default=30.0)
+VTEX_PRIORITY_MIN_RUN = env.float("VTEX_PRIORITY_MIN_RUN", default=10.0)
+# ON_DEMAND upload batches sent in a row before a DEFAULT batch gets its turn
+META_UPLOAD_MAX_PRIORITY_STREAK = env.int("META_UPLOAD_MAX_PRIORITY_STREAK", default=5)
+
+# Bytes of synced products kept in memory while waiting to be saved, beyond which they
+# spill to a temporary file in VTEX_RESULTS_SPILL_DIR (0 keeps them all in memory)
+VTEX_RESULTS_MAX_MEMORY = env.int("VTEX_RESULTS_MAX_MEMORY", default=64 * 1024 * 1024)
+VTEX_RESULTS_SPILL_DIR = env.str("VTEX_RESULTS_SPILL_DIR", default="")
+
+# Batches of at least this many products are saved to UploadProduct with COPY (0 disables)
+UPLOAD_PRODUCT_COPY_MIN_ROWS = env.int("UPLOAD_PRODUCT_COPY_MIN_ROWS", default=1000)
+
+# DEFAULT uploads of at least this many pending products are sent to Meta as one product
+# feed file instead of items_batch calls (0 disables)
+META_FEED_UPLOAD_MIN_PRODUCTS = env.int("META_FEED_UPLOAD_MIN_PRODUCTS", default=20000)
+# The upload session of a feed file is checked every this many seconds until Meta processed
+# it, and its products go back to pending once the checks run out
+META_FEED_UPLOAD_CHECK_DELAY = env.int("META_FEED_UPLOAD_CHECK_DELAY", default=60)
+META_FEED_UPLOAD_CHECK_MAX_ATTEMPTS = env.int(
+    "META_FEED_UPLOAD_CHECK_MAX_ATTEMPTS", default=60
+)
+
+# Catalog reconciliation skips its deletions when they exceed this share of the Meta catalog
+META_RECONCILE_MAX_DELETE_RATIO = env.float(
+    "META_RECONCILE_MAX_DELETE_RATIO", default=0.5
+)
+
+# Catalogs whose Meta product policies are synced at the same time
+META_POLICY_SYNC_MAX_CONCURRENCY = env.int(
+    "META_POLICY_SYNC_MAX_CONCURRENCY", default=8
+)
+
+# VTEX webhooks that only change the price or the stock of a SKU reuse its mirrored details
+# and send Meta a partial update with the price and availability
+VTEX_WEBHOOK_FAST_PATH_ENABLED = env.bool(
+    "VTEX_WEBHOOK_FAST_PATH_ENABLED", default=True
+)
@@ -10,6 +10,7 @@ from django.conf.urls.static import static
 from django.http import HttpResponse
 
 from marketplace.swagger import view as swagger_view
+from marketplace.core.views import circuit_breakers_view, metrics_view
 from marketplace.applications import urls as applications_urls
 from marketplace.interactions import urls as interactions_urls
 from marketplace.webhooks import urls as webhooks_urls
@@ -32,6 +33,12 @@ api_urls = [
 urlpatterns = [
     path("", index),
     path("docs", swagger_view),
+    path("metrics", metrics_view, name="metrics"),
+    path(
+        "admin/circuit-breakers/",
+        admin.site.admin_view(circuit_breakers_view),
+        name="circuit-breakers",
+    ),
     path("admin", admin.site.urls),
     path("api/v1/", include(api_urls)),
 ]
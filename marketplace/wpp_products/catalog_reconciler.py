@@ -0,0 +1,202 @@
+import logging
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+
+from marketplace.clients.facebook.client import FacebookClient
+from marketplace.services.vtex.utils.webhook_items import webhook_item
+from marketplace.wpp_products.fingerprints import META_PRODUCT_FIELDS, has_drifted
+from marketplace.wpp_products.models import (
+    Catalog,
+    ProductFingerprint,
+    ProductValidation,
+    VtexProductMirror,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CatalogDiff:
+    """
+    Changes needed for a Meta catalog to match its VTEX store. `create` and
+    `update` hold seller#sku items to sync, `delete` the Meta retailer IDs.
+    """
+
+    create: List[str] = field(default_factory=list)
+    update: List[str] = field(default_factory=list)
+    delete: List[str] = field(default_factory=list)
+    meta_products: int = 0
+
+    @property
+    def to_sync(self) -> List[str]:
+        return self.create + self.update
+
+
+class CatalogReconciler:
+    """
+    Compares what a Meta catalog holds with what its VTEX store says it
+    should hold, so that only the drift is pushed.
+
+    The Meta catalog is read page by page, and each page is compared with
+    the VTEX SKU IDs and the fingerprints of the products last sent:
+    - products whose SKU is no longer in VTEX are deleted;
+    - products whose fields differ from what was sent are synced again;
+    - VTEX SKUs missing from Meta and never processed, absent from the
+      product mirror, are synced for the sellers found in the catalog.
+    Synced items go through the regular pipeline, so the business rules
+    still decide what reaches Meta. Deletions are skipped when they exceed
+    `max_delete_ratio` of the catalog, which points at a broken SKU list.
+    """
+
+    DELETE_BATCH_SIZE = 1000
+    # SKU IDs per query when looking them up in the product mirror
+    MIRROR_LOOKUP_SIZE = 5000
+
+    def __init__(
+        self,
+        catalog: Catalog,
+        vtex_skus: Iterable[Any],
+        client: Optional[FacebookClient] = None,
+        page_size: int = 2000,
+        max_delete_ratio: Optional[float] = None,
+    ) -> None:
+        self.catalog = catalog
+        self.vtex_skus: Set[str] = {str(sku_id) for sku_id in vtex_skus}
+        if client is None:
+            app = catalog.app
+            client = FacebookClient(app.apptype.get_system_access_token(app))
+        self.client = client
+        self.page_size = page_size
+        self.max_delete_ratio = (
+            settings.META_RECONCILE_MAX_DELETE_RATIO
+            if max_delete_ratio is None
+            else max_delete_ratio
+        )
+
+    def diff(self) -> CatalogDiff:
+        diff = CatalogDiff()
+        if not self.vtex_skus:
+            logger.warning(
+                f"No VTEX SKUs for catalog {self.catalog.name}, skipping reconciliation"
+            )
+            return diff
+
+        meta_skus: Set[str] = set()
+        sellers: Set[str] = set()
+        pages = self.client.iter_catalog_products(
+            self.catalog.facebook_catalog_id, META_PRODUCT_FIELDS, self.page_size
+        )
+        for page in pages:
+            self._compare_page(page, diff, meta_skus, sellers)
+
+        missing = self.vtex_skus - meta_skus - self._invalid_skus()
+        for sku_id in sorted(self._never_processed(missing)):
+            diff.create.extend(
+                webhook_item(seller, sku_id) for seller in sorted(sellers)
+            )
+
+        if diff.delete and (
+            len(diff.delete) > diff.meta_products * self.max_delete_ratio
+        ):
+            logger.error(
+                f"Reconciliation of catalog {self.catalog.name} would delete "
+                f"{len(diff.delete)} of {diff.meta_products} products, skipping "
+                "the deletions"
+            )
+            diff.delete = []
+
+        logger.info(
+            f"Reconciled catalog {self.catalog.name}: {diff.meta_products} "
+            f"products on Meta, {len(diff.create)} to create, "
+            f"{len(diff.update)} to update, {len(diff.delete)} to delete"
+        )
+        return diff
+
+    def _compare_page(
+        self,
+        page: List[Dict[str, Any]],
+        diff: CatalogDiff,
+        meta_skus: Set[str],
+        sellers: Set[str],
+    ) -> None:
+        retailer_ids = [p["retailer_id"] for p in page if p.get("retailer_id")]
+        fingerprints = {
+            facebook_product_id: (fingerprint, availability)
+            for facebook_product_id, fingerprint, availability in (
+                ProductFingerprint.objects.filter(
+                    catalog=self.catalog, facebook_product_id__in=retailer_ids
+                ).values_list("facebook_product_id", "fingerprint", "availability")
+            )
+        }
+
+        for product in page:
+            retailer_id = product.get("retailer_id")
+            if not retailer_id:
+                continue
+            diff.meta_products += 1
+            # Catalogs unifying the ID with the sales channel use
+            # "sku#seller#channel", the channel is not part of the item.
+            sku_id, seller = (retailer_id.split("#") + [""])[:2]
+            meta_skus.add(sku_id)
+            if seller:
+                sellers.add(seller)
+
+            if sku_id not in self.vtex_skus:
+                diff.delete.append(retailer_id)
+                continue
+
+            sent = fingerprints.get(retailer_id)
+            if seller and sent and has_drifted(sent, product):
+                diff.update.append(webhook_item(seller, sku_id))
+
+    def _invalid_skus(self) -> Set[str]:
+        """SKUs rejected by the Meta policies, kept out of the catalog."""
+        return {
+            str(sku_id)
+            for sku_id in ProductValidation.objects.filter(
+                catalog=self.catalog, is_valid=False
+            ).values_list("sku_id", flat=True)
+        }
+
+    def _never_processed(self, sku_ids: Set[str]) -> Set[str]:
+        """
+        The SKUs absent from the product mirror. The others went through the
+        pipeline already, and are left out of Meta by the business rules.
+        """
+        vtex_app = self.catalog.vtex_app
+        if not settings.VTEX_PRODUCT_MIRROR_ENABLED or vtex_app is None:
+            return sku_ids
+
+        remaining = set(sku_ids)
+        pending = sorted(sku_ids)
+        for start in range(0, len(pending), self.MIRROR_LOOKUP_SIZE):
+            chunk = pending[start : start + self.MIRROR_LOOKUP_SIZE]  # noqa: E203
+            remaining.difference_update(
+                VtexProductMirror.objects.filter(
+                    vtex_app=vtex_app, sku_id__in=chunk
+                ).values_list("sku_id", flat=True)
+            )
+        return remaining
+
+    def delete(self, retailer_ids: List[str]) -> None:
+        """
+        Deletes the products from the Meta catalog and their fingerprints.
+        """
+        for start in range(0, len(retailer_ids), self.DELETE_BATCH_SIZE):
+            chunk = retailer_ids[start : start + self.DELETE_BATCH_SIZE]  # noqa: E203
+            self.client.delete_products_in_batch(
+                self.catalog.facebook_catalog_id,
+                [{"method": "DELETE", "retailer_id": rid} for rid in chunk],
+            )
+            ProductFingerprint.objects.filter(
+                catalog=self.catalog, facebook_product_id__in=chunk
+            ).delete()
+        if retailer_ids:
+            logger.info(
+                f"Deleted {len(retailer_ids)} products from catalog "
+                f"{self.catalog.name}"
+            )
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Tuple
+
+from django.db import connection
+from django.utils import timezone
+
+from marketplace.wpp_products.models import Catalog, ProductFingerprint
+
+
+logger = logging.getLogger(__name__)
+
+
+# Fields of a product payload compared with the Meta catalog, with the names
+# Meta returns them under. Prices are left out, Meta returns them formatted.
+# The availability is stored apart, partial price and stock updates change it.
+FINGERPRINT_FIELDS = (
+    ("title", "name"),
+    ("brand", "brand"),
+    ("link", "url"),
+    ("image_link", "image_url"),
+)
+
+# Fields requested when reading the products of a Meta catalog
+META_PRODUCT_FIELDS = ",".join(
+    ["retailer_id", "availability"]
+    + [meta_field for _, meta_field in FINGERPRINT_FIELDS]
+)
+
+FINGERPRINT_TABLE = ProductFingerprint._meta.db_table
+
+UPSERT_SQL = (
+    f"INSERT INTO {FINGERPRINT_TABLE} "
+    "(catalog_id, facebook_product_id, fingerprint, availability, modified_on) "
+    "VALUES {values} "
+    "ON CONFLICT (catalog_id, facebook_product_id) DO UPDATE "
+    "SET fingerprint = EXCLUDED.fingerprint, "
+    "availability = EXCLUDED.availability, modified_on = EXCLUDED.modified_on"
+)
+
+
+def _normalize(value: Any) -> str:
+    return str(value or "").strip()
+
+
+def _digest(values: Iterable[Any]) -> str:
+    normalized = [_normalize(value) for value in values]
+    return hashlib.md5(json.dumps(normalized).encode()).hexdigest()
+
+
+def payload_fingerprint(data: Dict[str, Any]) -> str:
+    """Fingerprint of a product payload sent to Meta."""
+    return _digest(data.get(field) for field, _ in FINGERPRINT_FIELDS)
+
+
+def meta_fingerprint(product: Dict[str, Any]) -> str:
+    """Fingerprint of a product read from a Meta catalog."""
+    return _digest(product.get(meta_field) for _, meta_field in FINGERPRINT_FIELDS)
+
+
+def has_drifted(sent: Tuple[str, str], product: Dict[str, Any]) -> bool:
+    """
+    Whether a product read from a Meta catalog differs from the fingerprint
+    and availability last sent for it.
+    """
+    fingerprint, availability = sent
+    return fingerprint != meta_fingerprint(product) or availability != _normalize(
+        product.get("availability")
+    )
+
+
+def record_fingerprints(
+    catalog: Catalog, payloads: Iterable[Dict[str, Any]], batch_size: int = 1000
+) -> None:
+    """
+    Store the fingerprints of the products sent to the catalog, one upsert
+    statement per `batch_size` products. Partial price and stock updates
+    lack the fingerprinted fields and only update the availability stored.
+    Failures are logged, a missing fingerprint only makes the reconciliation
+    skip the product.
+    """
+    batch = {}
+    availabilities = {}
+    for data in payloads:
+        if not data.get("id"):
+            continue
+        if "title" in data:
+            batch[data["id"]] = (
+                payload_fingerprint(data),
+                _normalize(data.get("availability")),
+            )
+        elif "availability" in data:
+            availabilities[data["id"]] = _normalize(data["availability"])
+        if len(batch) >= batch_size:
+            _upsert(catalog, batch)
+            batch = {}
+        if len(availabilities) >= batch_size:
+            _update_availabilities(catalog, availabilities)
+            availabilities = {}
+    if batch:
+        _upsert(catalog, batch)
+    if availabilities:
+        _update_availabilities(catalog, availabilities)
+
+
+def _upsert(catalog: Catalog, fingerprints: Dict[str, Tuple[str, str]]) -> None:
+    now = timezone.now()
+    params = []
+    for facebook_product_id, (fingerprint, availability) in fingerprints.items():
+        params.extend((catalog.id, facebook_product_id, fingerprint, availability, now))
+    values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(fingerprints))
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(UPSERT_SQL.format(values=values), params)
+    except Exception as e:
+        logger.error(
+            f"Failed to record {len(fingerprints)} product fingerprints of "
+            f"catalog {catalog.name}: {e}"
+        )
+
+
+def _update_availabilities(catalog: Catalog, availabilities: Dict[str, str]) -> None:
+    # One update per availability value, there are only a couple of them
+    by_value = defaultdict(list)
+    for facebook_product_id, availability in availabilities.items():
+        by_value[availability].append(facebook_product_id)
+    try:
+        for availability, product_ids in by_value.items():
+            ProductFingerprint.objects.filter(
+                catalog=catalog, facebook_product_id__in=product_ids
+            ).update(availability=availability, modified_on=timezone.now())
+    except Exception as e:
+        logger.error(
+            f"Failed to update {len(availabilities)} product availabilities of "
+            f"catalog {catalog.name}: {e}"
+        )
@@ -0,0 +1,104 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from marketplace.services.vtex.benchmark.runner import (
+    BenchmarkScenario,
+    SyncBenchmark,
+    compare_with_baseline,
+    load_result,
+    save_result,
+)
+
+
+def _csv(value: str):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the VTEX product sync against a local fake VTEX server, "
+        "using the configured Redis and Postgres."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--name", default="default")
+        parser.add_argument("--skus", type=int, default=1000)
+        parser.add_argument("--sellers", type=int, default=1)
+        parser.add_argument("--sales-channels", type=_csv, default=[], help="e.g. 1,2")
+        parser.add_argument(
+            "--rules", type=_csv, default=[], help="e.g. currency_pt_br"
+        )
+        parser.add_argument("--workers", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--latency",
+            default="lognormal:0.05:0.5",
+            help="Latency of the fake VTEX, as fixed:a, uniform:a:b or lognormal:median:sigma",
+        )
+        parser.add_argument("--details-latency")
+        parser.add_argument("--simulation-latency")
+        parser.add_argument("--error-rate", type=float, default=0.0)
+        parser.add_argument(
+            "--error-statuses", type=lambda value: tuple(map(int, _csv(value)))
+        )
+        parser.add_argument("--unavailable-ratio", type=float, default=0.1)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", help="Save the run as a JSON baseline")
+        parser.add_argument("--baseline", help="Compare the run with a JSON baseline")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.1,
+            help="Relative change accepted before failing the comparison",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            scenario = BenchmarkScenario(
+                name=options["name"],
+                skus=options["skus"],
+                sellers=options["sellers"],
+                sales_channels=options["sales_channels"],
+                rules=options["rules"],
+                workers=options["workers"],
+                batch_size=options["batch_size"],
+                latency=options["latency"],
+                details_latency=options["details_latency"],
+                simulation_latency=options["simulation_latency"],
+                error_rate=options["error_rate"],
+                error_statuses=options["error_statuses"] or (503,),
+                unavailable_ratio=options["unavailable_ratio"],
+                seed=options["seed"],
+            )
+            scenario.server_config()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        result = SyncBenchmark(scenario).run()
+        pipeline = result["pipeline"]
+        self.stdout.write(
+            f"{scenario.skus} SKUs in {result['elapsed']}s: "
+            f"{result['skus_per_sec']} SKUs/s, peak RSS {result['peak_rss_mb']} MB, "
+            f"{result['redis_commands_per_sku']} Redis commands/SKU, "
+            f"{result['db_queries_per_sku']} DB queries/SKU, "
+            f"worker utilization {pipeline['worker_utilization']}"
+        )
+        self.stdout.write(json.dumps(pipeline["stages"], indent=2))
+
+        if options["output"]:
+            save_result(result, options["output"])
+            self.stdout.write(f"Saved to {options['output']}")
+
+        if options["baseline"]:
+            comparison = compare_with_baseline(
+                result, load_result(options["baseline"]), options["tolerance"]
+            )
+            for row in comparison:
+                flag = " REGRESSION" if row["regression"] else ""
+                self.stdout.write(
+                    f"{row['metric']}: {row['baseline']} -> {row['current']} "
+                    f"({row['change']:+.1%}){flag}"
+                )
+            if any(row["regression"] for row in comparison):
+                raise CommandError("Benchmark regressed compared with the baseline")
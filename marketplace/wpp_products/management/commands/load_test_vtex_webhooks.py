@@ -0,0 +1,97 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from marketplace.services.vtex.benchmark.runner import save_result
+from marketplace.services.vtex.benchmark.webhook_load import (
+    WebhookLoadScenario,
+    WebhookLoadTest,
+)
+
+
+def _csv(value: str):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the VTEX webhook path, from the notification endpoint to the "
+        "upload to a fake Meta, with in-process workers and the configured "
+        "Redis and Postgres."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--name", default="webhooks")
+        parser.add_argument("--skus", type=int, default=1000)
+        parser.add_argument("--sellers", type=int, default=1)
+        parser.add_argument(
+            "--rules", type=_csv, default=[], help="e.g. unifies_id_with_seller"
+        )
+        parser.add_argument("--bursts", type=int, default=5)
+        parser.add_argument("--burst-size", type=int, default=200)
+        parser.add_argument(
+            "--burst-interval", type=float, default=2.0, help="Seconds between bursts"
+        )
+        parser.add_argument(
+            "--posters", type=int, default=8, help="Concurrent webhook senders"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=4, help="Worker threads per queue"
+        )
+        parser.add_argument(
+            "--upload-delay",
+            type=int,
+            help="Seconds between upload batches, META_UPLOAD_PRODUCT_DELAY_DEFAULT by default",
+        )
+        parser.add_argument("--vtex-latency", default="lognormal:0.05:0.5")
+        parser.add_argument("--meta-latency", default="lognormal:0.3:0.4")
+        parser.add_argument("--meta-error-rate", type=float, default=0.0)
+        parser.add_argument("--drain-timeout", type=float, default=600.0)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", help="Save the report as JSON")
+
+    def handle(self, *args, **options):
+        scenario = WebhookLoadScenario(
+            name=options["name"],
+            skus=options["skus"],
+            sellers=options["sellers"],
+            rules=options["rules"],
+            bursts=options["bursts"],
+            burst_size=options["burst_size"],
+            burst_interval=options["burst_interval"],
+            posters=options["posters"],
+            concurrency=options["concurrency"],
+            upload_delay=options["upload_delay"],
+            vtex_latency=options["vtex_latency"],
+            meta_latency=options["meta_latency"],
+            meta_error_rate=options["meta_error_rate"],
+            drain_timeout=options["drain_timeout"],
+            seed=options["seed"],
+        )
+        try:
+            scenario.vtex_config()
+            scenario.meta_config()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        result = WebhookLoadTest(scenario).run()
+        latency = result["webhook_latency_ms"]
+        time_to_meta = result["time_to_meta_s"]
+        self.stdout.write(
+            f"{result['webhooks_sent']} webhooks in {result['send_duration']}s, "
+            f"p99 latency {latency['p99']} ms; "
+            f"{result['skus_delivered']}/{result['skus_notified']} SKUs reached Meta, "
+            f"time to Meta p50 {time_to_meta['p50']}s p99 {time_to_meta['p99']}s; "
+            f"queue lag p99 {result['queue_lag_s']['p99']}s; "
+            f"{result['db_rows_written_per_product']} rows written per product"
+        )
+        self.stdout.write(json.dumps(result["tasks"], indent=2))
+
+        if options["output"]:
+            save_result(result, options["output"])
+            self.stdout.write(f"Saved to {options['output']}")
+
+        if not result["drained"]:
+            raise CommandError(
+                f"The workers did not drain within {scenario.drain_timeout}s"
+            )
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("applications", "0017_alter_app_platform"),
+        ("wpp_products", "0014_auto_20250912_1456"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VtexProductMirror",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sku_id", models.CharField(max_length=50)),
+                ("details", models.JSONField()),
+                ("modified_on", models.DateTimeField(auto_now=True)),
+                (
+                    "vtex_app",
+                    models.ForeignKey(
+                        limit_choices_to={"code": "vtex"},
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="vtex_product_mirror",
+                        to="applications.app",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "VTEX Product Mirror",
+                "verbose_name_plural": "VTEX Product Mirror",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="vtexproductmirror",
+            constraint=models.UniqueConstraint(
+                fields=("vtex_app", "sku_id"), name="unique_sku_id_per_vtex_app"
+            ),
+        ),
+    ]
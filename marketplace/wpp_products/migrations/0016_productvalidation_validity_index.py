@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wpp_products", "0015_vtexproductmirror"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="productvalidation",
+            index=models.Index(
+                fields=["catalog", "sku_id", "is_valid"],
+                name="wpp_product_catalog_c71645_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wpp_products", "0016_productvalidation_validity_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="uploadproduct",
+            index=models.Index(
+                fields=["catalog", "status", "priority"],
+                name="wpp_product_catalog_8bb58e_idx",
+            ),
+        ),
+    ]
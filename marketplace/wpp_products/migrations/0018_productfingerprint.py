@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wpp_products", "0017_uploadproduct_priority_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductFingerprint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("facebook_product_id", models.CharField(max_length=100)),
+                ("fingerprint", models.CharField(max_length=32)),
+                ("modified_on", models.DateTimeField(auto_now=True)),
+                (
+                    "catalog",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="product_fingerprints",
+                        to="wpp_products.catalog",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="productfingerprint",
+            constraint=models.UniqueConstraint(
+                fields=("catalog", "facebook_product_id"),
+                name="unique_fingerprint_per_catalog_product",
+            ),
+        ),
+    ]
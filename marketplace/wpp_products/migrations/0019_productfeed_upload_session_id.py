@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wpp_products", "0018_productfingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productfeed",
+            name="upload_session_id",
+            field=models.CharField(blank=True, max_length=30, null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+def delete_fingerprints(apps, schema_editor):
+    # The stored fingerprints include the availability, now kept apart. They
+    # are recorded again by the next uploads, until then the reconciliation
+    # skips the products.
+    apps.get_model("wpp_products", "ProductFingerprint").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wpp_products", "0019_productfeed_upload_session_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productfingerprint",
+            name="availability",
+            field=models.CharField(blank=True, default="", max_length=20),
+        ),
+        migrations.RunPython(delete_fingerprints, migrations.RunPython.noop),
+    ]
@@ -71,6 +71,8 @@ class ProductFeed(BaseModel):
     facebook_feed_id = models.CharField(max_length=30, unique=True)
     name = models.CharField(max_length=100)
     catalog = models.ForeignKey(Catalog, on_delete=models.CASCADE, related_name="feeds")
+    # Upload session of the feed file Meta is still processing
+    upload_session_id = models.CharField(max_length=30, null=True, blank=True)
     created_by = models.ForeignKey(
         "accounts.User",
         on_delete=models.PROTECT,
@@ -151,6 +153,7 @@ class UploadProduct(models.Model):
             models.Index(fields=["catalog", "feed", "status"]),
             models.Index(fields=["facebook_product_id"]),
             models.Index(fields=["modified_on"]),
+            models.Index(fields=["catalog", "status", "priority"]),
         ]
 
     @classmethod
@@ -186,7 +189,12 @@ class UploadProduct(models.Model):
 
     @classmethod
     def get_latest_products(
-        cls, catalog: Catalog, status: str = "pending", batch_size: Optional[int] = None
+        cls,
+        catalog: Catalog,
+        status: str = "pending",
+        batch_size: Optional[int] = None,
+        min_priority: Optional[int] = None,
+        max_priority: Optional[int] = None,
     ) -> QuerySet:
         """
         Fetches the most relevant product for each unique `facebook_product_id`,
@@ -202,6 +210,8 @@ class UploadProduct(models.Model):
             catalog (Catalog): The catalog to filter products for.
             status (str, optional): The processing status to filter on. Default is "pending".
             batch_size (int, optional): Limits the number of products returned.
+            min_priority (int, optional): Only products with an entry of at least this priority.
+            max_priority (int, optional): Only products with an entry of at most this priority.
 
         Returns:
             QuerySet: A queryset of the most relevant UploadProduct instances.
@@ -216,9 +226,14 @@ class UploadProduct(models.Model):
             .values("id")[:1]
         )
 
+        products = cls.objects.filter(catalog=catalog, status=status)
+        if min_priority is not None:
+            products = products.filter(priority__gte=min_priority)
+        if max_priority is not None:
+            products = products.filter(priority__lte=max_priority)
+
         ids = (
-            cls.objects.filter(catalog=catalog, status=status)
-            .values("facebook_product_id")
+            products.values("facebook_product_id")
             .annotate(best_id=Subquery(inner_query))
             .values_list("best_id", flat=True)
         )
@@ -280,7 +295,66 @@ class ProductValidation(models.Model):
         indexes = [
             models.Index(fields=["catalog"]),
             models.Index(fields=["sku_id"]),
+            # Covers the validity lookups of a set of SKUs of a catalog
+            models.Index(fields=["catalog", "sku_id", "is_valid"]),
         ]
 
     def __str__(self):
         return f"{self.catalog.name} - {self.sku_id} - {'Valid' if self.is_valid else 'Invalid'}"
+
+
+class VtexProductMirror(models.Model):
+    """
+    Normalized VTEX details of a SKU, refreshed by the syncs and webhooks and
+    read by the on-demand inline sync instead of calling VTEX.
+    """
+
+    vtex_app = models.ForeignKey(
+        App,
+        on_delete=models.CASCADE,
+        related_name="vtex_product_mirror",
+        limit_choices_to={"code": "vtex"},
+    )
+    sku_id = models.CharField(max_length=50)
+    details = JSONField()
+    modified_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "VTEX Product Mirror"
+        verbose_name_plural = "VTEX Product Mirror"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vtex_app", "sku_id"],
+                name="unique_sku_id_per_vtex_app",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.vtex_app_id} - {self.sku_id}"
+
+
+class ProductFingerprint(models.Model):
+    """
+    Fingerprint of the fields of a product last sent to a Meta catalog,
+    compared by the catalog reconciliation with what the catalog holds.
+    """
+
+    catalog = models.ForeignKey(
+        Catalog, on_delete=models.CASCADE, related_name="product_fingerprints"
+    )
+    facebook_product_id = models.CharField(max_length=100)
+    fingerprint = models.CharField(max_length=32)
+    # Kept apart from the fingerprint, partial price and stock updates change it
+    availability = models.CharField(max_length=20, blank=True, default="")
+    modified_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["catalog", "facebook_product_id"],
+                name="unique_fingerprint_per_catalog_product",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.catalog_id} - {self.facebook_product_id}"
@@ -0,0 +1,309 @@
+import csv
+import gzip
+import io
+import logging
+import tempfile
+
+from typing import Callable, IO, Iterator, List, Optional, Set, Tuple
+
+from django.conf import settings
+
+from marketplace.services.facebook.service import FacebookService
+from marketplace.services.vtex.utils.enums import ProductPriority
+from marketplace.services.vtex.utils.sync_progress import SyncProgress
+from marketplace.wpp_products.fingerprints import record_fingerprints
+from marketplace.wpp_products.models import (
+    Catalog,
+    ProductFeed,
+    ProductUploadLog,
+    UploadProduct,
+)
+from marketplace.wpp_products.utils import extract_sku_id
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProductFeedUploader:
+    """
+    Sends the pending products of a catalog to Meta as one product feed file,
+    instead of thousands of items_batch calls.
+
+    The pending products are claimed for the feed of the catalog, streamed
+    from the database in chunks into a gzip compressed TSV file on disk and
+    uploaded in a single request. Only the latest row of each product is
+    written. The upload is update-only, so products missing from the file
+    are kept in the catalog. The products stay in processing until the
+    upload session tells Meta processed the file. If the upload fails the
+    products go back to pending, for the batch uploader. Partial price and stock updates do not
+    fit the columns of the file and are left to the batch uploader too, as
+    are the on demand products, which must not wait for Meta to process a
+    file.
+    """
+
+    FEED_NAME = "Weni VTEX products"
+    FILE_NAME = "products.tsv.gz"
+    FIELDS = (
+        "id",
+        "title",
+        "description",
+        "availability",
+        "status",
+        "condition",
+        "price",
+        "link",
+        "image_link",
+        "brand",
+        "sale_price",
+        "additional_image_link",
+        "rich_text_description",
+    )
+
+    def __init__(
+        self, catalog: Catalog, fb_service: FacebookService, chunk_size: int = 2000
+    ) -> None:
+        self.catalog = catalog
+        self.fb_service = fb_service
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def should_upload(catalog: Catalog) -> bool:
+        """
+        Whether the catalog has at least META_FEED_UPLOAD_MIN_PRODUCTS pending
+        with the default priority.
+        """
+        min_products = settings.META_FEED_UPLOAD_MIN_PRODUCTS
+        if min_products <= 0:
+            return False
+        pending = UploadProduct.objects.filter(
+            catalog=catalog, status="pending", priority=ProductPriority.DEFAULT
+        )
+        first = min_products - 1
+        return pending.values("id")[first:min_products].exists()
+
+    def get_or_create_feed(self) -> ProductFeed:
+        feed = self.catalog.feeds.filter(name=self.FEED_NAME).first()
+        if feed:
+            return feed
+
+        response = self.fb_service.create_product_feed(
+            self.catalog.facebook_catalog_id, self.FEED_NAME
+        )
+        logger.info(f"Created product feed {response['id']} for {self.catalog.name}")
+        return ProductFeed.objects.create(
+            facebook_feed_id=response["id"],
+            name=self.FEED_NAME,
+            catalog=self.catalog,
+        )
+
+    def upload(self, heartbeat: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Uploads the pending products as a feed file. `heartbeat` is called
+        after each chunk written, to renew the upload lock.
+
+        The products stay in processing until Meta processed the file, see
+        `check_upload`. Returns whether the products were sent.
+        """
+        feed = self.get_or_create_feed()
+        if feed.upload_session_id and not self._previous_upload_done(feed):
+            # One file at a time per feed, the products wait for the next run
+            return False
+
+        claimed = UploadProduct.objects.filter(
+            catalog=self.catalog,
+            status="pending",
+            priority=ProductPriority.DEFAULT,
+            data__has_key="title",
+        ).update(status="processing", feed=feed)
+        if not claimed:
+            return True
+
+        try:
+            with tempfile.TemporaryFile(prefix="meta-feed-") as feed_file:
+                written = self.write_feed(feed, feed_file, heartbeat)
+                feed_file.seek(0)
+                response = self.fb_service.upload_product_feed(
+                    feed.facebook_feed_id, feed_file, self.FILE_NAME
+                )
+            if not response.get("id"):
+                raise ValueError(f"Unexpected response: {response}")
+        except Exception as e:
+            logger.error(
+                f"Error uploading feed {feed.facebook_feed_id} for "
+                f"{self.catalog.name}, products back to pending: {e}",
+                exc_info=True,
+            )
+            self._claimed(feed).update(status="pending", feed=None)
+            return False
+
+        feed.upload_session_id = response["id"]
+        feed.save(update_fields=["upload_session_id"])
+        logger.info(
+            f"Uploaded {written} products to feed {feed.facebook_feed_id} of "
+            f"{self.catalog.name}, upload session {response['id']}"
+        )
+        return True
+
+    def check_upload(self, feed: ProductFeed) -> Optional[bool]:
+        """
+        Checks the upload session of the feed. Once Meta processed the file
+        the products it took are marked success and fingerprinted, the ones
+        it rejected are marked error, for the batch uploader.
+
+        Returns None while Meta is processing the file, otherwise whether
+        every product was taken.
+        """
+        session_id = feed.upload_session_id
+        session = self.fb_service.get_product_feed_upload(session_id)
+        if not session.get("end_time"):
+            return None
+
+        rejected = self._rejected_products(session_id)
+        if not self._release_session(feed, session_id):
+            # Another worker already handled this session
+            return None
+
+        invalid = session.get("num_invalid_items") or 0
+        if invalid > len(rejected):
+            # The errors only sample the products, so the rejected ones are
+            # unknown: the batch uploader sends them all again
+            logger.error(
+                f"Upload session {session_id} of {self.catalog.name} rejected "
+                f"{invalid} products, sent again by the batch uploader"
+            )
+            self._claimed(feed).update(status="pending", feed=None)
+            return False
+
+        claimed = self._claimed(feed)
+        if rejected:
+            logger.warning(
+                f"Upload session {session_id} of {self.catalog.name} rejected "
+                f"{len(rejected)} products"
+            )
+            claimed.filter(facebook_product_id__in=rejected).update(status="error")
+
+        self.log_sent_products(feed)
+        record_fingerprints(
+            self.catalog,
+            (data for _, data in self._latest_rows(feed)),
+            batch_size=self.chunk_size,
+        )
+        sent = claimed.update(status="success")
+        SyncProgress.increment(
+            self.catalog.uuid, "uploaded", session.get("num_persisted_items") or 0
+        )
+        logger.info(
+            f"Upload session {session_id} of {self.catalog.name} processed, "
+            f"{sent} rows sent"
+        )
+        return not rejected
+
+    def _previous_upload_done(self, feed: ProductFeed) -> bool:
+        try:
+            return self.check_upload(feed) is not None
+        except Exception as e:
+            logger.error(
+                f"Error checking upload session {feed.upload_session_id} of "
+                f"{self.catalog.name}: {e}"
+            )
+            return False
+
+    def abandon_upload(self, feed: ProductFeed) -> None:
+        """
+        Gives up on the upload session of the feed, its products go back to
+        pending for the batch uploader.
+        """
+        if self._release_session(feed, feed.upload_session_id):
+            self._claimed(feed).update(status="pending", feed=None)
+
+    def _rejected_products(self, session_id: str) -> Set[str]:
+        rejected = set()
+        for error in self.fb_service.list_product_feed_upload_errors(session_id):
+            if error.get("severity") != "fatal":
+                continue
+            for sample in error.get("samples", {}).get("data", []):
+                if sample.get("retailer_id"):
+                    rejected.add(sample["retailer_id"])
+        return rejected
+
+    @staticmethod
+    def _release_session(feed: ProductFeed, session_id: str) -> bool:
+        released = ProductFeed.objects.filter(
+            pk=feed.pk, upload_session_id=session_id
+        ).update(upload_session_id=None)
+        feed.upload_session_id = None
+        return bool(released)
+
+    def _claimed(self, feed: ProductFeed):
+        return UploadProduct.objects.filter(feed=feed, status="processing")
+
+    def _latest_rows(self, feed: ProductFeed) -> Iterator[Tuple[str, dict]]:
+        """
+        The data of the claimed products, one row per product, the one with
+        the highest priority and then the most recent.
+        """
+        rows = (
+            self._claimed(feed)
+            .order_by("facebook_product_id", "-priority", "-modified_on")
+            .values_list("facebook_product_id", "data")
+            .iterator(chunk_size=self.chunk_size)
+        )
+        last_id = None
+        for facebook_product_id, data in rows:
+            if facebook_product_id != last_id:
+                last_id = facebook_product_id
+                yield facebook_product_id, data
+
+    @staticmethod
+    def _clean(value) -> str:
+        if value is None:
+            return ""
+        return " ".join(str(value).replace("\t", " ").splitlines())
+
+    def write_feed(
+        self,
+        feed: ProductFeed,
+        fileobj: IO[bytes],
+        heartbeat: Optional[Callable[[], None]] = None,
+    ) -> int:
+        """
+        Writes the claimed products to `fileobj` as a gzip compressed TSV.
+        Returns the number of products written.
+        """
+        written = 0
+        gzip_file = gzip.GzipFile(fileobj=fileobj, mode="wb")
+        with io.TextIOWrapper(gzip_file, encoding="utf-8", newline="") as text:
+            writer = csv.writer(
+                text,
+                delimiter="\t",
+                quoting=csv.QUOTE_NONE,
+                quotechar=None,
+                lineterminator="\n",
+            )
+            writer.writerow(self.FIELDS)
+            for _, data in self._latest_rows(feed):
+                writer.writerow([self._clean(data.get(field)) for field in self.FIELDS])
+                written += 1
+                if heartbeat and written % self.chunk_size == 0:
+                    heartbeat()
+        return written
+
+    def log_sent_products(self, feed: ProductFeed) -> None:
+        product_ids = (
+            self._claimed(feed)
+            .values_list("facebook_product_id", flat=True)
+            .distinct()
+            .iterator(chunk_size=self.chunk_size)
+        )
+        logs: List[ProductUploadLog] = []
+        for product_id in product_ids:
+            try:
+                sku_id = extract_sku_id(product_id)
+            except ValueError:
+                continue
+            logs.append(ProductUploadLog(sku_id=sku_id, vtex_app=self.catalog.vtex_app))
+            if len(logs) >= self.chunk_size:
+                ProductUploadLog.objects.bulk_create(logs)
+                logs = []
+        if logs:
+            ProductUploadLog.objects.bulk_create(logs)
@@ -5,18 +5,34 @@ import time
 from datetime import datetime, timedelta
 
 from marketplace.services.vtex.utils.enums import ProductPriority
+from marketplace.services.vtex.utils.fair_share import (
+    FairShareDispatcher,
+    send_sync_task,
+)
+from marketplace.services.vtex.utils.seller_registry import ActiveSellerRegistry
+from marketplace.services.vtex.utils.sync_deadline import SyncDeadline
+from marketplace.services.vtex.utils.webhook_items import (
+    CHANGE_FULL,
+    CHANGE_PRICE_STOCK,
+    parse_webhook_item,
+    webhook_change_type,
+    webhook_item,
+)
 
 from celery import shared_task
 
 from django_redis import get_redis_connection
 from django.db import close_old_connections
 from django.core.cache import cache
+from django.conf import settings
 from django.utils import timezone
 
 from marketplace.clients.facebook.client import FacebookClient
+from marketplace.services.facebook.service import FacebookService
 
 from marketplace.wpp_products.models import (
     Catalog,
+    ProductFeed,
     ProductUploadLog,
     UploadProduct,
     WebhookLog,
@@ -38,7 +54,10 @@ from marketplace.wpp_products.utils import (
     SellerSyncUtils,
     UploadManager,
     ProductSyncMetaPolices,
+    RedisSemaphore,
 )
+from marketplace.wpp_products.catalog_reconciler import CatalogReconciler
+from marketplace.wpp_products.product_feed import ProductFeedUploader
 
 
 logger = logging.getLogger(__name__)
@@ -46,6 +65,13 @@ logger = logging.getLogger(__name__)
 
 SYNC_WHATSAPP_CATALOGS_LOCK_KEY = "sync-whatsapp-catalogs-lock"
 
+# Slots of the policy sync subtasks running at once
+POLICY_SYNC_SLOTS_KEY = "sync-meta-polices-slots"
+# Seconds between the attempts of a policy sync waiting for a slot, and the
+# attempts made, so that waiting subtasks do not outlive the hourly run
+POLICY_SYNC_RETRY_DELAY = 30
+POLICY_SYNC_MAX_ATTEMPTS = 100
+
 
 @shared_task(name="sync_facebook_catalogs")
 def sync_facebook_catalogs():
@@ -236,6 +262,21 @@ def task_upload_vtex_products(**kwargs):
                     )
                     uploader = ProductBatchUploader(catalog=catalog, priority=priority)
 
+            # Large DEFAULT uploads go to Meta as one feed file, the batch
+            # uploader then sends whatever is left pending
+            if priority == ProductPriority.DEFAULT and (
+                ProductFeedUploader.should_upload(uploader.catalog)
+            ):
+                sent = ProductFeedUploader(
+                    uploader.catalog, uploader.fb_service
+                ).upload(
+                    heartbeat=lambda: redis_client.expire(
+                        lock_key, lock_expiration_time
+                    )
+                )
+                if sent:
+                    _schedule_feed_upload_check(str(uploader.catalog.uuid))
+
             uploader.process_and_upload(redis_client, lock_key, lock_expiration_time)
 
         finally:
@@ -247,6 +288,55 @@ def task_upload_vtex_products(**kwargs):
     print(f"Processing upload for App: {app_vtex_uuid}")
 
 
+def _schedule_feed_upload_check(catalog_uuid: str, attempt: int = 0) -> None:
+    celery_app.send_task(
+        "task_check_product_feed_upload",
+        kwargs={"catalog_uuid": catalog_uuid, "attempt": attempt},
+        countdown=settings.META_FEED_UPLOAD_CHECK_DELAY,
+        ignore_result=True,
+    )
+
+
+@celery_app.task(name="task_check_product_feed_upload")
+def task_check_product_feed_upload(catalog_uuid: str, attempt: int = 0):
+    """
+    Checks the upload session of the product feed of a catalog, again every
+    META_FEED_UPLOAD_CHECK_DELAY seconds while Meta processes the file. The
+    products go back to pending once the checks run out.
+    """
+    feed = (
+        ProductFeed.objects.select_related("catalog__app")
+        .filter(
+            catalog__uuid=catalog_uuid,
+            name=ProductFeedUploader.FEED_NAME,
+            upload_session_id__isnull=False,
+        )
+        .first()
+    )
+    if feed is None:
+        return
+
+    app = feed.catalog.app
+    fb_service = FacebookService(
+        FacebookClient(app.apptype.get_system_access_token(app))
+    )
+    uploader = ProductFeedUploader(feed.catalog, fb_service)
+    try:
+        if uploader.check_upload(feed) is not None:
+            return
+    except Exception as e:
+        logger.error(f"Error checking the feed upload of catalog {catalog_uuid}: {e}")
+
+    if attempt + 1 >= settings.META_FEED_UPLOAD_CHECK_MAX_ATTEMPTS:
+        logger.error(
+            f"Upload session {feed.upload_session_id} of catalog {catalog_uuid} "
+            "not processed in time, products back to pending"
+        )
+        uploader.abandon_upload(feed)
+        return
+    _schedule_feed_upload_check(catalog_uuid, attempt + 1)
+
+
 @celery_app.task(name="task_cleanup_vtex_logs_and_uploads")
 def task_cleanup_vtex_logs_and_uploads():
     # Delete all records from the ProductUploadLog and WebhookLog tables
@@ -261,11 +351,12 @@ def task_cleanup_vtex_logs_and_uploads():
     if error_queryset.exists():
         error_queryset.update(status="pending")
 
-    # Update status to "pending" for records that have been "processing" for more than 20 minutes
+    # Update status to "pending" for records that have been "processing" for more than 20 minutes,
+    # except the ones of a feed file Meta is still processing
     time_threshold = timezone.now() - timedelta(minutes=20)
     in_processing = UploadProduct.objects.filter(
         status="processing", modified_on__lt=time_threshold
-    )
+    ).exclude(feed__upload_session_id__isnull=False)
     if in_processing.exists():
         in_processing.update(status="pending")
 
@@ -324,28 +415,52 @@ def send_sync(app_uuid: str, webhook: dict):
     if not seller_id:
         raise ValueError(f"Seller ID not found in webhook. App:{str(app.uuid)}")
 
+    # A seller missing from the cached active sellers means a new one
+    domain = app.config.get("api_credentials", {}).get("domain")
+    if domain:
+        ActiveSellerRegistry.invalidate_unknown_in_domain(domain, seller_id)
+
+    # Price and stock only changes skip the details fetch and send a partial update
+    change = CHANGE_FULL
+    if settings.VTEX_WEBHOOK_FAST_PATH_ENABLED:
+        change = webhook_change_type(webhook)
+
     # OPTIMIZATION: Enqueue directly without creating a Celery task
     # This is a fast Redis operation that doesn't need to be async
-    if not _enqueue_webhook(app_uuid, seller_id, sku_id):
+    if not _enqueue_webhook(app_uuid, seller_id, sku_id, change):
         return
 
     # OPTIMIZATION: Schedule dequeue with debounce to avoid creating multiple tasks
     _schedule_dequeue_with_debounce(app_uuid, celery_queue)
 
 
-def _enqueue_webhook(app_uuid: str, seller: str, sku_id: str) -> bool:
+def _enqueue_webhook(
+    app_uuid: str, seller: str, sku_id: str, change: str = CHANGE_FULL
+) -> bool:
     """
     Enqueues the seller and SKU in Redis for batch processing.
 
     This function is called directly from send_sync to avoid creating
     unnecessary Celery tasks for a simple Redis operation.
 
+    A full update queued for the SKU covers its price and stock, so a price
+    and stock only item is not queued next to it, and is replaced by it.
+
     Returns:
         bool: True if enqueued successfully, False otherwise
     """
     try:
         queue = RedisQueue(f"webhook_queue:{app_uuid}")
-        value = f"{seller}#{sku_id}"
+        value = webhook_item(seller, sku_id, change)
+        full_value = webhook_item(seller, sku_id)
+
+        if change == CHANGE_PRICE_STOCK and queue.contains(full_value):
+            logger.info(
+                f"Full update already in queue for App: {app_uuid}, Item: {value}"
+            )
+            return True
+        if change == CHANGE_FULL:
+            queue.discard(webhook_item(seller, sku_id, CHANGE_PRICE_STOCK))
 
         # Added to queue if it doesn't exist
         inserted = queue.insert(value)
@@ -493,6 +608,10 @@ def task_insert_vtex_products_by_sellers(**kwargs):
 
 @celery_app.task(name="task_sync_product_policies")
 def task_sync_product_policies():
+    """
+    Sends one policy sync subtask per catalog of the VTEX apps. The subtasks
+    run in parallel, at most META_POLICY_SYNC_MAX_CONCURRENCY at a time.
+    """
     print("Starting synchronization of product policies")
 
     try:
@@ -501,8 +620,11 @@ def task_sync_product_policies():
         for app in vtex_apps:
             catalogs = app.vtex_catalogs.all()
             for catalog in catalogs:
-                product_sync_service = ProductSyncMetaPolices(catalog)
-                product_sync_service.sync_products_polices()
+                celery_app.send_task(
+                    "task_sync_catalog_product_policies",
+                    kwargs={"catalog_uuid": str(catalog.uuid)},
+                    ignore_result=True,
+                )
 
     except Exception as e:
         logger.exception(
@@ -514,6 +636,78 @@ def task_sync_product_policies():
     print("=" * 40)
 
 
+@celery_app.task(name="task_sync_catalog_product_policies")
+def task_sync_catalog_product_policies(catalog_uuid: str, attempt: int = 0):
+    """
+    Syncs the product policies of a catalog once a slot of the global cap is
+    free, trying again every POLICY_SYNC_RETRY_DELAY seconds otherwise.
+    """
+    semaphore = RedisSemaphore(
+        POLICY_SYNC_SLOTS_KEY,
+        limit=settings.META_POLICY_SYNC_MAX_CONCURRENCY,
+        lease=ProductSyncMetaPolices.LOCK_TIMEOUT,
+    )
+    try:
+        catalog = Catalog.objects.get(uuid=catalog_uuid)
+        if ProductSyncMetaPolices(catalog).sync_products_polices(semaphore):
+            return
+    except Exception as e:
+        logger.exception(
+            f"Error syncing the product policies of catalog {catalog_uuid}: {e}"
+        )
+        return
+
+    if attempt + 1 >= POLICY_SYNC_MAX_ATTEMPTS:
+        logger.warning(
+            f"No policy sync slot for catalog {catalog_uuid}, left for the next run"
+        )
+        return
+    celery_app.send_task(
+        "task_sync_catalog_product_policies",
+        kwargs={"catalog_uuid": catalog_uuid, "attempt": attempt + 1},
+        countdown=POLICY_SYNC_RETRY_DELAY,
+        ignore_result=True,
+    )
+
+
+@celery_app.task(name="task_reconcile_vtex_catalogs")
+def task_reconcile_vtex_catalogs():
+    """
+    Compares the Meta catalogs of the VTEX apps with their stores, deleting
+    the products gone from VTEX and enqueueing the drifted or missing SKUs
+    for the webhook batch sync.
+    """
+    vtex_apps = App.objects.filter(code="vtex", configured=True)
+    for app in vtex_apps:
+        if not app.config.get("initial_sync_completed", False):
+            continue
+        try:
+            _reconcile_app_catalogs(app)
+        except Exception as e:
+            logger.exception(f"Error reconciling the catalogs of App: {app.uuid}, {e}")
+
+
+def _reconcile_app_catalogs(app: App) -> None:
+    vtex_base_service = VtexServiceBase()
+    credentials = vtex_base_service.get_vtex_credentials_or_raise(app)
+    pvt_service = vtex_base_service.get_private_service_for_credentials(credentials)
+    vtex_skus = pvt_service.list_all_skus_ids(credentials.domain)
+    app_uuid = str(app.uuid)
+    enqueued = 0
+
+    for catalog in app.vtex_catalogs.all():
+        reconciler = CatalogReconciler(catalog, vtex_skus)
+        diff = reconciler.diff()
+        reconciler.delete(diff.delete)
+
+        for item in diff.to_sync:
+            enqueued += _enqueue_webhook(app_uuid, *parse_webhook_item(item))
+
+    if enqueued:
+        celery_queue = app.config.get("celery_queue_name", "product_synchronization")
+        _schedule_dequeue_with_debounce(app_uuid, celery_queue)
+
+
 @celery_app.task(name="task_enqueue_webhook")
 def task_enqueue_webhook(app_uuid: str, seller: str, sku_id: str):
     """
@@ -566,11 +760,12 @@ def task_dequeue_webhooks(
                 print(f"No items to process for App: {app_uuid}. Stopping dequeue.")
                 break
 
-            celery_app.send_task(
+            send_sync_task(
                 "task_update_webhook_batch_products",
                 kwargs={"app_uuid": app_uuid, "batch": batch, "priority": priority},
                 queue=celery_queue,
-                ignore_result=True,
+                app_uuid=app_uuid,
+                cost=len(batch),
             )
             logger.info(f"Dispatched batch of {len(batch)} items for App: {app_uuid}.")
             print(
@@ -592,6 +787,7 @@ def task_update_webhook_batch_products(
     batch: list,
     priority: int = ProductPriority.DEFAULT,
     sales_channel: list[str] = None,
+    deadline: SyncDeadline = None,
 ):
     """
     Processes product updates in batches for a VTEX app.
@@ -609,6 +805,9 @@ def task_update_webhook_batch_products(
             ProductPriority.ON_DEMAND = on demand,
             ProductPriority.API_ONLY = inline.
         sales_channel (list[str], optional): Sales channel identifier.
+        deadline (SyncDeadline, optional): Latency budget of an inline sync, only
+            given when the task is called in-process. The items not processed in
+            time are recorded in it.
 
     Returns:
         If priority is ProductPriority.API_ONLY, returns the list of processed products.
@@ -646,6 +845,7 @@ def task_update_webhook_batch_products(
             sellers_skus=batch,
             priority=priority,
             sales_channel=sales_channel,
+            deadline=deadline,
         )
 
         # Receives a list of processed products from the service
@@ -669,3 +869,33 @@ def task_update_webhook_batch_products(
         return processed_products
 
     return None
+
+
+@celery_app.task(name="task_fair_share_run")
+def task_fair_share_run(queue: str, job: dict):
+    """
+    Runs a sync task sent by the fair-share dispatcher, keeping its slot
+    while it runs, then frees the slot and dispatches the next tasks of the
+    queue.
+    """
+    dispatcher = FairShareDispatcher(queue)
+    try:
+        with dispatcher.keep_lease(job["id"]):
+            return celery_app.tasks[job["task"]](**job["kwargs"])
+    finally:
+        try:
+            dispatcher.complete(job["id"])
+            dispatcher.dispatch()
+        except Exception as e:
+            logger.warning(f"Could not free the fair-share slot of {job['id']}: {e}")
+
+
+@celery_app.task(name="task_fair_share_dispatch")
+def task_fair_share_dispatch():
+    """
+    Dispatches the fair-share queues periodically, so tasks held by a round
+    that failed or by an expired slot are not left waiting.
+    """
+    dispatched = FairShareDispatcher.dispatch_all()
+    if dispatched:
+        logger.info(f"Fair-share dispatch sent {dispatched} tasks")
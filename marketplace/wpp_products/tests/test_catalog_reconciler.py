@@ -0,0 +1,202 @@
+import uuid
+
+from unittest.mock import MagicMock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from marketplace.applications.models import App
+from marketplace.wpp_products.catalog_reconciler import CatalogReconciler
+from marketplace.wpp_products.fingerprints import (
+    META_PRODUCT_FIELDS,
+    record_fingerprints,
+)
+from marketplace.wpp_products.models import (
+    Catalog,
+    ProductFingerprint,
+    ProductValidation,
+    VtexProductMirror,
+)
+
+
+User = get_user_model()
+
+
+def payload(retailer_id, title="Product", availability="in stock"):
+    return {
+        "id": retailer_id,
+        "title": title,
+        "availability": availability,
+        "brand": "Brand",
+        "link": f"https://store/{retailer_id}",
+        "image_link": f"https://store/{retailer_id}.jpg",
+        "price": "10.00 BRL",
+    }
+
+
+def meta_product(retailer_id, title="Product", availability="in stock"):
+    return {
+        "id": f"meta-{retailer_id}",
+        "retailer_id": retailer_id,
+        "name": title,
+        "availability": availability,
+        "brand": "Brand",
+        "url": f"https://store/{retailer_id}",
+        "image_url": f"https://store/{retailer_id}.jpg",
+    }
+
+
+class TestCatalogReconciler(TestCase):
+    def setUp(self):
+        user = User.objects.create_superuser(email="user@marketplace.ai")
+        app = App.objects.create(
+            code="wpp-cloud",
+            created_by=user,
+            project_uuid=str(uuid.uuid4()),
+            platform=App.PLATFORM_WENI_FLOWS,
+        )
+        self.vtex_app = App.objects.create(
+            code="vtex",
+            created_by=user,
+            project_uuid=app.project_uuid,
+            platform=App.PLATFORM_VTEX,
+        )
+        self.catalog = Catalog.objects.create(
+            name="Catalog", facebook_catalog_id="123", app=app, vtex_app=self.vtex_app
+        )
+        self.client = MagicMock()
+
+    def reconciler(self, vtex_skus, pages, **kwargs):
+        self.client.iter_catalog_products.return_value = iter(pages)
+        return CatalogReconciler(self.catalog, vtex_skus, client=self.client, **kwargs)
+
+    def test_computes_the_minimal_diff(self):
+        record_fingerprints(
+            self.catalog,
+            [payload("1#1"), payload("2#1"), payload("3#1", title="Old title")],
+        )
+        VtexProductMirror.objects.create(vtex_app=self.vtex_app, sku_id="6", details={})
+        ProductValidation.objects.create(
+            catalog=self.catalog, sku_id=7, is_valid=False, classification="policy"
+        )
+        pages = [
+            [meta_product("1#1"), meta_product("2#1", availability="out of stock")],
+            [meta_product("3#1", title="New title"), meta_product("4#1")],
+        ]
+
+        diff = self.reconciler([1, 2, 3, 5, 6, 7], pages).diff()
+
+        self.client.iter_catalog_products.assert_called_once_with(
+            "123", META_PRODUCT_FIELDS, 2000
+        )
+        self.assertEqual(diff.meta_products, 4)
+        self.assertEqual(diff.update, ["1#2", "1#3"])
+        self.assertEqual(diff.delete, ["4#1"])
+        self.assertEqual(diff.create, ["1#5"])
+
+    def test_products_with_the_fingerprint_sent_are_left_alone(self):
+        record_fingerprints(self.catalog, [payload("1#1", title=" Product ")])
+
+        diff = self.reconciler(["1"], [[meta_product("1#1")]]).diff()
+
+        self.assertEqual((diff.create, diff.update, diff.delete), ([], [], []))
+
+    def test_parses_retailer_ids_with_the_sales_channel(self):
+        record_fingerprints(
+            self.catalog, [payload("1#1#2", title="Old title"), payload("2#1#2")]
+        )
+        pages = [
+            [
+                meta_product("1#1#2", title="New title"),
+                meta_product("2#1#2"),
+                meta_product("4#1#2"),
+            ]
+        ]
+
+        diff = self.reconciler(["1", "2", "3"], pages).diff()
+
+        self.assertEqual(diff.update, ["1#1"])
+        self.assertEqual(diff.create, ["1#3"])
+        self.assertEqual(diff.delete, ["4#1#2"])
+
+    def test_skips_mass_deletions(self):
+        pages = [[meta_product("1#1"), meta_product("2#1"), meta_product("3#1")]]
+
+        with self.assertLogs("marketplace.wpp_products.catalog_reconciler", "ERROR"):
+            diff = self.reconciler(["1"], pages, max_delete_ratio=0.5).diff()
+
+        self.assertEqual(diff.delete, [])
+
+    def test_skips_without_vtex_skus(self):
+        diff = self.reconciler([], [[meta_product("1#1")]]).diff()
+
+        self.client.iter_catalog_products.assert_not_called()
+        self.assertEqual(diff.delete, [])
+
+    @override_settings(VTEX_PRODUCT_MIRROR_ENABLED=False)
+    def test_creates_every_missing_sku_without_the_mirror(self):
+        VtexProductMirror.objects.create(vtex_app=self.vtex_app, sku_id="2", details={})
+
+        diff = self.reconciler(["1", "2"], [[meta_product("1#1")]]).diff()
+
+        self.assertEqual(diff.create, ["1#2"])
+
+    def test_delete_removes_the_products_and_fingerprints(self):
+        record_fingerprints(self.catalog, [payload("1#1"), payload("2#1")])
+        reconciler = self.reconciler(["2"], [])
+        reconciler.DELETE_BATCH_SIZE = 1
+
+        reconciler.delete(["1#1", "3#1"])
+
+        self.assertEqual(self.client.delete_products_in_batch.call_count, 2)
+        self.client.delete_products_in_batch.assert_any_call(
+            "123", [{"method": "DELETE", "retailer_id": "1#1"}]
+        )
+        self.assertEqual(
+            list(
+                ProductFingerprint.objects.values_list("facebook_product_id", flat=True)
+            ),
+            ["2#1"],
+        )
+
+    def test_record_fingerprints_updates_the_existing_ones(self):
+        record_fingerprints(self.catalog, [payload("1#1", title="Old")])
+        record_fingerprints(self.catalog, [payload("1#1", title="New")], batch_size=1)
+
+        diff = self.reconciler(["1"], [[meta_product("1#1", title="New")]]).diff()
+
+        self.assertEqual(ProductFingerprint.objects.count(), 1)
+        self.assertEqual(diff.update, [])
+
+    def test_record_fingerprints_skips_partial_updates_of_unknown_products(self):
+        record_fingerprints(
+            self.catalog, [{"id": "1#1", "price": "8.00 BRL", "availability": "x"}]
+        )
+
+        self.assertFalse(ProductFingerprint.objects.exists())
+
+    def test_partial_updates_keep_the_availability_sent(self):
+        record_fingerprints(self.catalog, [payload("1#1"), payload("2#1")])
+        record_fingerprints(
+            self.catalog,
+            [
+                {"id": "1#1", "price": "8.00 BRL", "availability": "out of stock"},
+                {"id": "2#1", "price": "8.00 BRL", "availability": "out of stock"},
+            ],
+            batch_size=1,
+        )
+        pages = [
+            [
+                meta_product("1#1", availability="out of stock"),
+                meta_product("2#1", availability="in stock"),
+            ]
+        ]
+
+        diff = self.reconciler(["1", "2"], pages).diff()
+
+        # Stock churn is not drift, a stock change Meta missed is
+        self.assertEqual(diff.update, ["1#2"])
+        self.assertEqual(
+            ProductFingerprint.objects.get(facebook_product_id="1#1").availability,
+            "out of stock",
+        )
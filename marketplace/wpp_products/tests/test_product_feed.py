@@ -0,0 +1,281 @@
+import gzip
+import uuid
+
+from unittest.mock import Mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from marketplace.applications.models import App
+from marketplace.wpp_products.models import (
+    Catalog,
+    ProductFeed,
+    ProductFingerprint,
+    ProductUploadLog,
+    UploadProduct,
+)
+from marketplace.wpp_products.product_feed import ProductFeedUploader
+
+
+User = get_user_model()
+
+
+class TestProductFeedUploader(TestCase):
+    def setUp(self):
+        user = User.objects.create_superuser(email="user@marketplace.ai")
+        app = App.objects.create(
+            code="wpp-cloud",
+            created_by=user,
+            project_uuid=str(uuid.uuid4()),
+            platform=App.PLATFORM_WENI_FLOWS,
+        )
+        self.vtex_app = App.objects.create(
+            code="vtex",
+            created_by=user,
+            project_uuid=app.project_uuid,
+            platform=App.PLATFORM_VTEX,
+        )
+        self.catalog = Catalog.objects.create(
+            name="Catalog", facebook_catalog_id="123", app=app, vtex_app=self.vtex_app
+        )
+        self.sent = []
+        self.fb_service = Mock()
+        self.fb_service.create_product_feed.return_value = {"id": "feed-1"}
+        self.fb_service.upload_product_feed.side_effect = self.read_upload
+        self.fb_service.get_product_feed_upload.return_value = {
+            "id": "session-1",
+            "end_time": "2026-10-19T10:00:00+0000",
+            "num_invalid_items": 0,
+            "num_persisted_items": 2,
+        }
+        self.fb_service.list_product_feed_upload_errors.return_value = []
+
+    def read_upload(self, feed_id, file, file_name):
+        self.sent.append(gzip.decompress(file.read()).decode())
+        return {"id": "session-1"}
+
+    def product(self, facebook_product_id, title, priority=0, status="pending"):
+        return UploadProduct.objects.create(
+            facebook_product_id=facebook_product_id,
+            catalog=self.catalog,
+            data={
+                "id": facebook_product_id,
+                "title": title,
+                "description": "line\tone\nline two",
+                "price": "10.00 BRL",
+            },
+            status=status,
+            priority=priority,
+        )
+
+    def test_uploads_the_latest_row_of_each_product(self):
+        self.product("1#1", "Old")
+        self.product("1#1", "New")
+        self.product("2#1", "Old")
+        self.product("2#1", "Default")
+        self.product("3#1", "Sent", status="success")
+
+        self.assertTrue(ProductFeedUploader(self.catalog, self.fb_service).upload())
+
+        lines = self.sent[0].splitlines()
+        self.assertEqual(lines[0].split("\t"), list(ProductFeedUploader.FIELDS))
+        self.assertEqual(
+            [line.split("\t")[:4] for line in lines[1:]],
+            [
+                ["1#1", "New", "line one line two", ""],
+                ["2#1", "Default", "line one line two", ""],
+            ],
+        )
+        feed = ProductFeed.objects.get(catalog=self.catalog)
+        self.assertEqual(feed.facebook_feed_id, "feed-1")
+        self.assertEqual(feed.upload_session_id, "session-1")
+        self.fb_service.upload_product_feed.assert_called_once()
+        # Nothing is marked sent before Meta processed the file
+        self.assertEqual(
+            UploadProduct.objects.filter(feed=feed, status="processing").count(), 4
+        )
+        self.assertFalse(ProductUploadLog.objects.exists())
+        self.assertFalse(ProductFingerprint.objects.exists())
+
+        uploader = ProductFeedUploader(self.catalog, self.fb_service)
+        self.assertTrue(uploader.check_upload(feed))
+
+        self.fb_service.get_product_feed_upload.assert_called_once_with("session-1")
+        feed.refresh_from_db()
+        self.assertIsNone(feed.upload_session_id)
+        self.assertEqual(
+            UploadProduct.objects.filter(feed=feed, status="success").count(), 4
+        )
+        self.assertEqual(
+            sorted(ProductUploadLog.objects.values_list("sku_id", flat=True)), [1, 2]
+        )
+        self.assertEqual(
+            sorted(
+                ProductFingerprint.objects.values_list("facebook_product_id", flat=True)
+            ),
+            ["1#1", "2#1"],
+        )
+
+    def upload_and_check(self):
+        uploader = ProductFeedUploader(self.catalog, self.fb_service)
+        uploader.upload()
+        feed = ProductFeed.objects.get(catalog=self.catalog)
+        return uploader.check_upload(feed), feed
+
+    def test_products_stay_in_processing_while_meta_processes_the_file(self):
+        self.product("1#1", "Product")
+        self.fb_service.get_product_feed_upload.return_value = {"id": "session-1"}
+
+        checked, feed = self.upload_and_check()
+
+        self.assertIsNone(checked)
+        feed.refresh_from_db()
+        self.assertEqual(feed.upload_session_id, "session-1")
+        self.assertEqual(UploadProduct.objects.get().status, "processing")
+
+    def test_products_rejected_by_meta_are_marked_error(self):
+        self.product("1#1", "Product")
+        self.product("2#1", "Product")
+        self.fb_service.get_product_feed_upload.return_value["num_invalid_items"] = 1
+        self.fb_service.list_product_feed_upload_errors.return_value = [
+            {"severity": "warning", "samples": {"data": [{"retailer_id": "1#1"}]}},
+            {"severity": "fatal", "samples": {"data": [{"retailer_id": "2#1"}]}},
+        ]
+
+        with self.assertLogs("marketplace.wpp_products.product_feed", "WARNING"):
+            checked, _ = self.upload_and_check()
+
+        self.assertFalse(checked)
+        self.assertEqual(
+            dict(UploadProduct.objects.values_list("facebook_product_id", "status")),
+            {"1#1": "success", "2#1": "error"},
+        )
+        self.assertEqual(
+            list(
+                ProductFingerprint.objects.values_list("facebook_product_id", flat=True)
+            ),
+            ["1#1"],
+        )
+
+    def test_products_go_back_to_pending_when_the_rejected_ones_are_unknown(self):
+        self.product("1#1", "Product")
+        self.product("2#1", "Product")
+        self.fb_service.get_product_feed_upload.return_value["num_invalid_items"] = 2
+
+        with self.assertLogs("marketplace.wpp_products.product_feed", "ERROR"):
+            checked, _ = self.upload_and_check()
+
+        self.assertFalse(checked)
+        self.assertEqual(
+            list(UploadProduct.objects.values_list("status", "feed")),
+            [("pending", None), ("pending", None)],
+        )
+        self.assertFalse(ProductFingerprint.objects.exists())
+
+    def test_waits_for_the_previous_file_of_the_feed(self):
+        ProductFeed.objects.create(
+            facebook_feed_id="feed-0",
+            name=ProductFeedUploader.FEED_NAME,
+            catalog=self.catalog,
+            upload_session_id="session-0",
+        )
+        self.product("1#1", "Product")
+        self.fb_service.get_product_feed_upload.return_value = {"id": "session-0"}
+
+        sent = ProductFeedUploader(self.catalog, self.fb_service).upload()
+
+        self.assertFalse(sent)
+        self.fb_service.upload_product_feed.assert_not_called()
+        self.assertEqual(UploadProduct.objects.get().status, "pending")
+
+    def test_abandoned_upload_returns_the_products_to_pending(self):
+        self.product("1#1", "Product")
+        uploader = ProductFeedUploader(self.catalog, self.fb_service)
+        uploader.upload()
+        feed = ProductFeed.objects.get(catalog=self.catalog)
+
+        uploader.abandon_upload(feed)
+
+        feed.refresh_from_db()
+        self.assertIsNone(feed.upload_session_id)
+        product = UploadProduct.objects.get()
+        self.assertEqual((product.status, product.feed), ("pending", None))
+
+    def test_reuses_the_feed_of_the_catalog(self):
+        ProductFeed.objects.create(
+            facebook_feed_id="feed-0",
+            name=ProductFeedUploader.FEED_NAME,
+            catalog=self.catalog,
+        )
+        self.product("1#1", "Product")
+
+        ProductFeedUploader(self.catalog, self.fb_service).upload()
+
+        self.fb_service.create_product_feed.assert_not_called()
+        self.assertEqual(self.fb_service.upload_product_feed.call_args[0][0], "feed-0")
+
+    def test_failed_upload_returns_the_products_to_pending(self):
+        self.product("1#1", "Product")
+        self.fb_service.upload_product_feed.side_effect = Exception("timeout")
+
+        with self.assertLogs("marketplace.wpp_products.product_feed", "ERROR"):
+            uploaded = ProductFeedUploader(self.catalog, self.fb_service).upload()
+
+        self.assertFalse(uploaded)
+        product = UploadProduct.objects.get()
+        self.assertEqual((product.status, product.feed), ("pending", None))
+        self.assertFalse(ProductUploadLog.objects.exists())
+
+    def test_leaves_partial_updates_to_the_batch_uploader(self):
+        self.product("1#1", "Product")
+        partial = UploadProduct.objects.create(
+            facebook_product_id="2#1",
+            catalog=self.catalog,
+            data={"id": "2#1", "price": "8.00 BRL", "availability": "in stock"},
+        )
+
+        self.upload_and_check()
+
+        self.assertEqual(len(self.sent[0].splitlines()), 2)
+        partial.refresh_from_db()
+        self.assertEqual((partial.status, partial.feed), ("pending", None))
+        self.assertEqual(
+            list(
+                ProductFingerprint.objects.values_list("facebook_product_id", flat=True)
+            ),
+            ["1#1"],
+        )
+
+    def test_leaves_on_demand_products_to_the_batch_uploader(self):
+        self.product("1#1", "Product")
+        on_demand = self.product("2#1", "On demand", priority=1)
+
+        with override_settings(META_FEED_UPLOAD_MIN_PRODUCTS=2):
+            self.assertFalse(ProductFeedUploader.should_upload(self.catalog))
+        self.upload_and_check()
+
+        self.assertEqual(len(self.sent[0].splitlines()), 2)
+        on_demand.refresh_from_db()
+        self.assertEqual((on_demand.status, on_demand.feed), ("pending", None))
+
+    def test_renews_the_lock_while_writing(self):
+        for sku in range(5):
+            self.product(f"{sku}#1", "Product")
+        heartbeat = Mock()
+
+        ProductFeedUploader(self.catalog, self.fb_service, chunk_size=2).upload(
+            heartbeat=heartbeat
+        )
+
+        self.assertEqual(heartbeat.call_count, 2)
+
+    def test_should_upload_from_the_minimum_of_pending_products(self):
+        self.product("1#1", "Product")
+        self.product("2#1", "Product")
+
+        with override_settings(META_FEED_UPLOAD_MIN_PRODUCTS=2):
+            self.assertTrue(ProductFeedUploader.should_upload(self.catalog))
+        with override_settings(META_FEED_UPLOAD_MIN_PRODUCTS=3):
+            self.assertFalse(ProductFeedUploader.should_upload(self.catalog))
+        with override_settings(META_FEED_UPLOAD_MIN_PRODUCTS=0):
+            self.assertFalse(ProductFeedUploader.should_upload(self.catalog))
@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock, patch
 from django.test import SimpleTestCase
+from django.conf import settings
 import importlib
 import sys
 import types
@@ -206,19 +207,240 @@ class TestTasks(SimpleTestCase):
             uploader.process_and_upload.assert_called_once()
             redis.delete.assert_called()  # lock released
 
+    def test_task_upload_vtex_products_sends_large_default_uploads_as_feed(self):
+        tasks = import_tasks_module()
+        with patch("marketplace.wpp_products.tasks.App") as mock_app, patch(
+            "marketplace.wpp_products.tasks.get_redis_connection"
+        ) as mock_conn, patch(
+            "marketplace.wpp_products.tasks.ProductBatchUploader"
+        ) as mock_uploader_cls, patch(
+            "marketplace.wpp_products.tasks.ProductFeedUploader"
+        ) as mock_feed_cls, patch(
+            "marketplace.wpp_products.tasks.celery_app"
+        ) as mock_celery:
+            catalog = MagicMock()
+            catalog.vtex_app = True
+            qs = MagicMock()
+            qs.exists.return_value = True
+            qs.__iter__.return_value = iter([catalog])
+            mock_app.objects.get.return_value.vtex_catalogs.all.return_value = qs
+            redis = MagicMock()
+            redis.set.return_value = True
+            mock_conn.return_value = redis
+            uploader = mock_uploader_cls.return_value
+            mock_feed_cls.should_upload.return_value = True
+
+            tasks.task_upload_vtex_products(app_vtex_uuid="uuid", priority=0)
+
+            mock_feed_cls.assert_called_once_with(uploader.catalog, uploader.fb_service)
+            mock_feed_cls.return_value.upload.assert_called_once()
+            uploader.process_and_upload.assert_called_once()
+            mock_celery.send_task.assert_called_once_with(
+                "task_check_product_feed_upload",
+                kwargs={"catalog_uuid": str(uploader.catalog.uuid), "attempt": 0},
+                countdown=settings.META_FEED_UPLOAD_CHECK_DELAY,
+                ignore_result=True,
+            )
+
+    def test_task_check_product_feed_upload_checks_until_processed(self):
+        tasks = import_tasks_module()
+        with patch("marketplace.wpp_products.tasks.ProductFeed") as mock_feed, patch(
+            "marketplace.wpp_products.tasks.FacebookClient"
+        ), patch(
+            "marketplace.wpp_products.tasks.ProductFeedUploader"
+        ) as mock_feed_cls, patch(
+            "marketplace.wpp_products.tasks.celery_app"
+        ) as mock_celery:
+            feed = mock_feed.objects.select_related.return_value.filter.return_value
+            feed = feed.first.return_value
+            uploader = mock_feed_cls.return_value
+            uploader.check_upload.return_value = None
+
+            tasks.task_check_product_feed_upload("c1", attempt=2)
+
+            uploader.check_upload.assert_called_once_with(feed)
+            mock_celery.send_task.assert_called_once_with(
+                "task_check_product_feed_upload",
+                kwargs={"catalog_uuid": "c1", "attempt": 3},
+                countdown=settings.META_FEED_UPLOAD_CHECK_DELAY,
+                ignore_result=True,
+            )
+
+            mock_celery.send_task.reset_mock()
+            uploader.check_upload.return_value = True
+            tasks.task_check_product_feed_upload("c1", attempt=3)
+            mock_celery.send_task.assert_not_called()
+            uploader.abandon_upload.assert_not_called()
+
+    def test_task_check_product_feed_upload_gives_up_after_the_last_check(self):
+        tasks = import_tasks_module()
+        with patch("marketplace.wpp_products.tasks.ProductFeed") as mock_feed, patch(
+            "marketplace.wpp_products.tasks.FacebookClient"
+        ), patch(
+            "marketplace.wpp_products.tasks.ProductFeedUploader"
+        ) as mock_feed_cls, patch(
+            "marketplace.wpp_products.tasks.celery_app"
+        ) as mock_celery:
+            feed = mock_feed.objects.select_related.return_value.filter.return_value
+            feed = feed.first.return_value
+            uploader = mock_feed_cls.return_value
+            uploader.check_upload.side_effect = Exception("timeout")
+
+            tasks.task_check_product_feed_upload(
+                "c1", attempt=settings.META_FEED_UPLOAD_CHECK_MAX_ATTEMPTS - 1
+            )
+
+            uploader.abandon_upload.assert_called_once_with(feed)
+            mock_celery.send_task.assert_not_called()
+
+    def test_reconcile_enqueues_the_drift_and_deletes(self):
+        tasks = import_tasks_module()
+        with patch(
+            "marketplace.wpp_products.tasks.VtexServiceBase"
+        ) as mock_base_cls, patch(
+            "marketplace.wpp_products.tasks.CatalogReconciler"
+        ) as mock_reconciler_cls, patch(
+            "marketplace.wpp_products.tasks._enqueue_webhook", return_value=True
+        ) as mock_enqueue, patch(
+            "marketplace.wpp_products.tasks._schedule_dequeue_with_debounce"
+        ) as mock_schedule:
+            pvt_service = mock_base_cls.return_value.get_private_service_for_credentials
+            pvt_service.return_value.list_all_skus_ids.return_value = ["1", "2"]
+            reconciler = mock_reconciler_cls.return_value
+            reconciler.diff.return_value.to_sync = ["1#2", "1#3"]
+            reconciler.diff.return_value.delete = ["9#1"]
+            catalog = MagicMock()
+            app = MagicMock(uuid="app", config={})
+            app.vtex_catalogs.all.return_value = [catalog]
+
+            tasks._reconcile_app_catalogs(app)
+
+            mock_reconciler_cls.assert_called_once_with(catalog, ["1", "2"])
+            reconciler.delete.assert_called_once_with(["9#1"])
+            mock_enqueue.assert_any_call("app", "1", "2", "full")
+            mock_enqueue.assert_any_call("app", "1", "3", "full")
+            mock_schedule.assert_called_once_with("app", "product_synchronization")
+
+    def test_task_sync_product_policies_sends_one_task_per_catalog(self):
+        tasks = import_tasks_module()
+        with patch("marketplace.wpp_products.tasks.App") as mock_app, patch(
+            "marketplace.wpp_products.tasks.celery_app"
+        ) as mock_celery:
+            app = MagicMock()
+            app.vtex_catalogs.all.return_value = [
+                MagicMock(uuid="c1"),
+                MagicMock(uuid="c2"),
+            ]
+            mock_app.objects.filter.return_value = [app]
+
+            tasks.task_sync_product_policies()
+
+            self.assertEqual(
+                [c.kwargs["kwargs"] for c in mock_celery.send_task.call_args_list],
+                [{"catalog_uuid": "c1"}, {"catalog_uuid": "c2"}],
+            )
+
+    def test_task_sync_catalog_product_policies_runs_in_a_slot(self):
+        tasks = import_tasks_module()
+        with patch(
+            "marketplace.wpp_products.tasks.RedisSemaphore"
+        ) as mock_semaphore_cls, patch(
+            "marketplace.wpp_products.tasks.Catalog"
+        ) as mock_catalog, patch(
+            "marketplace.wpp_products.tasks.ProductSyncMetaPolices"
+        ) as mock_sync_cls:
+            mock_sync_cls.return_value.sync_products_polices.return_value = True
+
+            tasks.task_sync_catalog_product_policies("c1")
+
+            mock_sync_cls.assert_called_once_with(mock_catalog.objects.get.return_value)
+            mock_sync_cls.return_value.sync_products_polices.assert_called_once_with(
+                mock_semaphore_cls.return_value
+            )
+
+    def test_task_sync_catalog_product_policies_waits_for_a_slot(self):
+        tasks = import_tasks_module()
+        with patch("marketplace.wpp_products.tasks.RedisSemaphore"), patch(
+            "marketplace.wpp_products.tasks.Catalog"
+        ), patch("marketplace.wpp_products.tasks.celery_app") as mock_celery, patch(
+            "marketplace.wpp_products.tasks.ProductSyncMetaPolices"
+        ) as mock_sync_cls:
+            mock_sync_cls.return_value.sync_products_polices.return_value = False
+
+            tasks.task_sync_catalog_product_policies("c1", attempt=2)
+
+            mock_celery.send_task.assert_called_once_with(
+                "task_sync_catalog_product_policies",
+                kwargs={"catalog_uuid": "c1", "attempt": 3},
+                countdown=tasks.POLICY_SYNC_RETRY_DELAY,
+                ignore_result=True,
+            )
+
+            mock_celery.send_task.reset_mock()
+            tasks.task_sync_catalog_product_policies(
+                "c1", attempt=tasks.POLICY_SYNC_MAX_ATTEMPTS - 1
+            )
+            mock_celery.send_task.assert_not_called()
+
     def test_task_enqueue_webhook_calls(self):
         tasks = import_tasks_module()
         with patch("marketplace.wpp_products.tasks._enqueue_webhook") as mock_enqueue:
             tasks.task_enqueue_webhook("a", "s", "sku")
             mock_enqueue.assert_called_once_with("a", "s", "sku")
 
+    def test_send_sync_tags_price_and_stock_only_webhooks(self):
+        tasks = import_tasks_module()
+        webhook = {
+            "IdSku": "1",
+            "An": "A",
+            "PriceModified": True,
+            "StockModified": False,
+            "HasStockKeepingUnitModified": False,
+            "HasStockKeepingUnitRemovedFromAffiliate": False,
+        }
+        with patch("marketplace.wpp_products.tasks.cache") as mock_cache, patch(
+            "marketplace.wpp_products.tasks._enqueue_webhook", return_value=False
+        ) as mock_enqueue:
+            mock_cache.get.return_value = MagicMock(
+                config={"initial_sync_completed": True}
+            )
+
+            tasks.send_sync("app", webhook)
+            mock_enqueue.assert_called_once_with("app", "A", "1", "price_stock")
+
+            mock_enqueue.reset_mock()
+            with self.settings(VTEX_WEBHOOK_FAST_PATH_ENABLED=False):
+                tasks.send_sync("app", webhook)
+            mock_enqueue.assert_called_once_with("app", "A", "1", "full")
+
+    def test_enqueue_webhook_keeps_one_item_per_sku(self):
+        tasks = import_tasks_module()
+        with patch("marketplace.wpp_products.tasks.RedisQueue") as mock_queue_cls:
+            queue = mock_queue_cls.return_value
+
+            # A full update queued covers the price and stock
+            queue.contains.return_value = True
+            self.assertTrue(tasks._enqueue_webhook("app", "A", "1", "price_stock"))
+            queue.contains.assert_called_once_with("A#1")
+            queue.insert.assert_not_called()
+
+            queue.contains.return_value = False
+            tasks._enqueue_webhook("app", "A", "1", "price_stock")
+            queue.insert.assert_called_once_with("A#1#price_stock")
+
+            # A full update replaces the price and stock item
+            queue.insert.reset_mock()
+            tasks._enqueue_webhook("app", "A", "1")
+            queue.discard.assert_called_once_with("A#1#price_stock")
+            queue.insert.assert_called_once_with("A#1")
+
     def test_task_dequeue_webhooks_flow(self):
         tasks = import_tasks_module()
         with patch(
             "marketplace.wpp_products.tasks.RedisQueue"
         ) as mock_queue_cls, patch(
-            "marketplace.wpp_products.tasks.celery_app"
-        ) as mock_celery:
+            "marketplace.wpp_products.tasks.send_sync_task"
+        ) as mock_send:
             queue = MagicMock()
             queue.length.side_effect = [2, 2, 0]
             queue.get_batch.return_value = ["s#1", "s#2"]
@@ -230,7 +452,13 @@ class TestTasks(SimpleTestCase):
                 app_uuid="app", celery_queue="q", priority=1, batch_size=2
             )
 
-            mock_celery.send_task.assert_called_once()
+            mock_send.assert_called_once_with(
+                "task_update_webhook_batch_products",
+                kwargs={"app_uuid": "app", "batch": ["s#1", "s#2"], "priority": 1},
+                queue="q",
+                app_uuid="app",
+                cost=2,
+            )
             queue.redis.delete.assert_called()  # lock removed
 
     def test_task_update_webhook_batch_products_paths(self):
@@ -363,13 +591,19 @@ class TestTasks(SimpleTestCase):
         ) as mock_webhook, patch(
             "marketplace.wpp_products.tasks.UploadProduct"
         ) as mock_upload:
-            mock_upload.objects.filter.return_value.exists.side_effect = [True, True]
+            errors = mock_upload.objects.filter.return_value
+            errors.exists.return_value = True
+            in_processing = errors.exclude.return_value
+            in_processing.exists.return_value = True
             tasks.task_cleanup_vtex_logs_and_uploads()
             mock_log.objects.all.return_value.delete.assert_called_once()
             mock_webhook.objects.all.return_value.delete.assert_called_once()
-            self.assertEqual(
-                mock_upload.objects.filter.return_value.update.call_count, 2
+            errors.update.assert_called_once_with(status="pending")
+            # Rows of a feed file Meta is still processing are left alone
+            errors.exclude.assert_called_once_with(
+                feed__upload_session_id__isnull=False
             )
+            in_processing.update.assert_called_once_with(status="pending")
 
     def test_send_sync_paths(self):
         # App does not exist
@@ -439,6 +673,23 @@ class TestTasks(SimpleTestCase):
             res = tasks.send_sync("app", {"IdSku": "1", "An": "A"})
             mock_sched.assert_called_once()
 
+        # Known domain -> unknown sellers invalidate the active sellers registry
+        with patch("marketplace.wpp_products.tasks.cache") as mock_cache, patch(
+            "marketplace.wpp_products.tasks._enqueue_webhook", return_value=False
+        ), patch(
+            "marketplace.wpp_products.tasks.ActiveSellerRegistry"
+        ) as mock_registry:
+            app = MagicMock()
+            app.config = {
+                "initial_sync_completed": True,
+                "api_credentials": {"domain": "store.com"},
+            }
+            mock_cache.get.return_value = app
+            tasks.send_sync("app", {"IdSku": "1", "An": "A"})
+            mock_registry.invalidate_unknown_in_domain.assert_called_once_with(
+                "store.com", "A"
+            )
+
     def test_get_projects_with_vtex_app_and_sync_facebook_catalogs(self):
         # get_projects_with_vtex_app
         tasks = import_tasks_module()
@@ -6,6 +6,7 @@ from django.contrib.auth import get_user_model
 
 from marketplace.wpp_products.models import UploadProduct, Catalog
 from marketplace.wpp_products.utils import ProductBatchFetcher
+from marketplace.services.vtex.utils.enums import ProductPriority
 from marketplace.applications.models import App
 
 
@@ -84,3 +85,43 @@ class ProductBatchFetcherTestCase(TestCase):
         # Attempt to fetch products and expect StopIteration
         with self.assertRaises(StopIteration):
             next(batch_fetcher)
+
+    def _create_pending(self, facebook_product_id, priority=0):
+        return UploadProduct.objects.create(
+            facebook_product_id=facebook_product_id,
+            catalog=self.catalog,
+            data={"name": facebook_product_id},
+            status="pending",
+            priority=priority,
+        )
+
+    def test_fetch_on_demand_products_first(self):
+        self._create_pending("prod_1")
+        on_demand = self._create_pending("prod_2", priority=1)
+
+        batch_fetcher = ProductBatchFetcher(self.catalog, batch_size=10)
+        latest_products, product_ids = next(batch_fetcher)
+
+        self.assertEqual(list(latest_products), [on_demand])
+        self.assertEqual(batch_fetcher.lane, ProductPriority.ON_DEMAND)
+        self.assertFalse(batch_fetcher.has_priority_pending())
+
+        latest_products, product_ids = next(batch_fetcher)
+
+        self.assertEqual(product_ids, ["prod_1"])
+        self.assertEqual(batch_fetcher.lane, ProductPriority.DEFAULT)
+
+    def test_default_products_are_not_starved(self):
+        for index in range(3):
+            self._create_pending(f"on_demand_{index}", priority=1)
+        self._create_pending("prod_1")
+
+        batch_fetcher = ProductBatchFetcher(
+            self.catalog, batch_size=1, max_priority_streak=2
+        )
+        lanes = []
+        for _ in range(4):
+            next(batch_fetcher)
+            lanes.append(batch_fetcher.lane)
+
+        self.assertEqual(lanes, [1, 1, 0, 1])
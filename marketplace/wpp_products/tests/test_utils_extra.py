@@ -10,6 +10,7 @@ from marketplace.wpp_products.utils import (
     extract_sku_id,
     ProductBatchUploader,
     RedisQueue,
+    RedisSemaphore,
     exceptions,
 )
 
@@ -207,18 +208,73 @@ class TestProductSyncMetaPolices(SimpleTestCase):
         p = ProductSyncMetaPolices(self._make_catalog())
         p.redis = redis
         p.client = MagicMock()
-        p._list_unapproved_products = MagicMock(
-            return_value=[{"id": "p1", "retailer_id": "1#x"}]
+        p._iter_unapproved_products = MagicMock(
+            return_value=iter(
+                [
+                    [{"id": "p1", "retailer_id": "1#x"}],
+                    [{"id": "p2", "retailer_id": "2#x"}],
+                ]
+            )
         )
         p._sync_local_products = MagicMock()
 
         p.sync_products_polices()
-        p._sync_local_products.assert_called_once()
+        self.assertEqual(p._sync_local_products.call_count, 2)
+        redis.lock.assert_called_with(
+            f"sync-meta-polices-lock:{p.catalog.uuid}", timeout=p.LOCK_TIMEOUT
+        )
+        p._iter_unapproved_products.return_value = iter([[{"id": "p1"}]])
 
         # Now simulate exception inside _sync_local_products
         p._sync_local_products.side_effect = Exception("fail")
         p.sync_products_polices()  # logs error, no raise
 
+    @patch("marketplace.wpp_products.utils.get_redis_connection")
+    @patch("marketplace.wpp_products.utils.FacebookClient")
+    def test_sync_products_polices_takes_a_slot_under_the_lock(
+        self, mock_client, mock_conn
+    ):
+        redis = MagicMock()
+        redis.get.return_value = None
+        mock_conn.return_value = redis
+        semaphore = MagicMock()
+        semaphore.acquire.return_value = True
+
+        p = ProductSyncMetaPolices(self._make_catalog())
+        p._sync_unapproved_products = MagicMock()
+
+        self.assertTrue(p.sync_products_polices(semaphore))
+        self.assertTrue(p.sync_products_polices(semaphore))
+
+        first, second = [c.args[0] for c in semaphore.acquire.call_args_list]
+        self.assertNotEqual(first, second)
+        self.assertEqual(
+            [c.args[0] for c in semaphore.release.call_args_list], [first, second]
+        )
+
+        # A run overlapping the one holding the lock leaves its slot alone
+        semaphore.reset_mock()
+        redis.get.return_value = "locked"
+        self.assertTrue(p.sync_products_polices(semaphore))
+        semaphore.acquire.assert_not_called()
+        semaphore.release.assert_not_called()
+
+    @patch("marketplace.wpp_products.utils.get_redis_connection")
+    @patch("marketplace.wpp_products.utils.FacebookClient")
+    def test_sync_products_polices_without_a_free_slot(self, mock_client, mock_conn):
+        redis = MagicMock()
+        redis.get.return_value = None
+        mock_conn.return_value = redis
+        semaphore = MagicMock()
+        semaphore.acquire.return_value = False
+
+        p = ProductSyncMetaPolices(self._make_catalog())
+        p._sync_unapproved_products = MagicMock()
+
+        self.assertFalse(p.sync_products_polices(semaphore))
+        p._sync_unapproved_products.assert_not_called()
+        semaphore.release.assert_not_called()
+
     @patch("marketplace.wpp_products.utils.get_redis_connection")
     @patch("marketplace.wpp_products.utils.FacebookClient")
     def test_sync_products_polices_lock_error(self, mock_client, mock_conn):
@@ -234,37 +290,30 @@ class TestProductSyncMetaPolices(SimpleTestCase):
 
         p.sync_products_polices()  # should handle lock error
 
-    def test_list_unapproved_products_delegates(self):
+    def test_iter_unapproved_products_delegates(self):
         p = ProductSyncMetaPolices(self._make_catalog())
         p.client = MagicMock()
-        p.client.list_unapproved_products.return_value = ["a"]
-        out = p._list_unapproved_products()
-        self.assertEqual(out, ["a"])
+        p.client.iter_unapproved_products.return_value = iter([["a"]])
+        out = list(p._iter_unapproved_products())
+        self.assertEqual(out, [["a"]])
+        p.client.iter_unapproved_products.assert_called_once_with("cat-1")
 
     @patch("marketplace.wpp_products.utils.ProductValidation")
     def test_save_invalid_products(self, mock_validation):
         p = ProductSyncMetaPolices(self._make_catalog())
-        # First item: is_valid False -> skip creation
-        # Next two: None -> create True and then False
-        q = MagicMock()
-        q.values_list.return_value.first.side_effect = [False, None, None]
-        mock_validation.objects.filter.return_value = q
-
-        created_obj = MagicMock()
-        mock_validation.objects.get_or_create.side_effect = [
-            (created_obj, True),
-            (created_obj, False),
-        ]
 
         invalids = [
             {"sku_id": 1, "rejection_reason": "x"},
             {"sku_id": 2, "rejection_reason": "y"},
-            {"sku_id": 3, "rejection_reason": "z"},
+            {"sku_id": 2, "rejection_reason": "z"},
         ]
         p._save_invalid_products(invalids)
 
-        # get_or_create called for last two only
-        self.assertEqual(mock_validation.objects.get_or_create.call_count, 2)
+        # One insert for the distinct SKUs, existing validations are kept
+        mock_validation.objects.bulk_create.assert_called_once()
+        args, kwargs = mock_validation.objects.bulk_create.call_args
+        self.assertEqual(len(list(args[0])), 2)
+        self.assertTrue(kwargs["ignore_conflicts"])
 
     def test_sync_local_products_builds_deletes_and_saves(self):
         p = ProductSyncMetaPolices(self._make_catalog())
@@ -333,6 +382,8 @@ class TestProductBatchUploader(SimpleTestCase):
                 p2.data = {"b": 2}
                 self.items = [([p1], ["11#x"]), ([p2], ["22#y"])]
                 self.idx = 0
+                self.lane = 0
+                self.has_priority_pending = MagicMock(return_value=False)
                 self.mark_products_as_sent = MagicMock()
                 self.mark_products_as_error = MagicMock()
 
@@ -361,6 +412,20 @@ class TestProductBatchUploader(SimpleTestCase):
         self.assertEqual(redis.expire.call_count, 2)
         uploader.log_sent_products.assert_called_once()
 
+    @patch("marketplace.wpp_products.utils.time.sleep", return_value=None)
+    def test_upload_delay_ends_when_on_demand_products_are_pending(self, mock_sleep):
+        uploader = ProductBatchUploader(self._make_catalog())
+        uploader.product_manager = MagicMock()
+        uploader.product_manager.has_priority_pending.side_effect = [
+            False,
+            False,
+            True,
+        ]
+
+        uploader.wait_before_next_batch(30)
+
+        self.assertEqual(mock_sleep.call_count, 2)
+
     @patch("marketplace.wpp_products.utils.ProductUploadLog")
     def test_log_sent_products(self, mock_log):
         uploader = ProductBatchUploader(self._make_catalog())
@@ -410,3 +475,78 @@ class TestRedisQueue(SimpleTestCase):
         out = rq.get_batch(2)
         self.assertEqual(out, ["c", "d"])
         redis.zrem.assert_called()
+
+        # contains and discard
+        redis.zscore.return_value = 1.0
+        self.assertTrue(rq.contains("c"))
+        redis.zrem.return_value = 0
+        self.assertFalse(rq.discard("c"))
+        redis.zrem.assert_called_with("q", "c")
+
+
+class FakeSortedSetRedis:
+    def __init__(self):
+        self.zsets = {}
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.commands = []
+
+            def __getattr__(self, name):
+                return lambda *args: self.commands.append((name, args))
+
+            def execute(self):
+                return [getattr(redis, name)(*args) for name, args in self.commands]
+
+        return Pipeline()
+
+    def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.setdefault(key, {})
+        for member in [m for m, score in zset.items() if low <= score <= high]:
+            del zset[member]
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def expire(self, key, ttl):
+        pass
+
+    def zrank(self, key, member):
+        ranked = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+        members = [m for m, _ in ranked]
+        return members.index(member) if member in members else None
+
+    def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+
+class TestRedisSemaphore(SimpleTestCase):
+    def test_caps_the_holders(self):
+        redis = FakeSortedSetRedis()
+        semaphore = RedisSemaphore("slots", limit=2, lease=60, redis_client=redis)
+
+        self.assertTrue(semaphore.acquire("a"))
+        self.assertTrue(semaphore.acquire("b"))
+        self.assertFalse(semaphore.acquire("c"))
+        self.assertEqual(set(redis.zsets["slots"]), {"a", "b"})
+
+        semaphore.release("a")
+        self.assertTrue(semaphore.acquire("c"))
+
+    def test_frees_expired_leases(self):
+        redis = FakeSortedSetRedis()
+        semaphore = RedisSemaphore("slots", limit=1, lease=60, redis_client=redis)
+        redis.zadd("slots", {"dead": 1.0})
+
+        self.assertTrue(semaphore.acquire("a"))
+
+    def test_does_not_cap_without_redis(self):
+        redis = MagicMock()
+        redis.pipeline.return_value.execute.side_effect = ConnectionError("down")
+        semaphore = RedisSemaphore("slots", limit=1, lease=60, redis_client=redis)
+
+        with self.assertLogs("marketplace.wpp_products.utils", "WARNING"):
+            self.assertTrue(semaphore.acquire("a"))
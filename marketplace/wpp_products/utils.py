@@ -1,14 +1,16 @@
 import logging
 import json
 import time
+import uuid
 
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterator, List, Optional
 
 from datetime import datetime, timezone
 
 from django.conf import settings
 
 from marketplace.services.vtex.utils.enums import ProductPriority
+from marketplace.services.vtex.utils.sync_progress import SyncProgress
 
 from django.db.models import QuerySet
 
@@ -29,6 +31,7 @@ from marketplace.services.facebook.service import (
     FacebookService,
 )
 from marketplace.celery import app as celery_app
+from marketplace.wpp_products.fingerprints import record_fingerprints
 
 
 logger = logging.getLogger(__name__)
@@ -51,22 +54,65 @@ class ProductUploadManager:
 
 
 class ProductBatchFetcher(ProductUploadManager):
-    def __init__(self, catalog, batch_size):
+    """
+    Fetches the pending products of a catalog in batches, by priority lane.
+
+    Products saved by ON_DEMAND syncs are fetched before the DEFAULT ones at
+    every batch. After `max_priority_streak` priority batches in a row a
+    DEFAULT batch is fetched, if any, so full syncs keep moving while
+    on-demand requests keep arriving.
+    """
+
+    def __init__(self, catalog, batch_size, max_priority_streak: int = None):
         self.catalog = catalog
         self.batch_size = batch_size
+        self.max_priority_streak = (
+            max_priority_streak or settings.META_UPLOAD_MAX_PRIORITY_STREAK
+        )
+        self.priority_streak = 0
+        self.lane = ProductPriority.DEFAULT
 
     def __iter__(self):
         return self
 
-    def __next__(self):
-        latest_products = UploadProduct.get_latest_products(
-            catalog=self.catalog, status="pending", batch_size=self.batch_size
+    def _fetch_lane(self, lane: int) -> QuerySet:
+        if lane == ProductPriority.DEFAULT:
+            lane_filter = {"max_priority": ProductPriority.DEFAULT}
+        else:
+            lane_filter = {"min_priority": ProductPriority.ON_DEMAND}
+        return UploadProduct.get_latest_products(
+            catalog=self.catalog,
+            status="pending",
+            batch_size=self.batch_size,
+            **lane_filter,
         )
 
-        if not latest_products.exists():
+    def has_priority_pending(self) -> bool:
+        return UploadProduct.objects.filter(
+            catalog=self.catalog,
+            status="pending",
+            priority__gte=ProductPriority.ON_DEMAND,
+        ).exists()
+
+    def __next__(self):
+        lanes = [ProductPriority.ON_DEMAND, ProductPriority.DEFAULT]
+        if self.priority_streak >= self.max_priority_streak:
+            lanes.reverse()
+
+        for lane in lanes:
+            latest_products = self._fetch_lane(lane)
+            if latest_products.exists():
+                break
+        else:
             print(f"No more pending products for catalog {self.catalog.name}.")
             raise StopIteration
 
+        self.lane = lane
+        if lane == ProductPriority.DEFAULT:
+            self.priority_streak = 0
+        else:
+            self.priority_streak += 1
+
         product_ids = list(latest_products.values_list("id", flat=True))
 
         # Update status to "processing"
@@ -133,53 +179,75 @@ class UploadManager:
 
 class ProductSyncMetaPolices:
     SYNC_META_POLICES_LOCK_KEY = "sync-meta-polices-lock"
+    # Seconds the lock of a catalog is held at most, below the hourly schedule
+    LOCK_TIMEOUT = 3000
 
     def __init__(self, catalog: Any) -> None:
         self.catalog = catalog
         self.app = catalog.app
         self.client = FacebookClient(self.app.apptype.get_system_access_token(self.app))
         self.redis = get_redis_connection()
+        self.lock_key = f"{self.SYNC_META_POLICES_LOCK_KEY}:{catalog.uuid}"
 
-    def sync_products_polices(self) -> None:
-        if self.redis.get(self.SYNC_META_POLICES_LOCK_KEY):
+    def sync_products_polices(
+        self, semaphore: Optional["RedisSemaphore"] = None
+    ) -> bool:
+        """
+        Syncs the products rejected by the Meta policies. With a `semaphore`,
+        a slot is taken once the lock of the catalog is held, and False is
+        returned when none is free so the sync is tried again later.
+        """
+        if self.redis.get(self.lock_key):
             logger.error(
-                "The catalogs are already syncing products polices by another task!"
+                f"The catalog {self.catalog.name} is already syncing products "
+                "polices by another task!"
             )
-            return
+            return True
 
         try:
-            with self.redis.lock(self.SYNC_META_POLICES_LOCK_KEY, timeout=1200):
-                wa_business_id = self.app.config.get("wa_business_id")
-                wa_waba_id = self.app.config.get("wa_waba_id")
-
-                if not (wa_business_id and wa_waba_id):
-                    logger.warning(
-                        f"Business ID or WABA ID missing for app: {self.app.uuid}"
-                    )
-                    return
-
-                all_products = self._list_unapproved_products()
+            with self.redis.lock(self.lock_key, timeout=self.LOCK_TIMEOUT):
+                # Unique per run, an overlapping run never frees this slot
+                holder = uuid.uuid4().hex
+                if semaphore and not semaphore.acquire(holder):
+                    return False
                 try:
-                    if all_products:
-                        self._sync_local_products(all_products)
-                except Exception as e:
-                    logger.error(
-                        f"Error during sync process for App {self.app.name}: {e}",
-                        exc_info=True,
-                        stack_info=True,
-                    )
+                    self._sync_unapproved_products()
+                finally:
+                    if semaphore:
+                        semaphore.release(holder)
         except exceptions.LockError as e:
             logger.error(f"Failed to acquire or release lock: {e}")
+        return True
+
+    def _sync_unapproved_products(self) -> None:
+        wa_business_id = self.app.config.get("wa_business_id")
+        wa_waba_id = self.app.config.get("wa_waba_id")
 
-    def _list_unapproved_products(self) -> List[Dict[str, Any]]:
-        return self.client.list_unapproved_products(self.catalog.facebook_catalog_id)
+        if not (wa_business_id and wa_waba_id):
+            logger.warning(f"Business ID or WABA ID missing for app: {self.app.uuid}")
+            return
+
+        try:
+            for products in self._iter_unapproved_products():
+                if products:
+                    self._sync_local_products(products)
+        except Exception as e:
+            logger.error(
+                f"Error during sync process for App {self.app.name}: {e}",
+                exc_info=True,
+                stack_info=True,
+            )
+
+    def _iter_unapproved_products(self) -> Iterator[List[Dict[str, Any]]]:
+        """Pages of the products of the catalog rejected by the Meta policies."""
+        return self.client.iter_unapproved_products(self.catalog.facebook_catalog_id)
 
     def _sync_local_products(self, all_products: List[Dict[str, Any]]) -> None:
         products_to_delete = []
         products_invalid = []
         for product in all_products:
-            formated_product = self._product_data_info(product)
             try:
+                formated_product = self._product_data_info(product)
                 retailer_id = formated_product["retailer_id"]
                 if retailer_id:
                     products_to_delete.append(
@@ -212,44 +280,30 @@ class ProductSyncMetaPolices:
         )
 
     def _save_invalid_products(self, products_invalid: List[Dict[str, Any]]) -> None:
+        """
+        Saves the rejected SKUs as invalid with one bulk insert. SKUs the
+        catalog already has a validation for are left as they are.
+        """
+        validations = {}
         for product in products_invalid:
             sku_id = product.get("sku_id")
-            catalog = self.catalog
-
-            is_valid = (
-                ProductValidation.objects.filter(sku_id=sku_id, catalog=catalog)
-                .values_list("is_valid", flat=True)
-                .first()
-            )
-            if is_valid is not None and not is_valid:
-                logger.info(
-                    f"SKU:{sku_id} is already invalid in the database for catalog: {catalog.name}"
-                )
-                continue
-
             rejection_reason = product.get("rejection_reason", "No reason")
             reason_str = f"{rejection_reason} - sync-tsk"
-
-            # Use get_or_create to avoid duplication
-            _, created = ProductValidation.objects.get_or_create(
-                catalog=catalog,
+            validations[sku_id] = ProductValidation(
+                catalog=self.catalog,
                 sku_id=sku_id,
-                defaults={
-                    "is_valid": False,
-                    "classification": reason_str,
-                    "description": f"Product rejected due to: {reason_str}",
-                },
+                is_valid=False,
+                classification=reason_str[:100],
+                description=f"Product rejected due to: {reason_str}"[:9999],
             )
 
-            if created:
-                logger.info(
-                    f"SKU:{sku_id} has been saved as invalid for the first time in catalog: {catalog.name}"
-                )
-            else:
-                logger.info(
-                    f"SKU:{sku_id} already exists in the database "
-                    f"for catalog: {catalog.name} and was not created again."
-                )
+        ProductValidation.objects.bulk_create(
+            validations.values(), batch_size=1000, ignore_conflicts=True
+        )
+        logger.info(
+            f"Saved {len(validations)} rejected SKUs as invalid for catalog: "
+            f"{self.catalog.name}"
+        )
 
     def _product_data_info(self, product: Dict[str, Any]) -> Dict[str, Any]:
         retailer_id = product.get("retailer_id")
@@ -274,6 +328,8 @@ def extract_sku_id(product_id: str) -> int:
 class ProductBatchUploader:
     fb_service_class = FacebookService
     fb_client_class = FacebookClient
+    # Seconds between the checks for ON_DEMAND products during the upload delay
+    PRIORITY_POLL_INTERVAL = 2
 
     def __init__(
         self, catalog: Catalog, batch_size=5000, priority: int = ProductPriority.DEFAULT
@@ -305,18 +361,28 @@ class ProductBatchUploader:
                 if self.send_to_meta(payload):
                     self.product_manager.mark_products_as_sent(product_ids)
                     self.log_sent_products(product_ids)
+                    record_fingerprints(
+                        self.catalog,
+                        (request["data"] for request in payload["requests"]),
+                    )
+                    SyncProgress.increment(
+                        self.catalog.uuid, "uploaded", len(product_ids)
+                    )
                 else:
                     self.product_manager.mark_products_as_error(product_ids)
 
                 # Apply delay based on priority
                 # If priority is DEFAULT, apply delay from settings
                 # If priority is different from DEFAULT, no delay
-                if self.priority == ProductPriority.DEFAULT:
+                if (
+                    self.priority == ProductPriority.DEFAULT
+                    and self.product_manager.lane == ProductPriority.DEFAULT
+                ):
                     upload_delay: int = settings.META_UPLOAD_PRODUCT_DELAY_DEFAULT
                     logger.info(
                         f"Waiting {upload_delay} seconds for catalog {self.catalog.name} before next batch"
                     )
-                    time.sleep(upload_delay)
+                    self.wait_before_next_batch(upload_delay)
 
                 # Renew the lock
                 redis_client.expire(lock_key, lock_expiration_time)
@@ -341,6 +407,23 @@ class ProductBatchUploader:
                     stack_info=False,
                 )
 
+    def wait_before_next_batch(self, delay: int) -> None:
+        """
+        Sleeps for the upload delay, ending it as soon as ON_DEMAND products
+        are pending, so they are uploaded within seconds.
+        """
+        waited = 0
+        while waited < delay:
+            if self.product_manager.has_priority_pending():
+                logger.info(
+                    f"ON_DEMAND products pending for catalog {self.catalog.name}, "
+                    "uploading them now"
+                )
+                return
+            step = min(self.PRIORITY_POLL_INTERVAL, delay - waited)
+            time.sleep(step)
+            waited += step
+
     def create_batch_payload(self, products: QuerySet) -> dict:
         """
         Creates a payload for the Meta Batch API from a list of products.
@@ -410,6 +493,14 @@ class RedisQueue:
         self.redis.expire(self.queue_key, 3600 * 24)  # TTL of 24 hours
         return True
 
+    def contains(self, value):
+        """Whether the item is in the queue."""
+        return self.redis.zscore(self.queue_key, value) is not None
+
+    def discard(self, value):
+        """Remove the item from the queue, if it is there."""
+        return bool(self.redis.zrem(self.queue_key, value))
+
     def remove(self):
         """Remove and return the first item from the queue (FIFO)."""
         items = self.redis.zrange(
@@ -434,3 +525,52 @@ class RedisQueue:
         if items:
             self.redis.zrem(self.queue_key, *items)
         return [item.decode("utf-8") for item in items]
+
+
+class RedisSemaphore:
+    """
+    Caps how many tasks run at once across workers.
+
+    Holders are kept in a sorted set scored by the expiry of their lease, so
+    a slot held by a worker that died is freed after `lease` seconds. A
+    holder gets a slot when it ranks among the first `limit` leases.
+    """
+
+    def __init__(self, key: str, limit: int, lease: int, redis_client=None):
+        self.key = key
+        self.limit = limit
+        self.lease = lease
+        self._redis = redis_client
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis_connection()
+        return self._redis
+
+    def acquire(self, holder: str) -> bool:
+        """
+        Take a slot for `holder`, returning whether one was free. Without
+        Redis the cap is not enforced.
+        """
+        now = time.time()
+        try:
+            pipeline = self.redis.pipeline(transaction=True)
+            pipeline.zremrangebyscore(self.key, 0, now)
+            pipeline.zadd(self.key, {holder: now + self.lease})
+            pipeline.expire(self.key, self.lease)
+            pipeline.zrank(self.key, holder)
+            rank = pipeline.execute()[-1]
+            if rank is not None and rank < self.limit:
+                return True
+            self.redis.zrem(self.key, holder)
+            return False
+        except Exception as e:
+            logger.warning(f"Semaphore {self.key} unavailable, Redis error: {e}")
+            return True
+
+    def release(self, holder: str) -> None:
+        try:
+            self.redis.zrem(self.key, holder)
+        except Exception as e:
+            logger.warning(f"Could not release {holder} from {self.key}: {e}")